@@ -0,0 +1,5 @@
+"""
+get-unipa ベンチマーク
+
+実際の UNIVERSAL PASSPORT にアクセスせず、UNIPA 風の HTML を生成して計測します。
+"""
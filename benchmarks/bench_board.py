@@ -0,0 +1,85 @@
+"""
+ベンチマーク: 掲示板の掲示リスト解析のスケーリング
+
+掲示数 100, 1,000, 10,000 の合成掲示板ページについて、DOM からの抽出 (UnipaBulletinBoard.parse_all) と
+ストリーミングスキャナー (UnipaBulletinBoard.iter_all で利用) の所要時間を計測し、掲示 1 件あたりの時間を表示します。
+掲示 1 件あたりの時間が掲示数によらずほぼ一定であれば、線形に処理できています。
+
+    python -m benchmarks.bench_board
+"""
+import argparse
+import time
+from typing import Callable, List
+
+from unipa.BulletinBoard import UnipaBulletinBoard
+from unipa.BulletinBoard.BulletinBoardScanner import UnipaBulletinBoardScanner
+from unipa.testing.pages import UnipaPages, UnipaPageTokens
+from unipa.unipa_parser import PARSER_LXML, UnipaParser
+
+
+def measure(func: Callable[[], object],
+            repeat: int) -> float:
+    """
+    1 回あたりの時間 (秒) を計測する
+
+    Args:
+        func: 処理
+        repeat: 繰り返し回数
+
+    Returns:
+        float: 1 回あたりの時間 (秒、最良値)
+    """
+    results: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        results.append(time.perf_counter() - start)
+    return min(results)
+
+
+def scan(markup: str,
+         chunk_size: int = 64 * 1024) -> int:
+    """
+    ストリーミングスキャナーで掲示リストを走査する
+
+    Args:
+        markup: HTML
+        chunk_size: 一度に走査する文字数
+
+    Returns:
+        int: 掲示数
+    """
+    scanner = UnipaBulletinBoardScanner()
+    count = 0
+    for start in range(0, len(markup), chunk_size):
+        count += len(scanner.feed_items(markup[start:start + chunk_size]))
+    return count + len(scanner.close_items())
+
+
+def main() -> None:
+    """
+    ベンチマーク メイン関数
+    """
+    argument_parser = argparse.ArgumentParser(description=__doc__)
+    argument_parser.add_argument("--repeat", type=int, default=3, help="繰り返し回数")
+    argument_parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000], help="掲示数")
+    argument_parser.add_argument("--parser", default=PARSER_LXML, help="HTML パーサー")
+    args = argument_parser.parse_args()
+
+    parser = UnipaParser(args.parser, None)
+    print(f"{'posts':>8}{'parse':>12}{'parse_all':>12}{'scanner':>12}{'parse_all/post':>18}{'scanner/post':>16}")
+    for size in args.sizes:
+        markup = UnipaPages.board(UnipaPageTokens(), size)
+        soup = parser.parse(markup)
+        if len(UnipaBulletinBoard.parse_all(soup)) != size or scan(markup) != size:
+            raise RuntimeError("掲示数が一致しません")
+
+        parsed = measure(lambda: parser.parse(markup), args.repeat)
+        extracted = measure(lambda: UnipaBulletinBoard.parse_all(soup), args.repeat)
+        scanned = measure(lambda: scan(markup), args.repeat)
+        print(f"{size:>8}{parsed * 1000:>10.1f}ms{extracted * 1000:>10.1f}ms{scanned * 1000:>10.1f}ms"
+              f"{extracted / size * 1e6:>16.1f}us{scanned / size * 1e6:>14.1f}us")
+
+
+if __name__ == '__main__':
+    main()
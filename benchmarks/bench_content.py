@@ -0,0 +1,84 @@
+"""
+ベンチマーク: 掲示本文のプレーンテキスト・Markdown 変換
+
+掲示詳細の本文 HTML を、BeautifulSoup の get_text (DOM を構築する従来の方法) と、本文変換 (1 回の走査) で
+プレーンテキスト・Markdown に変換した場合の 1 件あたりの CPU 時間を比較します。同じ本文を繰り返し参照した場合の
+キャッシュ済みの変換時間も表示します。
+
+    python -m benchmarks.bench_content
+"""
+import argparse
+import time
+from typing import Callable, Dict, List
+
+from bs4 import BeautifulSoup
+
+from unipa.BulletinBoard.BulletinBoardContent import CONTENT_MARKDOWN, CONTENT_TEXT, UnipaContentConverter, \
+    render_content
+from unipa.unipa_parser import PARSER_BACKENDS, UnipaParser
+
+CONTENT_HTML = "<p>本文です。<br />詳細は<a href=\"https://example.com/\">こちら</a>を<strong>必ず</strong>確認してください。</p>" \
+               "<ul><li>対象: 全学生</li><li>締切: 4/30</li></ul>"
+
+
+def get_text(backend: str) -> Callable[[str], object]:
+    """
+    BeautifulSoup の get_text でプレーンテキストに変換する処理 (従来の方法)
+
+    Args:
+        backend: パーサー
+
+    Returns:
+        Callable[[str], object]: 処理
+    """
+    return lambda markup: BeautifulSoup(markup, backend).get_text("\n", strip=True)
+
+
+def measure(func: Callable[[str], object],
+            markup: str,
+            repeat: int) -> float:
+    """
+    1 回あたりの CPU 時間 (ミリ秒) を計測する
+
+    Args:
+        func: 処理
+        markup: 本文 HTML
+        repeat: 繰り返し回数
+
+    Returns:
+        float: 1 回あたりの CPU 時間 (ミリ秒、最良値)
+    """
+    results: List[float] = []
+    for _ in range(repeat):
+        start = time.process_time()
+        func(markup)
+        results.append(time.process_time() - start)
+    return min(results) * 1000
+
+
+def main() -> None:
+    """
+    ベンチマーク メイン関数
+    """
+    argument_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    argument_parser.add_argument("--repeat", type=int, default=20, help="繰り返し回数")
+    argument_parser.add_argument("--paragraphs", type=int, default=20, help="本文の繰り返し回数")
+    args = argument_parser.parse_args()
+
+    markup = f"<td>{CONTENT_HTML * args.paragraphs}</td>"
+    converter = UnipaContentConverter()
+    cases: Dict[str, Callable[[str], object]] = {}
+    for backend in PARSER_BACKENDS:
+        if UnipaParser.is_available(backend):
+            cases[f"get_text({backend})"] = get_text(backend)
+    cases["render(text)"] = lambda x: render_content(x, CONTENT_TEXT)
+    cases["render(markdown)"] = lambda x: render_content(x, CONTENT_MARKDOWN)
+    cases["cached(text)"] = lambda x: converter.convert(x, CONTENT_TEXT)
+
+    print(f"{'method':<24}{'CPU ms':>10}")
+    for name, func in cases.items():
+        print(f"{name:<24}{measure(func, markup, args.repeat):>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
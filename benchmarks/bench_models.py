@@ -0,0 +1,109 @@
+"""
+ベンチマーク: モデルのメモリ使用量
+
+掲示アイテム・掲示詳細・ナビゲーションアイテム・クラスなどのモデルを大量に生成し、tracemalloc で計測した
+1 件あたりのバイト数を表示します。比較のため、同じ属性をインスタンスの __dict__ に持つクラス (__slots__ を
+使わない従来の実装に相当) の値も表示します。文字列などの属性値は全件で共有し、モデル自体の大きさのみを計測します。
+
+    python -m benchmarks.bench_models
+"""
+import argparse
+import datetime
+import gc
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+from unipa.BulletinBoard import UnipaBulletinBoardItem, UnipaBulletinBoardItemDetails
+from unipa.BulletinBoard.PublicationPeriod import UnipaPublicationPeriod
+from unipa.Classes.UnipaClass import UnipaClass, UnipaClassLectureAt
+from unipa.unipa_utils import Menu, UnipaInfoItem, UnipaNavItem
+
+START = datetime.datetime(2022, 4, 1, 9, 0)
+END = datetime.datetime(2022, 4, 30, 17, 0)
+PERIOD = UnipaPublicationPeriod(START, END)
+LECTURE_AT = UnipaClassLectureAt("月曜日", 1)
+MENU = Menu("掲示", "掲示板")
+
+FACTORIES: Dict[str, Callable[[int], object]] = {
+    "UnipaBulletinBoardItem": lambda index: UnipaBulletinBoardItem(
+        "funcForm:j_idt1:1:j_idt2", "title", "s", "p", "flag", "unread", False, True, False),
+    "UnipaBulletinBoardItemDetails": lambda index: UnipaBulletinBoardItemDetails(
+        "id", "title", "author", "category", "<p>content</p>", PERIOD),
+    "UnipaPublicationPeriod": lambda index: UnipaPublicationPeriod(START, END),
+    "UnipaNavItem": lambda index: UnipaNavItem(MENU, "掲示板", "0_0_0"),
+    "Menu": lambda index: Menu("掲示", "掲示板"),
+    "UnipaInfoItem": lambda index: UnipaInfoItem("クラスプロファイル", "funcForm:j_idt1:1:j_idt2"),
+    "UnipaClass": lambda index: UnipaClass("internal", "name", "class", LECTURE_AT),
+    "UnipaClassLectureAt": lambda index: UnipaClassLectureAt("月曜日", 1),
+}
+
+
+def dict_factory(model: object) -> Callable[[int], object]:
+    """
+    モデルと同じ属性を __dict__ に持つオブジェクト (比較用) を作成する関数を返す
+
+    Args:
+        model: モデル
+
+    Returns:
+        Callable[[int], object]: モデルと同じ属性を同じ順に __dict__ に持つオブジェクトを作成する関数
+    """
+    names = getattr(model, "__slots__", None) or list(vars(model))
+    values = [getattr(model, name) for name in names]
+    # モデルの種類ごとにクラスを作成し、インスタンス間で属性のキーを共有させる (従来の実装と同じ条件にする)
+    dict_class = type(f"{type(model).__name__}Dict", (), {})
+
+    def create(index: int) -> object:
+        result = dict_class()
+        for name, value in zip(names, values):
+            setattr(result, name, value)
+        return result
+
+    return create
+
+
+def measure(factory: Callable[[int], object],
+            count: int) -> float:
+    """
+    1 件あたりのバイト数を計測する
+
+    Args:
+        factory: モデルを作成する関数
+        count: 作成する件数
+
+    Returns:
+        float: 1 件あたりのバイト数
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        items: List[object] = [factory(index) for index in range(count)]
+        size = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    # 要素を保持するリスト自体の大きさは除く
+    return size / len(items) - 8
+
+
+def main() -> None:
+    """
+    ベンチマーク メイン関数
+    """
+    argument_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    argument_parser.add_argument("--count", type=int, default=100000, help="モデルごとに作成する件数")
+    args = argument_parser.parse_args()
+
+    results: List[Tuple[str, float, float]] = []
+    for name, factory in FACTORIES.items():
+        model = measure(factory, args.count)
+        plain = measure(dict_factory(factory(0)), args.count)
+        results.append((name, model, plain))
+
+    print(f"{'model':<32}{'bytes/item':>12}{'__dict__':>12}")
+    for name, model, plain in results:
+        print(f"{name:<32}{model:>12.1f}{plain:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
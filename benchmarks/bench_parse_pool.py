@@ -0,0 +1,119 @@
+"""
+ベンチマーク: 解析用プロセスプールのスケーリング
+
+多数のワーカースレッドが掲示板ページ・掲示詳細ページ・クラスプロファイルページの解析と抽出を行う状況で、
+スレッドで解析した場合 (GIL により 1 コアで直列化される) と、解析用プロセスプールの子プロセス数を CPU のコア数まで
+増やした場合のスループット (ページ/秒) を比較します。子プロセスから受け取る抽出結果 (pickle) の大きさも表示します。
+
+    python -m benchmarks.bench_parse_pool --threads 16 --pages 200 --workers 1 2 4 8 --parser html5lib
+"""
+import argparse
+import os
+import pickle
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
+
+from bs4 import BeautifulSoup
+
+from unipa import Unipa
+from unipa.BulletinBoard import UnipaBulletinBoard
+from unipa.Classes import UnipaClasses
+from unipa.testing.pages import UnipaPages, UnipaPageTokens
+from unipa.unipa_parse_pool import UnipaParsePool
+from unipa.unipa_parser import PARSER_BACKENDS, UnipaParser
+
+# (抽出処理, ページの HTML)
+Workload = Tuple[Callable[[BeautifulSoup], object], str]
+
+
+def make_workloads(items: int,
+                   paragraphs: int) -> List[Workload]:
+    """
+    掲示板ページ・掲示詳細ページ・クラスプロファイルページの解析と抽出を作成する
+
+    Args:
+        items: 掲示板ページの掲示数
+        paragraphs: 掲示詳細の本文の繰り返し回数
+
+    Returns:
+        List[Workload]: 抽出処理とページの HTML
+    """
+    tokens = UnipaPageTokens()
+    board = UnipaPages.board(tokens, items)
+    item = UnipaBulletinBoard.parse_all(BeautifulSoup(board, "html.parser"))[0]
+    return [
+        (UnipaBulletinBoard.parse_all, board),
+        (item.parse_details, UnipaPages.details(tokens, paragraphs=paragraphs)),
+        (UnipaClasses.parse_all, UnipaPages.class_profile(tokens)),
+    ]
+
+
+def run(workloads: List[Workload],
+        parser: UnipaParser,
+        threads: int,
+        pages: int,
+        parse_pool: Optional[UnipaParsePool]) -> float:
+    """
+    ワーカースレッドで pages 件のページを解析・抽出し、スループットを計測する
+
+    Args:
+        workloads: 抽出処理とページの HTML
+        parser: HTML パーサー
+        threads: ワーカースレッド数
+        pages: 解析するページ数
+        parse_pool: 解析用プロセスプール (None の場合はワーカースレッドで解析する)
+
+    Returns:
+        float: スループット (ページ/秒)
+    """
+    def work(index: int) -> object:
+        extractor, markup = workloads[index % len(workloads)]
+        if parse_pool is None:
+            return extractor(parser.parse(markup, Unipa.has_header_form))
+        return parse_pool.extract(extractor, markup, parser, Unipa.has_header_form)[0]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as executor:
+        for _ in executor.map(work, range(pages)):
+            pass
+    return pages / (time.perf_counter() - start)
+
+
+def main() -> None:
+    """
+    ベンチマーク メイン関数
+    """
+    cpu_count = os.cpu_count() or 1
+    default_workers = sorted({1, 2, 4, 8, cpu_count} & set(range(1, cpu_count + 1)))
+
+    argument_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    argument_parser.add_argument("--threads", type=int, default=16, help="ワーカースレッド数")
+    argument_parser.add_argument("--pages", type=int, default=200, help="計測ごとに解析するページ数")
+    argument_parser.add_argument("--workers", type=int, nargs="+", default=default_workers, help="子プロセス数")
+    argument_parser.add_argument("--parser", choices=PARSER_BACKENDS, default="html5lib", help="HTML パーサー")
+    argument_parser.add_argument("--items", type=int, default=100, help="掲示板ページの掲示数")
+    argument_parser.add_argument("--paragraphs", type=int, default=20, help="掲示詳細の本文の繰り返し回数")
+    args = argument_parser.parse_args()
+
+    parser = UnipaParser(args.parser)
+    workloads = make_workloads(args.items, args.paragraphs)
+
+    print(f"CPU: {cpu_count}, parser: {parser.backend}, threads: {args.threads}, pages: {args.pages}")
+    for extractor, markup in workloads:
+        result = extractor(parser.parse(markup, Unipa.has_header_form))
+        print(f"  {extractor.__qualname__:<40} HTML {len(markup.encode('utf-8')):>9,} B"
+              f" -> result {len(pickle.dumps(result)):>7,} B")
+
+    baseline = run(workloads, parser, args.threads, args.pages, None)
+    print(f"{'mode':<16}{'pages/s':>10}{'speedup':>10}")
+    print(f"{'threads':<16}{baseline:>10.1f}{1.0:>10.2f}")
+    for workers in args.workers:
+        with UnipaParsePool(workers, min_size=0) as parse_pool:
+            parse_pool.warm_up(parser)
+            throughput = run(workloads, parser, args.threads, args.pages, parse_pool)
+        print(f"{f'processes={workers}':<16}{throughput:>10.1f}{throughput / baseline:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
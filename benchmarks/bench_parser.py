@@ -0,0 +1,93 @@
+"""
+ベンチマーク: HTML パーサーバックエンド
+
+ページ種別ごとに、解析と抽出にかかる時間をパーサーごとに計測し、html5lib に対する速度比を表示します。
+
+    python -m benchmarks.bench_parser
+"""
+import argparse
+import time
+from typing import Callable, Dict, List, Tuple
+
+from bs4 import BeautifulSoup
+
+from unipa import Unipa, UnipaUtils
+from unipa.BulletinBoard import UnipaBulletinBoard, UnipaBulletinBoardItem
+from unipa.Classes import UnipaClasses
+from unipa.testing.pages import UnipaPages, UnipaPageTokens
+from unipa.unipa_parser import PARSER_BACKENDS, PARSER_HTML5LIB, UnipaParser
+
+
+def get_cases(board_items: int) -> Dict[str, Tuple[str, Callable[[BeautifulSoup], object]]]:
+    """
+    ページ種別ごとの HTML と抽出処理を返す
+
+    Args:
+        board_items: 掲示板ページの掲示数
+
+    Returns:
+        Dict[str, Tuple[str, Callable[[BeautifulSoup], object]]]: ページ種別名と (HTML, 抽出処理)
+    """
+    tokens = UnipaPageTokens()
+    unipa = Unipa("https://unipa.example.com/")
+    item = UnipaBulletinBoardItem("0", "", "s", "p", "", "", False, False, False)
+    return {
+        "login": (UnipaPages.login(), lambda soup: soup.find("form", {"id": "loginForm"})),
+        "portal": (UnipaPages.portal(tokens), lambda soup: (unipa.update_token(soup), UnipaUtils.get_nav_items(soup))),
+        f"board({board_items})": (UnipaPages.board(tokens, board_items),
+                                  lambda soup: (unipa.update_token(soup), UnipaBulletinBoard.parse_all(soup))),
+        "details": (UnipaPages.details(tokens, paragraphs=20),
+                    lambda soup: (unipa.update_token(soup), item.parse_details(soup))),
+        "classes": (UnipaPages.class_profile(tokens, classes_per_period=2),
+                    lambda soup: (unipa.update_token(soup), UnipaClasses.parse_all(soup))),
+    }
+
+
+def measure(markup: str,
+            extractor: Callable[[BeautifulSoup], object],
+            backend: str,
+            repeat: int) -> float:
+    """
+    解析と抽出の 1 回あたりの時間 (ミリ秒) を計測する
+
+    Args:
+        markup: HTML
+        extractor: 抽出処理
+        backend: パーサー
+        repeat: 繰り返し回数
+
+    Returns:
+        float: 1 回あたりの時間 (ミリ秒、最良値)
+    """
+    parser = UnipaParser(backend, None)
+    results: List[float] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        extractor(parser.parse(markup))
+        results.append(time.perf_counter() - start)
+    return min(results) * 1000
+
+
+def main() -> None:
+    """
+    ベンチマーク メイン関数
+    """
+    argument_parser = argparse.ArgumentParser(description=__doc__)
+    argument_parser.add_argument("--repeat", type=int, default=5, help="繰り返し回数")
+    argument_parser.add_argument("--board-items", type=int, default=300, help="掲示板ページの掲示数")
+    args = argument_parser.parse_args()
+
+    backends = [backend for backend in PARSER_BACKENDS if UnipaParser.is_available(backend)]
+    print(f"{'page':<14}" + "".join(f"{backend:>14}" for backend in backends) + "   (ms, speedup vs html5lib)")
+    for name, (markup, extractor) in get_cases(args.board_items).items():
+        results = {backend: measure(markup, extractor, backend, args.repeat) for backend in backends}
+        base = results.get(PARSER_HTML5LIB)
+        cells = []
+        for backend in backends:
+            speedup = f" x{base / results[backend]:.1f}" if base is not None else ""
+            cells.append(f"{results[backend]:>8.2f}{speedup:>6}")
+        print(f"{name:<14}" + "".join(cells))
+
+
+if __name__ == '__main__':
+    main()
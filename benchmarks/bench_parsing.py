@@ -0,0 +1,139 @@
+"""
+ベンチマーク: 解析ユーティリティ
+
+メニュー ID・掲示の s, p 値の取得と日時テキストの変換について、1 回あたりの CPU 時間 (マイクロ秒) を
+従来の処理 (呼び出しごとに正規表現をコンパイルし、strptime で変換する) と解析ユーティリティで比較します。
+日時テキストの変換は、すべて異なるテキストの場合 (キャッシュなし) と、掲示板のように同じテキストが繰り返される場合を
+計測します。
+
+    python -m benchmarks.bench_parsing
+"""
+import argparse
+import datetime
+import re
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from unipa import unipa_parsing
+
+MENU_COMMAND = "PrimeFaces.ab({s:&quot;menuForm:mainMenu&quot;,f:&quot;menuForm&quot;," \
+               "pa:[{name:'menuForm:mainMenu_menuid':'0_0_0'}]});return false;"
+ONCLICK = "PrimeFaces.ab({s:\"funcForm:tabArea:1:j_idt330:0:j_idt332\",p:\"0\"});"
+
+
+def legacy_get_menuid(pfconfirmcommand: str) -> Optional[str]:
+    """
+    従来の UnipaUtils.get_menuid
+    """
+    pattern = re.compile(r"'menuForm:mainMenu_menuid':'(.+?)'")
+    match = pattern.search(pfconfirmcommand)
+    if match is None:
+        return None
+    return match.group(1)
+
+
+def legacy_get_target_sp(onclick: str) -> List[Optional[str]]:
+    """
+    従来の UnipaBulletinBoard.get_target_sp
+    """
+    match = re.search(r"PrimeFaces\.ab\({s:\"(.+?)\",p:\"(.+?)\"}\);", onclick)
+    if match is None:
+        return [None, None]
+    return [match.group(1), match.group(2)]
+
+
+def legacy_process_datetime(datetime_str: Optional[str]) -> Optional[datetime.datetime]:
+    """
+    従来の UnipaUtils.process_datetime
+    """
+    if datetime_str is None or datetime_str == "":
+        return None
+    datetime_str = re.sub(r"\(.+?\)", "", datetime_str)
+    datetime_format = "%Y/%m/%d %H:%M %z"
+    jst = datetime.timezone(datetime.timedelta(hours=+9), 'JST')
+    return datetime.datetime.strptime(datetime_str + " +0900", datetime_format).astimezone(jst)
+
+
+def make_datetimes(count: int,
+                   distinct: int) -> List[str]:
+    """
+    日時テキストを作成する
+
+    Args:
+        count: 件数
+        distinct: 異なるテキストの数
+
+    Returns:
+        List[str]: 日時テキスト
+    """
+    start = datetime.datetime(2022, 4, 1, 9, 0)
+    results = []
+    for index in range(count):
+        dt = start + datetime.timedelta(minutes=index % distinct)
+        results.append(dt.strftime("%Y/%m/%d(月) %H:%M"))
+    return results
+
+
+def measure(func: Callable[[], object],
+            count: int,
+            repeat: int,
+            setup: Optional[Callable[[], object]] = None) -> float:
+    """
+    1 回あたりの CPU 時間 (マイクロ秒) を計測する
+
+    Args:
+        func: count 回ぶんの処理
+        count: func 1 回あたりの呼び出し回数
+        repeat: 繰り返し回数
+        setup: 計測前に毎回実行する処理
+
+    Returns:
+        float: 1 回あたりの CPU 時間 (マイクロ秒、最良値)
+    """
+    results: List[float] = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.process_time()
+        func()
+        results.append(time.process_time() - start)
+    return min(results) / count * 1000 * 1000
+
+
+def main() -> None:
+    """
+    ベンチマーク メイン関数
+    """
+    argument_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    argument_parser.add_argument("--count", type=int, default=10000, help="1 回の計測での呼び出し回数")
+    argument_parser.add_argument("--repeat", type=int, default=5, help="繰り返し回数")
+    args = argument_parser.parse_args()
+
+    count = args.count
+    distinct = make_datetimes(count, count)
+    repeated = make_datetimes(count, 50)
+    clear = unipa_parsing.parse_datetime.cache_clear
+
+    # 処理名: (従来の処理, 解析ユーティリティ, 計測前の処理)
+    cases: Dict[str, Tuple[Callable[[], object], Callable[[], object], Optional[Callable[[], object]]]] = {
+        "get_menuid": (lambda: [legacy_get_menuid(MENU_COMMAND) for _ in range(count)],
+                       lambda: [unipa_parsing.get_menuid(MENU_COMMAND) for _ in range(count)], None),
+        "get_target_sp": (lambda: [legacy_get_target_sp(ONCLICK) for _ in range(count)],
+                          lambda: [unipa_parsing.get_target_sp(ONCLICK) for _ in range(count)], None),
+        "process_datetime(distinct)": (lambda: [legacy_process_datetime(x) for x in distinct],
+                                       lambda: [unipa_parsing.process_datetime(x) for x in distinct], clear),
+        "process_datetime(repeated)": (lambda: [legacy_process_datetime(x) for x in repeated],
+                                       lambda: [unipa_parsing.process_datetime(x) for x in repeated], clear),
+        "process_datetimes(repeated)": (lambda: [legacy_process_datetime(x) for x in repeated],
+                                        lambda: unipa_parsing.process_datetimes(repeated), clear),
+    }
+
+    print(f"{'function':<30}{'legacy us':>12}{'new us':>12}{'speedup':>10}")
+    for name, (legacy, new, setup) in cases.items():
+        before = measure(legacy, count, args.repeat)
+        after = measure(new, count, args.repeat, setup)
+        print(f"{name:<30}{before:>12.3f}{after:>12.3f}{before / after:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""
+ベンチマーク: ページスキャナー
+
+リクエストごとのトークン・フォームの action 属性の更新 (ログイン時はナビゲーション・インフォメーションアイテムも) にかかる
+CPU 時間を、DOM を使う従来の処理とページスキャナーで比較します。
+
+ログイン時のトップページ遷移とセッションの確認 (check_session) では DOM の構築そのものが不要になるため、
+従来の処理は DOM の構築を含めて計測します。掲示板・掲示詳細は機能側で DOM を構築するため、構築済みの DOM からの
+トークン取得のみを計測します。
+
+    python -m benchmarks.bench_scanner
+"""
+import argparse
+import contextlib
+import io
+import time
+from typing import Callable, Dict, List, Tuple
+
+from bs4 import BeautifulSoup
+
+from unipa import UnipaToken, UnipaUtils
+from unipa.testing.pages import UnipaPages, UnipaPageTokens
+from unipa.unipa_parser import PARSER_BACKENDS, UnipaParser
+from unipa.unipa_scanner import UnipaPageScanner
+
+
+def dom_tokens(backend: str,
+               items: bool,
+               parse: bool) -> Callable[[str], object]:
+    """
+    DOM からトークンなどを取得する処理 (従来の処理)
+
+    Args:
+        backend: パーサー
+        items: ナビゲーション・インフォメーションアイテムも取得するか
+        parse: DOM の構築を計測に含めるか
+
+    Returns:
+        Callable[[str], object]: 処理
+    """
+    parser = UnipaParser(backend, None)
+    parsed: Dict[str, BeautifulSoup] = {}
+
+    def run(markup: str) -> object:
+        if parse:
+            soup = parser.parse(markup)
+        else:
+            if markup not in parsed:
+                parsed[markup] = parser.parse(markup)
+            soup = parsed[markup]
+        token = UnipaToken.from_soup(soup)
+        action = soup.find("form", {"id": "headerForm"}).get("action")
+        if not items:
+            return token, action
+        with contextlib.redirect_stdout(io.StringIO()):
+            return token, action, UnipaUtils.get_nav_items(soup), UnipaUtils.get_info_items(soup)
+
+    return run
+
+
+def scan_tokens(items: bool) -> Callable[[str], object]:
+    """
+    ページスキャナーでトークンなどを取得する処理
+
+    Args:
+        items: ナビゲーション・インフォメーションアイテムも取得するか
+
+    Returns:
+        Callable[[str], object]: 処理
+    """
+
+    def run(markup: str) -> object:
+        scan = UnipaPageScanner.scan(markup, items)
+        return UnipaToken.from_inputs(scan.token_inputs), scan.header_action, scan.nav_items, scan.info_items
+
+    return run
+
+
+def measure(markup: str,
+            func: Callable[[str], object],
+            repeat: int) -> float:
+    """
+    1 回あたりの CPU 時間 (ミリ秒) を計測する
+
+    Args:
+        markup: HTML
+        func: 処理
+        repeat: 繰り返し回数
+
+    Returns:
+        float: 1 回あたりの CPU 時間 (ミリ秒、最良値)
+    """
+    results: List[float] = []
+    for _ in range(repeat):
+        start = time.process_time()
+        func(markup)
+        results.append(time.process_time() - start)
+    return min(results) * 1000
+
+
+def main() -> None:
+    """
+    ベンチマーク メイン関数
+    """
+    argument_parser = argparse.ArgumentParser(description=__doc__)
+    argument_parser.add_argument("--repeat", type=int, default=10, help="繰り返し回数")
+    argument_parser.add_argument("--board-items", type=int, default=300, help="掲示板ページの掲示数")
+    args = argument_parser.parse_args()
+
+    tokens = UnipaPageTokens()
+    # ページ種別名: (HTML, アイテムも取得するか, DOM の構築が不要になるか)
+    cases: Dict[str, Tuple[str, bool, bool]] = {
+        "login(top)": (UnipaPages.portal(tokens), True, True),
+        "check_session": (UnipaPages.portal(tokens), False, True),
+        f"board({args.board_items})": (UnipaPages.board(tokens, args.board_items), False, False),
+        "details": (UnipaPages.details(tokens, paragraphs=20), False, False),
+    }
+    backends = [backend for backend in PARSER_BACKENDS if UnipaParser.is_available(backend)]
+
+    print(f"{'page':<14}{'scanner':>10}" + "".join(f"{backend:>18}" for backend in backends) +
+          "   (CPU ms, saved per request)")
+    for name, (markup, items, parse) in cases.items():
+        scanned = measure(markup, scan_tokens(items), args.repeat)
+        cells = []
+        for backend in backends:
+            result = measure(markup, dom_tokens(backend, items, parse), args.repeat)
+            cells.append(f"{result:>10.2f} (-{result - scanned:.2f})")
+        print(f"{name:<14}{scanned:>10.2f}" + "".join(cells))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,290 @@
+"""
+負荷試験ドライバー
+
+スタンドインサーバー (unipa.testing.server) に対し、Unipa を利用する同時セッションを 50 - 500 程度まで増やしながら
+ログイン・掲示板の取得・掲示詳細の取得・クラスプロファイルの取得を繰り返し、スループットとレイテンシ (p50/p99) を報告します。
+
+スタンドインサーバーは別プロセスで起動します。応答遅延・エラーの注入・セッションの期限切れはオプションで指定します。
+エラーになったセッションは破棄し、次の操作でログインしなおします。
+--rate / --login-rate を指定すると、すべてのセッションで共有するレートリミッターで制限し、待ち時間を報告します。
+
+    python -m benchmarks.load --sessions 50 100 500 --duration 10 --latency 0.05 --error-rate 0.01
+"""
+import argparse
+import multiprocessing
+import random
+import threading
+import time
+from multiprocessing.synchronize import Event
+from typing import Dict, List, Optional, TypedDict
+
+from unipa import Unipa
+from unipa.BulletinBoard import UnipaBulletinBoard
+from unipa.BulletinBoard.BulletinBoard import UnipaBulletinBoardItem
+from unipa.Classes import UnipaClasses
+from unipa.testing.server import UnipaStubApp, UnipaStubServer, percentile
+from unipa.unipa_parser import PARSER_LXML
+from unipa.unipa_rate_limit import UnipaRateLimiter
+from unipa.unipa_transport import UnipaTransportPolicy
+
+USERNAME = "student"
+PASSWORD = "password"
+OPERATIONS = ("login", "board", "details", "classes")
+
+
+class UnipaStubOptions(TypedDict):
+    """
+    スタンドインサーバー (UnipaStubApp) のコンストラクタ引数
+    """
+
+    board_size: int
+    latency: float
+    latency_jitter: float
+    error_rate: float
+    session_ttl: Optional[float]
+    seed: Optional[int]
+
+
+class UnipaLoadResult:
+    """
+    負荷試験の結果 (1 つの同時セッション数)
+    """
+
+    def __init__(self,
+                 sessions: int):
+        """
+        コンストラクタ
+
+        Args:
+            sessions: 同時セッション数
+        """
+        self.sessions = sessions
+        self.elapsed = 0.0
+        self.latencies: Dict[str, List[float]] = {operation: [] for operation in OPERATIONS}
+        self.errors: Dict[str, int] = {}
+        self.rate_limit_wait = 0.0
+        self.lock = threading.Lock()
+
+    def add(self,
+            operation: str,
+            latency: float) -> None:
+        """
+        成功した操作を記録する
+
+        Args:
+            operation: 操作名
+            latency: 所要時間 (秒)
+        """
+        with self.lock:
+            self.latencies[operation].append(latency)
+
+    def add_error(self,
+                  operation: str,
+                  error: Exception) -> None:
+        """
+        失敗した操作を記録する
+
+        Args:
+            operation: 操作名
+            error: 例外
+        """
+        key = f"{operation}: {type(error).__name__}"
+        with self.lock:
+            self.errors[key] = self.errors.get(key, 0) + 1
+
+    @property
+    def operations(self) -> int:
+        """
+        成功した操作数
+
+        Returns:
+            int: 成功した操作数
+        """
+        return sum(len(x) for x in self.latencies.values())
+
+    @property
+    def throughput(self) -> float:
+        """
+        スループット (成功した操作数 / 秒)
+
+        Returns:
+            float: スループット
+        """
+        return self.operations / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def worker(base_url: str,
+           parser: str,
+           transport: UnipaTransportPolicy,
+           deadline: float,
+           result: UnipaLoadResult,
+           seed: int) -> None:
+    """
+    1 セッション分の操作を期限まで繰り返す
+
+    Args:
+        base_url: ベース URL
+        parser: HTML パーサー
+        transport: HTTP 通信のポリシー (すべてのセッションで共有する)
+        deadline: 期限 (time.perf_counter の値)
+        result: 記録先
+        seed: 掲示を選ぶ乱数のシード
+    """
+    rand = random.Random(seed)
+    unipa: Optional[Unipa] = None
+    items: List[UnipaBulletinBoardItem] = []
+    step = 0
+    while time.perf_counter() < deadline:
+        if unipa is None:
+            operation = "login"
+        else:
+            operation = OPERATIONS[1 + step % (len(OPERATIONS) - 1)]
+            step += 1
+        if operation == "details" and len(items) == 0:
+            operation = "board"
+
+        start = time.perf_counter()
+        try:
+            if operation == "login":
+                unipa = Unipa(base_url, parser, transport=transport)
+                unipa.login(USERNAME, PASSWORD)
+            elif operation == "board":
+                items = UnipaBulletinBoard(unipa).get_all()  # type: ignore
+            elif operation == "details":
+                rand.choice(items).get_details(unipa)
+            else:
+                UnipaClasses(unipa).get_all()  # type: ignore
+                # 掲示詳細は掲示板から取得するため、クラスプロファイルの後は掲示板を取得しなおす
+                items = []
+        except Exception as e:
+            result.add_error(operation, e)
+            if unipa is not None:
+                unipa.session.close()
+            unipa = None
+            items = []
+            continue
+        result.add(operation, time.perf_counter() - start)
+
+    if unipa is not None:
+        unipa.session.close()
+
+
+def run(base_url: str,
+        sessions: int,
+        duration: float,
+        parser: str,
+        rate_limiter: Optional[UnipaRateLimiter] = None) -> UnipaLoadResult:
+    """
+    同時セッション数を指定して負荷をかける
+
+    Args:
+        base_url: ベース URL
+        sessions: 同時セッション数
+        duration: 負荷をかける秒数
+        parser: HTML パーサー
+        rate_limiter: すべてのセッションで共有するレートリミッター (None の場合は制限しない)
+
+    Returns:
+        UnipaLoadResult: 結果
+    """
+    result = UnipaLoadResult(sessions)
+    transport = UnipaTransportPolicy(rate_limiter=rate_limiter)
+    waited = rate_limiter.get_wait_time() if rate_limiter is not None else 0.0
+    start = time.perf_counter()
+    deadline = start + duration
+    threads = [threading.Thread(target=worker, args=(base_url, parser, transport, deadline, result, index),
+                                daemon=True)
+               for index in range(sessions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    result.elapsed = time.perf_counter() - start
+    if rate_limiter is not None:
+        result.rate_limit_wait = rate_limiter.get_wait_time() - waited
+    return result
+
+
+def serve(options: UnipaStubOptions,
+          queue: "multiprocessing.Queue[str]",
+          stop: Event) -> None:
+    """
+    スタンドインサーバーを起動し、stop がセットされるまで待つ (別プロセスで実行する)
+
+    Args:
+        options: UnipaStubApp のコンストラクタ引数
+        queue: ベース URL を返すキュー
+        stop: 停止イベント
+    """
+    server = UnipaStubServer.start(UnipaStubApp({USERNAME: PASSWORD}, **options))
+    queue.put(server.base_url)
+    stop.wait()
+    server.stop()
+
+
+def report(result: UnipaLoadResult) -> None:
+    """
+    結果を表示する
+
+    Args:
+        result: 結果
+    """
+    errors = sum(result.errors.values())
+    print(f"sessions={result.sessions} elapsed={result.elapsed:.1f}s ops={result.operations} errors={errors} "
+          f"throughput={result.throughput:.1f}ops/s rate_limit_wait={result.rate_limit_wait:.1f}s")
+    print(f"  {'operation':<10}{'count':>8}{'p50(ms)':>10}{'p99(ms)':>10}")
+    for operation, latencies in result.latencies.items():
+        print(f"  {operation:<10}{len(latencies):>8}{percentile(latencies, 0.5) * 1000:>10.1f}"
+              f"{percentile(latencies, 0.99) * 1000:>10.1f}")
+    for key, count in sorted(result.errors.items()):
+        print(f"  error {key}: {count}")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    負荷試験ドライバー メイン関数
+
+    Args:
+        argv: コマンドライン引数
+    """
+    argument_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    argument_parser.add_argument("--sessions", type=int, nargs="+", default=[50, 100, 500], help="同時セッション数")
+    argument_parser.add_argument("--duration", type=float, default=10.0, help="同時セッション数ごとに負荷をかける秒数")
+    argument_parser.add_argument("--board-items", type=int, default=30, help="掲示板の掲示数")
+    argument_parser.add_argument("--latency", type=float, default=0.0, help="サーバーの応答遅延 (秒)")
+    argument_parser.add_argument("--latency-jitter", type=float, default=0.0, help="応答遅延の揺らぎの最大値 (秒)")
+    argument_parser.add_argument("--error-rate", type=float, default=0.0, help="サーバーがエラーを返す割合")
+    argument_parser.add_argument("--session-ttl", type=float, help="サーバーのセッションの有効期間 (秒)")
+    argument_parser.add_argument("--seed", type=int, help="サーバーの乱数のシード")
+    argument_parser.add_argument("--rate", type=float, help="通常のリクエストの 1 秒あたりの上限 (全セッション合計)")
+    argument_parser.add_argument("--login-rate", type=float, help="ログインの 1 秒あたりの上限 (全セッション合計)")
+    argument_parser.add_argument("--parser", default=PARSER_LXML, help="HTML パーサー")
+    args = argument_parser.parse_args(argv)
+
+    options: UnipaStubOptions = {
+        "board_size": args.board_items,
+        "latency": args.latency,
+        "latency_jitter": args.latency_jitter,
+        "error_rate": args.error_rate,
+        "session_ttl": args.session_ttl,
+        "seed": args.seed,
+    }
+    queue: "multiprocessing.Queue[str]" = multiprocessing.Queue()
+    stop = multiprocessing.Event()
+    process = multiprocessing.Process(target=serve, args=(options, queue, stop), daemon=True)
+    process.start()
+    try:
+        base_url = queue.get(timeout=30)
+        for sessions in args.sessions:
+            rate_limiter = None
+            if args.rate is not None or args.login_rate is not None:
+                rate_limiter = UnipaRateLimiter(args.rate, max(int(args.rate or 1), 1),
+                                                args.login_rate, max(int(args.login_rate or 1), 1))
+            report(run(base_url, sessions, args.duration, args.parser, rate_limiter))
+    finally:
+        stop.set()
+        process.join(10)
+
+
+if __name__ == '__main__':
+    main()
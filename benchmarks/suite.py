@@ -0,0 +1,253 @@
+"""
+ベンチマークスイート
+
+UNIPA 風の HTML (unipa.testing.pages) とスタンドインサーバー (unipa.testing.server) を使い、実際の UNIVERSAL PASSPORT に
+アクセスせずに主要な処理の壁時計時間・CPU 時間・ピークメモリを計測します。
+
+スタンドインサーバーは別プロセスで起動するため、CPU 時間とメモリにはサーバー側の処理は含まれません。
+--save-baseline で保存した結果を --baseline で指定すると、しきい値を超えて遅く (大きく) なった項目を報告し、
+終了コード 1 で終了します。
+
+    python -m benchmarks.suite --save-baseline baseline.json
+    python -m benchmarks.suite --baseline baseline.json
+"""
+import argparse
+import datetime
+import gc
+import json
+import multiprocessing
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+from unipa import Unipa, UnipaUtils
+from unipa.BulletinBoard import UnipaBulletinBoard
+from unipa.Classes import UnipaClasses
+from unipa.testing.pages import UnipaPages, UnipaPageTokens
+from unipa.testing.server import UnipaStubApp, UnipaStubServer
+from unipa.unipa_parser import PARSER_LXML, UnipaParser
+
+USERNAME = "student"
+PASSWORD = "password"
+METRICS = ("wall_ms", "cpu_ms", "peak_kib")
+
+
+class UnipaBenchmarkResult:
+    """
+    ベンチマーク結果 (1 項目)
+    """
+
+    def __init__(self,
+                 name: str,
+                 wall_ms: float,
+                 cpu_ms: float,
+                 peak_kib: float):
+        """
+        コンストラクタ
+
+        Args:
+            name: 項目名
+            wall_ms: 1 回あたりの壁時計時間 (ミリ秒、最良値)
+            cpu_ms: 1 回あたりの CPU 時間 (ミリ秒、最良値)
+            peak_kib: ピークメモリ (KiB、tracemalloc で計測)
+        """
+        self.name = name
+        self.wall_ms = wall_ms
+        self.cpu_ms = cpu_ms
+        self.peak_kib = peak_kib
+
+    def to_dict(self) -> Dict[str, float]:
+        """
+        辞書に変換する
+
+        Returns:
+            Dict[str, float]: 計測値
+        """
+        return {"wall_ms": self.wall_ms, "cpu_ms": self.cpu_ms, "peak_kib": self.peak_kib}
+
+
+def measure(name: str,
+            func: Callable[[], object],
+            repeat: int) -> UnipaBenchmarkResult:
+    """
+    処理を計測する
+
+    時間は tracemalloc を無効にした状態で repeat 回計測し、ピークメモリは別に 1 回だけ計測します。
+
+    Args:
+        name: 項目名
+        func: 処理
+        repeat: 繰り返し回数
+
+    Returns:
+        UnipaBenchmarkResult: 計測結果
+    """
+    walls: List[float] = []
+    cpus: List[float] = []
+    for _ in range(repeat):
+        gc.collect()
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        func()
+        cpus.append(time.process_time() - cpu)
+        walls.append(time.perf_counter() - wall)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return UnipaBenchmarkResult(name, min(walls) * 1000, min(cpus) * 1000, peak / 1024)
+
+
+def serve(board_size: int,
+          queue: "multiprocessing.Queue[str]",
+          stop: Any) -> None:
+    """
+    スタンドインサーバーを起動し、stop がセットされるまで待つ (別プロセスで実行する)
+
+    Args:
+        board_size: 掲示板の掲示数
+        queue: ベース URL を返すキュー
+        stop: 停止イベント
+    """
+    server = UnipaStubServer.start(UnipaStubApp({USERNAME: PASSWORD}, board_size))
+    queue.put(server.base_url)
+    stop.wait()
+    server.stop()
+
+
+def run(repeat: int,
+        board_items: int,
+        parser: str) -> List[UnipaBenchmarkResult]:
+    """
+    すべての項目を計測する
+
+    Args:
+        repeat: 繰り返し回数
+        board_items: 掲示板の掲示数
+        parser: HTML パーサー
+
+    Returns:
+        List[UnipaBenchmarkResult]: 計測結果
+    """
+    queue: "multiprocessing.Queue[str]" = multiprocessing.Queue()
+    stop = multiprocessing.Event()
+    process = multiprocessing.Process(target=serve, args=(board_items, queue, stop), daemon=True)
+    process.start()
+    try:
+        base_url = queue.get(timeout=30)
+        results = []
+
+        def login() -> Unipa:
+            unipa = Unipa(base_url, parser)
+            unipa.login(USERNAME, PASSWORD)
+            return unipa
+
+        results.append(measure("login", login, repeat))
+
+        unipa = login()
+        board = UnipaBulletinBoard(unipa)
+        results.append(measure(f"get_all({board_items})", board.get_all, repeat))
+
+        items = board.get_all()
+        results.append(measure("get_details", lambda: items[0].get_details(unipa), repeat))
+        results.append(measure("UnipaClasses.get_all", UnipaClasses(unipa).get_all, repeat))
+    finally:
+        stop.set()
+        process.join(10)
+
+    portal = UnipaParser(parser).parse(UnipaPages.portal(UnipaPageTokens()))
+    results.append(measure("get_nav_items", lambda: UnipaUtils.get_nav_items(portal), repeat))
+
+    start = datetime.datetime(2022, 4, 1, 9, 0)
+    datetimes = [UnipaPages.format_datetime(start + datetime.timedelta(hours=index)) for index in range(1000)]
+    results.append(measure("process_datetime(1000)",
+                           lambda: [UnipaUtils.process_datetime(x) for x in datetimes], repeat))
+    return results
+
+
+def compare(results: List[UnipaBenchmarkResult],
+            baseline: Dict[str, Dict[str, float]],
+            threshold: float) -> List[str]:
+    """
+    ベースラインと比較し、しきい値を超えて悪化した項目を返す
+
+    Args:
+        results: 計測結果
+        baseline: ベースライン (項目名: 計測値)
+        threshold: しきい値 (0.2 の場合は 20% 以上の悪化を報告する)
+
+    Returns:
+        List[str]: 悪化した項目の説明
+    """
+    regressions = []
+    for result in results:
+        base = baseline.get(result.name)
+        if base is None:
+            continue
+        for metric, value in result.to_dict().items():
+            base_value = base.get(metric)
+            if base_value is None or base_value <= 0:
+                continue
+            if value > base_value * (1 + threshold):
+                regressions.append(f"{result.name} {metric}: {base_value:.2f} -> {value:.2f} "
+                                   f"(+{(value / base_value - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    ベンチマークスイート メイン関数
+
+    Args:
+        argv: コマンドライン引数
+
+    Returns:
+        int: 終了コード (悪化した項目がある場合は 1)
+    """
+    argument_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    argument_parser.add_argument("--repeat", type=int, default=5, help="繰り返し回数")
+    argument_parser.add_argument("--board-items", type=int, default=300, help="掲示板の掲示数")
+    argument_parser.add_argument("--parser", default=PARSER_LXML, help="HTML パーサー")
+    argument_parser.add_argument("--baseline", help="比較するベースライン (JSON)")
+    argument_parser.add_argument("--threshold", type=float, default=0.2, help="悪化とみなす割合")
+    argument_parser.add_argument("--save-baseline", help="計測結果をベースラインとして保存するパス (JSON)")
+    args = argument_parser.parse_args(argv)
+
+    results = run(args.repeat, args.board_items, args.parser)
+
+    baseline: Dict[str, Dict[str, float]] = {}
+    if args.baseline is not None:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+
+    print(f"{'name':<24}{'wall(ms)':>12}{'cpu(ms)':>12}{'peak(KiB)':>12}")
+    for result in results:
+        line = f"{result.name:<24}{result.wall_ms:>12.2f}{result.cpu_ms:>12.2f}{result.peak_kib:>12.1f}"
+        base = baseline.get(result.name)
+        if base is not None:
+            line += "   (baseline " + ", ".join(f"{base.get(metric, 0):.2f}" for metric in METRICS) + ")"
+        print(line)
+
+    if args.save_baseline is not None:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump({
+                "python": sys.version.split()[0],
+                "parser": args.parser,
+                "board_items": args.board_items,
+                "results": {result.name: result.to_dict() for result in results},
+            }, f, indent=2)
+
+    regressions = compare(results, baseline, args.threshold)
+    for regression in regressions:
+        print("REGRESSION:", regression)
+    return 1 if len(regressions) > 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,11 +1,12 @@
 """
 新しい掲示を取得する
 """
-import json
 import os
 
 from unipa import Unipa
 from unipa.BulletinBoard import UnipaBulletinBoard
+from unipa.BulletinBoard.BulletinBoardDiff import EVENT_ADDED, UnipaBulletinBoardDiff
+from unipa.BulletinBoard.BulletinBoardStateStore import UnipaBulletinBoardStateStore
 from unipa.models.tests import ConfigJsonModel
 
 
@@ -22,24 +23,16 @@ def main() -> None:
     unipa = Unipa(config.base_url)
     unipa.login(config.username, config.password)
 
-    bulletinboard = UnipaBulletinBoard(unipa)
-    items = bulletinboard.get_all()
-
-    already = []
-    if os.path.exists("examples/new_bulletinboard.json"):
-        with open("examples/new_bulletinboard.json", "r") as f:
-            already = json.load(f)
-
-    for item in items:
-        if item.title in already:
-            continue
-
-        print("NEW ITEM: ", item.title)
-
-        already.append(item.title)
-
-    with open("examples/new_bulletinboard.json", "w") as f:
-        json.dump(already, f)
+    store = UnipaBulletinBoardStateStore("examples/new_bulletinboard.sqlite3")
+    try:
+        diff = UnipaBulletinBoardDiff(store)
+        for event in diff.poll(UnipaBulletinBoard(unipa)):
+            if event.kind == EVENT_ADDED and event.item is not None:
+                print("NEW ITEM: ", event.item.title)
+            else:
+                print(event)
+    finally:
+        store.close()
 
 
 if __name__ == '__main__':
@@ -8,8 +8,11 @@ import setuptools
 setuptools.setup(
     name='get-unipa',
     version=open("get-unipa.version").read().strip() if os.path.exists("get-unipa.version") else "0.0.0",
-    packages=setuptools.find_packages(exclude=['examples']),
-    install_requires=["beautifulsoup4", "requests", "html5lib"],
+    packages=setuptools.find_packages(exclude=['examples', 'benchmarks']),
+    install_requires=["beautifulsoup4", "requests", "html5lib", "lxml"],
+    extras_require={
+        "async": ["httpx"],
+    },
     url='https://github.com/book000/get-unipa',
     license='MIT',
     author='Tomachi',
@@ -1,16 +1,46 @@
 """
 掲示板
 """
+from typing import Dict, Optional, Union
+
+from bs4 import BeautifulSoup
+
 from unipa import Unipa, UnipaUtils
+from unipa.unipa_async import AsyncUnipa
 from unipa.BulletinBoard.BulletinBoardItemDetails import UnipaBulletinBoardItemDetails
 from unipa.BulletinBoard.PublicationPeriod import UnipaPublicationPeriod
+from unipa.errors import UnipaInternalError
+from unipa.unipa_model import UnipaModel
 
 
-class UnipaBulletinBoardItem:
+class UnipaBulletinBoardItem(UnipaModel):
     """
     掲示板の掲示アイテム
+
+    UnipaBulletinBoard から取得したアイテムは取得したセッションに紐付き、`details` プロパティで詳細を取得できます。
+    AsyncUnipaBulletinBoard から取得したアイテムは asyncio 版のセッションに紐付き、get_details_async で詳細を取得できます。
+    詳細は初めて参照したときに取得し (UnipaBulletinBoard.prefetch でまとめて取得することもできます)、以降は
+    アイテムが存在する間、通信せずに同じ詳細を返します。セッションと詳細はアイテムの等価性に含まれません。
     """
 
+    __slots__ = ("_item_id", "_title", "_target_s", "_target_p", "_flag_id", "_unread_id", "_is_attention", "_is_flag",
+                 "_is_unread", "_unipa", "_details")
+    _transient_slots = ("_unipa", "_details")
+    _item_id: str
+    _title: str
+    _target_s: str
+    _target_p: str
+    _flag_id: str
+    _unread_id: str
+    _is_attention: bool
+    _is_flag: bool
+    _is_unread: bool
+    _unipa: Optional[Union[Unipa, AsyncUnipa]]
+    _details: Optional[UnipaBulletinBoardItemDetails]
+
+    # 部分更新で掲示詳細を取得する際に更新する要素
+    DETAILS_RENDER = "funcForm"
+
     def __init__(self,
                  item_id: str,
                  title: str,
@@ -35,15 +65,17 @@ class UnipaBulletinBoardItem:
             is_flag: フラグ (ユーザーが設定可能)
             is_unread: 未読か (ユーザーが設定可能)
         """
-        self._item_id = item_id
-        self._title = title
-        self._target_s = target_s
-        self._target_p = target_p
-        self._flag_id = flag_id
-        self._unread_id = unread_id
-        self._is_attention = is_attention
-        self._is_flag = is_flag
-        self._is_unread = is_unread
+        object.__setattr__(self, "_item_id", item_id)
+        object.__setattr__(self, "_title", title)
+        object.__setattr__(self, "_target_s", target_s)
+        object.__setattr__(self, "_target_p", target_p)
+        object.__setattr__(self, "_flag_id", flag_id)
+        object.__setattr__(self, "_unread_id", unread_id)
+        object.__setattr__(self, "_is_attention", is_attention)
+        object.__setattr__(self, "_is_flag", is_flag)
+        object.__setattr__(self, "_is_unread", is_unread)
+        object.__setattr__(self, "_unipa", None)
+        object.__setattr__(self, "_details", None)
 
     @property
     def item_id(self) -> str:
@@ -139,21 +171,166 @@ class UnipaBulletinBoardItem:
         """
         return self._is_unread
 
+    @property
+    def unipa(self) -> Optional[Union[Unipa, AsyncUnipa]]:
+        """
+        アイテムを取得したセッション
+
+        Returns:
+            Optional[Union[Unipa, AsyncUnipa]]: アイテムを取得したセッション (紐付いていない場合は None)
+        """
+        return self._unipa
+
+    @property
+    def details(self) -> UnipaBulletinBoardItemDetails:
+        """
+        掲示アイテムの詳細 (初めて参照したときに、アイテムを取得したセッションで取得します)
+
+        Returns:
+            UnipaBulletinBoardItemDetails: 掲示アイテムの詳細
+        """
+        return self.get_details()
+
+    @property
+    def is_details_loaded(self) -> bool:
+        """
+        詳細を取得済みか
+
+        Returns:
+            bool: 詳細を取得済みか
+        """
+        return self._details is not None
+
+    def _bind(self,
+              unipa: Union[Unipa, AsyncUnipa]) -> "UnipaBulletinBoardItem":
+        """
+        アイテムをセッションに紐付けます。`details` プロパティはこのセッションで詳細を取得します。
+        (AsyncUnipa に紐付けた場合は get_details_async がこのセッションで詳細を取得します)
+        アイテムを取得した UnipaBulletinBoard, AsyncUnipaBulletinBoard のみが呼び出します。
+
+        Args:
+            unipa: Unipa または AsyncUnipa
+
+        Returns:
+            UnipaBulletinBoardItem: このアイテム
+        """
+        object.__setattr__(self, "_unipa", unipa)
+        return self
+
+    def set_details(self,
+                    details: UnipaBulletinBoardItemDetails) -> None:
+        """
+        取得済みの詳細を設定します。(UnipaBulletinBoard.prefetch などが利用します)
+
+        詳細は 1 回だけ設定できます。このアイテムの詳細ではない (掲示 ID・タイトルが異なる) 場合と、
+        異なる詳細を設定済みの場合は UnipaInternalError を送出します。
+
+        Args:
+            details: 掲示アイテムの詳細
+        """
+        if details.item_id != self._item_id or details.title.strip() != self._title.strip():
+            raise UnipaInternalError(f"掲示アイテム {self._title} と異なる掲示の詳細は設定できません: {details.title}")
+        if self.__memoize(details) != details:
+            raise UnipaInternalError(f"掲示アイテム {self._title} の詳細は設定済みです。")
+
+    def __memoize(self,
+                  details: UnipaBulletinBoardItemDetails) -> UnipaBulletinBoardItemDetails:
+        """
+        取得した詳細を保持する (最初に保持した詳細を以降も返す)
+
+        Args:
+            details: 掲示アイテムの詳細
+
+        Returns:
+            UnipaBulletinBoardItemDetails: 保持している詳細
+        """
+        current = self._details
+        if current is None:
+            object.__setattr__(self, "_details", details)
+            return details
+        return current
+
     def get_details(self,
-                    unipa: Unipa) -> UnipaBulletinBoardItemDetails:
+                    unipa: Optional[Unipa] = None,
+                    partial: bool = False) -> UnipaBulletinBoardItemDetails:
         """
-        掲示アイテムの詳細を取得します。
+        掲示アイテムの詳細を取得します。取得済みの場合は通信せずに取得済みの詳細を返します。
+
+        Args:
+            unipa: Unipa (None の場合はアイテムを取得したセッション)
+            partial: 部分更新 (JSF partial/ajax) で取得するか。ページ全体ではなく詳細のフォームのみを取得します
 
         Returns:
             UnipaBulletinBoardItemDetails: 掲示アイテムの詳細
         """
-        soup = unipa.request("BULLETBOARD", "funcForm", {
+        if self._details is not None:
+            return self._details
+
+        if unipa is None:
+            if isinstance(self._unipa, AsyncUnipa):
+                raise UnipaInternalError("asyncio 版のセッションに紐付いた掲示アイテムは get_details_async で取得してください。")
+            unipa = self._unipa
+        if unipa is None:
+            raise UnipaInternalError("掲示アイテムがセッションに紐付いていません。")
+
+        if partial:
+            response = unipa.request_partial("BULLETBOARD", "funcForm", self.get_details_params(),
+                                             render=self.DETAILS_RENDER)
+            soup = response.get_soup(unipa.parser)
+            with unipa.extraction():
+                details = self.parse_details(soup)
+            return self.__memoize(details)
+
+        page = unipa.request_page("BULLETBOARD", "funcForm", self.get_details_params())
+        return self.__memoize(unipa.extract(self.parse_details, page))
+
+    async def get_details_async(self,
+                                unipa: Optional[AsyncUnipa] = None) -> UnipaBulletinBoardItemDetails:
+        """
+        掲示アイテムの詳細を取得します。(asyncio 版) 取得済みの場合は通信せずに取得済みの詳細を返します。
+
+        Args:
+            unipa: AsyncUnipa (None の場合はアイテムを取得したセッション)
+
+        Returns:
+            UnipaBulletinBoardItemDetails: 掲示アイテムの詳細
+        """
+        if self._details is not None:
+            return self._details
+
+        if unipa is None:
+            if not isinstance(self._unipa, AsyncUnipa):
+                raise UnipaInternalError("掲示アイテムが asyncio 版のセッションに紐付いていません。")
+            unipa = self._unipa
+
+        soup = await unipa.request("BULLETBOARD", "funcForm", self.get_details_params())
+        return self.__memoize(await unipa.extract(self.parse_details, soup))
+
+    def get_details_params(self) -> Dict[str, str]:
+        """
+        掲示アイテムの詳細を取得する際のリクエストパラメータを返します。
+
+        Returns:
+            Dict[str, str]: リクエストパラメータ
+        """
+        return {
             "javax.faces.source": self.target_s,
             "javax.faces.partial.execute": self.target_s,
             "funcForm:tabArea_activeIndex": "1",
             self.target_s: self.target_p
-        }, "html5lib")
+        }
+
+    def parse_details(self,
+                      soup: BeautifulSoup) -> UnipaBulletinBoardItemDetails:
+        """
+        掲示詳細ページから掲示アイテムの詳細を取得します。
+
+        Args:
+            soup: 掲示詳細ページの BeautifulSoup (パーサーは問いません)
 
+        Returns:
+            UnipaBulletinBoardItemDetails: 掲示アイテムの詳細
+        """
         outputpanel = soup.select_one("div.ui-outputpanel")
         if outputpanel is None:
             raise RuntimeError("掲示板の詳細パネルが見つかりません。")
@@ -171,12 +348,11 @@ class UnipaBulletinBoardItem:
             # print(row_key.text, row_value.text)
             data[row_key.text.strip()] = row_value
 
-        raw_publication_period = data["掲示期間"]
-        raw_start_date: str = raw_publication_period.find_all("span")[0].text.strip()
-        raw_end_date = raw_publication_period.find_all("span")[2].text.strip()
+        raw_publication_period = data["掲示期間"].find_all("span")
+        raw_start_date: str = raw_publication_period[0].text.strip()
+        raw_end_date: str = raw_publication_period[2].text.strip()
 
-        start_date = UnipaUtils.process_datetime(raw_start_date)
-        end_date = UnipaUtils.process_datetime(raw_end_date)
+        start_date, end_date = UnipaUtils.process_datetimes((raw_start_date, raw_end_date))
 
         publication_period = UnipaPublicationPeriod(start_date, end_date)
 
@@ -0,0 +1,351 @@
+"""
+掲示本文のプレーンテキスト・Markdown 変換
+
+掲示詳細の本文 HTML (content_html) を DOM を構築せずに 1 回の走査で変換します。変換結果は本文のハッシュごとに
+メモ化するため、同じ本文を何度読んでも変換は 1 回だけです。
+"""
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import Executor
+from html.parser import HTMLParser
+from typing import Dict, Iterable, List, Optional, Tuple
+
+CONTENT_TEXT = "text"
+CONTENT_MARKDOWN = "markdown"
+
+# 段落として前後を空行で区切る要素
+_PARAGRAPH_TAGS = frozenset(("p", "ul", "ol", "table", "blockquote", "pre", "h1", "h2", "h3", "h4", "h5", "h6"))
+# 前後で改行する要素
+_LINE_TAGS = frozenset(("div", "tr", "li", "dt", "dd", "section", "article", "header", "footer"))
+_SKIP_TAGS = frozenset(("script", "style", "head", "title"))
+_EMPHASIS = {"strong": "**", "b": "**", "em": "*", "i": "*"}
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+_MARKDOWN_ESCAPE_PATTERN = re.compile(r"([\\`*_\[\]])")
+_BLANK_LINES_PATTERN = re.compile(r"\n{3,}")
+_TRAILING_SPACE_PATTERN = re.compile(r"[ \t]+\n")
+
+
+class UnipaContentRenderer(HTMLParser):
+    """
+    本文 HTML のプレーンテキスト・Markdown 変換 (1 回の走査)
+    """
+
+    def __init__(self,
+                 markdown: bool = False):
+        """
+        コンストラクタ
+
+        Args:
+            markdown: Markdown に変換するか (False の場合はプレーンテキスト)
+        """
+        super().__init__(convert_charrefs=True)
+        self.markdown = markdown
+        self.__parts: List[str] = []
+        self.__breaks = 0
+        self.__skip = 0
+        self.__pre = 0
+        self.__lists: List[List[int]] = []
+        self.__links: List[Tuple[int, Optional[str]]] = []
+        self.__cells = 0
+
+    @classmethod
+    def render(cls,
+               html: str,
+               markdown: bool = False) -> str:
+        """
+        本文 HTML を変換する
+
+        Args:
+            html: 本文 HTML
+            markdown: Markdown に変換するか (False の場合はプレーンテキスト)
+
+        Returns:
+            str: 変換結果
+        """
+        renderer = cls(markdown)
+        renderer.feed(html)
+        renderer.close()
+        text = "".join(renderer.__parts)
+        text = _TRAILING_SPACE_PATTERN.sub("\n", text)
+        return _BLANK_LINES_PATTERN.sub("\n\n", text).strip()
+
+    def __break(self,
+                count: int) -> None:
+        if count > 0 and len(self.__parts) > 0:
+            self.__breaks = max(self.__breaks, count)
+
+    def __get_break(self,
+                    tag: str) -> int:
+        if tag in _PARAGRAPH_TAGS:
+            # 入れ子のリストは空行で区切らない
+            return 1 if tag in ("ul", "ol") and len(self.__lists) > 0 else 2
+        return 1 if tag in _LINE_TAGS else 0
+
+    def __write(self,
+                text: str) -> None:
+        if self.__breaks > 0:
+            self.__parts.append("\n" * self.__breaks)
+            self.__breaks = 0
+            text = text.lstrip(" ")
+        if text != "":
+            self.__parts.append(text)
+
+    def handle_starttag(self,
+                        tag: str,
+                        attrs: List[Tuple[str, Optional[str]]]) -> None:
+        if tag in _SKIP_TAGS:
+            self.__skip += 1
+            return
+        if self.__skip > 0:
+            return
+
+        self.__break(self.__get_break(tag))
+
+        attributes = dict(attrs)
+        if tag == "br":
+            self.__write("\\\n" if self.markdown else "\n")
+        elif tag == "pre":
+            self.__pre += 1
+        elif tag in ("ul", "ol"):
+            self.__lists.append([0 if tag == "ol" else -1])
+        elif tag == "li" and len(self.__lists) > 0:
+            counter = self.__lists[-1]
+            if counter[0] >= 0:
+                counter[0] += 1
+            marker = f"{counter[0]}. " if counter[0] >= 0 else ("- " if self.markdown else "・")
+            self.__write("")
+            self.__parts.append("   " * (len(self.__lists) - 1) + marker)
+        elif tag == "tr":
+            self.__cells = 0
+        elif tag in ("td", "th"):
+            if self.__cells > 0:
+                self.__write(" | " if self.markdown else "\t")
+            self.__cells += 1
+        elif tag == "hr":
+            self.__break(2)
+            self.__write("---" if self.markdown else "")
+            self.__break(2)
+        elif self.markdown:
+            if tag == "a":
+                self.__links.append((len(self.__parts), attributes.get("href")))
+            elif tag in _EMPHASIS:
+                self.__write(_EMPHASIS[tag])
+            elif tag in ("h1", "h2", "h3", "h4", "h5", "h6"):
+                self.__write("#" * int(tag[1]) + " ")
+            elif tag == "img":
+                self.__write(f"![{attributes.get('alt') or ''}]({attributes.get('src') or ''})")
+        elif tag == "img" and attributes.get("alt"):
+            self.__write(attributes.get("alt") or "")
+
+    def handle_startendtag(self,
+                           tag: str,
+                           attrs: List[Tuple[str, Optional[str]]]) -> None:
+        self.handle_starttag(tag, attrs)
+        if tag not in ("br", "hr", "img"):
+            self.handle_endtag(tag)
+
+    def handle_endtag(self,
+                      tag: str) -> None:
+        if tag in _SKIP_TAGS:
+            self.__skip = max(self.__skip - 1, 0)
+            return
+        if self.__skip > 0:
+            return
+
+        if tag == "pre":
+            self.__pre = max(self.__pre - 1, 0)
+        elif tag in ("ul", "ol") and len(self.__lists) > 0:
+            self.__lists.pop()
+        elif self.markdown and tag == "a" and len(self.__links) > 0:
+            start, href = self.__links.pop()
+            text = "".join(self.__parts[start:]).strip()
+            if href and text and href != text:
+                self.__parts[start:] = [f"[{text}]({href})"]
+            elif href and not text:
+                self.__parts[start:] = [f"<{href}>"]
+        elif self.markdown and tag in _EMPHASIS:
+            self.__parts.append(_EMPHASIS[tag])
+
+        self.__break(self.__get_break(tag))
+
+    def handle_data(self,
+                    data: str) -> None:
+        if self.__skip > 0:
+            return
+        if self.__pre == 0:
+            data = _WHITESPACE_PATTERN.sub(" ", data)
+            at_line_start = len(self.__parts) == 0 or self.__breaks > 0 or self.__parts[-1].endswith(("\n", " "))
+            if data == " " and at_line_start:
+                return
+        if self.markdown and self.__pre == 0:
+            data = _MARKDOWN_ESCAPE_PATTERN.sub(r"\\\1", data)
+        self.__write(data)
+
+
+def render_content(html: str,
+                   kind: str = CONTENT_TEXT) -> str:
+    """
+    本文 HTML を変換する (メモ化しない。プロセスプールなどで実行するための関数)
+
+    Args:
+        html: 本文 HTML
+        kind: 変換形式 (CONTENT_TEXT, CONTENT_MARKDOWN)
+
+    Returns:
+        str: 変換結果
+    """
+    return UnipaContentRenderer.render(html, kind == CONTENT_MARKDOWN)
+
+
+class UnipaContentConverter:
+    """
+    本文 HTML の変換結果のキャッシュ
+
+    本文 HTML のハッシュと変換形式ごとに、最近使った maxsize 件の変換結果を保持します (LRU)。
+    """
+
+    def __init__(self,
+                 maxsize: int = 4096):
+        """
+        コンストラクタ
+
+        Args:
+            maxsize: 保持する変換結果の最大件数
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.__cache: "OrderedDict[Tuple[str, bytes], str]" = OrderedDict()
+        self.__lock = threading.Lock()
+
+    @staticmethod
+    def make_key(html: str,
+                 kind: str) -> Tuple[str, bytes]:
+        """
+        キャッシュのキーを作成する
+
+        Args:
+            html: 本文 HTML
+            kind: 変換形式
+
+        Returns:
+            Tuple[str, bytes]: (変換形式, 本文 HTML のハッシュ)
+        """
+        return kind, hashlib.blake2b(html.encode("utf-8"), digest_size=16).digest()
+
+    def get(self,
+            key: Tuple[str, bytes]) -> Optional[str]:
+        """
+        キャッシュした変換結果を取得する
+
+        Args:
+            key: キャッシュのキー
+
+        Returns:
+            Optional[str]: 変換結果 (キャッシュしていない場合は None)
+        """
+        with self.__lock:
+            result = self.__cache.get(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self.__cache.move_to_end(key)
+            self.hits += 1
+            return result
+
+    def put(self,
+            key: Tuple[str, bytes],
+            result: str) -> None:
+        """
+        変換結果をキャッシュする
+
+        Args:
+            key: キャッシュのキー
+            result: 変換結果
+        """
+        with self.__lock:
+            self.__cache[key] = result
+            self.__cache.move_to_end(key)
+            while len(self.__cache) > self.maxsize:
+                self.__cache.popitem(last=False)
+
+    def convert(self,
+                html: str,
+                kind: str = CONTENT_TEXT) -> str:
+        """
+        本文 HTML を変換する (キャッシュがあれば再利用する)
+
+        Args:
+            html: 本文 HTML
+            kind: 変換形式 (CONTENT_TEXT, CONTENT_MARKDOWN)
+
+        Returns:
+            str: 変換結果
+        """
+        key = self.make_key(html, kind)
+        result = self.get(key)
+        if result is None:
+            result = render_content(html, kind)
+            self.put(key, result)
+        return result
+
+    def convert_many(self,
+                     contents: Iterable[str],
+                     kind: str = CONTENT_TEXT,
+                     executor: Optional[Executor] = None) -> List[str]:
+        """
+        複数の本文 HTML をまとめて変換する
+
+        同じ本文は 1 回だけ変換し、キャッシュにない本文のみを executor で並列に変換します。
+        変換は CPU 処理のため、並列化する場合は ProcessPoolExecutor を指定してください。
+
+        Args:
+            contents: 本文 HTML
+            kind: 変換形式 (CONTENT_TEXT, CONTENT_MARKDOWN)
+            executor: 変換に利用する Executor (None の場合は呼び出したスレッドで変換する)
+
+        Returns:
+            List[str]: 変換結果 (contents の順)
+        """
+        contents = list(contents)
+        keys = [self.make_key(html, kind) for html in contents]
+        results: Dict[Tuple[str, bytes], str] = {}
+        missing: Dict[Tuple[str, bytes], str] = {}
+        for key, html in zip(keys, contents):
+            if key in results or key in missing:
+                continue
+            result = self.get(key)
+            if result is None:
+                missing[key] = html
+            else:
+                results[key] = result
+
+        if len(missing) > 0:
+            htmls = list(missing.values())
+            if executor is None:
+                rendered = [render_content(html, kind) for html in htmls]
+            else:
+                rendered = list(executor.map(render_content, htmls, [kind] * len(htmls)))
+            for key, result in zip(missing, rendered):
+                self.put(key, result)
+                results[key] = result
+
+        return [results[key] for key in keys]
+
+    def clear(self) -> None:
+        """
+        キャッシュを破棄し、ヒット数・ミス数をリセットする
+        """
+        with self.__lock:
+            self.__cache.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.__cache)
+
+
+# 掲示詳細の content_text, content_markdown が利用する共有キャッシュ
+CONTENT_CONVERTER = UnipaContentConverter()
@@ -0,0 +1,88 @@
+"""
+掲示アイテム 詳細情報の一括取得結果
+"""
+from typing import Optional
+
+from unipa.BulletinBoard.BulletinBoard import UnipaBulletinBoardItem
+from unipa.BulletinBoard.BulletinBoardItemDetails import UnipaBulletinBoardItemDetails
+
+
+class UnipaBulletinBoardDetailsResult:
+    """
+    掲示アイテム 詳細情報の一括取得結果 (1 アイテムぶん)
+    """
+
+    def __init__(self,
+                 index: int,
+                 item: UnipaBulletinBoardItem,
+                 details: Optional[UnipaBulletinBoardItemDetails],
+                 error: Optional[Exception]):
+        """
+        コンストラクタ
+
+        Args:
+            index: 指定されたアイテムリストでの位置
+            item: 掲示アイテム
+            details: 掲示アイテムの詳細 (取得に失敗した場合は None)
+            error: 取得に失敗した場合の例外
+        """
+        self._index = index
+        self._item = item
+        self._details = details
+        self._error = error
+
+    @property
+    def index(self) -> int:
+        """
+        指定されたアイテムリストでの位置
+
+        Returns:
+            int: 指定されたアイテムリストでの位置
+        """
+        return self._index
+
+    @property
+    def item(self) -> UnipaBulletinBoardItem:
+        """
+        掲示アイテム
+
+        Returns:
+            UnipaBulletinBoardItem: 掲示アイテム
+        """
+        return self._item
+
+    @property
+    def details(self) -> Optional[UnipaBulletinBoardItemDetails]:
+        """
+        掲示アイテムの詳細
+
+        Returns:
+            Optional[UnipaBulletinBoardItemDetails]: 掲示アイテムの詳細 (取得に失敗した場合は None)
+        """
+        return self._details
+
+    @property
+    def error(self) -> Optional[Exception]:
+        """
+        取得に失敗した場合の例外
+
+        Returns:
+            Optional[Exception]: 例外 (成功した場合は None)
+        """
+        return self._error
+
+    @property
+    def is_success(self) -> bool:
+        """
+        取得に成功したか
+
+        Returns:
+            bool: 取得に成功したか
+        """
+        return self._error is None
+
+    def __str__(self) -> str:
+        return f"UnipaBulletinBoardDetailsResult(index={self._index}, " \
+               f"item={self._item}, " \
+               f"details={self._details}, " \
+               f"error={self._error!r})"
@@ -0,0 +1,418 @@
+"""
+掲示板の差分検出
+"""
+import hashlib
+import itertools
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from unipa.BulletinBoard.BulletinBoard import UnipaBulletinBoardItem
+from unipa.BulletinBoard.BulletinBoardDetailsResult import UnipaBulletinBoardDetailsResult
+from unipa.BulletinBoard.BulletinBoardItemDetails import UnipaBulletinBoardItemDetails
+from unipa.BulletinBoard.BulletinBoardStateStore import UnipaBulletinBoardPostState, UnipaBulletinBoardStateStore
+
+if TYPE_CHECKING:
+    from unipa.BulletinBoard import UnipaBulletinBoard
+
+EVENT_ADDED = "added"
+EVENT_REMOVED = "removed"
+EVENT_CHANGED = "changed"
+
+DetailsFetcher = Callable[[List[UnipaBulletinBoardItem]], Iterable[UnipaBulletinBoardDetailsResult]]
+
+
+class UnipaBulletinBoardEvent:
+    """
+    掲示板の変化
+    """
+
+    def __init__(self,
+                 kind: str,
+                 fingerprint: str,
+                 item: Optional[UnipaBulletinBoardItem],
+                 previous: Optional[UnipaBulletinBoardPostState],
+                 changes: List[str],
+                 details: Optional[UnipaBulletinBoardItemDetails] = None):
+        """
+        コンストラクタ
+
+        Args:
+            kind: 変化の種類 (added, removed, changed)
+            fingerprint: 掲示のフィンガープリント
+            item: 掲示アイテム (removed の場合は None)
+            previous: 前回の掲示の状態 (added の場合は None)
+            changes: 変化した項目 (title, is_attention, is_flag, is_unread, content)
+            details: 掲示アイテムの詳細 (取得した場合のみ)
+        """
+        self._kind = kind
+        self._fingerprint = fingerprint
+        self._item = item
+        self._previous = previous
+        self._changes = changes
+        self._details = details
+
+    @property
+    def kind(self) -> str:
+        """
+        変化の種類 (added, removed, changed)
+
+        Returns:
+            str: 変化の種類
+        """
+        return self._kind
+
+    @property
+    def fingerprint(self) -> str:
+        """
+        掲示のフィンガープリント
+
+        Returns:
+            str: 掲示のフィンガープリント
+        """
+        return self._fingerprint
+
+    @property
+    def item(self) -> Optional[UnipaBulletinBoardItem]:
+        """
+        掲示アイテム
+
+        Returns:
+            Optional[UnipaBulletinBoardItem]: 掲示アイテム (removed の場合は None)
+        """
+        return self._item
+
+    @property
+    def previous(self) -> Optional[UnipaBulletinBoardPostState]:
+        """
+        前回の掲示の状態
+
+        Returns:
+            Optional[UnipaBulletinBoardPostState]: 前回の掲示の状態 (added の場合は None)
+        """
+        return self._previous
+
+    @property
+    def changes(self) -> List[str]:
+        """
+        変化した項目
+
+        Returns:
+            List[str]: 変化した項目 (title, is_attention, is_flag, is_unread, content)
+        """
+        return self._changes
+
+    @property
+    def details(self) -> Optional[UnipaBulletinBoardItemDetails]:
+        """
+        掲示アイテムの詳細
+
+        Returns:
+            Optional[UnipaBulletinBoardItemDetails]: 掲示アイテムの詳細 (取得した場合のみ)
+        """
+        return self._details
+
+    def __str__(self) -> str:
+        title = self._item.title if self._item is not None else (self._previous.title if self._previous else None)
+        return f"UnipaBulletinBoardEvent(kind={self._kind}, " \
+               f"fingerprint={self._fingerprint}, " \
+               f"title={title}, " \
+               f"changes={self._changes})"
+
+
+class UnipaBulletinBoardDiff:
+    """
+    掲示板の差分検出
+
+    掲示 ID (s, p 値) は表示順で振られるため、掲示の同一性はタイトルと、詳細の差出人・カテゴリ・公開開始日で判定します。
+    フィンガープリントは掲示を初めて検出したときに作成して状態ストアに保存し、以降は同じ掲示に同じ値を使います。
+
+    - 同じタイトルの掲示の数が前回と変わらない場合は、同じタイトルの掲示の中での位置で対応付けます (詳細は取得しません)
+    - 数が変わった場合は、そのタイトルの掲示の詳細を取得し、差出人・カテゴリ・公開開始日で対応付けます。
+      詳細を取得しない場合は、位置 (表示順の最後を 0 とする) で対応付けます (新しい掲示は上に追加されるため)
+    - タイトルが変わった掲示は、詳細の差出人・カテゴリ・公開開始日が一致する削除済みの掲示が 1 件だけの場合に対応付け、
+      title の変化として通知します
+
+        diff = UnipaBulletinBoardDiff(UnipaBulletinBoardStateStore("bulletinboard.sqlite3"))
+        for event in diff.poll(UnipaBulletinBoard(unipa)):
+            print(event)
+    """
+
+    LIST_FIELDS = ("is_attention", "is_flag", "is_unread")
+
+    def __init__(self,
+                 store: UnipaBulletinBoardStateStore):
+        """
+        コンストラクタ
+
+        Args:
+            store: 状態ストア
+        """
+        self.store = store
+
+    def poll(self,
+             board: "UnipaBulletinBoard",
+             fetch_details: bool = True) -> List[UnipaBulletinBoardEvent]:
+        """
+        掲示リストを取得し、前回からの変化を返す
+
+        Args:
+            board: 掲示板
+            fetch_details: 追加された掲示と、数が変わった同じタイトルの掲示の詳細を取得するか
+
+        Returns:
+            List[UnipaBulletinBoardEvent]: 変化
+        """
+        fetcher: Optional[DetailsFetcher] = board.get_details_many if fetch_details else None
+        return self.apply(board.get_all(), fetcher)
+
+    def apply(self,
+              items: List[UnipaBulletinBoardItem],
+              fetch_details: Optional[DetailsFetcher] = None) -> List[UnipaBulletinBoardEvent]:
+        """
+        掲示リストと状態ストアを比較して変化を返し、状態ストアを更新する
+
+        Args:
+            items: 掲示リスト (UnipaBulletinBoard.get_all の結果)
+            fetch_details: 掲示の詳細を取得する関数 (UnipaBulletinBoard.get_details_many など)
+
+        Returns:
+            List[UnipaBulletinBoardEvent]: 変化
+        """
+        previous = self.store.load()
+        previous_groups: Dict[str, List[UnipaBulletinBoardPostState]] = {}
+        for state in previous.values():
+            previous_groups.setdefault(state.title, []).append(state)
+        for states in previous_groups.values():
+            states.sort(key=lambda x: x.ordinal)
+
+        current_groups: Dict[str, List[Tuple[int, UnipaBulletinBoardItem]]] = {}
+        for item in items:
+            current_groups.setdefault(item.title, []).append((0, item))
+        for title, group in current_groups.items():
+            # 表示順の最後 (最も古い掲示) を 0 とする
+            current_groups[title] = [(ordinal, item) for ordinal, (_, item) in enumerate(reversed(group))]
+
+        # 同じタイトルの掲示の数が変わったグループと、前回なかったタイトルの掲示は詳細を取得する
+        targets: List[UnipaBulletinBoardItem] = []
+        for title, group in current_groups.items():
+            states = previous_groups.get(title, [])
+            if len(states) != len(group):
+                targets.extend(item for _, item in group)
+        details = self.__fetch_details(targets, fetch_details)
+
+        matched: List[Tuple[int, UnipaBulletinBoardItem, UnipaBulletinBoardPostState]] = []
+        added: List[Tuple[int, UnipaBulletinBoardItem]] = []
+        for title, group in current_groups.items():
+            states = previous_groups.pop(title, [])
+            pairs, unmatched_items, unmatched_states = self.match_group(group, states, details)
+            matched.extend(pairs)
+            added.extend(unmatched_items)
+            for state in unmatched_states:
+                previous_groups.setdefault(title, []).append(state)
+        removed = {state.fingerprint: state for states in previous_groups.values() for state in states}
+
+        events: List[UnipaBulletinBoardEvent] = []
+        upserts: List[UnipaBulletinBoardPostState] = []
+
+        for ordinal, item, state in matched:
+            item_details = details.get(id(item))
+            new_state = self.to_state(state.fingerprint, item, item_details, state, ordinal)
+            changes = [field for field in self.LIST_FIELDS if getattr(state, field) != getattr(item, field)]
+            if state.content_hash is not None and new_state.content_hash != state.content_hash:
+                changes.append("content")
+            if len(changes) > 0:
+                events.append(UnipaBulletinBoardEvent(EVENT_CHANGED, state.fingerprint, item, state, changes,
+                                                      item_details))
+            if len(changes) > 0 or self.is_state_changed(state, new_state):
+                upserts.append(new_state)
+
+        # 詳細の差出人・カテゴリ・公開開始日が一致する削除済みの掲示が 1 件だけの場合、タイトルの変化として扱う
+        removed_by_identity: Dict[Tuple[Optional[str], Optional[str], Optional[str]], List[str]] = {}
+        for fingerprint, state in removed.items():
+            if state.author is not None:
+                removed_by_identity.setdefault(self.identity(state), []).append(fingerprint)
+        added_by_identity: Dict[Tuple[Optional[str], Optional[str], Optional[str]], int] = {}
+        for _, item in added:
+            item_details = details.get(id(item))
+            if item_details is not None:
+                key = self.identity(self.to_state("", item, item_details))
+                added_by_identity[key] = added_by_identity.get(key, 0) + 1
+
+        used = set(previous)
+        for ordinal, item in added:
+            item_details = details.get(id(item))
+            candidates: List[str] = []
+            if item_details is not None:
+                key = self.identity(self.to_state("", item, item_details))
+                if added_by_identity.get(key) == 1:
+                    candidates = removed_by_identity.get(key, [])
+
+            if len(candidates) != 1:
+                fingerprint = self.make_fingerprint(item, item_details, used)
+                used.add(fingerprint)
+                upserts.append(self.to_state(fingerprint, item, item_details, None, ordinal))
+                events.append(UnipaBulletinBoardEvent(EVENT_ADDED, fingerprint, item, None, [], item_details))
+                continue
+
+            old = removed.pop(candidates[0])
+            state = self.to_state(old.fingerprint, item, item_details, old, ordinal)
+            upserts.append(state)
+            changes = ["title"] + [field for field in self.LIST_FIELDS if getattr(old, field) != getattr(item, field)]
+            if old.content_hash != state.content_hash:
+                changes.append("content")
+            events.append(UnipaBulletinBoardEvent(EVENT_CHANGED, old.fingerprint, item, old, changes, item_details))
+
+        for fingerprint, state in removed.items():
+            events.append(UnipaBulletinBoardEvent(EVENT_REMOVED, fingerprint, None, state, []))
+
+        self.store.apply(upserts, list(removed))
+        return events
+
+    @staticmethod
+    def __fetch_details(items: List[UnipaBulletinBoardItem],
+                        fetch_details: Optional[DetailsFetcher]) -> Dict[int, UnipaBulletinBoardItemDetails]:
+        # id(掲示アイテム) -> 詳細 (取得に失敗した掲示は含まない)
+        details: Dict[int, UnipaBulletinBoardItemDetails] = {}
+        if fetch_details is None or len(items) == 0:
+            return details
+        for result in fetch_details(items):
+            if result.details is not None:
+                details[id(items[result.index])] = result.details
+        return details
+
+    @classmethod
+    def match_group(cls,
+                    group: List[Tuple[int, UnipaBulletinBoardItem]],
+                    states: List[UnipaBulletinBoardPostState],
+                    details: Dict[int, UnipaBulletinBoardItemDetails]) \
+            -> Tuple[List[Tuple[int, UnipaBulletinBoardItem, UnipaBulletinBoardPostState]],
+                     List[Tuple[int, UnipaBulletinBoardItem]],
+                     List[UnipaBulletinBoardPostState]]:
+        """
+        同じタイトルの掲示と、前回の掲示の状態を対応付ける
+
+        数が同じ場合と、詳細がそろっていない場合は位置 (ordinal) の順に対応付けます。
+        それ以外は差出人・カテゴリ・公開開始日が一致するものを位置の順に対応付けます。
+
+        Args:
+            group: (位置, 掲示アイテム) (位置の順)
+            states: 前回の掲示の状態 (位置の順)
+            details: id(掲示アイテム) -> 詳細
+
+        Returns:
+            Tuple: 対応付けた (位置, 掲示アイテム, 前回の状態), 対応しなかった (位置, 掲示アイテム),
+                対応しなかった前回の状態
+        """
+        by_identity = len(states) != len(group) \
+            and all(id(item) in details for _, item in group) \
+            and all(state.author is not None for state in states)
+        if not by_identity:
+            count = min(len(group), len(states))
+            return [(ordinal, item, state) for (ordinal, item), state in zip(group, states)], \
+                group[count:], states[count:]
+
+        remaining: Dict[Tuple[Optional[str], Optional[str], Optional[str]], List[UnipaBulletinBoardPostState]] = {}
+        for state in states:
+            remaining.setdefault(cls.identity(state), []).append(state)
+        pairs: List[Tuple[int, UnipaBulletinBoardItem, UnipaBulletinBoardPostState]] = []
+        unmatched: List[Tuple[int, UnipaBulletinBoardItem]] = []
+        for ordinal, item in group:
+            candidates = remaining.get(cls.identity(cls.to_state("", item, details[id(item)])), [])
+            if len(candidates) == 0:
+                unmatched.append((ordinal, item))
+            else:
+                pairs.append((ordinal, item, candidates.pop(0)))
+        return pairs, unmatched, [state for candidates in remaining.values() for state in candidates]
+
+    @staticmethod
+    def make_fingerprint(item: UnipaBulletinBoardItem,
+                         details: Optional[UnipaBulletinBoardItemDetails],
+                         used: Set[str]) -> str:
+        """
+        新しく検出した掲示のフィンガープリントを作成する
+
+        Args:
+            item: 掲示アイテム
+            details: 掲示アイテムの詳細 (取得していない場合は None)
+            used: 利用済みのフィンガープリント (重複しない値を作成する)
+
+        Returns:
+            str: フィンガープリント
+        """
+        start_date = details.publication_period.start_date if details is not None else None
+        source = "\0".join([item.title, details.author if details else "", details.category if details else "",
+                            start_date.isoformat() if start_date else ""])
+        for counter in itertools.count():
+            fingerprint = hashlib.sha1(f"{source}\0{counter}".encode("utf-8")).hexdigest()
+            if fingerprint not in used:
+                return fingerprint
+        raise AssertionError("unreachable")
+
+    @staticmethod
+    def identity(state: UnipaBulletinBoardPostState) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+        """
+        掲示の識別子 (同じタイトルの掲示の区別・タイトルの変化の検出に利用する)
+
+        Args:
+            state: 掲示の状態
+
+        Returns:
+            Tuple[Optional[str], Optional[str], Optional[str]]: 差出人, カテゴリ, 公開開始日
+        """
+        return state.author, state.category, state.start_date
+
+    @classmethod
+    def is_state_changed(cls,
+                         previous: UnipaBulletinBoardPostState,
+                         state: UnipaBulletinBoardPostState) -> bool:
+        """
+        保存する状態が前回から変わったか (位置・詳細の変化を含む)
+
+        Args:
+            previous: 前回の掲示の状態
+            state: 保存する状態
+
+        Returns:
+            bool: 変わったか
+        """
+        columns = UnipaBulletinBoardStateStore.COLUMNS
+        return any(getattr(previous, column) != getattr(state, column) for column in columns)
+
+    @staticmethod
+    def to_state(fingerprint: str,
+                 item: UnipaBulletinBoardItem,
+                 details: Optional[UnipaBulletinBoardItemDetails],
+                 previous: Optional[UnipaBulletinBoardPostState] = None,
+                 ordinal: int = 0) -> UnipaBulletinBoardPostState:
+        """
+        掲示アイテムから保存する状態を作成する
+
+        Args:
+            fingerprint: フィンガープリント
+            item: 掲示アイテム
+            details: 掲示アイテムの詳細 (ない場合は前回の状態の値を引き継ぐ)
+            previous: 前回の掲示の状態
+            ordinal: 同じタイトルの掲示の中での位置 (表示順の最後を 0 とする)
+
+        Returns:
+            UnipaBulletinBoardPostState: 保存する状態
+        """
+        if details is None:
+            return UnipaBulletinBoardPostState(
+                fingerprint, item.title, item.is_attention, item.is_flag, item.is_unread,
+                previous.author if previous else None,
+                previous.category if previous else None,
+                previous.start_date if previous else None,
+                previous.content_hash if previous else None,
+                ordinal,
+            )
+
+        start_date = details.publication_period.start_date
+        end_date = details.publication_period.end_date
+        content = "\0".join([details.author, details.category, details.content_html,
+                             start_date.isoformat() if start_date else "", end_date.isoformat() if end_date else ""])
+        return UnipaBulletinBoardPostState(
+            fingerprint, item.title, item.is_attention, item.is_flag, item.is_unread,
+            details.author, details.category, start_date.isoformat() if start_date else None,
+            hashlib.sha1(content.encode("utf-8")).hexdigest(),
+            ordinal,
+        )
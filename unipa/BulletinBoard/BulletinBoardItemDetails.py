@@ -1,17 +1,32 @@
 """
 掲示板の掲示アイテム 詳細情報
 """
+from concurrent.futures import Executor
+from typing import Iterable, List, Optional
+
+from unipa.BulletinBoard.BulletinBoardContent import CONTENT_CONVERTER, CONTENT_MARKDOWN, CONTENT_TEXT
 from unipa.BulletinBoard.PublicationPeriod import UnipaPublicationPeriod
+from unipa.unipa_model import UnipaModel
 
 
-class UnipaBulletinBoardItemDetails:
+class UnipaBulletinBoardItemDetails(UnipaModel):
     """
     掲示板の掲示アイテム 詳細情報
 
     Notes:
-        get-unipa ではコンテンツ内容のプレーンテキスト化はしていません。`content_html` プロパティで HTML をそのまま返すため、Markdown などへの変換は利用側で実施してください。
+        `content_html` プロパティは HTML をそのまま返します。プレーンテキスト・Markdown が必要な場合は
+        `content_text`, `content_markdown` プロパティを利用してください。変換は初めて参照したときに実施し、
+        結果は本文のハッシュごとに共有キャッシュ (BulletinBoardContent.CONTENT_CONVERTER) に保持されます。
     """
 
+    __slots__ = ("_item_id", "_title", "_author", "_category", "_content_html", "_publication_period")
+    _item_id: str
+    _title: str
+    _author: str
+    _category: str
+    _content_html: str
+    _publication_period: UnipaPublicationPeriod
+
     def __init__(self,
                  item_id: str,
                  title: str,
@@ -30,12 +45,12 @@ class UnipaBulletinBoardItemDetails:
             content_html: コンテンツ HTML
             publication_period: 公開期間
         """
-        self._item_id = item_id
-        self._title = title
-        self._author = author
-        self._category = category
-        self._content_html = content_html
-        self._publication_period = publication_period
+        object.__setattr__(self, "_item_id", item_id)
+        object.__setattr__(self, "_title", title)
+        object.__setattr__(self, "_author", author)
+        object.__setattr__(self, "_category", category)
+        object.__setattr__(self, "_content_html", content_html)
+        object.__setattr__(self, "_publication_period", publication_period)
 
     @property
     def item_id(self) -> str:
@@ -91,6 +106,45 @@ class UnipaBulletinBoardItemDetails:
         """
         return self._content_html
 
+    @property
+    def content_text(self) -> str:
+        """
+        コンテンツ (プレーンテキスト)
+
+        Returns:
+            str: コンテンツのプレーンテキスト
+        """
+        return CONTENT_CONVERTER.convert(self._content_html, CONTENT_TEXT)
+
+    @property
+    def content_markdown(self) -> str:
+        """
+        コンテンツ (Markdown)
+
+        Returns:
+            str: コンテンツの Markdown
+        """
+        return CONTENT_CONVERTER.convert(self._content_html, CONTENT_MARKDOWN)
+
+    @staticmethod
+    def convert_contents(details: Iterable["UnipaBulletinBoardItemDetails"],
+                         kind: str = CONTENT_TEXT,
+                         executor: Optional[Executor] = None) -> List[str]:
+        """
+        複数の掲示詳細のコンテンツをまとめて変換し、共有キャッシュに保持します。
+
+        変換済み・重複した本文は変換しないため、以降の content_text, content_markdown の参照は変換なしで返ります。
+
+        Args:
+            details: 掲示詳細
+            kind: 変換形式 (CONTENT_TEXT, CONTENT_MARKDOWN)
+            executor: 変換に利用する Executor (ProcessPoolExecutor など。None の場合は呼び出したスレッドで変換する)
+
+        Returns:
+            List[str]: 変換結果 (details の順)
+        """
+        return CONTENT_CONVERTER.convert_many((x.content_html for x in details), kind, executor)
+
     @property
     def publication_period(self) -> UnipaPublicationPeriod:
         """
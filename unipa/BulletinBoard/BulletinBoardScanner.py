@@ -0,0 +1,204 @@
+"""
+掲示板ページのストリーミングスキャナー
+"""
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Tuple
+
+from unipa.BulletinBoard.BulletinBoard import UnipaBulletinBoardItem
+from unipa.errors import UnipaInternalError
+from unipa.unipa_parsing import TARGET_SP_PATTERN
+
+# 掲示アイテムが含まれる「全表示」タブパネルの位置
+ALL_TABPANEL_INDEX = 1
+
+
+class _UnipaBulletinBoardRow:
+    """
+    走査中の掲示アイテム
+    """
+
+    def __init__(self,
+                 depth: int):
+        self.depth = depth
+        self.item_id: Optional[str] = None
+        self.onclick: Optional[str] = None
+        self.title: Optional[List[str]] = None
+        self.in_link = False
+        self.is_attention = False
+        self.span_depth: Optional[int] = None
+        self.button_depth: Optional[int] = None
+        # フラグ・未/既読ボタンのチェックボックス (id, checked)
+        self.buttons: List[Optional[Tuple[Optional[str], bool]]] = []
+
+
+class UnipaBulletinBoardScanner(HTMLParser):
+    """
+    掲示板ページのストリーミングスキャナー
+
+    DOM を構築せずに「全表示」タブパネルの掲示アイテム (div.ui-scrollpanel > div.alignRight) を走査し、
+    アイテムの終了タグを読んだ時点で UnipaBulletinBoardItem を返します。UnipaBulletinBoard.parse_all と同じ要素を対象にします。
+
+        scanner = UnipaBulletinBoardScanner()
+        for chunk in chunks:
+            for item in scanner.feed_items(chunk):
+                print(item.title)
+        items = scanner.close_items()
+    """
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.__panels_depth: Optional[int] = None
+        self.__tabpanel_count = 0
+        # 「全表示」タブパネル内の div ごとのクラス
+        self.__divs: Optional[List[List[str]]] = None
+        self.__row: Optional[_UnipaBulletinBoardRow] = None
+        self.__depth = 0
+        self.__found = False
+        self.__items: List[UnipaBulletinBoardItem] = []
+
+    def feed_items(self,
+                   data: str) -> List[UnipaBulletinBoardItem]:
+        """
+        HTML の断片を読み込み、読み終えた掲示アイテムを返す
+
+        Args:
+            data: HTML の断片
+
+        Returns:
+            List[UnipaBulletinBoardItem]: 読み終えた掲示アイテム
+        """
+        self.feed(data)
+        items = self.__items
+        self.__items = []
+        return items
+
+    def close_items(self) -> List[UnipaBulletinBoardItem]:
+        """
+        HTML の読み込みを終了し、残りの掲示アイテムを返す
+
+        Returns:
+            List[UnipaBulletinBoardItem]: 読み終えた掲示アイテム
+        """
+        self.close()
+        if not self.__found:
+            raise UnipaInternalError("掲示板パネルのうち、全表示タブが見つかりませんでした。")
+        items = self.__items
+        self.__items = []
+        return items
+
+    def handle_starttag(self,
+                        tag: str,
+                        attrs: List[Tuple[str, Optional[str]]]) -> None:
+        if tag != "div" and self.__row is None:
+            return
+
+        attributes = dict(attrs)
+        if tag == "div":
+            self.__depth += 1
+            self.__start_div(attributes)
+            return
+
+        row = self.__row
+        if row is None:
+            return
+        classes = (attributes.get("class") or "").split()
+        if tag == "a" and row.title is None:
+            row.item_id = attributes.get("id")
+            row.onclick = attributes.get("onclick")
+            row.title = []
+            row.in_link = True
+        elif tag == "i" and "iconColorAttention" in classes:
+            row.is_attention = True
+        elif tag == "span" and "inlineBlock" in classes and row.span_depth is None:
+            row.span_depth = self.__depth
+        elif tag == "input" and row.button_depth is not None and attributes.get("type") == "checkbox" \
+                and row.buttons[-1] is None:
+            row.buttons[-1] = (attributes.get("id"), "checked" in attributes)
+
+    def __start_div(self,
+                    attributes: Dict[str, Optional[str]]) -> None:
+        classes = (attributes.get("class") or "").split()
+        if self.__divs is not None:
+            parent = self.__divs[-1] if len(self.__divs) > 0 else []
+            self.__divs.append(classes)
+            row = self.__row
+            if row is None:
+                if "alignRight" in classes and "ui-scrollpanel" in parent:
+                    self.__row = _UnipaBulletinBoardRow(self.__depth)
+                return
+            # span.inlineBlock の直下の div[type="button"]
+            if row.span_depth == self.__depth - 1 and attributes.get("type") == "button":
+                row.button_depth = self.__depth
+                row.buttons.append(None)
+            return
+
+        if self.__panels_depth is None:
+            if "ui-tabs-panels" in classes:
+                self.__panels_depth = self.__depth
+            return
+
+        if self.__depth == self.__panels_depth + 1 and attributes.get("role") == "tabpanel":
+            if self.__tabpanel_count == ALL_TABPANEL_INDEX:
+                self.__divs = []
+                self.__found = True
+            self.__tabpanel_count += 1
+
+    def handle_endtag(self,
+                      tag: str) -> None:
+        row = self.__row
+        if row is not None:
+            if tag == "a":
+                row.in_link = False
+            elif tag == "span" and row.span_depth == self.__depth:
+                row.span_depth = None
+            elif tag == "div" and row.button_depth == self.__depth:
+                row.button_depth = None
+
+        if tag != "div":
+            return
+
+        if row is not None and row.depth == self.__depth:
+            self.__row = None
+            item = self.__build(row)
+            if item is not None:
+                self.__items.append(item)
+
+        if self.__divs is not None:
+            if len(self.__divs) == 0:
+                # 「全表示」タブパネルの終了
+                self.__divs = None
+            else:
+                self.__divs.pop()
+        elif self.__panels_depth is not None and self.__depth == self.__panels_depth:
+            self.__panels_depth = None
+        self.__depth -= 1
+
+    def handle_data(self,
+                    data: str) -> None:
+        row = self.__row
+        if row is not None and row.in_link and row.title is not None:
+            row.title.append(data)
+
+    @staticmethod
+    def __build(row: _UnipaBulletinBoardRow) -> Optional[UnipaBulletinBoardItem]:
+        match = TARGET_SP_PATTERN.search(row.onclick or "")
+        if match is None:
+            return None
+
+        buttons = [button for button in row.buttons if button is not None]
+        if len(buttons) < 2:
+            raise UnipaInternalError("掲示板パネルのうち、フラグ・未/既読ボタンが見つかりませんでした。")
+
+        flag_id, flag_checked = buttons[0]
+        unread_id, unread_checked = buttons[1]
+        return UnipaBulletinBoardItem(
+            row.item_id,  # type: ignore
+            "".join(row.title or []),
+            match.group(1),
+            match.group(2),
+            flag_id,  # type: ignore
+            unread_id,  # type: ignore
+            row.is_attention,
+            not flag_checked,
+            unread_checked
+        )
@@ -0,0 +1,148 @@
+"""
+掲示板の差分検出用 状態ストア
+"""
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Optional
+
+
+class UnipaBulletinBoardPostState:
+    """
+    状態ストアに保存する掲示の状態
+    """
+
+    def __init__(self,
+                 fingerprint: str,
+                 title: str,
+                 is_attention: bool,
+                 is_flag: bool,
+                 is_unread: bool,
+                 author: Optional[str] = None,
+                 category: Optional[str] = None,
+                 start_date: Optional[str] = None,
+                 content_hash: Optional[str] = None,
+                 ordinal: int = 0):
+        """
+        コンストラクタ
+
+        Args:
+            fingerprint: 掲示のフィンガープリント
+            title: 掲示タイトル
+            is_attention: 注目フラグ
+            is_flag: フラグ
+            is_unread: 未読か
+            author: 差出人 (詳細を取得していない場合は None)
+            category: カテゴリ (詳細を取得していない場合は None)
+            start_date: 公開開始日 (ISO 8601 形式。詳細を取得していない場合は None)
+            content_hash: 詳細内容のハッシュ (詳細を取得していない場合は None)
+            ordinal: 同じタイトルの掲示の中での位置 (表示順の最後を 0 とする)
+        """
+        self.fingerprint = fingerprint
+        self.title = title
+        self.is_attention = is_attention
+        self.is_flag = is_flag
+        self.is_unread = is_unread
+        self.author = author
+        self.category = category
+        self.start_date = start_date
+        self.content_hash = content_hash
+        self.ordinal = ordinal
+
+    def __str__(self) -> str:
+        return f"UnipaBulletinBoardPostState(fingerprint={self.fingerprint}, " \
+               f"title={self.title}, " \
+               f"is_attention={self.is_attention}, " \
+               f"is_flag={self.is_flag}, " \
+               f"is_unread={self.is_unread}, " \
+               f"content_hash={self.content_hash}, " \
+               f"ordinal={self.ordinal})"
+
+
+class UnipaBulletinBoardStateStore:
+    """
+    掲示板の差分検出用 状態ストア (SQLite)
+
+    掲示ごとに 1 行を保存し、変化のあった掲示の行のみを 1 トランザクションで更新します。
+    削除された掲示を検出するため、読み込みは毎回すべての行を読みます (掲示板の掲示数に比例します)。
+    """
+
+    COLUMNS = ("fingerprint", "title", "is_attention", "is_flag", "is_unread", "author", "category", "start_date",
+               "content_hash", "ordinal")
+
+    def __init__(self,
+                 path: str = ":memory:"):
+        """
+        コンストラクタ
+
+        Args:
+            path: SQLite データベースのパス (":memory:" の場合はメモリ上に保存)
+        """
+        self.__lock = threading.Lock()
+        self.__connection = sqlite3.connect(path, check_same_thread=False)
+        with self.__connection:
+            self.__connection.execute(
+                "CREATE TABLE IF NOT EXISTS posts ("
+                "fingerprint TEXT PRIMARY KEY, "
+                "title TEXT NOT NULL, "
+                "is_attention INTEGER NOT NULL, "
+                "is_flag INTEGER NOT NULL, "
+                "is_unread INTEGER NOT NULL, "
+                "author TEXT, "
+                "category TEXT, "
+                "start_date TEXT, "
+                "content_hash TEXT, "
+                "ordinal INTEGER NOT NULL, "
+                "updated_at REAL NOT NULL)"
+            )
+
+    def load(self) -> Dict[str, UnipaBulletinBoardPostState]:
+        """
+        保存されている掲示の状態をすべて取得する
+
+        Returns:
+            Dict[str, UnipaBulletinBoardPostState]: フィンガープリントと掲示の状態
+        """
+        with self.__lock:
+            rows = self.__connection.execute(f"SELECT {', '.join(self.COLUMNS)} FROM posts").fetchall()
+
+        return {
+            row[0]: UnipaBulletinBoardPostState(row[0], row[1], bool(row[2]), bool(row[3]), bool(row[4]), row[5],
+                                                row[6], row[7], row[8], row[9])
+            for row in rows
+        }
+
+    def apply(self,
+              upserts: Iterable[UnipaBulletinBoardPostState],
+              deletes: Iterable[str]) -> None:
+        """
+        変化のあった掲示の状態を 1 トランザクションで保存する
+
+        Args:
+            upserts: 追加・更新する掲示の状態
+            deletes: 削除する掲示のフィンガープリント
+        """
+        now = time.time()
+        with self.__lock, self.__connection:
+            self.__connection.executemany(
+                "DELETE FROM posts WHERE fingerprint = ?",
+                [(fingerprint,) for fingerprint in deletes]
+            )
+            self.__connection.executemany(
+                f"INSERT OR REPLACE INTO posts ({', '.join(self.COLUMNS)}, updated_at) "
+                f"VALUES ({', '.join('?' * (len(self.COLUMNS) + 1))})",
+                [(state.fingerprint, state.title, int(state.is_attention), int(state.is_flag), int(state.is_unread),
+                  state.author, state.category, state.start_date, state.content_hash, state.ordinal, now)
+                 for state in upserts]
+            )
+
+    def __len__(self) -> int:
+        with self.__lock:
+            row = self.__connection.execute("SELECT COUNT(*) FROM posts").fetchone()
+        return int(row[0])
+
+    def close(self) -> None:
+        """
+        データベースを閉じる
+        """
+        self.__connection.close()
@@ -4,12 +4,18 @@
 import datetime
 from typing import Optional
 
+from unipa.unipa_model import UnipaModel
 
-class UnipaPublicationPeriod:
+
+class UnipaPublicationPeriod(UnipaModel):
     """
     公開期間情報 (掲示板掲示用)
     """
 
+    __slots__ = ("_start_date", "_end_date")
+    _start_date: Optional[datetime.datetime]
+    _end_date: Optional[datetime.datetime]
+
     def __init__(self,
                  start_date: Optional[datetime.datetime],
                  end_date: Optional[datetime.datetime]):
@@ -20,8 +26,8 @@ class UnipaPublicationPeriod:
             start_date: 公開開始日
             end_date: 公開終了日
         """
-        self._start_date = start_date
-        self._end_date = end_date
+        object.__setattr__(self, "_start_date", start_date)
+        object.__setattr__(self, "_end_date", end_date)
 
     @property
     def start_date(self) -> Optional[datetime.datetime]:
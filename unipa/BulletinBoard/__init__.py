@@ -1,12 +1,23 @@
 """
 パッケージ: 掲示板
 """
-import re
-from typing import List, Optional
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from typing import Dict, Generator, Iterable, Iterator, List, Optional, Set, Tuple
 
-from unipa import Unipa
+from bs4 import BeautifulSoup
+from bs4.element import Tag
+
+from unipa import Unipa, unipa_parsing
 from unipa.BulletinBoard.BulletinBoard import UnipaBulletinBoardItem
+from unipa.BulletinBoard.BulletinBoardDetailsResult import UnipaBulletinBoardDetailsResult
+from unipa.BulletinBoard.BulletinBoardItemDetails import UnipaBulletinBoardItemDetails
+from unipa.BulletinBoard.BulletinBoardScanner import ALL_TABPANEL_INDEX, UnipaBulletinBoardScanner
 from unipa.errors import UnipaInternalError, UnipaNotLoggedIn
+from unipa.unipa_async import AsyncUnipa
+from unipa.unipa_page import UnipaPage
+from unipa.unipa_session_pool import UnipaSessionPool
+from unipa.unipa_stats import HOOK_AFTER_EXTRACT, PHASE_EXTRACTION
 
 
 class UnipaBulletinBoard:
@@ -14,6 +25,10 @@ class UnipaBulletinBoard:
     掲示板
     """
 
+    MENU_PARAMS: Dict[str, str] = {
+        "javax.faces.partial.execute": "@all"
+    }
+
     def __init__(self,
                  unipa: Unipa):
         """
@@ -29,71 +44,292 @@ class UnipaBulletinBoard:
         Returns:
             List[UnipaBulletinBoardItem]: 掲示リスト
         """
+        items = self.unipa.extract(self.parse_all, self.__request_board())
+        for item in items:
+            item._bind(self.unipa)
+        return items
+
+    def iter_all(self,
+                 chunk_size: int = 64 * 1024) -> Iterator[UnipaBulletinBoardItem]:
+        """
+        掲示リストを、掲示板ページを走査しながら 1 件ずつ返します。
+
+        DOM を構築せずに走査するため、get_all よりメモリ使用量が少なく、途中で打ち切ることもできます。
+        ただし、トークンの更新とキャッシュのためにレスポンス本文はすべて受信してから走査するため、掲示板ページの HTML
+        全体を保持する分のメモリは必要です。
+        掲示板ページへのリクエストは、最初のアイテムを取り出すときに送信します。
+
+            for item in UnipaBulletinBoard(unipa).iter_all():
+                if item.title in seen:
+                    break
+
+        Args:
+            chunk_size: 一度に走査する文字数
+
+        Returns:
+            Iterator[UnipaBulletinBoardItem]: 掲示リスト
+        """
+        page = self.__request_board()
+        text = page.text
+        scanner = UnipaBulletinBoardScanner()
+        elapsed = 0.0
+        try:
+            for start in range(0, len(text), chunk_size):
+                started = time.perf_counter()
+                items = scanner.feed_items(text[start:start + chunk_size])
+                elapsed += time.perf_counter() - started
+                yield from (item._bind(self.unipa) for item in items)
+
+            started = time.perf_counter()
+            items = scanner.close_items()
+            elapsed += time.perf_counter() - started
+            yield from (item._bind(self.unipa) for item in items)
+        finally:
+            page.stats.add_timing(PHASE_EXTRACTION, elapsed)
+            self.unipa.hooks.fire(HOOK_AFTER_EXTRACT, page.stats)
+
+    def iter_details(self,
+                     items: Optional[Iterable[UnipaBulletinBoardItem]] = None,
+                     partial: bool = False) -> Iterator[UnipaBulletinBoardDetailsResult]:
+        """
+        掲示アイテムの詳細を 1 件ずつ取得して返します。
+
+        次の結果を取り出すときに次の掲示の詳細を取得するため、途中で打ち切った場合は残りの掲示の詳細は取得しません。
+
+            for result in UnipaBulletinBoard(unipa).iter_details():
+                if result.item.title in seen:
+                    break
 
+        Args:
+            items: 掲示アイテム (None の場合は iter_all の結果)
+            partial: 部分更新 (JSF partial/ajax) で取得するか
+
+        Returns:
+            Iterator[UnipaBulletinBoardDetailsResult]: 取得結果。取得に失敗したアイテムは error に例外が入る
+        """
+        if items is None:
+            items = self.iter_all()
+
+        for index, item in enumerate(items):
+            yield self.__get_details(self.unipa, index, item, partial)
+
+    def __request_board(self) -> UnipaPage:
+        """
+        掲示板ページに移動する
+
+        Returns:
+            UnipaPage: 掲示板ページ
+        """
         if not self.unipa.is_logged_in():
             raise UnipaNotLoggedIn()
 
-        nav_item = next(filter(lambda x: x.name == "掲示板", self.unipa.get_nav_items()))
+        nav_item = self.unipa.get_navigation().get_nav("掲示板")
         menu_id = nav_item.menu_id
 
         self.logger.debug(f"BulletinBoard/menu_id: {menu_id}")
 
-        soup = self.unipa.request_from_menu(nav_item, {
-            "javax.faces.partial.execute": "@all"
-        })
-        self.unipa.request_url.set("BULLETBOARD", soup)
+        page = self.unipa.request_page_from_menu(nav_item, self.MENU_PARAMS)
+        self.unipa.set_request_url_from_page("BULLETBOARD", page)
+        return page
 
-        if soup.find("div", {"class": "ui-tabs-panels"}) is None:
-            raise UnipaInternalError("掲示板パネルが見つかりませんでした。")
+    @classmethod
+    def parse_all(cls,
+                  soup: BeautifulSoup) -> List[UnipaBulletinBoardItem]:
+        """
+        掲示板ページから掲示リストを取得します。
 
-        panels = soup.select("div.ui-tabs-panels > div[role=\"tabpanel\"]")
+        「全表示」タブパネルの中だけを、掲示アイテムごとに 1 回ずつ走査します。
 
-        if len(panels) < 2:
+        Args:
+            soup: 掲示板ページの BeautifulSoup (パーサーは問いません)
+
+        Returns:
+            List[UnipaBulletinBoardItem]: 掲示リスト
+        """
+        tabs_panels = soup.find("div", class_="ui-tabs-panels")
+        if tabs_panels is None:
+            raise UnipaInternalError("掲示板パネルが見つかりませんでした。")
+
+        panels = tabs_panels.find_all("div", attrs={"role": "tabpanel"}, recursive=False)
+        if len(panels) <= ALL_TABPANEL_INDEX:
             raise UnipaInternalError("掲示板パネルのうち、全表示タブが見つかりませんでした。")
 
-        panel = panels[1]
+        panel = panels[ALL_TABPANEL_INDEX]
 
         # このへんの処理あまりにも無理やりなのですぐ壊れるかも
 
         items = []
         # div.ui-scrollpanel > div.alignRight
-        for item in panel.select("div.ui-scrollpanel > div.alignRight"):
-            a_tag = item.find("a")
-            item_id = a_tag.get("id")
-            title = a_tag.text
-            onclick = a_tag.get("onclick")
-            [target_s, target_p] = self.get_target_sp(onclick)  # idを拾ってもいい
-            if target_s is None or target_p is None:
-                continue
-
-            is_attention = item.select_one("i.iconColorAttention") is not None
-
-            buttons = panel.select("span.inlineBlock > div[type=\"button\"]")
-            if len(buttons) < 2:
-                raise UnipaInternalError("掲示板パネルのうち、フラグ・未/既読ボタンが見つかりませんでした。")
-
-            flag_input = buttons[0].select_one("input[type=\"checkbox\"]")
-            flag_id = flag_input.get("id")
-            is_flag = flag_input.get("checked") is None
-
-            unread_input = buttons[1].select_one("input[type=\"checkbox\"]")
-            unread_id = unread_input.get("id")
-            is_unread = unread_input.get("checked") is not None
-
-            items.append(UnipaBulletinBoardItem(
-                item_id,
-                title,
-                target_s,
-                target_p,
-                flag_id,
-                unread_id,
-                is_attention,
-                is_flag,
-                is_unread
-            ))
+        for scrollpanel in panel.find_all("div", class_="ui-scrollpanel"):
+            for row in scrollpanel.find_all("div", class_="alignRight", recursive=False):
+                item = cls.parse_item(row)
+                if item is not None:
+                    items.append(item)
 
         return items
 
+    @classmethod
+    def parse_item(cls,
+                   row: Tag) -> Optional[UnipaBulletinBoardItem]:
+        """
+        掲示板ページの掲示アイテム (div.alignRight) から掲示アイテムを取得します。
+
+        Args:
+            row: 掲示アイテムの要素 (div.alignRight)
+
+        Returns:
+            Optional[UnipaBulletinBoardItem]: 掲示アイテム (s, p 値が取得できない場合は None)
+        """
+        a_tag = row.find("a")
+        if a_tag is None:
+            return None
+        item_id = a_tag.get("id")
+        title = a_tag.text
+        onclick = a_tag.get("onclick")
+        [target_s, target_p] = cls.get_target_sp(onclick or "")  # idを拾ってもいい
+        if target_s is None or target_p is None:
+            return None
+
+        is_attention = row.find("i", class_="iconColorAttention") is not None
+
+        # span.inlineBlock > div[type="button"]
+        buttons = [
+            button
+            for span in row.find_all("span", class_="inlineBlock")
+            for button in span.find_all("div", attrs={"type": "button"}, recursive=False)
+        ]
+        if len(buttons) < 2:
+            raise UnipaInternalError("掲示板パネルのうち、フラグ・未/既読ボタンが見つかりませんでした。")
+
+        flag_input = buttons[0].find("input", attrs={"type": "checkbox"})
+        flag_id = flag_input.get("id")
+        is_flag = flag_input.get("checked") is None
+
+        unread_input = buttons[1].find("input", attrs={"type": "checkbox"})
+        unread_id = unread_input.get("id")
+        is_unread = unread_input.get("checked") is not None
+
+        return UnipaBulletinBoardItem(
+            item_id,
+            title,
+            target_s,
+            target_p,
+            flag_id,
+            unread_id,
+            is_attention,
+            is_flag,
+            is_unread
+        )
+
+    def get_details_many(self,
+                         items: Iterable[UnipaBulletinBoardItem],
+                         pool: Optional[UnipaSessionPool] = None,
+                         max_workers: Optional[int] = None,
+                         ordered: bool = False,
+                         dedupe: bool = True) -> Generator[UnipaBulletinBoardDetailsResult, None, None]:
+        """
+        複数の掲示アイテムの詳細を一括で取得します。
+
+        1 つのセッションではトークンの更新順を守るためリクエストを直列に送る必要があるため、並列に取得する場合は
+        掲示板を開いた状態のセッションプールを指定してください。
+
+            pool = UnipaSessionPool(base_url, username, password, 4,
+                                    prepare=lambda unipa: UnipaBulletinBoard(unipa).get_all())
+            pool.login()
+            for result in UnipaBulletinBoard(unipa).get_details_many(items, pool):
+                if result.is_success:
+                    print(result.details.title)
+
+        Args:
+            items: 掲示アイテム
+            pool: 利用するセッションプール (None の場合はこのインスタンスのセッションで直列に取得する)
+            max_workers: 同時に取得する数の上限 (None の場合はセッションプールのセッション数)
+            ordered: True の場合は items の順で、False の場合は取得が完了した順で結果を返す
+            dedupe: 同じ掲示 (s, p 値が同じもの) を 1 回だけ取得する
+
+        Returns:
+            Generator[UnipaBulletinBoardDetailsResult, None, None]: 取得結果。取得に失敗したアイテムは error に例外が入る
+                (途中で打ち切る場合は close を呼ぶと、未着手の取得を取り消す)
+        """
+        targets: List[Tuple[int, UnipaBulletinBoardItem]] = []
+        seen: Set[Tuple[str, str]] = set()
+        for index, item in enumerate(items):
+            if dedupe:
+                if (item.target_s, item.target_p) in seen:
+                    continue
+                seen.add((item.target_s, item.target_p))
+            targets.append((index, item))
+
+        if pool is None:
+            for index, item in targets:
+                yield self.__get_details(self.unipa, index, item)
+            return
+
+        workers = min(max_workers or pool.size, pool.size)
+        executor = ThreadPoolExecutor(workers, thread_name_prefix="unipa-details")
+        try:
+            futures: List[Future[UnipaBulletinBoardDetailsResult]] = []
+            for index, item in targets:
+                futures.append(executor.submit(self.__get_details_from_pool, pool, index, item))
+
+            for future in (futures if ordered else as_completed(futures)):
+                yield future.result()
+        finally:
+            # 途中で打ち切られた場合、未着手の取得はキャンセルする
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def prefetch(self,
+                 items: Iterable[UnipaBulletinBoardItem],
+                 pool: Optional[UnipaSessionPool] = None,
+                 max_workers: Optional[int] = None) -> List[UnipaBulletinBoardDetailsResult]:
+        """
+        複数の掲示アイテムの詳細をまとめて取得し、各アイテムに設定します。
+
+        取得済みのアイテムは取得せず、同じ掲示 (s, p 値が同じもの) は 1 回だけ取得します。以降の `item.details` の参照は
+        通信しません。並列に取得する場合は get_details_many と同様にセッションプールを指定してください。
+
+        Args:
+            items: 掲示アイテム
+            pool: 利用するセッションプール (None の場合はこのインスタンスのセッションで直列に取得する)
+            max_workers: 同時に取得する数の上限 (None の場合はセッションプールのセッション数)
+
+        Returns:
+            List[UnipaBulletinBoardDetailsResult]: 取得に失敗したアイテムの取得結果
+        """
+        pending = [item for item in items if not item.is_details_loaded]
+        errors: List[UnipaBulletinBoardDetailsResult] = []
+        loaded: Dict[Tuple[str, str], UnipaBulletinBoardItemDetails] = {}
+        for result in self.get_details_many(pending, pool, max_workers):
+            if result.details is None:
+                errors.append(result)
+            else:
+                loaded[(result.item.target_s, result.item.target_p)] = result.details
+
+        # 重複して取得しなかったアイテムにも設定する
+        for item in pending:
+            details = loaded.get((item.target_s, item.target_p))
+            if details is not None:
+                item.set_details(details)
+        return errors
+
+    def __get_details_from_pool(self,
+                                pool: UnipaSessionPool,
+                                index: int,
+                                item: UnipaBulletinBoardItem) -> UnipaBulletinBoardDetailsResult:
+        with pool.lease() as unipa:
+            return self.__get_details(unipa, index, item)
+
+    def __get_details(self,
+                      unipa: Unipa,
+                      index: int,
+                      item: UnipaBulletinBoardItem,
+                      partial: bool = False) -> UnipaBulletinBoardDetailsResult:
+        try:
+            return UnipaBulletinBoardDetailsResult(index, item, item.get_details(unipa, partial), None)
+        except Exception as e:  # noqa
+            self.logger.debug("掲示詳細の取得に失敗しました: %s (%s)", item.title, e)
+            return UnipaBulletinBoardDetailsResult(index, item, None, e)
+
     @staticmethod
     def get_target_sp(onclick: str) -> List[Optional[str]]:
         """
@@ -105,9 +341,50 @@ class UnipaBulletinBoard:
         Returns:
             [s, p]: s, p 値
         """
-        pattern = re.compile(r"PrimeFaces\.ab\({s:\"(.+?)\",p:\"(.+?)\"}\);")
-        match = pattern.search(onclick)
-        if match is None:
-            return [None, None]
+        return list(unipa_parsing.get_target_sp(onclick))
+
+
+class AsyncUnipaBulletinBoard:
+    """
+    掲示板 (asyncio 版)
+    """
 
-        return [match.group(1), match.group(2)]
+    def __init__(self,
+                 unipa: AsyncUnipa):
+        """
+        コンストラクタ
+        """
+        self.unipa = unipa
+        self.logger = unipa.logger
+
+    async def get_all(self) -> List[UnipaBulletinBoardItem]:
+        """
+        掲示リストを取得します。
+
+        Returns:
+            List[UnipaBulletinBoardItem]: 掲示リスト
+        """
+        if not self.unipa.is_logged_in():
+            raise UnipaNotLoggedIn()
+
+        nav_item = self.unipa.get_navigation().get_nav("掲示板")
+        soup = await self.unipa.request_from_menu(nav_item, UnipaBulletinBoard.MENU_PARAMS)
+        self.unipa.request_url.set("BULLETBOARD", soup)
+
+        items = await self.unipa.extract(UnipaBulletinBoard.parse_all, soup)
+        for item in items:
+            item._bind(self.unipa)
+        return items
+
+    async def get_details(self,
+                          item: UnipaBulletinBoardItem) -> UnipaBulletinBoardItemDetails:
+        """
+        掲示アイテムの詳細を取得します。
+
+        Args:
+            item: 掲示アイテム
+
+        Returns:
+            UnipaBulletinBoardItemDetails: 掲示アイテムの詳細
+        """
+        return await item.get_details_async(self.unipa)
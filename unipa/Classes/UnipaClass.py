@@ -5,12 +5,18 @@
 """
 from typing import Optional
 
+from unipa.unipa_model import UnipaModel
 
-class UnipaClassLectureAt:
+
+class UnipaClassLectureAt(UnipaModel):
     """
     クラス 曜日・時限情報
     """
 
+    __slots__ = ("_day_of_week", "_period_of_time")
+    _day_of_week: str
+    _period_of_time: Optional[int]
+
     def __init__(self,
                  day_of_week: str,
                  period_of_time: Optional[int]):
@@ -20,8 +26,8 @@ class UnipaClassLectureAt:
             day_of_week: 実施曜日 (月曜日 etc or 集中講義 or 実習)
             period_of_time: 実施時限 (数値)
         """
-        self._day_of_week = day_of_week
-        self._period_of_time = period_of_time
+        object.__setattr__(self, "_day_of_week", day_of_week)
+        object.__setattr__(self, "_period_of_time", period_of_time)
 
     @property
     def day_of_week(self) -> str:
@@ -47,11 +53,17 @@ class UnipaClassLectureAt:
         return f"UnipaClassLectureAt(day_of_week={self._day_of_week}, period_of_time={self._period_of_time})"
 
 
-class UnipaClass:
+class UnipaClass(UnipaModel):
     """
     クラス 基本情報
     """
 
+    __slots__ = ("_class_internal_id", "_name", "_class_id", "_lecture_at")
+    _class_internal_id: str
+    _name: str
+    _class_id: Optional[str]
+    _lecture_at: UnipaClassLectureAt
+
     def __init__(self,
                  class_internal_id: str,
                  name: str,
@@ -66,10 +78,10 @@ class UnipaClass:
             class_id: クラスID (表示されている値)
             lecture_at: 実施曜日・時限
         """
-        self._class_internal_id = class_internal_id
-        self._name = name
-        self._class_id = class_id
-        self._lecture_at = lecture_at
+        object.__setattr__(self, "_class_internal_id", class_internal_id)
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_class_id", class_id)
+        object.__setattr__(self, "_lecture_at", lecture_at)
 
     @property
     def class_internal_id(self) -> str:
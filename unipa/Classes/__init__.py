@@ -4,7 +4,10 @@
 import re
 from typing import List
 
+from bs4 import BeautifulSoup
+
 from unipa import Unipa
+from unipa.unipa_async import AsyncUnipa
 from unipa.Classes.UnipaClass import UnipaClass, UnipaClassLectureAt
 
 
@@ -26,9 +29,20 @@ class UnipaClasses:
         履修中の全クラスを取得する
         """
 
-        info_item = next(filter(lambda x: x.name == "クラスプロファイル", self.unipa.get_info_items()))
-        soup = self.unipa.request_from_info(info_item)
+        info_item = self.unipa.get_navigation().get_info("クラスプロファイル")
+        return self.unipa.extract(self.parse_all, self.unipa.request_page_from_info(info_item))
+
+    @staticmethod
+    def parse_all(soup: BeautifulSoup) -> List[UnipaClass]:
+        """
+        クラスプロファイルページから履修中の全クラスを取得する
+
+        Args:
+            soup: クラスプロファイルページの BeautifulSoup (パーサーは問いません)
 
+        Returns:
+            List[UnipaClass]: 履修中の全クラス
+        """
         yobi_panels = soup.select(".yobiContArea")
         classes = []
         for yobi_panel in yobi_panels:
@@ -55,3 +69,26 @@ class UnipaClasses:
                     classes.append(UnipaClass(name, internal_id, class_id, lecture_at))
 
         return classes
+
+
+class AsyncUnipaClasses:
+    """
+    クラス (asyncio 版)
+    """
+
+    def __init__(self,
+                 unipa: AsyncUnipa):
+        """
+        コンストラクタ
+        """
+        self.unipa = unipa
+        self.logger = unipa.logger
+
+    async def get_all(self) -> List[UnipaClass]:
+        """
+        履修中の全クラスを取得する
+        """
+        info_item = self.unipa.get_navigation().get_info("クラスプロファイル")
+        soup = await self.unipa.request_from_info(info_item)
+
+        return await self.unipa.extract(UnipaClasses.parse_all, soup)
@@ -5,15 +5,40 @@ Library for get various information about UNIVERSAL PASSPORT.
 UNIVERSAL PASSPORT のさまざまな情報を取得するためのライブラリです。
 """
 import logging
-from typing import List, Optional
+import os
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Mapping, Optional, Tuple, TypeVar
 from urllib.parse import urljoin
 
 import requests
 from bs4 import BeautifulSoup
 from requests import Response
-
-from unipa.errors import UnipaInternalError, UnipaLoginError, UnipaNotLoggedIn
-from unipa.unipa_utils import UnipaInfoItem, UnipaNavItem, UnipaRequestUrl, UnipaUtils
+from requests.cookies import create_cookie
+from urllib3.exceptions import ReadTimeoutError
+
+from unipa.errors import UnipaConnectionError, UnipaInternalError, UnipaLoginError, UnipaNotLoggedIn, \
+    UnipaSessionExpiredError, UnipaTimeoutError
+from unipa.models.session import CookieModel, InfoItemModel, NavItemModel, SessionModel, TokenModel
+from unipa.unipa_cache import UnipaCacheEntry, UnipaResponseCache
+from unipa.unipa_capture import UnipaCapture, UnipaCaptureBuffer
+from unipa.unipa_navigation import NAVIGATION_STORE, UnipaNavigation, UnipaNavigationStore
+from unipa.unipa_page import UnipaPage
+from unipa.unipa_parse_pool import UnipaParsePool
+from unipa.unipa_parser import PARSER_LXML, UnipaParser
+from unipa.unipa_partial import PARTIAL_AJAX_HEADERS, UnipaPartialResponse
+from unipa.unipa_rate_limit import RATE_LIMIT_LOGIN, RATE_LIMIT_REQUEST
+from unipa.unipa_scanner import UnipaPageScanner
+from unipa.unipa_stats import HOOK_AFTER_EXTRACT, HOOK_AFTER_PARSE, HOOK_AFTER_RESPONSE, HOOK_BEFORE_REQUEST, \
+    PHASE_CONNECT, PHASE_DECODE, PHASE_DOWNLOAD, PHASE_EXTRACTION, PHASE_PARSE, PHASE_SERVER_WAIT, \
+    PHASE_TOKEN_UPDATE, UnipaHooks, UnipaRequestStats, UnipaStopwatch, UnipaTimingAdapter, get_connect_time, \
+    reset_connect_time
+from unipa.unipa_transport import UnipaTransportPolicy
+from unipa.unipa_utils import Menu, UnipaInfoItem, UnipaNavItem, UnipaRequestUrl, UnipaUtils
+
+SESSION_VERSION = 1
+
+R = TypeVar("R")
 
 
 class UnipaToken:
@@ -93,6 +118,63 @@ class UnipaToken:
         """
         return self._javax_view_state
 
+    def get_params(self) -> Dict[str, str]:
+        """
+        リクエストに付加するトークンのパラメータを返す
+
+        Returns:
+            Dict[str, str]: パラメータ
+        """
+        return {
+            "rx-token": self._rx_token,
+            "rx-loginKey": self._rx_login_key,
+            "rx-deviceKbn": self._rx_device_kbn,
+            "rx-loginType": self._rx_login_type,
+            "javax.faces.ViewState": self._javax_view_state,
+        }
+
+    @classmethod
+    def from_soup(cls,
+                  soup: BeautifulSoup) -> "UnipaToken":
+        """
+        レスポンスのフォーム (form#headerForm) からトークンを取得する
+
+        Args:
+            soup: BeautifulSoup (パーサーは問いません)
+
+        Returns:
+            UnipaToken: トークン
+        """
+        header_form = soup.find("form", {"id": "headerForm"})
+        if header_form is None:
+            raise UnipaInternalError("トークンを更新するためのフォーム情報の取得に失敗しました。")
+
+        rx_token = header_form.find("input", {"name": "rx-token"}).get("value")
+        rx_login_key = header_form.find("input", {"name": "rx-loginKey"}).get("value")
+        rx_device_kbn = header_form.find("input", {"name": "rx-deviceKbn"}).get("value")
+        rx_login_type = header_form.find("input", {"name": "rx-loginType"}).get("value")
+        javax_view_state = header_form.select_one("input[name=\"javax.faces.ViewState\"]").get("value")
+
+        return cls(rx_token, rx_login_key, rx_device_kbn, rx_login_type, javax_view_state)
+
+    @classmethod
+    def from_inputs(cls,
+                    inputs: Dict[str, str]) -> "UnipaToken":
+        """
+        form#headerForm の input の値 (name: value) からトークンを取得する
+
+        Args:
+            inputs: input の値 (UnipaPageScan.token_inputs)
+
+        Returns:
+            UnipaToken: トークン
+        """
+        try:
+            return cls(inputs["rx-token"], inputs["rx-loginKey"], inputs["rx-deviceKbn"], inputs["rx-loginType"],
+                       inputs["javax.faces.ViewState"])
+        except KeyError as e:
+            raise UnipaInternalError("トークンを更新するためのフォーム情報の取得に失敗しました。") from e
+
 
 class Unipa:
     """
@@ -100,26 +182,58 @@ class Unipa:
     """
 
     def __init__(self,
-                 base_url: str):
+                 base_url: str,
+                 parser: str = PARSER_LXML,
+                 cache: Optional[UnipaResponseCache] = None,
+                 transport: Optional[UnipaTransportPolicy] = None,
+                 capture: Optional[UnipaCaptureBuffer] = None,
+                 navigation_store: Optional[UnipaNavigationStore] = None,
+                 parse_pool: Optional[UnipaParsePool] = None):
         """
         Unipa クラスを初期化します
 
         Args:
             base_url: UNIVERSAL PASSPORT のベース URL
                 (ログインページ URL にて、 `/up/` より前の URL を指定します。例: https://unipa.itp.kindai.ac.jp/)
+            parser: HTML パーサー (lxml, html5lib, html.parser)。
+                lxml で必要な要素が見つからない壊れたページは html5lib で解析しなおします
+            cache: 画面遷移 (request_from_menu, request_from_info) のレスポンスキャッシュ (None の場合はキャッシュしない)。
+                キャッシュにはアカウントの情報が含まれるため、ほかのアカウントの Unipa と共有しないでください
+            transport: HTTP 通信のポリシー (タイムアウト・再試行・コネクションプール・サーキットブレーカー)。
+                None の場合は既定値を利用する。サーキットブレーカーはポリシーを共有する Unipa 間で共有される
+            capture: リクエスト・レスポンスのキャプチャ (デバッグ用。None の場合はキャプチャしない)
+            navigation_store: ナビゲーションの保存先 (None の場合はプロセス内で共有する保存先)。
+                メニューが前回と変わっていない場合、ログイン時にメニューを解析せずに保存したナビゲーションを利用する
+            parse_pool: 解析用プロセスプール (None の場合は呼び出したスレッドで解析する)。
+                掲示リスト・掲示詳細・クラスの解析と抽出を子プロセスで実行する。ほかの Unipa と共有できる
         """
+        self.transport: UnipaTransportPolicy = transport or UnipaTransportPolicy()
         self.session: requests.Session = requests.Session()
         self.session.headers["User-Agent"] = "get-unipa (https://github.com/book000/get-unipa)"
+        if not self.transport.keep_alive:
+            self.session.headers["Connection"] = "close"
+        for prefix in ("https://", "http://"):
+            self.session.mount(prefix, UnipaTimingAdapter(pool_connections=self.transport.pool_connections,
+                                                          pool_maxsize=self.transport.pool_maxsize,
+                                                          pool_block=self.transport.pool_block))
         self.logger = logging.getLogger(__name__)
         self.__base_url: str = base_url
         self.__logged_in: bool = False
-        self.__response: Optional[Response] = None
+        self.__latest_stats: Optional[UnipaRequestStats] = None
 
         self.__token: Optional[UnipaToken] = None
-        self.__nav_items: List[UnipaNavItem] = []
-        self.__info_items: List[UnipaInfoItem] = []
+        self.__navigation: UnipaNavigation = UnipaNavigation([], [])
 
         self.request_url: UnipaRequestUrl = UnipaRequestUrl(base_url)
+        self.parser: UnipaParser = UnipaParser(parser)
+        self.hooks: UnipaHooks = UnipaHooks()
+        self.cache: Optional[UnipaResponseCache] = cache
+        self.capture: Optional[UnipaCaptureBuffer] = capture
+        self.navigation_store: UnipaNavigationStore = navigation_store if navigation_store is not None \
+            else NAVIGATION_STORE
+        self.parse_pool: Optional[UnipaParsePool] = parse_pool
+        if capture is not None:
+            capture.attach(self.hooks)
 
     def login(self,
               username: str,
@@ -135,11 +249,11 @@ class Unipa:
             bool: ログインできたか
         """
 
-        self.__response = self.session.get(self.__base_url)
-        if self.__response.status_code != 200:
+        response, text, stats = self.__send("GET", self.__base_url, rate_limit=RATE_LIMIT_LOGIN)
+        if response.status_code != 200:
             raise UnipaInternalError("ログインページの取得に失敗しました。")
 
-        soup = BeautifulSoup(self.__response.text, "html5lib")
+        soup = self.__parse(stats, text, lambda x: x.find("form", {"id": "loginForm"}) is not None)
         login_form = soup.find("form", {"id": "loginForm"})
         if login_form is None:
             # form#loginForm が見つからない場合、ログイントークンなどが取得できないのでログイン不可
@@ -149,64 +263,248 @@ class Unipa:
         login_url = urljoin(self.__base_url, login_form.get("action"))
         self.logger.debug("ログインフォームのURL: %s", login_url)
 
-        params = {}
-
-        # input と button の値をログイン処理でそのまま流用する
-        for input_tag in login_form.find_all("input"):
-            input_tag_name = input_tag.get("name")
-            input_tag_value = input_tag.get("value")
-            if input_tag_name is None or input_tag_value is None:
-                continue
-            if input_tag_value == "":
-                continue
-
-            params[input_tag_name] = input_tag_value
-
-        for button_tag in login_form.find_all("button"):
-            button_tag_name = button_tag.get("name")
-            button_tag_value = button_tag.get("value")
-            if button_tag_name is None:
-                continue
-
-            if button_tag_value is None:
-                button_tag_value = ""
-
-            params[button_tag_name] = button_tag_value
-
+        params = UnipaUtils.get_login_params(login_form)
         self.logger.debug("ログインフォームのデフォルトパラメータ: %s", params)
 
         params["loginForm:userId"] = username
         params["loginForm:password"] = password
 
-        self.__response = self.session.post(login_url, data=params, headers={
+        response, text, stats = self.__send("POST", login_url, data=params, headers={
             "Content-Type": "application/x-www-form-urlencoded"
-        })
+        }, rate_limit=RATE_LIMIT_LOGIN)
 
-        if self.__response.status_code != 200:
+        if response.status_code != 200:
             return False
 
-        soup = BeautifulSoup(self.__response.text, "html5lib")
+        soup = self.__parse(stats, text, self.has_header_form)
         error_details = soup.find("span", {"class": "ui-messages-error-detail"})
         if error_details is not None:
             raise UnipaLoginError(error_details.text)
 
         self.__logged_in = True
-        self.update_token_html5lib(soup)
+        with UnipaStopwatch(stats, PHASE_TOKEN_UPDATE):
+            self.update_token(soup)
 
         self.request_url.set("TOP", soup)
 
         # トップページに移動（アンケートとかがある場合アンケート一覧が出るので）
-        soup = self.request("TOP", "headerForm", {
+        page = self.request_page("TOP", "headerForm", {
             "rx.sync.source": "headerForm:logo",
             "headerForm:logo": "",
         })
 
-        self.__nav_items = UnipaUtils.get_nav_items(soup)
-        self.__info_items = UnipaUtils.get_info_items(soup)
+        with self.extraction():
+            self.__navigation = self.__load_navigation(page, UnipaNavigation.make_fingerprint(page.text))
 
-        self.request_url.set("TOP", soup)
+        self.set_request_url_from_page("TOP", page)
         return True
 
+    def __load_navigation(self,
+                          page: UnipaPage,
+                          fingerprint: Optional[str]) -> UnipaNavigation:
+        """
+        TOP ページからナビゲーションを取得する
+
+        メニュー部分のフィンガープリントが現在のナビゲーション・保存したナビゲーションと一致する場合は解析しません。
+
+        Args:
+            page: TOP ページ
+            fingerprint: TOP ページのメニュー部分のフィンガープリント
+
+        Returns:
+            UnipaNavigation: ナビゲーション
+        """
+        if fingerprint is not None:
+            for navigation in (self.__navigation, self.navigation_store.get(self.__base_url)):
+                if navigation is not None and navigation.fingerprint == fingerprint:
+                    return navigation
+
+        scan = UnipaPageScanner.scan(page.text, True)
+        if scan.nav_items is not None and scan.info_items is not None:
+            navigation = UnipaNavigation(scan.nav_items, scan.info_items, fingerprint)
+        else:
+            # スキャンで見つからない・構造が想定と異なる場合は DOM から取得する (見つからない場合はエラー)
+            navigation = UnipaNavigation(UnipaUtils.get_nav_items(page.soup), UnipaUtils.get_info_items(page.soup),
+                                         fingerprint)
+
+        if fingerprint is not None:
+            self.navigation_store.put(self.__base_url, navigation)
+        return navigation
+
+    def export_session(self) -> str:
+        """
+        ログイン済みのセッション (Cookie, トークン, リクエスト URL, ナビゲーション・インフォメーションアイテム) を
+        JSON 文字列として出力する
+
+        Notes:
+            トークンはリクエストのたびに更新されるため、すべてのリクエストを終えてから出力してください。
+            出力にはログイン中のセッションの Cookie が含まれるため、取り扱いに注意してください。
+
+        Returns:
+            str: JSON 文字列
+        """
+        if not self.__logged_in or self.__token is None:
+            raise UnipaNotLoggedIn()
+
+        token = self.__token
+        model = SessionModel(
+            version=SESSION_VERSION,
+            base_url=self.__base_url,
+            saved_at=time.time(),
+            cookies=[CookieModel(
+                name=cookie.name,
+                value=cookie.value,
+                domain=cookie.domain,
+                path=cookie.path,
+                secure=cookie.secure,
+                expires=cookie.expires,
+                http_only=cookie.has_nonstandard_attr("HttpOnly"),
+            ) for cookie in self.session.cookies],
+            token=TokenModel(token.rx_token, token.rx_login_key, token.rx_device_kbn, token.rx_login_type,
+                             token.javax_view_state),
+            request_urls=self.request_url.get_actions(),
+            nav_items=[NavItemModel(item.menu.name, item.menu.sub_name, item.name, item.menu_id)
+                       for item in self.__navigation.nav_items],
+            info_items=[InfoItemModel(item.name, item.menu_id) for item in self.__navigation.info_items],
+            nav_fingerprint=self.__navigation.fingerprint,
+        )
+        return model.to_json(ensure_ascii=False)  # type: ignore
+
+    def import_session(self,
+                       data: str) -> None:
+        """
+        export_session で出力したセッションを読み込む
+
+        セッションが有効かどうかは確認しないため、必要に応じて check_session を呼び出してください。
+
+        Args:
+            data: export_session で出力した JSON 文字列
+        """
+        try:
+            model: SessionModel = SessionModel.from_json(data)  # type: ignore
+        except (ValueError, KeyError, TypeError) as e:
+            raise UnipaInternalError("セッションの読み込みに失敗しました。") from e
+
+        if model.version != SESSION_VERSION:
+            raise UnipaInternalError(f"セッションのバージョンが異なります: {model.version}")
+        if model.base_url != self.__base_url:
+            raise UnipaInternalError(f"セッションのベース URL が異なります: {model.base_url}")
+
+        self.session.cookies.clear()
+        for cookie in model.cookies:
+            self.session.cookies.set_cookie(create_cookie(  # type: ignore
+                cookie.name,
+                cookie.value,
+                domain=cookie.domain,
+                path=cookie.path,
+                secure=cookie.secure,
+                expires=cookie.expires,
+                rest={"HttpOnly": None} if cookie.http_only else {},
+            ))
+
+        token = model.token
+        self.__token = UnipaToken(token.rx_token, token.rx_login_key, token.rx_device_kbn, token.rx_login_type,
+                                  token.javax_view_state)
+        self.request_url.set_actions(model.request_urls)
+        self.__navigation = UnipaNavigation(
+            [UnipaNavItem(Menu(item.menu_name, item.menu_sub_name), item.name, item.menu_id)
+             for item in model.nav_items],
+            [UnipaInfoItem(item.name, item.item_id) for item in model.info_items],
+            model.nav_fingerprint
+        )
+        self.__logged_in = True
+
+    def check_session(self) -> bool:
+        """
+        セッションが有効かどうかを確認する
+
+        トップページへの遷移を 1 回だけ行い、トークンを含むページが返ってくるかで判定します。
+        ナビゲーション・インフォメーションアイテムは、メニューが変わっていた場合のみ取得しなおします。
+
+        Returns:
+            bool: セッションが有効か
+        """
+        if not self.__logged_in or self.request_url.get("TOP") is None or self.__token is None:
+            return False
+
+        try:
+            page = self.request_page("TOP", "headerForm", {
+                "rx.sync.source": "headerForm:logo",
+                "headerForm:logo": "",
+            })
+            self.set_request_url_from_page("TOP", page)
+            fingerprint = UnipaNavigation.make_fingerprint(page.text)
+            if fingerprint is not None and fingerprint != self.__navigation.fingerprint:
+                with self.extraction():
+                    self.__navigation = self.__load_navigation(page, fingerprint)
+        except UnipaInternalError as e:
+            self.logger.debug("セッションが無効です: %s", e)
+            return False
+
+        return True
+
+    def save_session(self,
+                     path: str) -> None:
+        """
+        ログイン済みのセッションをファイルに保存する (所有者のみ読み書きできるファイルに、置き換えで書き込む)
+
+        Args:
+            path: 保存先のパス
+        """
+        data = self.export_session()
+        tmp_path = f"{path}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def restore_session(self,
+                        path: str,
+                        username: str,
+                        password: str) -> bool:
+        """
+        保存したセッションを復元する。セッションがない・期限切れの場合はログインし、セッションを保存する
+
+            unipa = Unipa(base_url)
+            unipa.restore_session("session.json", username, password)
+            items = UnipaBulletinBoard(unipa).get_all()
+            unipa.save_session("session.json")
+
+        Args:
+            path: セッションの保存先のパス
+            username: ユーザー名
+            password: パスワード
+
+        Returns:
+            bool: 保存したセッションを復元できたか (False の場合はログインしなおした。ログインできなかった場合は
+                UnipaLoginError を送出する)
+        """
+        if os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self.import_session(f.read())
+                if self.check_session():
+                    return True
+            except UnipaInternalError as e:
+                self.logger.debug("セッションを復元できませんでした: %s", e)
+
+            self.__reset_session()
+
+        if not self.login(username, password):
+            raise UnipaLoginError("ログインに失敗しました。")
+        self.save_session(path)
+        return False
+
+    def __reset_session(self) -> None:
+        """
+        ログイン状態を破棄する
+        """
+        self.session.cookies.clear()
+        self.__logged_in = False
+        self.__token = None
+        self.__navigation = UnipaNavigation([], [])
+        self.request_url = UnipaRequestUrl(self.__base_url)
+
     def request_from_menu(self,
                           menu_item: UnipaNavItem,
                           extra_params: dict[str, str] = None) -> BeautifulSoup:
@@ -223,16 +521,27 @@ class Unipa:
         if extra_params is None:
             extra_params = {}
 
+        return self.request_page_from_menu(menu_item, extra_params).soup
+
+    def request_page_from_menu(self,
+                               menu_item: UnipaNavItem,
+                               extra_params: Optional[Dict[str, str]] = None) -> UnipaPage:
+        """
+        メニューからリクエストを送信し、DOM を構築せずにレスポンスページを返す
+
+        Args:
+            menu_item: メニューアイテム
+            extra_params: リクエストに付加するパラメータ (トークンなど以外)
+
+        Returns:
+            UnipaPage: レスポンスページ
+        """
         if not self.__logged_in or self.request_url.get("TOP") is None or self.__token is None:
             raise UnipaNotLoggedIn()
 
-        params = {
-            "menuForm:mainMenu": "menuForm:mainMenu",
-            "rx.sync.source": "menuForm:mainMenu",
-            "menuForm:mainMenu_menuid": str(menu_item.menu_id),
-        }
-        params.update(extra_params)
-        return self.request("TOP", "menuForm", params)
+        params = UnipaUtils.get_menu_params(menu_item)
+        params.update(extra_params or {})
+        return self.request_page("TOP", "menuForm", params, cacheable=True)
 
     def request_from_info(self,
                           info_item: UnipaInfoItem) -> BeautifulSoup:
@@ -248,17 +557,30 @@ class Unipa:
         if not self.__logged_in or self.request_url.get("TOP") is None or self.__token is None:
             raise UnipaNotLoggedIn()
 
-        return self.request("TOP", "funcForm", {
-            "menuForm:mainMenu": "menuForm:mainMenu",
-            "rx.sync.source": info_item.menu_id,
-            info_item.menu_id: info_item.menu_id,
-        })
+        return self.request("TOP", "funcForm", UnipaUtils.get_info_params(info_item), cacheable=True)
+
+    def request_page_from_info(self,
+                               info_item: UnipaInfoItem) -> UnipaPage:
+        """
+        インフォメーションからリクエストを送信し、DOM を構築せずにレスポンスページを返す
+
+        Args:
+            info_item: インフォメーションアイテム
+
+        Returns:
+            UnipaPage: レスポンスページ
+        """
+        if not self.__logged_in or self.request_url.get("TOP") is None or self.__token is None:
+            raise UnipaNotLoggedIn()
+
+        return self.request_page("TOP", "funcForm", UnipaUtils.get_info_params(info_item), cacheable=True)
 
     def request(self,
                 request_target: str,
                 request_type: str,
                 extra_params: dict[str, str],
-                response_markup: str = "html5lib") -> BeautifulSoup:
+                response_markup: Optional[str] = None,
+                cacheable: bool = False) -> BeautifulSoup:
         """
         リクエストを送信する
 
@@ -266,33 +588,63 @@ class Unipa:
             request_target: リクエストターゲット
             request_type: リクエストタイプ (menuForm, funcForm など)
             extra_params: リクエストに付加するパラメータ (トークンなど以外)
-            response_markup: レスポンスのマークアップ
+            response_markup: レスポンスのマークアップ (None の場合はコンストラクタで指定したパーサーを利用する)
+            cacheable: レスポンスキャッシュを利用するか (同じパラメータで同じ内容が返る画面遷移のみ指定すること)
 
         Returns:
             Response: レスポンス
         """
+        soup = self.request_page(request_target, request_type, extra_params, response_markup, cacheable).soup
+        if self.logger.isEnabledFor(logging.DEBUG):
+            # prettify は重いので、デバッグログが有効なときだけ実行する
+            self.logger.debug("soupレスポンス: %s", soup.prettify())
+        return soup
+
+    def request_page(self,
+                     request_target: str,
+                     request_type: str,
+                     extra_params: dict[str, str],
+                     response_markup: Optional[str] = None,
+                     cacheable: bool = False,
+                     scan_items: bool = False) -> UnipaPage:
+        """
+        リクエストを送信し、DOM を構築せずにレスポンスページを返す
+
+        トークンはレスポンスを 1 回走査して更新します。DOM はページの soup プロパティに
+        アクセスしたときに初めて構築されるため、トークンやフォームの action 属性、ナビゲーションアイテムなどだけが
+        必要な場合は DOM の構築を省略できます。
+
+        Args:
+            request_target: リクエストターゲット
+            request_type: リクエストタイプ (menuForm, funcForm など)
+            extra_params: リクエストに付加するパラメータ (トークンなど以外)
+            response_markup: レスポンスのマークアップ (None の場合はコンストラクタで指定したパーサーを利用する)
+            cacheable: レスポンスキャッシュを利用するか (同じパラメータで同じ内容が返る画面遷移のみ指定すること)
+            scan_items: ナビゲーション・インフォメーションアイテムも走査するか
+
+        Returns:
+            UnipaPage: レスポンスページ
+        """
         if not self.__logged_in or self.request_url.get("TOP") is None or self.__token is None:
             raise UnipaNotLoggedIn()
 
-        params = {
-            "rx-token": self.__token.rx_token,
-            "rx-loginKey": self.__token.rx_login_key,
-            "rx-deviceKbn": self.__token.rx_device_kbn,
-            "rx-loginType": self.__token.rx_login_type,
-            "javax.faces.ViewState": self.__token.javax_view_state,
-            request_type: request_type
-        }
+        cache_key = None
+        if cacheable and self.cache is not None and response_markup != "lxml":
+            cache_key = self.cache.make_key(request_target, request_type, extra_params, response_markup)
+            entry = self.cache.get(cache_key)
+            if entry is not None:
+                return self.__restore_cache(request_target, entry, response_markup, scan_items)
+
+        params = self.__token.get_params()
+        params[request_type] = request_type
         params.update(extra_params)
 
         headers = {
             "Content-Type": "application/x-www-form-urlencoded",
         }
         if response_markup == "lxml":
-            headers["Accept"] = "text/html"
-        if response_markup == "lxml":
-            headers["Accept"] = "application/xml,text/xml"
-            headers["Faces-Request"] = "partial/ajax"
-            headers["X-Requested-With"] = "XMLHttpRequest"
+            # 互換性のため、lxml の場合は部分更新 (partial/ajax) としてリクエストする。request_partial を利用すること
+            headers.update(PARTIAL_AJAX_HEADERS)
 
         url = self.request_url.get(request_target)
         if url is None:
@@ -301,22 +653,325 @@ class Unipa:
         self.logger.debug("リクエストURL: %s", url)
         self.logger.debug("リクエストデータ: %s", params)
         self.logger.debug("リクエストヘッダー: %s", headers)
-        self.__response = self.session.post(url, data=params, headers=headers)
+        response, text, stats = self.__send("POST", url, request_target, data=params, headers=headers)
+
+        if response.status_code != 200:
+            self.logger.debug("レスポンス: %s", text)
+            raise UnipaInternalError("リクエストに失敗しました。(" + str(response.status_code) + ")")
+
+        page = UnipaPage(text, stats, self.parser, self.hooks, response_markup, scan_items)
+        if response_markup != "lxml":
+            self.update_token_from_page(page)
+        else:
+            with UnipaStopwatch(stats, PHASE_PARSE):
+                partial = UnipaPartialResponse.parse(response.content)
+            self.update_token_from_partial(stats, partial)
+
+        if cache_key is not None and self.cache is not None and self.__token is not None:
+            self.cache.put(cache_key, text, self.__token.javax_view_state)
+
+        return page
+
+    def request_partial(self,
+                        request_target: str,
+                        request_type: str,
+                        extra_params: dict[str, str],
+                        render: str,
+                        execute: Optional[str] = None) -> UnipaPartialResponse:
+        """
+        部分更新 (JSF partial/ajax) のリクエストを送信する
+
+        ページ全体ではなく render で指定した要素の HTML 断片だけが返ってくるため、ダウンロードと解析の量を減らせます。
+        View state (と、form#headerForm が更新された場合はトークン) はレスポンスの内容で更新します。
+
+        Args:
+            request_target: リクエストターゲット
+            request_type: リクエストタイプ (menuForm, funcForm など)
+            extra_params: リクエストに付加するパラメータ (トークンなど以外)
+            render: 更新する要素の ID (スペース区切りで複数指定可)
+            execute: 処理する要素の ID (None の場合は javax.faces.source と同じ)
+
+        Returns:
+            UnipaPartialResponse: 部分更新レスポンス
+        """
+        if not self.__logged_in or self.request_url.get("TOP") is None or self.__token is None:
+            raise UnipaNotLoggedIn()
+
+        params = self.__token.get_params()
+        params[request_type] = request_type
+        params["javax.faces.partial.ajax"] = "true"
+        params["javax.faces.partial.render"] = render
+        params.update(extra_params)
+        if execute is not None:
+            params["javax.faces.partial.execute"] = execute
+
+        headers = {
+            "Content-Type": "application/x-www-form-urlencoded; charset=UTF-8",
+        }
+        headers.update(PARTIAL_AJAX_HEADERS)
+
+        url = self.request_url.get(request_target)
+        if url is None:
+            raise UnipaInternalError("リクエストターゲットが見つかりません: " + request_target)
+
+        self.logger.debug("リクエストURL: %s", url)
+        self.logger.debug("リクエストデータ: %s", params)
+        response, text, stats = self.__send("POST", url, request_target, data=params, headers=headers)
+
+        if response.status_code != 200:
+            self.logger.debug("レスポンス: %s", text)
+            raise UnipaInternalError("リクエストに失敗しました。(" + str(response.status_code) + ")")
+
+        with UnipaStopwatch(stats, PHASE_PARSE):
+            partial = UnipaPartialResponse.parse(response.content)
+        self.hooks.fire(HOOK_AFTER_PARSE, stats, partial)
+
+        if partial.redirect is not None:
+            raise UnipaInternalError("部分更新のリクエストがリダイレクトされました: " + partial.redirect)
+        if partial.error is not None:
+            raise UnipaInternalError("部分更新のリクエストに失敗しました: " + partial.error)
+
+        self.update_token_from_partial(stats, partial)
+        return partial
+
+    def __restore_cache(self,
+                        request_target: str,
+                        entry: UnipaCacheEntry,
+                        response_markup: Optional[str],
+                        scan_items: bool) -> UnipaPage:
+        """
+        キャッシュしたレスポンスを返す
+
+        rx-token などは最新のものを維持し、View state のみキャッシュしたレスポンスのものに戻すことで、
+        キャッシュしたページからの続きのリクエスト (掲示詳細の取得など) をそのまま送信できるようにする。
+
+        Args:
+            request_target: リクエストターゲット
+            entry: キャッシュ
+            response_markup: レスポンスのマークアップ
+            scan_items: ナビゲーション・インフォメーションアイテムも走査するか
+
+        Returns:
+            UnipaPage: キャッシュしたレスポンスページ
+        """
+        stats = UnipaRequestStats("POST", self.request_url.get(request_target) or "", request_target)
+        stats.from_cache = True
+        stats.status_code = 200
+        self.__latest_stats = stats
+
+        with UnipaStopwatch(stats, PHASE_TOKEN_UPDATE):
+            token = self.__token
+            if token is None:
+                raise UnipaNotLoggedIn()
+            self.__token = UnipaToken(token.rx_token, token.rx_login_key, token.rx_device_kbn, token.rx_login_type,
+                                      entry.javax_view_state)
+
+        return UnipaPage(entry.text, stats, self.parser, self.hooks, response_markup, scan_items)
+
+    def __send(self,
+               method: str,
+               url: str,
+               request_target: Optional[str] = None,
+               data: Optional[Dict[str, str]] = None,
+               headers: Optional[Dict[str, str]] = None,
+               rate_limit: str = RATE_LIMIT_REQUEST) -> Tuple[Response, str, UnipaRequestStats]:
+        """
+        リクエストを送信し、フェーズごとの所要時間を計測する
 
-        if self.__response.status_code != 200:
-            self.logger.debug("レスポンス: %s", self.__response.text)
-            raise UnipaInternalError("リクエストに失敗しました。(" + str(self.__response.status_code) + ")")
+        Args:
+            method: HTTP メソッド
+            url: リクエスト URL
+            request_target: リクエストターゲット
+            data: リクエストデータ
+            headers: リクエストヘッダー
+            rate_limit: レートリミッターの種類 (RATE_LIMIT_REQUEST, RATE_LIMIT_LOGIN)
 
-        soup = BeautifulSoup(self.__response.text, response_markup)
-        self.logger.debug("soupレスポンス: %s", soup.prettify())
+        Returns:
+            Tuple[Response, str, UnipaRequestStats]: レスポンス, デコード済みのレスポンス本文, 計測結果
+        """
+        stats = UnipaRequestStats(method, url, request_target)
+        self.__latest_stats = stats
+
+        prepared = self.session.prepare_request(requests.Request(method, url, data=data, headers=headers))
+        body = prepared.body or b""
+        stats.request_bytes = len(body.encode("utf-8") if isinstance(body, str) else body)
+        self.hooks.fire(HOOK_BEFORE_REQUEST, stats, prepared)
+
+        # stream=True にすることで、ヘッダー受信までとボディのダウンロードを分けて計測する
+        settings = self.session.merge_environment_settings(prepared.url, {}, True, None, None)
+        response = self.__send_with_retry(prepared, settings, stats, rate_limit)
+
+        breaker = self.transport.circuit_breaker
+        try:
+            with UnipaStopwatch(stats, PHASE_DOWNLOAD):
+                content = response.content
+        except requests.RequestException as e:
+            if breaker is not None:
+                breaker.record_failure()
+            if isinstance(e, requests.exceptions.ConnectionError) and isinstance(e.args[0], ReadTimeoutError):
+                raise UnipaTimeoutError("レスポンスの受信がタイムアウトしました。") from e
+            raise UnipaConnectionError("レスポンスの受信に失敗しました。") from e
+        stats.status_code = response.status_code
+        stats.response_bytes = len(content)
+
+        with UnipaStopwatch(stats, PHASE_DECODE):
+            text = response.text
+        self.hooks.fire(HOOK_AFTER_RESPONSE, stats, response)
+
+        return response, text, stats
+
+    def __send_with_retry(self,
+                          prepared: requests.PreparedRequest,
+                          settings: Mapping[str, object],
+                          stats: UnipaRequestStats,
+                          rate_limit: str) -> Response:
+        """
+        通信のポリシーに従い、再試行しながらリクエストを送信する
 
-        if response_markup == "html5lib":
-            self.update_token_html5lib(soup)
+        POST はサーバーが処理していないことが確実な場合 (接続できなかった場合と post_retry_statuses のステータス) のみ
+        再試行するため、同じトークンで再送しても問題ありません。
+        レートリミッターがある場合は、再試行を含む送信のたびにトークンを取得します。
 
-        # xmlのときに更新するかは検討
+        Args:
+            prepared: リクエスト
+            settings: 送信時の設定 (プロキシ・証明書など)
+            stats: 計測結果
+            rate_limit: レートリミッターの種類
 
+        Returns:
+            Response: レスポンス (本文は未受信。再試行しても再試行するステータスが返された場合はそのレスポンス)
+        """
+        policy = self.transport
+        breaker = policy.circuit_breaker
+        limiter = policy.rate_limiter
+        reset_connect_time()
+        attempt = 0
+        while True:
+            if breaker is not None:
+                breaker.before_request()
+            # 想定外の例外で抜けた場合も失敗として記録し、half_open の試行中のまま残さない
+            succeeded = False
+            try:
+                if limiter is not None:
+                    stats.rate_limit_wait += limiter.acquire(prepared.url or "", rate_limit)
+
+                start = time.perf_counter()
+                try:
+                    response = self.session.send(prepared, timeout=policy.timeout, **settings)  # type: ignore
+                    error: Optional[requests.RequestException] = None
+                except requests.RequestException as e:
+                    error = e
+                stats.add_timing(PHASE_SERVER_WAIT, time.perf_counter() - start)
+
+                succeeded = error is None and response.status_code not in policy.retry_statuses \
+                    and response.status_code not in policy.post_retry_statuses
+            finally:
+                if breaker is not None:
+                    if succeeded:
+                        breaker.record_success()
+                    else:
+                        breaker.record_failure()
+            if succeeded:
+                break
+
+            if error is None:
+                retryable = policy.is_retryable_status(prepared.method, response.status_code)
+            else:
+                retryable = policy.is_retryable(prepared.method, error)
+            if attempt >= policy.max_retries or not retryable:
+                if error is None:
+                    break
+                if isinstance(error, requests.Timeout):
+                    raise UnipaTimeoutError(f"リクエストがタイムアウトしました。({prepared.url})") from error
+                raise UnipaConnectionError(f"リクエストに失敗しました。({prepared.url})") from error
+
+            attempt += 1
+            if error is None:
+                self.logger.debug("ステータス %d のため再試行します (%d 回目)", response.status_code, attempt)
+                response.close()
+            else:
+                self.logger.debug("%s のため再試行します (%d 回目)", type(error).__name__, attempt)
+            wait = policy.get_backoff(attempt)
+            stats.retries = attempt
+            stats.retry_wait += wait
+            time.sleep(wait)
+
+        # 接続時間はサーバーの待ち時間から除く
+        connect_time = get_connect_time()
+        stats.add_timing(PHASE_CONNECT, connect_time)
+        stats.timings[PHASE_SERVER_WAIT] = max(stats.timings[PHASE_SERVER_WAIT] - connect_time, 0.0)
+        return response
+
+    def __parse(self,
+                stats: UnipaRequestStats,
+                text: str,
+                required: Callable[[BeautifulSoup], bool]) -> BeautifulSoup:
+        """
+        ログイン処理のレスポンスを解析する
+
+        Args:
+            stats: 計測結果
+            text: レスポンス本文
+            required: 解析結果が妥当かを判定する関数
+
+        Returns:
+            BeautifulSoup: 解析結果
+        """
+        with UnipaStopwatch(stats, PHASE_PARSE):
+            soup = self.parser.parse(text, required)
+        self.hooks.fire(HOOK_AFTER_PARSE, stats, soup)
         return soup
 
+    @contextmanager
+    def extraction(self) -> Iterator[None]:
+        """
+        抽出処理 (レスポンスからの情報の取得) の所要時間を、最後のリクエストの計測結果に記録します。
+
+            with unipa.extraction():
+                items = UnipaBulletinBoard.parse_all(soup)
+        """
+        stats = self.__latest_stats
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            if stats is not None:
+                stats.add_timing(PHASE_EXTRACTION, time.perf_counter() - start)
+                self.hooks.fire(HOOK_AFTER_EXTRACT, stats)
+
+    def extract(self,
+                extractor: Callable[[BeautifulSoup], R],
+                page: UnipaPage) -> R:
+        """
+        レスポンスページから抽出処理を実行し、所要時間をページの計測結果に記録します。
+
+        解析用プロセスプール (parse_pool) を指定している場合、DOM を構築していないページは解析と抽出をまとめて
+        子プロセスで実行し、抽出結果のみを受け取ります。この場合 HOOK_AFTER_PARSE は呼ばれず、抽出の所要時間には
+        プロセス間通信の時間も含まれます。extractor は pickle できる関数 (UnipaBulletinBoard.parse_all など) を
+        指定してください。
+
+        Args:
+            extractor: 抽出処理
+            page: レスポンスページ
+
+        Returns:
+            R: 抽出結果
+        """
+        parse_pool = self.parse_pool
+        if parse_pool is None or page.is_parsed or not parse_pool.accepts(page.text):
+            soup = page.soup
+            with self.extraction():
+                return extractor(soup)
+
+        stats = page.stats
+        start = time.perf_counter()
+        required = self.has_header_form if page.response_markup is None else None
+        result, parse_time, _ = parse_pool.extract(extractor, page.text, self.parser, required, page.response_markup)
+        stats.add_timing(PHASE_PARSE, parse_time)
+        stats.add_timing(PHASE_EXTRACTION, time.perf_counter() - start - parse_time)
+        self.hooks.fire(HOOK_AFTER_EXTRACT, stats)
+        return result
+
     def is_logged_in(self) -> bool:
         """
         ログインしているかどうかを返します。
@@ -335,6 +990,15 @@ class Unipa:
         """
         return self.__token
 
+    def get_navigation(self) -> UnipaNavigation:
+        """
+        ナビゲーション (名前・メニューのパス・menu_id で検索できるナビゲーション・インフォメーションアイテム) を返します。
+
+        Returns:
+            UnipaNavigation: ナビゲーション
+        """
+        return self.__navigation
+
     def get_nav_items(self) -> List[UnipaNavItem]:
         """
         ナビゲーションアイテムを返します。
@@ -342,7 +1006,7 @@ class Unipa:
         Returns:
             List[UnipaNavItem]: ナビゲーションアイテム
         """
-        return self.__nav_items
+        return self.__navigation.nav_items
 
     def get_info_items(self) -> List[UnipaInfoItem]:
         """
@@ -351,30 +1015,121 @@ class Unipa:
         Returns:
             List[UnipaInfoItem]: インフォメーションアイテム
         """
-        return self.__info_items
+        return self.__navigation.info_items
+
+    def get_latest_stats(self) -> Optional[UnipaRequestStats]:
+        """
+        最後のリクエストの計測結果を返します。
 
-    def get_latest_response(self) -> Optional[Response]:
+        Returns:
+            Optional[UnipaRequestStats]: 計測結果 (ない場合は None)
+        """
+        return self.__latest_stats
+
+    def get_latest_capture(self) -> Optional[UnipaCapture]:
         """
-        最後のレスポンスを返します。デバッグのために利用することを想定しています。
+        最後のリクエスト・レスポンスのキャプチャを返します。デバッグのために利用することを想定しています。
+
+        コンストラクタで capture を指定した場合のみ記録されます。
+
+        Returns:
+            Optional[UnipaCapture]: キャプチャ (キャプチャしていない場合は None)
+        """
+        return self.capture.latest() if self.capture is not None else None
+
+    @staticmethod
+    def has_header_form(soup: BeautifulSoup) -> bool:
+        """
+        トークンを含むフォーム (form#headerForm) があるかどうかを返します。
+
+        Args:
+            soup: BeautifulSoup
 
         Returns:
-            Optional[Response]: レスポンス (ない場合は None)
+            bool: form#headerForm があるかどうか
         """
-        return self.__response
+        return soup.find("form", {"id": "headerForm"}) is not None
 
     def update_token_html5lib(self,
                               soup: BeautifulSoup) -> None:
         """
         トークンをアップデートします。
+
+        Notes:
+            互換性のために残しています。パーサーによらず動作するため、`update_token` を利用してください。
         """
-        header_form = soup.find("form", {"id": "headerForm"})
-        if header_form is None:
-            raise UnipaInternalError("トークンを更新するためのフォーム情報の取得に失敗しました。")
+        self.update_token(soup)
 
-        rx_token = header_form.find("input", {"name": "rx-token"}).get("value")
-        rx_login_key = header_form.find("input", {"name": "rx-loginKey"}).get("value")
-        rx_device_kbn = header_form.find("input", {"name": "rx-deviceKbn"}).get("value")
-        rx_login_type = header_form.find("input", {"name": "rx-loginType"}).get("value")
-        javax_view_state = header_form.select_one("input[name=\"javax.faces.ViewState\"]").get("value")
+    def update_token(self,
+                     soup: BeautifulSoup) -> None:
+        """
+        トークンをアップデートします。
+
+        Args:
+            soup: BeautifulSoup (パーサーは問いません)
+        """
+        self.__token = UnipaToken.from_soup(soup)
+
+    def update_token_from_page(self,
+                               page: UnipaPage) -> None:
+        """
+        レスポンスページのスキャン結果からトークンをアップデートします。
+
+        スキャンでトークンが見つからない壊れたページは、DOM を構築して取得します。
+        ログインページに戻された場合 (セッションの期限切れ) は UnipaSessionExpiredError を送出します。
+
+        Args:
+            page: レスポンスページ
+        """
+        scan = page.scan
+        if not scan.has_token:
+            if "loginForm" in scan.actions:
+                raise UnipaSessionExpiredError("セッションの有効期限が切れています。")
+            soup = page.soup
+            with UnipaStopwatch(page.stats, PHASE_TOKEN_UPDATE):
+                self.update_token(soup)
+            return
+
+        with UnipaStopwatch(page.stats, PHASE_TOKEN_UPDATE):
+            self.__token = UnipaToken.from_inputs(scan.token_inputs)
+
+    def update_token_from_partial(self,
+                                  stats: UnipaRequestStats,
+                                  partial: UnipaPartialResponse) -> None:
+        """
+        部分更新レスポンスからトークンをアップデートします。
+
+        form#headerForm が更新されていればトークンを、View state が更新されていれば View state をアップデートします。
+
+        Args:
+            stats: 計測結果
+            partial: 部分更新レスポンス
+        """
+        with UnipaStopwatch(stats, PHASE_TOKEN_UPDATE):
+            header_form = partial.get_update("headerForm")
+            if header_form is not None:
+                scan = UnipaPageScanner.scan(header_form)
+                if scan.has_token:
+                    self.__token = UnipaToken.from_inputs(scan.token_inputs)
+
+            token = self.__token
+            if partial.view_state is not None and token is not None:
+                self.__token = UnipaToken(token.rx_token, token.rx_login_key, token.rx_device_kbn,
+                                          token.rx_login_type, partial.view_state)
+
+    def set_request_url_from_page(self,
+                                  name: str,
+                                  page: UnipaPage) -> None:
+        """
+        レスポンスページのスキャン結果から UnipaRequestUrl の値 (URL) を設定します。
+
+        Args:
+            name: UnipaRequestUrl の名前
+            page: レスポンスページ
+        """
+        action = page.scan.header_action
+        if action is None:
+            self.request_url.set(name, page.soup)
+            return
 
-        self.__token = UnipaToken(rx_token, rx_login_key, rx_device_kbn, rx_login_type, javax_view_state)
+        self.request_url.set_actions({name: action})
@@ -19,3 +19,27 @@ class UnipaNotLoggedIn(Exception):
     """
     UNIPA にログインしている必要があるがしていない
     """
+
+
+class UnipaConnectionError(UnipaInternalError):
+    """
+    UNIPA に接続できなかった (再試行しても接続できなかった)
+    """
+
+
+class UnipaTimeoutError(UnipaInternalError):
+    """
+    UNIPA からのレスポンスがタイムアウトした
+    """
+
+
+class UnipaCircuitOpenError(UnipaInternalError):
+    """
+    サーバーの応答が不安定なため、サーキットブレーカーがリクエストを停止している
+    """
+
+
+class UnipaSessionExpiredError(UnipaInternalError):
+    """
+    セッションの有効期限が切れ、ログインページに戻された
+    """
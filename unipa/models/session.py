@@ -0,0 +1,80 @@
+"""
+セッション保存用モデル
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from dataclasses_json import dataclass_json
+
+
+@dataclass_json
+@dataclass
+# noinspection PyClassHasNoInit
+class CookieModel:
+    """
+    Cookie モデル
+    """
+    name: str
+    value: Optional[str]
+    domain: str
+    path: str
+    secure: bool
+    expires: Optional[int]
+    http_only: bool
+
+
+@dataclass_json
+@dataclass
+# noinspection PyClassHasNoInit
+class TokenModel:
+    """
+    トークンモデル
+    """
+    rx_token: str
+    rx_login_key: str
+    rx_device_kbn: str
+    rx_login_type: str
+    javax_view_state: str
+
+
+@dataclass_json
+@dataclass
+# noinspection PyClassHasNoInit
+class NavItemModel:
+    """
+    ナビゲーションアイテムモデル
+    """
+    menu_name: str
+    menu_sub_name: Optional[str]
+    name: str
+    menu_id: Optional[str]
+
+
+@dataclass_json
+@dataclass
+# noinspection PyClassHasNoInit
+class InfoItemModel:
+    """
+    トップインフォメーションアイテムモデル
+    """
+    name: str
+    item_id: str
+
+
+@dataclass_json
+@dataclass
+# noinspection PyClassHasNoInit
+class SessionModel:
+    """
+    ログイン済みセッションモデル
+    """
+    version: int
+    base_url: str
+    saved_at: float
+    cookies: List[CookieModel]
+    token: TokenModel
+    request_urls: Dict[str, Optional[str]]
+    nav_items: List[NavItemModel]
+    info_items: List[InfoItemModel]
+    nav_fingerprint: Optional[str] = None
@@ -0,0 +1,123 @@
+"""
+ユニットテスト: asyncio 版
+"""
+import asyncio
+from typing import List, Tuple
+from unittest import TestCase
+
+import httpx
+
+from unipa import Unipa
+from unipa.BulletinBoard import AsyncUnipaBulletinBoard
+from unipa.Classes import AsyncUnipaClasses
+from unipa.errors import UnipaInternalError, UnipaLoginError
+from unipa.testing.server import UnipaStubApp, UnipaStubServer
+from unipa.unipa_async import AsyncUnipa
+from unipa.unipa_navigation import UnipaNavigationStore
+
+
+class TestAsyncUnipa(TestCase):
+    """
+    ユニットテスト: asyncio 版
+    """
+
+    # noinspection PyPep8Naming
+    def setUp(self) -> None:
+        """
+        テストセットアップ
+        """
+        self.server = UnipaStubServer.start(UnipaStubApp(
+            accounts={f"student{i}": "password" for i in range(5)},
+            board_size=12,
+        ))
+
+    # noinspection PyPep8Naming
+    def tearDown(self) -> None:
+        """
+        テスト後処理
+        """
+        self.server.stop()
+
+    async def poll(self,
+                   username: str) -> Tuple[List[str], List[str], int]:
+        """
+        ログインし、掲示リスト・掲示詳細・クラスを取得する
+        """
+        async with AsyncUnipa(self.server.base_url) as unipa:
+            self.assertTrue(await unipa.login(username, "password"))
+            board = AsyncUnipaBulletinBoard(unipa)
+            items = await board.get_all()
+            details = [await board.get_details(item) for item in items[:3]]
+            classes = await AsyncUnipaClasses(unipa).get_all()
+            return [x.title for x in items[:3]], [x.title for x in details], len(classes)
+
+    def test_concurrent_accounts(self) -> None:
+        """
+        複数アカウントを並行して処理しても、トークンが混ざらないこと
+        """
+        async def main() -> List[Tuple[List[str], List[str], int]]:
+            return await asyncio.gather(*[self.poll(f"student{i}") for i in range(5)])
+
+        for titles, details, classes in asyncio.run(main()):
+            self.assertEqual(titles, details)
+            self.assertEqual(classes, 42)
+
+    def test_login_error(self) -> None:
+        """
+        ログインに失敗した場合は UnipaLoginError
+        """
+        async def main() -> None:
+            async with AsyncUnipa(self.server.base_url) as unipa:
+                await unipa.login("student0", "wrong")
+
+        with self.assertRaises(UnipaLoginError):
+            asyncio.run(main())
+
+    def test_bind(self) -> None:
+        """
+        取得した掲示アイテムがセッションに紐付き、get_details_async で詳細を取得できること
+        """
+        async def main() -> None:
+            async with AsyncUnipa(self.server.base_url) as unipa:
+                await unipa.login("student0", "password")
+                items = await AsyncUnipaBulletinBoard(unipa).get_all()
+                self.assertIs(items[0].unipa, unipa)
+                details = await items[0].get_details_async()
+                self.assertEqual(details.title, items[0].title)
+                with self.assertRaises(UnipaInternalError):
+                    items[1].get_details()
+
+        asyncio.run(main())
+
+    def test_navigation_store(self) -> None:
+        """
+        メニューが変わっていない場合は、保存したナビゲーションを Unipa と共有すること
+        """
+        store = UnipaNavigationStore()
+        unipa = Unipa(self.server.base_url, navigation_store=store)
+        unipa.login("student0", "password")
+
+        async def main() -> None:
+            async with AsyncUnipa(self.server.base_url, navigation_store=store) as async_unipa:
+                await async_unipa.login("student1", "password")
+                self.assertIs(async_unipa.get_navigation(), unipa.get_navigation())
+
+        asyncio.run(main())
+
+    def test_close(self) -> None:
+        """
+        作成したクライアントは閉じ、指定したクライアントは閉じないこと
+        """
+        async def main() -> None:
+            async with AsyncUnipa(self.server.base_url) as unipa:
+                await unipa.login("student0", "password")
+            self.assertTrue(unipa.client.is_closed)
+
+            async with httpx.AsyncClient(follow_redirects=True) as client:
+                for username in ("student0", "student1"):
+                    async with AsyncUnipa(self.server.base_url, client=client) as unipa:
+                        self.assertTrue(await unipa.login(username, "password"))
+                    self.assertFalse(client.is_closed)
+            self.assertTrue(client.is_closed)
+
+        asyncio.run(main())
@@ -0,0 +1,167 @@
+"""
+ユニットテスト: 掲示板
+"""
+from unittest import TestCase
+
+from unipa import Unipa
+from unipa.BulletinBoard import UnipaBulletinBoard
+from unipa.BulletinBoard.BulletinBoard import UnipaBulletinBoardItem
+from unipa.BulletinBoard.BulletinBoardItemDetails import UnipaBulletinBoardItemDetails
+from unipa.errors import UnipaInternalError
+from unipa.testing.server import UnipaStubApp, UnipaStubServer
+from unipa.unipa_session_pool import UnipaSessionPool
+
+
+class TestUnipaBulletinBoard(TestCase):
+    """
+    ユニットテスト: 掲示板
+    """
+
+    # noinspection PyPep8Naming
+    def setUp(self) -> None:
+        """
+        テストセットアップ
+        """
+        self.server = UnipaStubServer.start(UnipaStubApp(board_size=20))
+        self.unipa = Unipa(self.server.base_url)
+        self.unipa.login("student", "password")
+        self.board = UnipaBulletinBoard(self.unipa)
+        self.items = self.board.get_all()
+
+    # noinspection PyPep8Naming
+    def tearDown(self) -> None:
+        """
+        テスト後処理
+        """
+        self.server.stop()
+
+    def test_get_all(self) -> None:
+        """
+        掲示アイテムごとのフラグ・未/既読ボタンを取得すること
+        """
+        self.assertEqual([(x.is_attention, x.is_flag, x.is_unread) for x in self.items],
+                         [(index % 7 == 0, index % 5 == 0, index % 3 != 0) for index in range(len(self.items))])
+        for index, item in enumerate(self.items):
+            self.assertEqual(item.flag_id, f"funcForm:tabArea:1:j_idt330:{index}:flag")
+            self.assertEqual(item.unread_id, f"funcForm:tabArea:1:j_idt330:{index}:unread")
+
+    def test_get_details_many(self) -> None:
+        """
+        重複を除いて取得し、失敗したアイテムは例外を記録して処理を続けること
+        """
+        broken = UnipaBulletinBoardItem("x", "broken", "funcForm:tabArea:1:j_idt330:999:j_idt332", "p", "", "",
+                                        False, False, False)
+        items = self.items[:5] + [self.items[0], broken] + self.items[5:8]
+
+        results = list(self.board.get_details_many(items, ordered=True))
+        self.assertEqual([x.index for x in results], [0, 1, 2, 3, 4, 6, 7, 8, 9])
+        self.assertFalse(results[5].is_success)
+        self.assertIsNone(results[5].details)
+        for result in results[:5] + results[6:]:
+            assert result.details is not None
+            self.assertEqual(result.details.title, result.item.title)
+
+    def test_get_details_many_pool(self) -> None:
+        """
+        セッションプールで並列に取得できること
+        """
+        with UnipaSessionPool(self.server.base_url, "student", "password", 4,
+                              prepare=lambda unipa: UnipaBulletinBoard(unipa).get_all()) as pool:
+            pool.login()
+            results = list(self.board.get_details_many(self.items, pool))
+
+        self.assertEqual(sorted(x.index for x in results), list(range(len(self.items))))
+        for result in results:
+            assert result.details is not None
+            self.assertEqual(result.details.title, result.item.title)
+
+        # 掲示詳細はアイテムごとにメモ化されるため、新しい掲示リストでサーバーに取得しなおす
+        requests = self.server.app.request_count
+        ordered = self.board.get_details_many(self.board.get_all(), ordered=True)
+        first = next(ordered)
+        self.assertEqual(first.index, 0)
+        assert first.details is not None
+        self.assertEqual(first.details.title, self.items[0].title)
+        ordered.close()
+        # 掲示板ページ 1 回と掲示詳細 1 回
+        self.assertEqual(self.server.app.request_count, requests + 2)
+
+    def test_iter_all(self) -> None:
+        """
+        get_all と同じ掲示リストを 1 件ずつ返すこと
+        """
+        items = list(self.board.iter_all(chunk_size=1000))
+        self.assertEqual(items, self.items)
+
+    def test_iter_details(self) -> None:
+        """
+        途中で打ち切った場合は残りの掲示の詳細を取得しないこと
+        """
+        app = self.server.app
+        requests = app.request_count
+        titles = []
+        for result in self.board.iter_details(partial=True):
+            assert result.details is not None
+            titles.append(result.details.title)
+            if len(titles) == 3:
+                break
+
+        self.assertEqual(titles, [x.title for x in self.items[:3]])
+        # 掲示板ページ 1 回と掲示詳細 3 回
+        self.assertEqual(app.request_count, requests + 4)
+
+    def test_details(self) -> None:
+        """
+        details は初めて参照したときだけ、アイテムを取得したセッションで取得すること
+        """
+        app = self.server.app
+        requests = app.request_count
+        item = self.items[2]
+        self.assertIs(item.unipa, self.unipa)
+        self.assertFalse(item.is_details_loaded)
+
+        details = item.details
+        self.assertEqual(details.title, item.title)
+        self.assertIs(item.details, details)
+        self.assertIs(item.get_details(self.unipa), details)
+        self.assertEqual(app.request_count, requests + 1)
+        # セッションと詳細は等価性に含まれない
+        self.assertEqual(item, list(self.board.iter_all())[2])
+
+    def test_set_details(self) -> None:
+        """
+        ほかの掲示の詳細は設定できず、設定した詳細は置き換えられないこと
+        """
+        first, second = self.board.get_all()[:2]
+        details = first.get_details()
+        with self.assertRaises(UnipaInternalError):
+            second.set_details(details)
+        self.assertFalse(second.is_details_loaded)
+
+        first.set_details(details)
+        replaced = UnipaBulletinBoardItemDetails(details.item_id, details.title, "差出人", details.category,
+                                                 details.content_html, details.publication_period)
+        with self.assertRaises(UnipaInternalError):
+            first.set_details(replaced)
+        self.assertIs(first.details, details)
+
+    def test_prefetch(self) -> None:
+        """
+        prefetch は未取得の掲示の詳細だけを重複なくまとめて取得し、以降の参照は通信しないこと
+        """
+        app = self.server.app
+        self.items[0].get_details()
+        duplicate = list(self.board.iter_all())[1]
+        broken = UnipaBulletinBoardItem("x", "broken", "funcForm:tabArea:1:j_idt330:999:j_idt332", "p", "", "",
+                                        False, False, False)
+
+        requests = app.request_count
+        errors = self.board.prefetch(self.items + [duplicate, broken])
+        self.assertEqual([x.item for x in errors], [broken])
+        self.assertEqual(app.request_count, requests + len(self.items))
+
+        requests = app.request_count
+        self.assertEqual([x.details.title for x in self.items + [duplicate]],
+                         [x.title for x in self.items + [duplicate]])
+        self.assertEqual(self.board.prefetch(self.items), [])
+        self.assertEqual(app.request_count, requests)
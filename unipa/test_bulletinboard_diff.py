@@ -0,0 +1,121 @@
+"""
+ユニットテスト: 掲示板の差分検出
+"""
+import datetime
+from typing import Iterator, List, Optional
+from unittest import TestCase
+
+from unipa import Unipa
+from unipa.BulletinBoard import UnipaBulletinBoard, UnipaBulletinBoardItem
+from unipa.BulletinBoard.BulletinBoardDetailsResult import UnipaBulletinBoardDetailsResult
+from unipa.BulletinBoard.BulletinBoardDiff import EVENT_ADDED, EVENT_CHANGED, EVENT_REMOVED, UnipaBulletinBoardDiff
+from unipa.BulletinBoard.BulletinBoardItemDetails import UnipaBulletinBoardItemDetails
+from unipa.BulletinBoard.BulletinBoardStateStore import UnipaBulletinBoardStateStore
+from unipa.BulletinBoard.PublicationPeriod import UnipaPublicationPeriod
+from unipa.testing.server import UnipaStubApp, UnipaStubServer
+
+
+def make_item(index: int,
+              title: str,
+              is_unread: bool = True,
+              post: Optional[int] = None) -> UnipaBulletinBoardItem:
+    # item_id には掲示そのものの番号 (post。省略時は表示順) を入れ、fetch_details で公開開始日に使う
+    return UnipaBulletinBoardItem(str(index if post is None else post), title,
+                                  f"funcForm:tabArea:1:j_idt330:{index}:j_idt332", "p", "", "", False, False, is_unread)
+
+
+def fetch_details(items: List[UnipaBulletinBoardItem]) -> Iterator[UnipaBulletinBoardDetailsResult]:
+    for index, item in enumerate(items):
+        period = UnipaPublicationPeriod(datetime.datetime(2022, 4, 1 + int(item.item_id)), None)
+        # タイトルの先頭 1 文字を差出人とする
+        details = UnipaBulletinBoardItemDetails(item.item_id, item.title, item.title[0], "学生課", "本文", period)
+        yield UnipaBulletinBoardDetailsResult(index, item, details, None)
+
+
+class TestUnipaBulletinBoardDiff(TestCase):
+    """
+    ユニットテスト: 掲示板の差分検出
+    """
+
+    def test_apply(self) -> None:
+        """
+        追加・削除・フラグの変化・タイトルの変化を検出し、変化のあった掲示の詳細のみ取得すること
+        """
+        store = UnipaBulletinBoardStateStore()
+        diff = UnipaBulletinBoardDiff(store)
+        fetched: List[str] = []
+
+        def fetcher(items: List[UnipaBulletinBoardItem]) -> Iterator[UnipaBulletinBoardDetailsResult]:
+            fetched.extend(item.title for item in items)
+            return fetch_details(items)
+
+        events = diff.apply([make_item(0, "A 休講"), make_item(1, "B 休講"), make_item(2, "B 休講")], fetcher)
+        self.assertEqual([event.kind for event in events], [EVENT_ADDED] * 3)
+        self.assertEqual(len({event.fingerprint for event in events}), 3)
+        self.assertEqual(len(store), 3)
+        self.assertEqual(diff.apply([make_item(5, "A 休講"), make_item(6, "B 休講"), make_item(7, "B 休講")],
+                                    fetcher), [])
+
+        # 既読になった掲示・タイトルが変わった掲示・削除された掲示・追加された掲示
+        fetched.clear()
+        events = diff.apply([make_item(0, "A 休講", False), make_item(1, "B 休講 (訂正)"), make_item(2, "C 補講")],
+                            fetcher)
+        self.assertEqual(sorted(fetched), ["B 休講 (訂正)", "C 補講"])
+        kinds = {(event.kind, event.item.title if event.item else event.previous.title if event.previous else None)
+                 for event in events}
+        self.assertEqual(kinds, {(EVENT_CHANGED, "A 休講"), (EVENT_CHANGED, "B 休講 (訂正)"),
+                                 (EVENT_ADDED, "C 補講"), (EVENT_REMOVED, "B 休講")})
+        changes = {event.item.title: event.changes for event in events if event.kind == EVENT_CHANGED and event.item}
+        self.assertEqual(changes, {"A 休講": ["is_unread"], "B 休講 (訂正)": ["title"]})
+        self.assertEqual(sorted(state.title for state in store.load().values()), ["A 休講", "B 休講 (訂正)", "C 補講"])
+
+    def test_same_title_inserted(self) -> None:
+        """
+        同じタイトルの掲示が上に追加された場合、追加された掲示のみを検出すること
+        """
+        store = UnipaBulletinBoardStateStore()
+        diff = UnipaBulletinBoardDiff(store)
+        events = diff.apply([make_item(0, "休講", post=1), make_item(1, "休講", post=0)], fetch_details)
+        fingerprints = {event.details.item_id: event.fingerprint for event in events if event.details}
+
+        events = diff.apply([make_item(0, "休講", post=2), make_item(1, "休講", post=1), make_item(2, "休講", post=0)],
+                            fetch_details)
+        self.assertEqual([event.kind for event in events], [EVENT_ADDED])
+        assert events[0].details is not None
+        self.assertEqual(events[0].details.item_id, "2")
+        self.assertNotIn(events[0].fingerprint, fingerprints.values())
+
+        # 既存の掲示のフィンガープリントは変わらない
+        self.assertEqual(diff.apply([make_item(0, "休講", post=1), make_item(1, "休講", post=0)], fetch_details)[0].kind,
+                         EVENT_REMOVED)
+        self.assertEqual({state.fingerprint for state in store.load().values()}, set(fingerprints.values()))
+
+    def test_ambiguous_rename(self) -> None:
+        """
+        差出人・カテゴリ・公開開始日が一致する削除済みの掲示が複数ある場合、タイトルの変化として扱わないこと
+        """
+        diff = UnipaBulletinBoardDiff(UnipaBulletinBoardStateStore())
+        diff.apply([make_item(0, "B1", post=0), make_item(1, "B2", post=0)], fetch_details)
+
+        events = diff.apply([make_item(0, "B3", post=0)], fetch_details)
+        self.assertEqual(sorted(event.kind for event in events), [EVENT_ADDED, EVENT_REMOVED, EVENT_REMOVED])
+
+    def test_poll(self) -> None:
+        """
+        スタンドインサーバーの掲示板で差分を検出できること
+        """
+        server = UnipaStubServer.start(UnipaStubApp(board_size=10))
+        try:
+            unipa = Unipa(server.base_url)
+            unipa.login("student", "password")
+            board = UnipaBulletinBoard(unipa)
+            diff = UnipaBulletinBoardDiff(UnipaBulletinBoardStateStore())
+
+            events = diff.poll(board)
+            self.assertEqual(len(events), 10)
+            for event in events:
+                assert event.details is not None and event.item is not None
+                self.assertEqual(event.details.title, event.item.title)
+            self.assertEqual(diff.poll(board), [])
+        finally:
+            server.stop()
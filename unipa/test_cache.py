@@ -0,0 +1,74 @@
+"""
+ユニットテスト: レスポンスキャッシュ
+"""
+from typing import List
+from unittest import TestCase
+
+from unipa import Unipa
+from unipa.BulletinBoard import UnipaBulletinBoard
+from unipa.Classes import UnipaClasses
+from unipa.testing.server import UnipaStubApp, UnipaStubServer
+from unipa.unipa_cache import UnipaResponseCache
+
+
+class TestUnipaResponseCache(TestCase):
+    """
+    ユニットテスト: レスポンスキャッシュ
+    """
+
+    def test_ttl_and_lru(self) -> None:
+        """
+        有効期限切れと LRU による削除
+        """
+        now: List[float] = [0.0]
+        cache = UnipaResponseCache(ttl=10, max_entries=2, max_size=None, clock=lambda: now[0])
+        cache.put(("a",), "A", "1")
+        cache.put(("b",), "B", "2")
+        self.assertIsNotNone(cache.get(("a",)))
+        cache.put(("c",), "C", "3")
+        self.assertIsNone(cache.get(("b",)))
+        self.assertIsNotNone(cache.get(("a",)))
+
+        now[0] = 11.0
+        self.assertIsNone(cache.get(("a",)))
+        self.assertEqual(cache.get_counters(), {"hits": 2, "misses": 2, "evictions": 1, "entries": 1})
+
+    def test_max_size(self) -> None:
+        """
+        サイズの上限を超えた場合は古いものから削除すること
+        """
+        cache = UnipaResponseCache(max_size=5)
+        cache.put(("a",), "AAA", "1")
+        cache.put(("b",), "BBB", "2")
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.size, 3)
+        cache.put(("c",), "CCCCCC", "3")
+        self.assertIsNone(cache.get(("c",)))
+
+    def test_unipa(self) -> None:
+        """
+        キャッシュから返した掲示板のあとも、掲示詳細を取得できること
+        """
+        app = UnipaStubApp(board_size=10)
+        server = UnipaStubServer.start(app)
+        try:
+            cache = UnipaResponseCache()
+            unipa = Unipa(server.base_url, cache=cache)
+            unipa.login("student", "password")
+
+            board = UnipaBulletinBoard(unipa)
+            items = board.get_all()
+            self.assertEqual(len(UnipaClasses(unipa).get_all()), 42)
+            requests = app.request_count
+
+            self.assertEqual(len(board.get_all()), len(items))
+            stats = unipa.get_latest_stats()
+            assert stats is not None
+            self.assertTrue(stats.from_cache)
+            self.assertEqual(app.request_count, requests)
+            self.assertEqual(cache.hits, 1)
+
+            # キャッシュした掲示板の View state で掲示詳細を取得する
+            self.assertEqual(items[3].get_details(unipa).title, items[3].title)
+        finally:
+            server.stop()
@@ -0,0 +1,94 @@
+"""
+ユニットテスト: リクエスト・レスポンスのキャプチャ
+"""
+import os
+import tempfile
+from unittest import TestCase
+
+from unipa import Unipa
+from unipa.BulletinBoard import UnipaBulletinBoard
+from unipa.testing.server import UnipaStubApp, UnipaStubServer
+from unipa.unipa_capture import REDACTED, UnipaCaptureBuffer
+
+
+class TestUnipaCapture(TestCase):
+    """
+    ユニットテスト: リクエスト・レスポンスのキャプチャ
+    """
+
+    # noinspection PyPep8Naming
+    def setUp(self) -> None:
+        """
+        テストセットアップ
+        """
+        self.server = UnipaStubServer.start(UnipaStubApp(board_size=5))
+
+    # noinspection PyPep8Naming
+    def tearDown(self) -> None:
+        """
+        テスト後処理
+        """
+        self.server.stop()
+
+    def test_disabled(self) -> None:
+        """
+        キャプチャを指定しない場合は何も保存せず、作業ディレクトリにファイルを書き出さないこと
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            cwd = os.getcwd()
+            os.chdir(directory)
+            try:
+                unipa = Unipa(self.server.base_url)
+                unipa.login("student", "password")
+                self.assertIsNone(unipa.get_latest_capture())
+                self.assertEqual(os.listdir(directory), [])
+            finally:
+                os.chdir(cwd)
+
+    def test_redact(self) -> None:
+        """
+        パスワード・トークン・Cookie を伏せ字にして保存すること
+        """
+        capture = UnipaCaptureBuffer()
+        unipa = Unipa(self.server.base_url, capture=capture)
+        unipa.login("student", "password")
+        UnipaBulletinBoard(unipa).get_all()
+
+        captures = capture.get_captures()
+        self.assertEqual(len(captures), 4)
+        login = captures[1]
+        self.assertIn("loginForm:userId=student", login.request_body)
+        self.assertIn(f"loginForm:password={REDACTED}", login.request_body)
+        self.assertNotIn("password=password", login.request_body)
+
+        token = unipa.get_token()
+        self.assertIsNotNone(token)
+        latest = unipa.get_latest_capture()
+        self.assertIs(latest, captures[-1])
+        for entry in captures:
+            for secret in (token.rx_token, token.rx_login_key, token.javax_view_state):  # type: ignore
+                self.assertNotIn(secret, entry.request_body)
+                self.assertNotIn(secret, entry.response_body)
+        self.assertIn("掲示板", latest.response_body)  # type: ignore
+        self.assertEqual(latest.request_headers["Cookie"], REDACTED)  # type: ignore
+        self.assertEqual(captures[0].response_headers["Set-Cookie"], REDACTED)
+
+    def test_bounded(self) -> None:
+        """
+        件数・サイズの上限を超えると古いキャプチャから破棄すること
+        """
+        capture = UnipaCaptureBuffer(capacity=2)
+        unipa = Unipa(self.server.base_url, capture=capture)
+        unipa.login("student", "password")
+        self.assertEqual(len(capture), 2)
+        self.assertEqual([x.request_target for x in capture], [None, "TOP"])
+
+        capture = UnipaCaptureBuffer(max_bytes=1)
+        unipa = Unipa(self.server.base_url, capture=capture)
+        unipa.login("student", "password")
+        self.assertEqual(len(capture), 1)
+        self.assertEqual(capture.size, capture.get_captures()[0].size)
+
+        capture.detach(unipa.hooks)
+        UnipaBulletinBoard(unipa).get_all()
+        self.assertEqual(capture.latest().request_target, "TOP")  # type: ignore
@@ -0,0 +1,99 @@
+"""
+ユニットテスト: 掲示本文のプレーンテキスト・Markdown 変換
+"""
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+
+from unipa.BulletinBoard import UnipaBulletinBoardItemDetails
+from unipa.BulletinBoard.BulletinBoardContent import CONTENT_CONVERTER, CONTENT_MARKDOWN, CONTENT_TEXT, \
+    UnipaContentConverter, render_content
+from unipa.BulletinBoard.PublicationPeriod import UnipaPublicationPeriod
+
+CONTENT_HTML = "<td><p>本文です。<br />詳細は<a href=\"https://example.com/\">こちら</a></p>" \
+               "<ul><li>項目 1</li><li><strong>締切</strong> は 4/30</li></ul>" \
+               "<script>alert(1)</script>末尾&amp;_</td>"
+
+
+class TestUnipaContent(TestCase):
+    """
+    ユニットテスト: 掲示本文のプレーンテキスト・Markdown 変換
+    """
+
+    def setUp(self) -> None:
+        """
+        テストセットアップ
+        """
+        CONTENT_CONVERTER.clear()
+        self.period = UnipaPublicationPeriod(datetime.datetime(2022, 4, 1, 9, 0), None)
+
+    def tearDown(self) -> None:
+        """
+        テスト後処理
+        """
+        CONTENT_CONVERTER.clear()
+
+    def test_render_text(self) -> None:
+        """
+        プレーンテキストに変換できること
+        """
+        self.assertEqual(render_content(CONTENT_HTML, CONTENT_TEXT),
+                         "本文です。\n詳細はこちら\n\n・項目 1\n・締切 は 4/30\n\n末尾&_")
+
+    def test_render_markdown(self) -> None:
+        """
+        Markdown に変換できること (リンク・強調・リスト・エスケープ)
+        """
+        self.assertEqual(render_content(CONTENT_HTML, CONTENT_MARKDOWN),
+                         "本文です。\\\n詳細は[こちら](https://example.com/)\n\n- 項目 1\n- **締切** は 4/30\n\n末尾&\\_")
+        self.assertEqual(render_content("<ol><li>a<ul><li>b</li></ul></li><li>c</li></ol>", CONTENT_MARKDOWN),
+                         "1. a\n   - b\n2. c")
+
+    def test_details_properties(self) -> None:
+        """
+        掲示詳細の content_text, content_markdown が本文のハッシュごとにメモ化されること
+        """
+        details = UnipaBulletinBoardItemDetails("id", "title", "author", "category", CONTENT_HTML, self.period)
+        other = UnipaBulletinBoardItemDetails("id2", "title2", "author", "category", CONTENT_HTML, self.period)
+
+        self.assertEqual(details.content_text, render_content(CONTENT_HTML, CONTENT_TEXT))
+        self.assertEqual(CONTENT_CONVERTER.misses, 1)
+        self.assertEqual(other.content_text, details.content_text)
+        self.assertEqual(details.content_markdown, render_content(CONTENT_HTML, CONTENT_MARKDOWN))
+        self.assertEqual(len(CONTENT_CONVERTER), 2)
+
+    def test_convert_many(self) -> None:
+        """
+        まとめて変換する際、同じ本文・変換済みの本文は変換せず、結果は入力の順で返ること
+        """
+        converter = UnipaContentConverter()
+        converter.convert("<p>0</p>")
+        contents = [f"<p>{index % 5}</p>" for index in range(20)]
+        with ThreadPoolExecutor(2) as executor:
+            results = converter.convert_many(contents, CONTENT_TEXT, executor)
+
+        self.assertEqual(results, [str(index % 5) for index in range(20)])
+        self.assertEqual(len(converter), 5)
+        self.assertEqual(converter.hits, 1)
+        self.assertEqual(converter.convert_many(contents), results)
+
+        details = [UnipaBulletinBoardItemDetails(str(index), "title", "author", "category", html, self.period)
+                   for index, html in enumerate(contents)]
+        self.assertEqual(UnipaBulletinBoardItemDetails.convert_contents(details), results)
+        self.assertEqual(CONTENT_CONVERTER.misses, 5)
+        self.assertEqual([x.content_text for x in details], results)
+        self.assertEqual(CONTENT_CONVERTER.misses, 5)
+
+    def test_maxsize(self) -> None:
+        """
+        maxsize 件を超えると最も古く使われた変換結果から破棄されること
+        """
+        converter = UnipaContentConverter(maxsize=2)
+        converter.convert("<p>a</p>")
+        converter.convert("<p>b</p>")
+        converter.convert("<p>a</p>")
+        converter.convert("<p>c</p>")
+
+        self.assertEqual(len(converter), 2)
+        self.assertIsNotNone(converter.get(converter.make_key("<p>a</p>", CONTENT_TEXT)))
+        self.assertIsNone(converter.get(converter.make_key("<p>b</p>", CONTENT_TEXT)))
@@ -0,0 +1,72 @@
+"""
+ユニットテスト: インスタンスごとのセッション状態の分離
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Tuple
+from unittest import TestCase
+
+from unipa import Unipa
+from unipa.BulletinBoard import UnipaBulletinBoard
+from unipa.testing.server import UnipaStubApp, UnipaStubServer
+from unipa.unipa_utils import UnipaRequestUrl
+
+TENANTS = 200
+
+
+class TestUnipaIsolation(TestCase):
+    """
+    ユニットテスト: インスタンスごとのセッション状態の分離
+    """
+
+    # noinspection PyPep8Naming
+    def setUp(self) -> None:
+        """
+        テストセットアップ
+        """
+        self.app = UnipaStubApp(board_size=3, tenants=True, menus=1)
+        self.server = UnipaStubServer.start(self.app)
+
+    # noinspection PyPep8Naming
+    def tearDown(self) -> None:
+        """
+        テスト後処理
+        """
+        self.server.stop()
+
+    def test_request_url(self) -> None:
+        """
+        UnipaRequestUrl の値はインスタンスごとに保持されること
+        """
+        first = UnipaRequestUrl("https://a.example.com/")
+        second = UnipaRequestUrl("https://b.example.com/")
+        first.set_actions({"TOP": "/a/up/top.jsf"})
+
+        self.assertEqual(first.get("TOP"), "https://a.example.com/a/up/top.jsf")
+        self.assertIsNone(second.get("TOP"))
+        self.assertEqual(second.get_actions(), {name: None for name in UnipaRequestUrl.NAMES})
+
+    def test_many_tenants(self) -> None:
+        """
+        1 プロセスで数百の Unipa を異なるベース URL に対して並列に利用しても、状態が混ざらないこと
+        """
+        def run(index: int) -> Tuple[Unipa, int]:
+            unipa = Unipa(f"{self.server.base_url}tenant-{index}/")
+            unipa.login("student", "password")
+            return unipa, len(UnipaBulletinBoard(unipa).get_all())
+
+        with ThreadPoolExecutor(16) as executor:
+            results = list(executor.map(run, range(TENANTS)))
+
+        tokens = set()
+        for index, (unipa, count) in enumerate(results):
+            self.assertEqual(count, 3)
+            self.assertEqual(unipa.request_url.get("TOP"),
+                             f"{self.server.base_url}tenant-{index}/up/faces/up/po/Poa00601A.jsf")
+            self.assertEqual(unipa.request_url.get("BULLETBOARD"),
+                             f"{self.server.base_url}tenant-{index}/up/faces/up/po/pPoa0202A.jsf")
+            token = unipa.get_token()
+            assert token is not None
+            tokens.add(token.rx_login_key)
+            self.assertTrue(unipa.check_session())
+        # セッション (トークン) もインスタンスごと
+        self.assertEqual(len(tokens), TENANTS)
@@ -55,7 +55,8 @@ class TestUnipa(TestCase):
 
         self.assertTrue(self.unipa.login(username, password), "ログインに失敗しました")
 
-        self.bulletinboard_items = UnipaBulletinBoard(self.unipa).get_all()
+        self.bulletinboard = UnipaBulletinBoard(self.unipa)
+        self.bulletinboard_items = self.bulletinboard.get_all()
 
     def test_bulletinboard_get_all(self) -> None:
         """
@@ -94,13 +95,16 @@ class TestUnipa(TestCase):
         """
         掲示板 掲示詳細の取得テスト
         """
+        # 掲示詳細はまとめて 1 回ずつ取得し、テストケースごとには取得しない
+        self.assertEqual(self.bulletinboard.prefetch(self.bulletinboard_items), [], "掲示詳細の取得に失敗しました")
+
         for test in self.tests.bulletinboard_get_details:
             self.logger.info("掲示板 掲示詳細の取得テスト: 掲示タイトル「%s」", test.title)
 
             target = None
             target_match = 0
             for match in self.bulletinboard_items:
-                details = match.get_details(self.unipa)
+                details = match.details
                 results = [
                     details.title == test.title,
                     details.author == test.author,
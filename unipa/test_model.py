@@ -0,0 +1,88 @@
+"""
+ユニットテスト: モデル
+"""
+import copy
+import datetime
+import pickle
+from typing import List
+from unittest import TestCase
+
+from unipa.BulletinBoard.BulletinBoard import UnipaBulletinBoardItem
+from unipa.BulletinBoard.BulletinBoardItemDetails import UnipaBulletinBoardItemDetails
+from unipa.BulletinBoard.PublicationPeriod import UnipaPublicationPeriod
+from unipa.Classes.UnipaClass import UnipaClass, UnipaClassLectureAt
+from unipa.unipa_model import UnipaModel
+from unipa.unipa_utils import Menu, UnipaInfoItem, UnipaNavItem
+
+
+class TestUnipaModel(TestCase):
+    """
+    ユニットテスト: モデル
+    """
+
+    def setUp(self) -> None:
+        """
+        テストセットアップ
+        """
+        period = UnipaPublicationPeriod(datetime.datetime(2022, 4, 1, 9, 0), None)
+        self.item = UnipaBulletinBoardItem("id", "title", "s", "p", "flag", "unread", False, True, False)
+        self.models: List[UnipaModel] = [
+            self.item,
+            UnipaBulletinBoardItemDetails("id", "title", "author", "category", "<p>content</p>", period),
+            period,
+            UnipaNavItem(Menu("掲示", None), "掲示板", "0_0_0"),
+            Menu("掲示", None),
+            UnipaInfoItem("クラスプロファイル", "funcForm:j_idt1:1:j_idt2"),
+            UnipaClass("internal", "name", None, UnipaClassLectureAt("月曜日", 1)),
+            UnipaClassLectureAt("集中講義", None),
+        ]
+
+    def test_slots(self) -> None:
+        """
+        インスタンスが __dict__ を持たず、公開属性の変更・属性の追加ができないこと
+        """
+        for model in self.models:
+            with self.subTest(type(model).__name__):
+                self.assertFalse(hasattr(model, "__dict__"))
+                names = [x[1:] for x in model.__slots__ if isinstance(getattr(type(model), x[1:], None), property)]
+                self.assertGreater(len(names), 0)
+                for name in names:
+                    with self.assertRaises(AttributeError):
+                        setattr(model, name, None)
+                with self.assertRaises(AttributeError):
+                    setattr(model, "extra", None)
+
+    def test_immutable(self) -> None:
+        """
+        内部属性 (値ではない属性を含む) の代入・削除ができず、ハッシュが変わらないこと
+        """
+        for model in self.models:
+            with self.subTest(type(model).__name__):
+                expected = hash(model)
+                for name in model.__slots__:
+                    with self.assertRaises(AttributeError):
+                        setattr(model, name, None)
+                    with self.assertRaises(AttributeError):
+                        delattr(model, name)
+                self.assertEqual(hash(model), expected)
+
+        with self.assertRaises(AttributeError):
+            self.item._title = "x"
+        self.assertEqual(self.item.title, "title")
+
+    def test_equality(self) -> None:
+        """
+        同じ型・同じ値のモデルは等しく、ハッシュも一致すること。コピー・pickle でも値が保たれること
+        """
+        for model in self.models:
+            with self.subTest(type(model).__name__):
+                for other in (copy.copy(model), copy.deepcopy(model), pickle.loads(pickle.dumps(model))):
+                    self.assertIsNot(other, model)
+                    self.assertEqual(other, model)
+                    self.assertEqual(hash(other), hash(model))
+                self.assertEqual(len({model, copy.copy(model)}), 1)
+
+        self.assertNotEqual(Menu("掲示", None), Menu("掲示", "掲示板"))
+        self.assertNotEqual(UnipaInfoItem("a", "b"), ("a", "b"))
+        self.assertEqual(self.item.title, "title")
+        self.assertTrue(self.item.is_flag)
@@ -0,0 +1,100 @@
+"""
+ユニットテスト: ナビゲーションのレジストリ
+"""
+import os
+import stat
+import tempfile
+from unittest import TestCase
+
+from unipa import Unipa
+from unipa.errors import UnipaInternalError
+from unipa.testing.pages import UnipaPages, UnipaPageTokens
+from unipa.testing.server import UnipaStubApp, UnipaStubServer
+from unipa.unipa_navigation import UnipaNavigation, UnipaNavigationStore
+from unipa.unipa_scanner import UnipaPageScanner
+
+
+class TestUnipaNavigation(TestCase):
+    """
+    ユニットテスト: ナビゲーションのレジストリ
+    """
+
+    # noinspection PyPep8Naming
+    def setUp(self) -> None:
+        """
+        テストセットアップ
+        """
+        self.app = UnipaStubApp(board_size=5)
+        self.server = UnipaStubServer.start(self.app)
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "navigation.json")
+
+    # noinspection PyPep8Naming
+    def tearDown(self) -> None:
+        """
+        テスト後処理
+        """
+        self.server.stop()
+        self.directory.cleanup()
+
+    def test_find(self) -> None:
+        """
+        名前・メニューのパス・menu_id でアイテムを検索できること
+        """
+        markup = UnipaPages.portal(UnipaPageTokens())
+        scan = UnipaPageScanner.scan(markup, True)
+        assert scan.nav_items is not None and scan.info_items is not None
+        navigation = UnipaNavigation(scan.nav_items, scan.info_items)
+
+        item = navigation.get_nav("掲示板")
+        self.assertEqual(item.menu_id, "0_0_0")
+        self.assertIs(navigation.find_nav_by_path("メニュー0", "サブメニュー0-0", "掲示板"), item)
+        self.assertIs(navigation.find_nav_by_menu_id("0_0_0"), item)
+        self.assertEqual(navigation.find_nav_by_menu_id("7_2_5"), navigation.nav_items[-1])
+        self.assertEqual(navigation.get_info("クラスプロファイル"), scan.info_items[1])
+        self.assertIsNone(navigation.find_nav("存在しない"))
+        with self.assertRaises(UnipaInternalError):
+            navigation.get_info("存在しない")
+
+    def test_fingerprint(self) -> None:
+        """
+        フィンガープリントはトークンが変わっても同じで、メニューが変わると変わること
+        """
+        fingerprint = UnipaNavigation.make_fingerprint(UnipaPages.portal(UnipaPageTokens()))
+        self.assertIsNotNone(fingerprint)
+        self.assertEqual(UnipaNavigation.make_fingerprint(
+            UnipaPages.portal(UnipaPageTokens(rx_token="token-2", javax_view_state="3:4"))), fingerprint)
+        self.assertNotEqual(UnipaNavigation.make_fingerprint(
+            UnipaPages.portal(UnipaPageTokens(), menus=9)), fingerprint)
+        self.assertNotEqual(UnipaNavigation.make_fingerprint(
+            UnipaPages.portal(UnipaPageTokens(), info_items=["掲示"])), fingerprint)
+        self.assertIsNone(UnipaNavigation.make_fingerprint(UnipaPages.login("1:2")))
+
+    def test_login(self) -> None:
+        """
+        メニューが変わっていない場合はログイン時にメニューを解析せず、保存したナビゲーションを再利用すること
+        """
+        store = UnipaNavigationStore(self.path)
+        unipa = Unipa(self.server.base_url, navigation_store=store)
+        unipa.login("student", "password")
+        navigation = unipa.get_navigation()
+        self.assertEqual(navigation.get_nav("掲示板").menu_id, "0_0_0")
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o600)
+
+        # ファイルから読み込んだ保存先でも再利用する
+        other = Unipa(self.server.base_url, navigation_store=UnipaNavigationStore(self.path))
+        other.login("student", "password")
+        self.assertEqual(other.get_navigation().fingerprint, navigation.fingerprint)
+        self.assertEqual(other.get_nav_items(), unipa.get_nav_items())
+        self.assertEqual(other.get_info_items(), unipa.get_info_items())
+
+        other = Unipa(self.server.base_url, navigation_store=store)
+        other.login("student", "password")
+        self.assertIs(other.get_navigation(), navigation)
+
+        # メニューが変わった場合は解析しなおす
+        self.app.info_items = ["クラスプロファイル"]
+        self.assertTrue(unipa.check_session())
+        self.assertIsNot(unipa.get_navigation(), navigation)
+        self.assertEqual(unipa.get_navigation().get_info("クラスプロファイル").name, "クラスプロファイル")
+        self.assertIs(store.get(self.server.base_url), unipa.get_navigation())
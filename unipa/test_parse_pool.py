@@ -0,0 +1,108 @@
+"""
+ユニットテスト: 解析用プロセスプール
+"""
+import os
+from typing import List
+from unittest import TestCase
+
+from unipa import Unipa
+from unipa.BulletinBoard import UnipaBulletinBoard
+from unipa.Classes import UnipaClasses
+from unipa.errors import UnipaInternalError
+from unipa.testing.server import UnipaStubApp, UnipaStubServer
+from unipa.unipa_parse_pool import UnipaParsePool
+from unipa.unipa_stats import HOOK_AFTER_PARSE, PHASE_EXTRACTION, PHASE_PARSE
+
+
+class TestUnipaParsePool(TestCase):
+    """
+    ユニットテスト: 解析用プロセスプール
+    """
+
+    parse_pool: UnipaParsePool
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """
+        テストセットアップ (子プロセスの起動は遅いため、テスト全体で共有する)
+        """
+        cls.parse_pool = UnipaParsePool(2, min_size=0)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        """
+        テスト後処理
+        """
+        cls.parse_pool.close()
+
+    # noinspection PyPep8Naming
+    def setUp(self) -> None:
+        """
+        テストセットアップ
+        """
+        self.server = UnipaStubServer.start(UnipaStubApp(board_size=12))
+        self.unipa = Unipa(self.server.base_url)
+        self.assertTrue(self.unipa.login("student", "password"))
+        self.pooled = Unipa(self.server.base_url, parse_pool=self.parse_pool)
+        self.assertTrue(self.pooled.login("student", "password"))
+
+    # noinspection PyPep8Naming
+    def tearDown(self) -> None:
+        """
+        テスト後処理
+        """
+        self.server.stop()
+
+    def test_bulletin_board(self) -> None:
+        """
+        子プロセスで解析した掲示リスト・掲示詳細が、スレッドで解析した結果と一致すること
+        """
+        parsed: List[str] = []
+        self.pooled.hooks.register(HOOK_AFTER_PARSE, lambda stats, soup: parsed.append(HOOK_AFTER_PARSE))
+        submitted = self.parse_pool.submitted
+
+        expected = UnipaBulletinBoard(self.unipa).get_all()
+        items = UnipaBulletinBoard(self.pooled).get_all()
+        self.assertEqual(items, expected)
+        self.assertIs(items[0].unipa, self.pooled)
+        self.assertEqual(parsed, [])
+
+        stats = self.pooled.get_latest_stats()
+        assert stats is not None
+        self.assertGreater(stats.timings[PHASE_PARSE], 0)
+        self.assertGreater(stats.timings[PHASE_EXTRACTION], 0)
+
+        self.assertEqual(items[0].get_details(), expected[0].get_details())
+        self.assertEqual(self.parse_pool.submitted, submitted + 2)
+
+    def test_classes(self) -> None:
+        """
+        子プロセスで解析したクラスが、スレッドで解析した結果と一致すること
+        """
+        self.assertEqual(UnipaClasses(self.pooled).get_all(), UnipaClasses(self.unipa).get_all())
+
+    def test_error(self) -> None:
+        """
+        子プロセスの抽出処理の例外が呼び出し元に伝わること
+        """
+        page = self.pooled.request_page_from_info(self.pooled.get_navigation().get_info("クラスプロファイル"))
+        with self.assertRaises(UnipaInternalError):
+            self.pooled.extract(UnipaBulletinBoard.parse_all, page)
+
+    def test_min_size(self) -> None:
+        """
+        min_size より短いレスポンスは子プロセスに送らないこと
+        """
+        with UnipaParsePool(1, min_size=10 ** 9) as parse_pool:
+            unipa = Unipa(self.server.base_url, parse_pool=parse_pool)
+            self.assertTrue(unipa.login("student", "password"))
+            self.assertEqual(len(UnipaBulletinBoard(unipa).get_all()), 12)
+            self.assertEqual(parse_pool.submitted, 0)
+
+    def test_warm_up(self) -> None:
+        """
+        子プロセスで実行されること
+        """
+        pids = self.parse_pool.warm_up()
+        self.assertEqual(len(pids), 2)
+        self.assertNotIn(os.getpid(), pids)
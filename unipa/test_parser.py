@@ -0,0 +1,98 @@
+"""
+ユニットテスト: HTML パーサーバックエンド
+"""
+import datetime
+from typing import Dict, List
+from unittest import TestCase
+
+from unipa import Unipa, UnipaUtils
+from unipa.BulletinBoard import UnipaBulletinBoard, UnipaBulletinBoardItem
+from unipa.Classes import UnipaClasses
+from unipa.testing.pages import UnipaPages, UnipaPageTokens
+from unipa.unipa_model import UnipaModel
+from unipa.unipa_parser import PARSER_BACKENDS, PARSER_HTML5LIB, PARSER_LXML, UnipaParser
+
+
+def dump(obj: object) -> object:
+    """
+    モデルを比較可能な値に変換する
+    """
+    if isinstance(obj, list):
+        return [dump(x) for x in obj]
+    if isinstance(obj, UnipaModel):
+        return {key: dump(getattr(obj, key)) for key in obj._fields}
+    return obj
+
+
+class TestUnipaParser(TestCase):
+    """
+    ユニットテスト: HTML パーサーバックエンド
+    """
+
+    # noinspection PyPep8Naming
+    def setUp(self) -> None:
+        """
+        テストセットアップ
+        """
+        self.tokens = UnipaPageTokens(rx_token="token-1", javax_view_state="1:2")
+        self.pages: Dict[str, str] = {
+            "portal": UnipaPages.portal(self.tokens),
+            "board": UnipaPages.board(self.tokens, 30),
+            "details": UnipaPages.details(self.tokens),
+            "classes": UnipaPages.class_profile(self.tokens, classes_per_period=2),
+        }
+
+    def extract(self,
+                backend: str) -> List[object]:
+        """
+        すべての抽出処理を実行する
+        """
+        parser = UnipaParser(backend, None)
+        unipa = Unipa("https://unipa.example.com/", backend)
+        unipa.update_token(parser.parse(self.pages["portal"]))
+        token = unipa.get_token()
+        assert token is not None
+
+        board_items = UnipaBulletinBoard.parse_all(parser.parse(self.pages["board"]))
+        item = UnipaBulletinBoardItem("0", "", "s", "p", "", "", False, False, False)
+        return [
+            [token.rx_token, token.rx_login_key, token.rx_device_kbn, token.rx_login_type, token.javax_view_state],
+            dump(UnipaUtils.get_nav_items(parser.parse(self.pages["portal"]))),
+            dump(board_items),
+            dump(item.parse_details(parser.parse(self.pages["details"]))),
+            dump(UnipaClasses.parse_all(parser.parse(self.pages["classes"]))),
+        ]
+
+    def test_backends_equivalent(self) -> None:
+        """
+        すべてのパーサーで抽出結果が一致すること
+        """
+        expected = self.extract(PARSER_HTML5LIB)
+        self.assertEqual(expected[0], ["token-1", "rx-login-key", "1", "Gakuen", "1:2"])
+        self.assertEqual(len(expected[2]), 30)  # type: ignore
+
+        for backend in PARSER_BACKENDS:
+            with self.subTest(backend=backend):
+                self.assertEqual(self.extract(backend), expected)
+
+    def test_details(self) -> None:
+        """
+        掲示詳細の抽出結果
+        """
+        item = UnipaBulletinBoardItem("0", "", "s", "p", "", "", False, False, False)
+        details = item.parse_details(UnipaParser().parse(self.pages["details"]))
+        jst = datetime.timezone(datetime.timedelta(hours=9))
+        self.assertEqual(details.title, "【お知らせ】掲示0")
+        self.assertEqual(details.author, "教務課")
+        self.assertEqual(details.publication_period.start_date, datetime.datetime(2022, 4, 1, 9, 0, tzinfo=jst))
+
+    def test_fallback(self) -> None:
+        """
+        必要な要素が見つからない場合はフォールバック先のパーサーで解析しなおすこと
+        """
+        parser = UnipaParser(PARSER_LXML, PARSER_HTML5LIB)
+        soup = parser.parse(self.pages["portal"], lambda x: False)
+        self.assertEqual(soup.builder.NAME, PARSER_HTML5LIB)
+
+        soup = parser.parse(self.pages["portal"], Unipa.has_header_form)
+        self.assertEqual(soup.builder.NAME, PARSER_LXML)
@@ -0,0 +1,73 @@
+"""
+ユニットテスト: 解析ユーティリティ
+"""
+import datetime
+from unittest import TestCase
+
+from benchmarks.bench_parsing import MENU_COMMAND, ONCLICK, legacy_process_datetime
+from unipa import UnipaUtils, unipa_parsing
+from unipa.unipa_parsing import JST, parse_datetime, process_datetime, process_datetimes
+
+
+class TestUnipaParsing(TestCase):
+    """
+    ユニットテスト: 解析ユーティリティ
+    """
+
+    def setUp(self) -> None:
+        """
+        テストセットアップ
+        """
+        parse_datetime.cache_clear()
+
+    def test_attributes(self) -> None:
+        """
+        メニュー ID と掲示の s, p 値を取得できること
+        """
+        self.assertEqual(unipa_parsing.get_menuid(MENU_COMMAND), "0_0_0")
+        self.assertIsNone(unipa_parsing.get_menuid("return false;"))
+        self.assertEqual(unipa_parsing.get_target_sp(ONCLICK), ("funcForm:tabArea:1:j_idt330:0:j_idt332", "0"))
+        self.assertEqual(unipa_parsing.get_target_sp(""), (None, None))
+        self.assertEqual(UnipaUtils.get_menuid(MENU_COMMAND), "0_0_0")
+
+    def test_process_datetime(self) -> None:
+        """
+        従来の処理と同じ日本時間の datetime.datetime に変換すること
+        """
+        for text in ("2022/04/01(金) 09:00", "2022/4/1 9:00", "2022/04/01 (金)  23:59", "2022/12/31(土) 00:00"):
+            with self.subTest(text=text):
+                result = process_datetime(text)
+                self.assertEqual(result, legacy_process_datetime(text))
+                assert result is not None
+                self.assertEqual(result.tzinfo, JST)
+                self.assertEqual(result.tzname(), "JST")
+
+        self.assertIsNone(process_datetime(None))
+        self.assertIsNone(process_datetime(""))
+        with self.assertRaises(ValueError):
+            process_datetime("2022/04/01")
+        with self.assertRaises(ValueError):
+            process_datetime("2022/13/01(金) 09:00")
+
+    def test_cache(self) -> None:
+        """
+        同じテキストは 1 回だけ変換すること
+        """
+        first = process_datetime("2022/04/01(金) 09:00")
+        self.assertIs(process_datetime("2022/04/01(金) 09:00"), first)
+        info = parse_datetime.cache_info()
+        self.assertEqual((info.hits, info.misses), (1, 1))
+
+    def test_process_datetimes(self) -> None:
+        """
+        まとめて変換でき、結果は入力の順で返ること
+        """
+        texts = ["2022/04/01(金) 09:00", None, "2022/04/30(土) 17:00", "", "2022/04/01(金) 09:00"]
+        results = process_datetimes(texts)
+        self.assertEqual(results, [
+            datetime.datetime(2022, 4, 1, 9, 0, tzinfo=JST), None,
+            datetime.datetime(2022, 4, 30, 17, 0, tzinfo=JST), None,
+            datetime.datetime(2022, 4, 1, 9, 0, tzinfo=JST),
+        ])
+        self.assertEqual(parse_datetime.cache_info().misses, 2)
+        self.assertEqual(UnipaUtils.process_datetimes(texts), results)
@@ -0,0 +1,72 @@
+"""
+ユニットテスト: 部分更新 (JSF partial/ajax) レスポンス
+"""
+from unittest import TestCase
+
+from unipa import Unipa
+from unipa.BulletinBoard import UnipaBulletinBoard
+from unipa.errors import UnipaInternalError
+from unipa.testing.server import UnipaStubApp, UnipaStubServer
+from unipa.unipa_partial import UnipaPartialResponse
+
+
+class TestUnipaPartialResponse(TestCase):
+    """
+    ユニットテスト: 部分更新 (JSF partial/ajax) レスポンス
+    """
+
+    def test_parse(self) -> None:
+        """
+        更新された要素と View state を取得できること
+        """
+        partial = UnipaPartialResponse.parse(
+            b"<?xml version='1.0' encoding='UTF-8'?>\n<partial-response id=\"j_id1\"><changes>"
+            b"<update id=\"funcForm:panel\"><![CDATA[<div id=\"funcForm:panel\">\xe6\x8e\xb2\xe7\xa4\xba</div>]]>"
+            b"</update><update id=\"j_id1:javax.faces.ViewState:0\"><![CDATA[-1:2]]></update>"
+            b"<extension ln=\"primefaces\" type=\"args\">{}</extension></changes></partial-response>"
+        )
+        self.assertEqual(partial.updates, {"funcForm:panel": "<div id=\"funcForm:panel\">掲示</div>"})
+        self.assertEqual(partial.view_state, "-1:2")
+
+        redirect = UnipaPartialResponse.parse(b"<partial-response><redirect url=\"/up/faces/login/\"/>"
+                                              b"</partial-response>")
+        self.assertEqual(redirect.redirect, "/up/faces/login/")
+        error = UnipaPartialResponse.parse(b"<partial-response><error><error-name>ViewExpiredException</error-name>"
+                                           b"<error-message>expired</error-message></error></partial-response>")
+        self.assertEqual(error.error, "ViewExpiredException: expired")
+        with self.assertRaises(UnipaInternalError):
+            UnipaPartialResponse.parse(b"<html><body>Not Found</body></html>")
+
+    def test_get_details(self) -> None:
+        """
+        部分更新で掲示詳細を取得し、View state を更新して続けてリクエストできること
+        """
+        app = UnipaStubApp(board_size=5)
+        server = UnipaStubServer.start(app)
+        try:
+            unipa = Unipa(server.base_url)
+            unipa.login("student", "password")
+            board = UnipaBulletinBoard(unipa)
+
+            # 掲示詳細はアイテムごとにメモ化されるため、取得方法ごとに新しい掲示リストを使う
+            full = board.get_all()[0].get_details(unipa)
+            full_stats = unipa.get_latest_stats()
+            items = board.get_all()
+            requests = app.request_count
+            for item in items:
+                details = item.get_details(unipa, partial=True)
+                self.assertEqual(details.title, item.title)
+                self.assertEqual(details.content_html, full.content_html)
+            self.assertEqual(app.request_count, requests + len(items))
+
+            partial_stats = unipa.get_latest_stats()
+            assert full_stats is not None and partial_stats is not None
+            self.assertLess(partial_stats.response_bytes, full_stats.response_bytes)
+
+            # 部分更新で View state を更新した後も、続けてページ全体をリクエストできること
+            item = board.get_all()[1]
+            requests = app.request_count
+            self.assertEqual(item.get_details(unipa).title, item.title)
+            self.assertEqual(app.request_count, requests + 1)
+        finally:
+            server.stop()
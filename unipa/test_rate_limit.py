@@ -0,0 +1,61 @@
+"""
+ユニットテスト: クライアント側のレートリミッター
+"""
+from unittest import TestCase
+
+from unipa import Unipa
+from unipa.BulletinBoard import UnipaBulletinBoard
+from unipa.testing.server import UnipaStubApp, UnipaStubServer
+from unipa.unipa_rate_limit import RATE_LIMIT_LOGIN, RATE_LIMIT_REQUEST, UnipaRateLimiter, UnipaTokenBucket
+from unipa.unipa_transport import UnipaTransportPolicy
+
+
+class TestUnipaRateLimit(TestCase):
+    """
+    ユニットテスト: クライアント側のレートリミッター
+    """
+
+    def test_token_bucket(self) -> None:
+        """
+        バースト数を超えたリクエストはレートに応じて順に待たされること
+        """
+        bucket = UnipaTokenBucket(rate=10, burst=2)
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertEqual(bucket.reserve(), 0)
+        self.assertAlmostEqual(bucket.reserve(), 0.1, delta=0.02)
+        self.assertAlmostEqual(bucket.reserve(), 0.2, delta=0.02)
+        self.assertEqual(bucket.acquired, 4)
+        self.assertAlmostEqual(bucket.wait_time, 0.3, delta=0.04)
+
+    def test_buckets(self) -> None:
+        """
+        ホストと種類 (ログイン・通常のリクエスト) ごとに別の予算で制限すること
+        """
+        limiter = UnipaRateLimiter(request_rate=1, request_burst=1, login_rate=None)
+        a = limiter.get_bucket("https://a.example.com/up/faces/up/po/Poa00601A.jsf")
+        self.assertIs(limiter.get_bucket("https://a.example.com/up/faces/login/Com00505A.jsf"), a)
+        self.assertIsNot(limiter.get_bucket("https://b.example.com/up/faces/up/po/Poa00601A.jsf"), a)
+        self.assertIsNone(limiter.get_bucket("https://a.example.com/", RATE_LIMIT_LOGIN))
+        self.assertEqual(limiter.acquire("https://a.example.com/", RATE_LIMIT_LOGIN), 0)
+
+    def test_shared(self) -> None:
+        """
+        複数の Unipa で共有したレートリミッターで、待ち時間が計測結果に記録されること
+        """
+        server = UnipaStubServer.start(UnipaStubApp(board_size=5))
+        try:
+            limiter = UnipaRateLimiter(request_rate=20, request_burst=1, login_rate=4, login_burst=1)
+            policy = UnipaTransportPolicy(rate_limiter=limiter)
+            sessions = [Unipa(server.base_url, transport=policy) for _ in range(2)]
+            for unipa in sessions:
+                self.assertTrue(unipa.login("student", "password"))
+            self.assertGreater(limiter.get_wait_time(kind=RATE_LIMIT_LOGIN), 0)
+
+            UnipaBulletinBoard(sessions[0]).get_all()
+            stats = sessions[0].get_latest_stats()
+            self.assertIsNotNone(stats)
+            self.assertGreater(stats.rate_limit_wait, 0)  # type: ignore
+            self.assertGreater(limiter.get_wait_time(host=f"127.0.0.1:{server.server_address[1]}",
+                                                     kind=RATE_LIMIT_REQUEST), 0)
+        finally:
+            server.stop()
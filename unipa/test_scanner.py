@@ -0,0 +1,153 @@
+"""
+ユニットテスト: ページスキャナー
+"""
+import contextlib
+import io
+from unittest import TestCase
+
+from bs4 import BeautifulSoup, Tag
+
+from unipa import Unipa, UnipaToken
+from unipa.testing.pages import UnipaPages, UnipaPageTokens
+from unipa.testing.server import UnipaStubApp, UnipaStubResponse, UnipaStubServer, UnipaStubSession
+from unipa.unipa_scanner import UnipaPageScanner
+from unipa.unipa_utils import UnipaUtils
+
+# 2 つ目の div.infoDetail (DOM からの取得では先頭のみを対象とする)
+DUPLICATE_INFO_DETAIL = "<div class=\"infoDetail\"><div class=\"ui-panel-content\">" \
+                        "<a id=\"funcForm:dup\" class=\"ui-commandlink\"><span class=\"span\">重複</span></a>" \
+                        "</div></div>"
+
+
+class _UnipaDuplicateInfoApp(UnipaStubApp):
+    """
+    #portalCont に div.infoDetail が 2 つある TOP ページを返すスタンドインサーバーの処理
+    """
+
+    def portal(self,
+               session: UnipaStubSession) -> UnipaStubResponse:
+        response = super().portal(session)
+        response.body = response.body.replace("</div></div></form>", "</div>" + DUPLICATE_INFO_DETAIL + "</div></form>")
+        return response
+
+
+class TestUnipaPageScanner(TestCase):
+    """
+    ユニットテスト: ページスキャナー
+    """
+
+    def test_equivalence(self) -> None:
+        """
+        DOM から取得した場合と同じトークン・action 属性・アイテムを取得できること
+        """
+        markup = UnipaPages.portal(UnipaPageTokens(), info_items=["掲示 &", "クラスプロファイル"])
+        soup = BeautifulSoup(markup, "html5lib")
+        scan = UnipaPageScanner.scan(markup, items=True)
+
+        self.assertEqual(scan.token_inputs, UnipaToken.from_soup(soup).get_params())
+        header_form = soup.find("form", {"id": "headerForm"})
+        assert isinstance(header_form, Tag)
+        self.assertEqual(scan.header_action, header_form.get("action"))
+        self.assert_parity(markup)
+
+    def assert_parity(self,
+                      markup: str) -> None:
+        """
+        スキャンしたナビゲーション・インフォメーションアイテムが、DOM から取得した結果と一致すること
+
+        Args:
+            markup: HTML
+        """
+        soup = BeautifulSoup(markup, "html5lib")
+        scan = UnipaPageScanner.scan(markup, items=True)
+
+        nav_items = UnipaUtils.get_nav_items(soup)
+        assert scan.nav_items is not None
+        self.assertEqual([(x.menu.name, x.menu.sub_name, x.name, x.menu_id) for x in scan.nav_items],
+                         [(x.menu.name, x.menu.sub_name, x.name, x.menu_id) for x in nav_items])
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            info_items = UnipaUtils.get_info_items(soup)
+        assert scan.info_items is not None
+        self.assertEqual([(x.name, x.menu_id) for x in scan.info_items], [(x.name, x.menu_id) for x in info_items])
+
+    def test_parity(self) -> None:
+        """
+        スタンドインサーバーのページで、DOM から取得した場合と同じアイテムを取得できること
+        """
+        tokens = UnipaPageTokens()
+        self.assert_parity(UnipaPages.portal(tokens))
+        self.assert_parity(UnipaPages.portal(tokens, menus=1, submenus=1, items=1, info_items=[]))
+        self.assert_parity(UnipaPages.portal(tokens, menus=12, submenus=5, items=10))
+
+        # 取得中の要素と同名の要素が入れ子になっている
+        markup = UnipaPages.portal(tokens)
+        self.assert_parity(markup.replace("<span class=\"span\">掲示</span>",
+                                          "<span class=\"span\">掲<span>示</span>物</span>"))
+        self.assert_parity(markup.replace("<span class=\"ui-menuitem-text\">掲示板</span>",
+                                          "<span class=\"ui-menuitem-text\">掲<span>示</span>板</span>"))
+
+        # #portalCont の外にある div.infoDetail は対象外
+        self.assert_parity(markup.replace("<form id=\"funcForm\"", DUPLICATE_INFO_DETAIL + "<form id=\"funcForm\""))
+
+    def test_mismatch(self) -> None:
+        """
+        DOM から取得した場合と結果が異なりうる構造の場合は、アイテムを取得しないこと
+        """
+        markup = UnipaPages.portal(UnipaPageTokens())
+        for broken in (
+                markup.replace("</div></div></form>", "</div>" + DUPLICATE_INFO_DETAIL + "</div></form>"),
+                markup.replace("<span class=\"span\">掲示</span>", ""),
+                markup.replace("<span class=\"ui-menuitem-text\">掲示板</span>", ""),
+                markup.replace("<h3>サブメニュー0-0</h3>", ""),
+                markup.replace("</div></body>", "<div id=\"menuForm:mainMenu\"></div></div></body>"),
+                markup[:markup.index("</div></div></form>")],
+        ):
+            scan = UnipaPageScanner.scan(broken, items=True)
+            self.assertTrue(scan.has_token)
+            self.assertIsNone(scan.nav_items)
+            self.assertIsNone(scan.info_items)
+
+        server = UnipaStubServer.start(_UnipaDuplicateInfoApp())
+        try:
+            unipa = Unipa(server.base_url)
+            unipa.login("student", "password")
+            self.assertEqual([x.name for x in unipa.get_info_items()], ["掲示", "クラスプロファイル", "アンケート"])
+        finally:
+            server.stop()
+
+    def test_tokens_only(self) -> None:
+        """
+        アイテムを取得しない場合は form#headerForm で走査を打ち切ること
+        """
+        scan = UnipaPageScanner.scan(UnipaPages.portal(UnipaPageTokens()))
+        self.assertTrue(scan.has_token)
+        self.assertEqual(list(scan.actions), ["headerForm"])
+        self.assertIsNone(scan.nav_items)
+        self.assertIsNone(scan.info_items)
+
+        self.assertFalse(UnipaPageScanner.scan(UnipaPages.login()).has_token)
+
+    def test_request_page(self) -> None:
+        """
+        DOM を構築せずにトークンを更新し、DOM は必要になったときに構築すること
+        """
+        server = UnipaStubServer.start(UnipaStubApp())
+        try:
+            unipa = Unipa(server.base_url)
+            unipa.login("student", "password")
+            self.assertEqual(unipa.get_nav_items()[0].name, "掲示板")
+            self.assertEqual(unipa.get_info_items()[1].name, "クラスプロファイル")
+
+            token = unipa.get_token()
+            page = unipa.request_page("TOP", "headerForm", {
+                "rx.sync.source": "headerForm:logo",
+                "headerForm:logo": "",
+            })
+            self.assertFalse(page.is_parsed)
+            self.assertNotEqual(unipa.get_token(), token)
+            self.assertIsNotNone(page.soup.find("div", {"id": "portalCont"}))
+            self.assertTrue(page.is_parsed)
+            self.assertTrue(unipa.check_session())
+        finally:
+            server.stop()
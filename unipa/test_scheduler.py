@@ -0,0 +1,205 @@
+"""
+ユニットテスト: 複数アカウントの定期取得スケジューラー
+"""
+import threading
+import time
+from typing import List
+from unittest import TestCase
+
+from unipa import Unipa
+from unipa.BulletinBoard.BulletinBoard import UnipaBulletinBoardItem
+from unipa.BulletinBoard.BulletinBoardDiff import EVENT_ADDED
+from unipa.BulletinBoard.BulletinBoardStateStore import UnipaBulletinBoardStateStore
+from unipa.errors import UnipaCircuitOpenError, UnipaLoginError
+from unipa.testing.server import UnipaStubApp, UnipaStubServer
+from unipa.unipa_scheduler import UnipaAccount, UnipaBulletinBoardDiffTask, UnipaPollScheduler, \
+    poll_bulletin_board, poll_classes
+
+
+class TestUnipaPollScheduler(TestCase):
+    """
+    ユニットテスト: 複数アカウントの定期取得スケジューラー
+    """
+
+    # noinspection PyPep8Naming
+    def setUp(self) -> None:
+        """
+        テストセットアップ
+        """
+        self.accounts = {f"student{i}": f"password{i}" for i in range(6)}
+        self.app = UnipaStubApp(accounts=self.accounts, board_size=8, menus=1)
+        self.server = UnipaStubServer.start(self.app)
+
+    # noinspection PyPep8Naming
+    def tearDown(self) -> None:
+        """
+        テスト後処理
+        """
+        self.server.stop()
+
+    def add_accounts(self,
+                     scheduler: UnipaPollScheduler) -> None:
+        """
+        すべてのアカウントを登録する
+
+        Args:
+            scheduler: スケジューラー
+        """
+        for username, password in self.accounts.items():
+            scheduler.add_account(username, password)
+
+    def test_run_once(self) -> None:
+        """
+        すべてのアカウントが同時実行数の上限以下で取得され、2 回目はセッションが再利用されること
+        """
+        lock = threading.Lock()
+        running: List[int] = [0, 0]
+        results: List[str] = []
+
+        def task(unipa: Unipa, account: UnipaAccount) -> List[UnipaBulletinBoardItem]:
+            with lock:
+                running[0] += 1
+                running[1] = max(running[1], running[0])
+            try:
+                time.sleep(0.02)
+                return poll_bulletin_board(unipa, account)
+            finally:
+                with lock:
+                    running[0] -= 1
+
+        with UnipaPollScheduler(self.server.base_url, task, max_workers=4, max_concurrency=2,
+                                on_result=lambda account, result: results.append(account.username)) as scheduler:
+            self.add_accounts(scheduler)
+            self.assertEqual(scheduler.run_once(timeout=30), [])
+            self.assertEqual(sorted(results), sorted(self.accounts))
+            self.assertLessEqual(running[1], 2)
+            for account in scheduler.accounts:
+                self.assertEqual(len(account.last_result), 8)  # type: ignore
+                self.assertIsNotNone(account.unipa)
+
+            self.assertEqual(scheduler.run_once(timeout=30), [])
+            metrics = scheduler.get_metrics()
+            self.assertEqual(metrics.completed, 12)
+            self.assertEqual(metrics.logins, 6)
+            self.assertEqual(metrics.running, 0)
+            self.assertEqual(metrics.backlog, 0)
+
+    def test_backoff(self) -> None:
+        """
+        失敗したアカウントのみがバックオフし、ほかのアカウントは通常の間隔で取得されること
+        """
+        errors: List[BaseException] = []
+        with UnipaPollScheduler(self.server.base_url, poll_bulletin_board, interval=100, backoff_base=10,
+                                backoff_max=15, on_error=lambda account, error: errors.append(error)) as scheduler:
+            self.add_accounts(scheduler)
+            broken = scheduler.add_account("student0", "wrong", key="broken")
+
+            failed = scheduler.run_once(timeout=30)
+            self.assertEqual(failed, [broken])
+            self.assertEqual(len(errors), 1)
+            self.assertIsInstance(errors[0], UnipaLoginError)
+            self.assertIsNone(broken.unipa)
+            self.assertEqual(broken.failures, 1)
+            self.assertGreaterEqual(broken.next_run - time.monotonic(), 5 - 1)
+            self.assertLessEqual(broken.next_run - time.monotonic(), 10)
+
+            scheduler.run_once(timeout=30)
+            self.assertEqual(broken.failures, 2)
+            self.assertGreaterEqual(broken.next_run - time.monotonic(), 7.5 - 1)
+            self.assertLessEqual(broken.next_run - time.monotonic(), 15)
+
+            metrics = scheduler.get_metrics()
+            self.assertEqual(metrics.failed, 2)
+            self.assertEqual(metrics.completed, 12)
+            self.assertEqual(metrics.backing_off, 1)
+            self.assertEqual(scheduler.run_pending(), 0)
+
+    def test_expired_session(self) -> None:
+        """
+        セッションが期限切れの場合、ログインしなおして取得すること
+        """
+        with UnipaPollScheduler(self.server.base_url, poll_bulletin_board) as scheduler:
+            self.add_accounts(scheduler)
+            scheduler.run_once(timeout=30)
+            with self.app.lock:
+                self.app.sessions.clear()
+
+            self.assertEqual(scheduler.run_once(timeout=30), [])
+            metrics = scheduler.get_metrics()
+            self.assertEqual(metrics.failed, 0)
+            self.assertEqual(metrics.logins, 12)
+
+    def test_task_error(self) -> None:
+        """
+        セッションの期限切れ以外の失敗ではログインしなおさず、セッションを再利用すること
+        """
+        failures: List[BaseException] = [RuntimeError("状態ストアの例外"), UnipaCircuitOpenError("停止中")]
+
+        def task(unipa: Unipa, account: UnipaAccount) -> object:
+            if account.successes > 0 and len(failures) > 0:
+                raise failures.pop(0)
+            return poll_bulletin_board(unipa, account)
+
+        with UnipaPollScheduler(self.server.base_url, task) as scheduler:
+            account = scheduler.add_account("student0", "password0")
+            scheduler.run_once(timeout=30)
+            unipa = account.unipa
+            self.assertIsNotNone(unipa)
+
+            for error_type in (RuntimeError, UnipaCircuitOpenError):
+                scheduler.run_once(timeout=30)
+                self.assertIsInstance(account.last_error, error_type)
+                self.assertIs(account.unipa, unipa)
+
+            scheduler.run_once(timeout=30)
+            self.assertIs(account.unipa, unipa)
+            self.assertEqual(account.successes, 2)
+            self.assertEqual(scheduler.get_metrics().logins, 1)
+
+    def test_start(self) -> None:
+        """
+        バックグラウンドで、すべてのアカウントが間隔ごとに取得されること
+        """
+        with UnipaPollScheduler(self.server.base_url, poll_classes, interval=0.2, max_concurrency=3) as scheduler:
+            self.add_accounts(scheduler)
+            scheduler.start()
+            time.sleep(1.0)
+            scheduler.stop()
+
+            for account in scheduler.accounts:
+                self.assertGreaterEqual(account.successes, 2, account)
+                self.assertIsNone(account.unipa)
+            metrics = scheduler.get_metrics()
+            self.assertGreater(metrics.throughput, 0)
+            self.assertEqual(metrics.failed, 0)
+
+    def test_remove_account(self) -> None:
+        """
+        登録を解除したアカウントは取得されないこと
+        """
+        with UnipaPollScheduler(self.server.base_url) as scheduler:
+            self.add_accounts(scheduler)
+            removed = scheduler.remove_account(f"{self.server.base_url} student0")
+            self.assertIsNotNone(removed)
+            scheduler.run_once(timeout=30)
+            self.assertEqual(removed.runs, 0)  # type: ignore
+            self.assertEqual(len(scheduler.accounts), 5)
+
+    def test_diff_task(self) -> None:
+        """
+        アカウントごとの状態ストアで掲示板の変化を検出すること
+        """
+        task = UnipaBulletinBoardDiffTask(lambda account: UnipaBulletinBoardStateStore(), fetch_details=False)
+        try:
+            with UnipaPollScheduler(self.server.base_url, task) as scheduler:
+                self.add_accounts(scheduler)
+                scheduler.run_once(timeout=30)
+                for account in scheduler.accounts:
+                    events = account.last_result
+                    self.assertEqual([x.kind for x in events], [EVENT_ADDED] * 8)  # type: ignore
+
+                scheduler.run_once(timeout=30)
+                for account in scheduler.accounts:
+                    self.assertEqual(account.last_result, [])
+        finally:
+            task.close()
@@ -0,0 +1,110 @@
+"""
+ユニットテスト: セッションの保存・復元
+"""
+import os
+import stat
+import tempfile
+from typing import Dict, Optional
+from unittest import TestCase
+
+from unipa import Unipa
+from unipa.BulletinBoard import UnipaBulletinBoard
+from unipa.errors import UnipaLoginError, UnipaSessionExpiredError
+from unipa.testing.pages import UnipaPages
+from unipa.testing.server import UnipaStubApp, UnipaStubResponse, UnipaStubServer
+
+
+class _UnipaLoginFailureApp(UnipaStubApp):
+    """
+    ログインの POST に 500 を返すスタンドインサーバーの処理
+    """
+
+    def handle(self,
+               method: str,
+               path: str,
+               form: Dict[str, str],
+               session_id: Optional[str]) -> UnipaStubResponse:
+        if method == "POST" and path == UnipaPages.LOGIN_ACTION:
+            with self.lock:
+                self.request_count += 1
+            return UnipaStubResponse(500, "<html><body>Internal Server Error</body></html>")
+        return super().handle(method, path, form, session_id)
+
+
+class TestUnipaSession(TestCase):
+    """
+    ユニットテスト: セッションの保存・復元
+    """
+
+    # noinspection PyPep8Naming
+    def setUp(self) -> None:
+        """
+        テストセットアップ
+        """
+        self.app = UnipaStubApp(board_size=5)
+        self.server = UnipaStubServer.start(self.app)
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "session.json")
+
+    # noinspection PyPep8Naming
+    def tearDown(self) -> None:
+        """
+        テスト後処理
+        """
+        self.server.stop()
+        self.directory.cleanup()
+
+    def test_restore(self) -> None:
+        """
+        保存したセッションを 1 リクエストで復元できること
+        """
+        unipa = Unipa(self.server.base_url)
+        self.assertFalse(unipa.restore_session(self.path, "student", "password"))
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o600)
+        UnipaBulletinBoard(unipa).get_all()
+        unipa.save_session(self.path)
+
+        requests = self.app.request_count
+        restored = Unipa(self.server.base_url)
+        self.assertTrue(restored.restore_session(self.path, "student", "password"))
+        self.assertEqual(self.app.request_count, requests + 1)
+        self.assertEqual([x.name for x in restored.get_nav_items()], [x.name for x in unipa.get_nav_items()])
+        self.assertEqual([x.name for x in restored.get_info_items()], [x.name for x in unipa.get_info_items()])
+        self.assertEqual(len(UnipaBulletinBoard(restored).get_all()), 5)
+
+    def test_expired(self) -> None:
+        """
+        セッションが期限切れの場合はログインしなおすこと
+        """
+        unipa = Unipa(self.server.base_url)
+        unipa.restore_session(self.path, "student", "password")
+        self.app.sessions.clear()
+        with self.assertRaises(UnipaSessionExpiredError):
+            UnipaBulletinBoard(unipa).get_all()
+
+        restored = Unipa(self.server.base_url)
+        self.assertFalse(restored.restore_session(self.path, "student", "password"))
+        self.assertTrue(restored.is_logged_in())
+        self.assertEqual(len(UnipaBulletinBoard(restored).get_all()), 5)
+
+        # トークンはリクエストのたびに更新されるため、最後に保存しなおす
+        restored.save_session(self.path)
+        self.assertTrue(Unipa(self.server.base_url).restore_session(self.path, "student", "password"))
+
+    def test_login_failed(self) -> None:
+        """
+        ログインしなおせなかった場合は UnipaLoginError を送出し、セッションを保存しないこと
+        """
+        with self.assertRaises(UnipaLoginError):
+            Unipa(self.server.base_url).restore_session(self.path, "student", "wrong")
+        self.assertFalse(os.path.exists(self.path))
+
+        server = UnipaStubServer.start(_UnipaLoginFailureApp(board_size=5))
+        try:
+            unipa = Unipa(server.base_url)
+            with self.assertRaises(UnipaLoginError):
+                unipa.restore_session(self.path, "student", "password")
+            self.assertFalse(unipa.is_logged_in())
+            self.assertFalse(os.path.exists(self.path))
+        finally:
+            server.stop()
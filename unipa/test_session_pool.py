@@ -0,0 +1,100 @@
+"""
+ユニットテスト: セッションプール
+"""
+import threading
+import time
+from typing import Set
+from unittest import TestCase
+
+from unipa import Unipa
+from unipa.BulletinBoard import UnipaBulletinBoard
+from unipa.BulletinBoard.BulletinBoard import UnipaBulletinBoardItem
+from unipa.BulletinBoard.BulletinBoardItemDetails import UnipaBulletinBoardItemDetails
+from unipa.errors import UnipaInternalError, UnipaLoginError, UnipaNotLoggedIn
+from unipa.testing.server import UnipaStubApp, UnipaStubServer
+from unipa.unipa_session_pool import UnipaSessionPool
+
+
+class TestUnipaSessionPool(TestCase):
+    """
+    ユニットテスト: セッションプール
+    """
+
+    # noinspection PyPep8Naming
+    def setUp(self) -> None:
+        """
+        テストセットアップ
+        """
+        self.app = UnipaStubApp(board_size=24)
+        self.server = UnipaStubServer.start(self.app)
+        self.pool = UnipaSessionPool(self.server.base_url, "student", "password", 3,
+                                     prepare=lambda unipa: UnipaBulletinBoard(unipa).get_all())
+
+    # noinspection PyPep8Naming
+    def tearDown(self) -> None:
+        """
+        テスト後処理
+        """
+        self.pool.close()
+        self.server.stop()
+
+    def test_map(self) -> None:
+        """
+        すべてのセッションに処理が振り分けられ、結果がアイテムの順で返ること
+        """
+        self.pool.login()
+        self.assertEqual(len(self.app.sessions), 3)
+
+        items = UnipaBulletinBoard(self.pool.sessions[0]).get_all()
+        used: Set[int] = set()
+        lock = threading.Lock()
+
+        def get_details(unipa: Unipa, item: UnipaBulletinBoardItem) -> UnipaBulletinBoardItemDetails:
+            with lock:
+                used.add(id(unipa))
+            time.sleep(0.01)
+            return item.get_details(unipa)
+
+        details = list(self.pool.map(get_details, items))
+        self.assertEqual([x.title for x in details], [x.title for x in items])
+        self.assertEqual(len(used), 3)
+
+    def test_lease(self) -> None:
+        """
+        貸し出し中のセッションは他に貸し出されず、ログイン前は貸し出さないこと
+        """
+        with self.assertRaises(UnipaNotLoggedIn):
+            with self.pool.lease():
+                pass
+
+        self.pool.login()
+        with self.pool.lease() as first, self.pool.lease() as second, self.pool.lease() as third:
+            self.assertEqual(len({id(first), id(second), id(third)}), 3)
+            with self.assertRaises(UnipaInternalError):
+                with self.pool.lease(timeout=0.01):
+                    pass
+
+    def test_login_twice(self) -> None:
+        """
+        ログイン済みの場合は再度ログインせず、セッションを重複して貸し出さないこと
+        """
+        self.pool.login()
+        requests = self.app.request_count
+        self.pool.login()
+        self.assertEqual(self.app.request_count, requests)
+        self.assertEqual(len(self.app.sessions), 3)
+        with self.pool.lease(), self.pool.lease(), self.pool.lease():
+            with self.assertRaises(UnipaInternalError):
+                with self.pool.lease(timeout=0.01):
+                    pass
+
+    def test_login_failed(self) -> None:
+        """
+        ログインに失敗した場合はセッションを貸し出さないこと
+        """
+        with UnipaSessionPool(self.server.base_url, "student", "wrong", 2) as pool:
+            with self.assertRaises(UnipaLoginError):
+                pool.login()
+            with self.assertRaises(UnipaNotLoggedIn):
+                with pool.lease(timeout=0.01):
+                    pass
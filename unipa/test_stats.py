@@ -0,0 +1,74 @@
+"""
+ユニットテスト: リクエスト計測とフック
+"""
+from typing import List
+from unittest import TestCase
+
+from unipa import Unipa
+from unipa.BulletinBoard import UnipaBulletinBoard
+from unipa.testing.server import UnipaStubServer
+from unipa.unipa_stats import HOOK_AFTER_EXTRACT, HOOK_AFTER_PARSE, HOOK_AFTER_RESPONSE, HOOK_BEFORE_REQUEST, \
+    PHASE_CONNECT, PHASE_DECODE, PHASE_DOWNLOAD, PHASE_EXTRACTION, PHASE_PARSE, PHASE_SERVER_WAIT, \
+    PHASE_TOKEN_UPDATE, PHASES, UnipaRequestStats
+
+
+class TestUnipaStats(TestCase):
+    """
+    ユニットテスト: リクエスト計測とフック
+    """
+
+    # noinspection PyPep8Naming
+    def setUp(self) -> None:
+        """
+        テストセットアップ
+        """
+        self.server = UnipaStubServer.start()
+        self.unipa = Unipa(self.server.base_url)
+
+    # noinspection PyPep8Naming
+    def tearDown(self) -> None:
+        """
+        テスト後処理
+        """
+        self.server.stop()
+
+    def test_phases(self) -> None:
+        """
+        リクエストごとにすべてのフェーズの所要時間とバイト数が記録されること
+        """
+        events: List[str] = []
+        stats_list: List[UnipaRequestStats] = []
+        self.unipa.hooks.register(HOOK_BEFORE_REQUEST, lambda stats, request: events.append(HOOK_BEFORE_REQUEST))
+        self.unipa.hooks.register(HOOK_AFTER_RESPONSE, lambda stats, response: events.append(HOOK_AFTER_RESPONSE))
+        self.unipa.hooks.register(HOOK_AFTER_PARSE, lambda stats, soup: events.append(HOOK_AFTER_PARSE))
+        self.unipa.hooks.register(HOOK_AFTER_EXTRACT, lambda stats, _: stats_list.append(stats))
+
+        self.assertTrue(self.unipa.login("student", "password"))
+        self.assertEqual(events[:3], [HOOK_BEFORE_REQUEST, HOOK_AFTER_RESPONSE, HOOK_AFTER_PARSE])
+        self.assertEqual(events.count(HOOK_BEFORE_REQUEST), 3)
+
+        UnipaBulletinBoard(self.unipa).get_all()
+        stats = self.unipa.get_latest_stats()
+        assert stats is not None
+        self.assertIs(stats_list[-1], stats)
+        self.assertEqual(stats.request_target, "TOP")
+        self.assertEqual(stats.status_code, 200)
+        self.assertGreater(stats.request_bytes, 0)
+        self.assertGreater(stats.response_bytes, 0)
+        for phase in (PHASE_SERVER_WAIT, PHASE_DOWNLOAD, PHASE_DECODE, PHASE_PARSE, PHASE_TOKEN_UPDATE,
+                      PHASE_EXTRACTION):
+            self.assertGreater(stats.timings[phase], 0, phase)
+        self.assertEqual(set(stats.timings), set(PHASES))
+        self.assertGreaterEqual(stats.timings[PHASE_CONNECT], 0)
+
+    def test_hook_error(self) -> None:
+        """
+        フック内の例外はリクエスト処理に影響しないこと
+        """
+        def fail(*_: object) -> None:
+            raise ValueError("hook")
+
+        self.unipa.hooks.register(HOOK_AFTER_PARSE, fail)
+        with self.assertLogs("unipa.unipa_stats"):
+            self.assertTrue(self.unipa.login("student", "password"))
+        self.unipa.hooks.unregister(HOOK_AFTER_PARSE, fail)
@@ -0,0 +1,77 @@
+"""
+ユニットテスト: スタンドインサーバーの遅延・エラー注入・セッションの期限切れ
+"""
+import time
+from unittest import TestCase
+
+from unipa import Unipa
+from unipa.BulletinBoard import UnipaBulletinBoard
+from unipa.errors import UnipaInternalError
+from unipa.testing.server import UnipaStubApp, UnipaStubServer, percentile
+from unipa.unipa_transport import UnipaTransportPolicy
+
+
+class TestUnipaStubServer(TestCase):
+    """
+    ユニットテスト: スタンドインサーバーの遅延・エラー注入・セッションの期限切れ
+    """
+
+    def test_error_injection(self) -> None:
+        """
+        注入したエラーではトークンが更新されず、同じセッションで続けてリクエストできること
+        """
+        app = UnipaStubApp(board_size=5)
+        server = UnipaStubServer.start(app)
+        try:
+            unipa = Unipa(server.base_url, transport=UnipaTransportPolicy(max_retries=0))
+            unipa.login("student", "password")
+
+            app.error_rate = 1.0
+            with self.assertRaises(UnipaInternalError):
+                UnipaBulletinBoard(unipa).get_all()
+            self.assertEqual(app.error_count, 1)
+
+            app.error_rate = 0.0
+            self.assertEqual(len(UnipaBulletinBoard(unipa).get_all()), 5)
+        finally:
+            server.stop()
+
+    def test_latency(self) -> None:
+        """
+        設定した応答遅延が加わること
+        """
+        server = UnipaStubServer.start(UnipaStubApp(latency=0.05))
+        try:
+            unipa = Unipa(server.base_url)
+            start = time.perf_counter()
+            unipa.login("student", "password")
+            self.assertGreaterEqual(time.perf_counter() - start, 0.05 * 3)
+        finally:
+            server.stop()
+
+    def test_session_ttl(self) -> None:
+        """
+        有効期間を過ぎたセッションは破棄され、ログインしなおす必要があること
+        """
+        app = UnipaStubApp(session_ttl=0.5)
+        server = UnipaStubServer.start(app)
+        try:
+            unipa = Unipa(server.base_url)
+            unipa.login("student", "password")
+            self.assertTrue(unipa.check_session())
+
+            time.sleep(0.7)
+            self.assertFalse(unipa.check_session())
+            self.assertEqual(app.expired_count, 1)
+        finally:
+            server.stop()
+
+    def test_percentile(self) -> None:
+        """
+        パーセンタイルを最近傍順位法で求めること
+        """
+        values = [float(x) for x in range(1, 101)]
+        self.assertEqual(percentile(values, 0.5), 50.0)
+        self.assertEqual(percentile(values, 0.99), 99.0)
+        self.assertEqual(percentile([3.0], 0.99), 3.0)
+        self.assertEqual(percentile([], 0.5), 0.0)
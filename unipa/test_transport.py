@@ -0,0 +1,183 @@
+"""
+ユニットテスト: HTTP 通信のポリシー
+"""
+import time
+from typing import Dict, Optional
+from unittest import TestCase
+
+from unipa import Unipa
+from unipa.BulletinBoard import UnipaBulletinBoard
+from unipa.errors import UnipaCircuitOpenError, UnipaConnectionError, UnipaInternalError, UnipaTimeoutError
+from unipa.testing.server import UnipaStubApp, UnipaStubResponse, UnipaStubServer
+from unipa.unipa_transport import CIRCUIT_CLOSED, CIRCUIT_HALF_OPEN, CIRCUIT_OPEN, UnipaCircuitBreaker, \
+    UnipaTransportPolicy
+
+
+class _UnipaFlakyApp(UnipaStubApp):
+    """
+    指定した回数だけ 503 を返すスタンドインサーバーの処理
+
+    gateway_timeouts を指定した場合は、リクエストを処理した (トークンを更新した) うえで 504 を返す
+    """
+
+    def __init__(self) -> None:
+        super().__init__(board_size=5)
+        self.failures = 0
+        self.gateway_timeouts = 0
+        self.processed = 0
+
+    def handle(self,
+               method: str,
+               path: str,
+               form: Dict[str, str],
+               session_id: Optional[str]) -> UnipaStubResponse:
+        with self.lock:
+            if self.failures > 0:
+                self.failures -= 1
+                self.error_count += 1
+                return UnipaStubResponse(503, "<html><body>Service Unavailable</body></html>")
+        response = super().handle(method, path, form, session_id)
+        with self.lock:
+            self.processed += 1
+            if self.gateway_timeouts > 0:
+                self.gateway_timeouts -= 1
+                return UnipaStubResponse(504, "<html><body>Gateway Timeout</body></html>", response.session_id)
+        return response
+
+
+class TestUnipaTransport(TestCase):
+    """
+    ユニットテスト: HTTP 通信のポリシー
+    """
+
+    # noinspection PyPep8Naming
+    def setUp(self) -> None:
+        """
+        テストセットアップ
+        """
+        self.app = _UnipaFlakyApp()
+        self.server = UnipaStubServer.start(self.app)
+
+    # noinspection PyPep8Naming
+    def tearDown(self) -> None:
+        """
+        テスト後処理
+        """
+        self.server.stop()
+
+    def test_retry(self) -> None:
+        """
+        503 の場合は同じトークンで再送し、トークンの更新が途切れないこと
+        """
+        unipa = Unipa(self.server.base_url, transport=UnipaTransportPolicy(max_retries=2, backoff_base=0.01))
+        unipa.login("student", "password")
+
+        self.app.failures = 2
+        self.assertEqual(len(UnipaBulletinBoard(unipa).get_all()), 5)
+        stats = unipa.get_latest_stats()
+        self.assertIsNotNone(stats)
+        self.assertEqual(stats.retries, 2)  # type: ignore
+        self.assertEqual(self.app.error_count, 2)
+
+        self.app.failures = 3
+        with self.assertRaises(UnipaInternalError):
+            UnipaBulletinBoard(unipa).get_all()
+        self.assertEqual(self.app.failures, 0)
+
+    def test_gateway_timeout(self) -> None:
+        """
+        POST の 504 はサーバーが処理してトークンを更新した可能性があるため再試行せず、GET の 504 は再試行すること
+        """
+        unipa = Unipa(self.server.base_url, transport=UnipaTransportPolicy(max_retries=2, backoff_base=0.01))
+        self.app.gateway_timeouts = 1
+        processed = self.app.processed
+        self.assertTrue(unipa.login("student", "password"))
+        self.assertEqual(self.app.processed, processed + 4)
+
+        self.app.gateway_timeouts = 1
+        processed = self.app.processed
+        with self.assertRaises(UnipaInternalError):
+            UnipaBulletinBoard(unipa).get_all()
+        self.assertEqual(self.app.processed, processed + 1)
+        self.assertEqual(unipa.get_latest_stats().retries, 0)  # type: ignore
+
+    def test_read_timeout(self) -> None:
+        """
+        POST の読み込みタイムアウトはサーバーが処理した可能性があるため再試行しないこと
+        """
+        unipa = Unipa(self.server.base_url, transport=UnipaTransportPolicy(read_timeout=0.1, backoff_base=0.01))
+        unipa.login("student", "password")
+
+        self.app.latency = 0.5
+        requests = self.app.request_count
+        with self.assertRaises(UnipaTimeoutError):
+            UnipaBulletinBoard(unipa).get_all()
+        self.assertEqual(self.app.request_count, requests + 1)
+
+    def test_connection_error(self) -> None:
+        """
+        接続できない場合は再試行したうえで UnipaConnectionError を送出すること
+        """
+        base_url = self.server.base_url
+        self.server.stop()
+        self.server = UnipaStubServer.start(self.app)
+
+        unipa = Unipa(base_url, transport=UnipaTransportPolicy(max_retries=2, backoff_base=0.01))
+        with self.assertRaises(UnipaConnectionError):
+            unipa.login("student", "password")
+        self.assertEqual(unipa.get_latest_stats().retries, 2)  # type: ignore
+
+    def test_circuit_breaker(self) -> None:
+        """
+        連続して失敗するとリクエストを送信せずに失敗し、一定時間後の試行が成功すると元に戻ること
+        """
+        breaker = UnipaCircuitBreaker(failure_threshold=3, reset_timeout=0.2)
+        policy = UnipaTransportPolicy(max_retries=1, backoff_base=0.01, circuit_breaker=breaker)
+        unipa = Unipa(self.server.base_url, transport=policy)
+        unipa.login("student", "password")
+
+        self.app.failures = 3
+        for _ in range(2):
+            with self.assertRaises(UnipaInternalError):
+                UnipaBulletinBoard(unipa).get_all()
+        self.assertEqual(breaker.state, CIRCUIT_OPEN)
+
+        requests = self.app.request_count
+        with self.assertRaises(UnipaCircuitOpenError):
+            UnipaBulletinBoard(unipa).get_all()
+        self.assertEqual(self.app.request_count, requests)
+
+        time.sleep(0.25)
+        self.assertEqual(breaker.state, CIRCUIT_HALF_OPEN)
+        self.assertEqual(len(UnipaBulletinBoard(unipa).get_all()), 5)
+        self.assertEqual(breaker.state, CIRCUIT_CLOSED)
+
+    def test_circuit_breaker_unexpected_error(self) -> None:
+        """
+        half_open の試行が想定外の例外で失敗した場合も open に戻り、一定時間後に再び試行できること
+        """
+        breaker = UnipaCircuitBreaker(failure_threshold=1, reset_timeout=0.2)
+        policy = UnipaTransportPolicy(max_retries=0, circuit_breaker=breaker)
+        unipa = Unipa(self.server.base_url, transport=policy)
+        unipa.login("student", "password")
+
+        self.app.failures = 1
+        with self.assertRaises(UnipaInternalError):
+            UnipaBulletinBoard(unipa).get_all()
+        self.assertEqual(breaker.state, CIRCUIT_OPEN)
+
+        def broken_hook(response: object, **kwargs: object) -> None:
+            raise RuntimeError("broken hook")
+
+        time.sleep(0.25)
+        unipa.session.hooks["response"].append(broken_hook)
+        with self.assertRaises(RuntimeError):
+            UnipaBulletinBoard(unipa).get_all()
+        unipa.session.hooks["response"].remove(broken_hook)
+        self.assertEqual(breaker.state, CIRCUIT_OPEN)
+
+        # フックの例外はサーバーが処理した後に発生するため、トークンが同期しなくなる。ログインしなおして確認する
+        time.sleep(0.25)
+        self.assertTrue(unipa.login("student", "password"))
+        self.assertEqual(breaker.state, CIRCUIT_CLOSED)
+        self.assertEqual(len(UnipaBulletinBoard(unipa).get_all()), 5)
@@ -0,0 +1,6 @@
+"""
+get-unipa テスト支援
+
+実際の UNIVERSAL PASSPORT にアクセスしないテストとベンチマークのため、UNIPA 風の HTML ページ生成 (pages) と
+スタンドインサーバー (server) を提供します。
+"""
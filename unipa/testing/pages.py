@@ -0,0 +1,482 @@
+"""
+UNIPA 風 HTML ページ生成
+
+ベンチマークやオフラインテストのために、get-unipa が解析する範囲の構造を持った HTML を生成します。
+"""
+import datetime
+from html import escape
+from typing import Dict, List, Optional
+
+DAY_OF_WEEKS = "月火水木金土日"
+
+
+class UnipaPageTokens:
+    """
+    生成するページに埋め込むトークン
+    """
+
+    def __init__(self,
+                 rx_token: str = "rx-token-0",
+                 rx_login_key: str = "rx-login-key",
+                 rx_device_kbn: str = "1",
+                 rx_login_type: str = "Gakuen",
+                 javax_view_state: str = "-1234567890:1234567890"):
+        """
+        生成するページに埋め込むトークン コンストラクタ
+
+        Args:
+            rx_token: トークン
+            rx_login_key: ログインキー
+            rx_device_kbn: デバイス区分
+            rx_login_type: ログイン種別
+            javax_view_state: View state
+        """
+        self.rx_token = rx_token
+        self.rx_login_key = rx_login_key
+        self.rx_device_kbn = rx_device_kbn
+        self.rx_login_type = rx_login_type
+        self.javax_view_state = javax_view_state
+
+
+class UnipaPages:
+    """
+    UNIPA 風 HTML ページ生成
+    """
+
+    TOP_ACTION = "/up/faces/up/po/Poa00601A.jsf"
+    BULLETBOARD_ACTION = "/up/faces/up/po/pPoa0202A.jsf"
+    LOGIN_ACTION = "/up/faces/login/Com00501A.jsf"
+
+    def __init__(self) -> None:
+        pass
+
+    @classmethod
+    def login(cls,
+              view_state: str = "-1:-1",
+              error: Optional[str] = None) -> str:
+        """
+        ログインページ
+
+        Args:
+            view_state: View state
+            error: ログインエラーメッセージ (ログイン失敗時のページを生成する場合)
+
+        Returns:
+            str: HTML
+        """
+        error_html = ""
+        if error is not None:
+            error_html = "<div class=\"ui-messages-error ui-corner-all\">" \
+                         f"<span class=\"ui-messages-error-detail\">{escape(error)}</span></div>"
+        return cls._document(
+            "ログイン",
+            f"<form id=\"loginForm\" name=\"loginForm\" method=\"post\" action=\"{cls.LOGIN_ACTION}\" "
+            "enctype=\"application/x-www-form-urlencoded\">"
+            "<input type=\"hidden\" name=\"loginForm\" value=\"loginForm\" />"
+            f"{error_html}"
+            "<input id=\"loginForm:userId\" name=\"loginForm:userId\" type=\"text\" value=\"\" />"
+            "<input id=\"loginForm:password\" name=\"loginForm:password\" type=\"password\" value=\"\" />"
+            "<button id=\"loginForm:loginButton\" name=\"loginForm:loginButton\" type=\"submit\">"
+            "<span class=\"ui-button-text\">ログイン</span></button>"
+            "<input type=\"hidden\" name=\"javax.faces.ViewState\" id=\"j_id1:javax.faces.ViewState:0\" "
+            f"value=\"{escape(view_state)}\" autocomplete=\"off\" />"
+            "</form>"
+        )
+
+    @classmethod
+    def portal(cls,
+               tokens: UnipaPageTokens,
+               menus: int = 8,
+               submenus: int = 3,
+               items: int = 6,
+               info_items: Optional[List[str]] = None,
+               action: Optional[str] = None) -> str:
+        """
+        TOP ページ (ポータル)
+
+        Args:
+            tokens: トークン
+            menus: メニュー数
+            submenus: メニューごとのサブメニュー数
+            items: サブメニューごとのアイテム数
+            info_items: インフォメーションアイテム名 (None の場合は既定値)
+            action: headerForm の action 属性値 (None の場合は TOP)
+
+        Returns:
+            str: HTML
+        """
+        if info_items is None:
+            info_items = ["掲示", "クラスプロファイル", "アンケート"]
+
+        infos = []
+        for index, name in enumerate(info_items):
+            infos.append(
+                "<div class=\"ui-panel ui-widget\"><div class=\"ui-panel-content ui-widget-content\">"
+                f"<a id=\"funcForm:j_idt{index}:0:j_idt{index + 100}\" href=\"#\" class=\"ui-commandlink "
+                f"ui-widget\" onclick=\"PrimeFaces.ab({{s:&quot;funcForm:j_idt{index}&quot;}});return false;\">"
+                f"<span class=\"span\">{escape(name)}</span></a></div></div>"
+            )
+
+        return cls._document(
+            "ポータル",
+            cls._header_form(tokens, action or cls.TOP_ACTION) +
+            cls.menu(menus, submenus, items) +
+            "<form id=\"funcForm\" name=\"funcForm\" method=\"post\" action=\"" + (action or cls.TOP_ACTION) + "\">"
+            "<div id=\"portalCont\"><div class=\"infoDetail\">" + "".join(infos) + "</div></div></form>"
+        )
+
+    @classmethod
+    def menu(cls,
+             menus: int = 8,
+             submenus: int = 3,
+             items: int = 6) -> str:
+        """
+        メガメニュー (form#menuForm)
+
+        先頭メニューの先頭サブメニューには「掲示板」と「クラスプロファイル」が含まれます。
+
+        Args:
+            menus: メニュー数
+            submenus: メニューごとのサブメニュー数
+            items: サブメニューごとのアイテム数
+
+        Returns:
+            str: HTML
+        """
+        menu_html = []
+        for menu_index in range(menus):
+            tds = []
+            for submenu_index in range(submenus):
+                lis = [f"<li class=\"ui-widget-header\"><h3>サブメニュー{menu_index}-{submenu_index}</h3></li>"]
+                for item_index in range(items):
+                    name = f"アイテム{menu_index}-{submenu_index}-{item_index}"
+                    if menu_index == 0 and submenu_index == 0 and item_index == 0:
+                        name = "掲示板"
+                    elif menu_index == 0 and submenu_index == 0 and item_index == 1:
+                        name = "クラスプロファイル"
+                    menu_id = f"{menu_index}_{submenu_index}_{item_index}"
+                    lis.append(
+                        "<li class=\"ui-menuitem ui-widget ui-corner-all\" role=\"menuitem\">"
+                        "<a class=\"ui-menuitem-link ui-corner-all\" href=\"#\" "
+                        "data-pfconfirmcommand=\"PrimeFaces.ab({s:&quot;menuForm:mainMenu&quot;,"
+                        f"f:&quot;menuForm&quot;,pa:[{{name:'menuForm:mainMenu_menuid':'{menu_id}'}}]}});"
+                        f"return false;\" onclick=\"return false;\"><span class=\"ui-menuitem-text\">{name}</span>"
+                        "</a></li>"
+                    )
+                # 確認ダイアログを伴わないリンク (data-pfconfirmcommand を持たない) は取得対象外
+                lis.append("<li class=\"ui-menuitem ui-widget ui-corner-all\" role=\"menuitem\">"
+                           "<a class=\"ui-menuitem-link ui-corner-all\" href=\"#\">"
+                           "<span class=\"ui-menuitem-text\">外部リンク</span></a></li>")
+                tds.append("<td><ul class=\"ui-menu-list ui-helper-reset\">" + "".join(lis) + "</ul></td>")
+
+            menu_html.append(
+                "<li class=\"ui-widget ui-menuitem ui-corner-all ui-menu-parent\" role=\"menuitem\">"
+                "<a href=\"#\" class=\"ui-menuitem-link ui-submenu-link ui-corner-all\">"
+                f"<span class=\"ui-menuitem-text\">メニュー{menu_index}</span></a>"
+                "<ul class=\"ui-menu-list ui-menu-child ui-widget-content ui-corner-all\"><li>"
+                "<table><tbody><tr>" + "".join(tds) + "</tr></tbody></table></li></ul></li>"
+            )
+
+        return "<form id=\"menuForm\" name=\"menuForm\" method=\"post\" action=\"" + cls.TOP_ACTION + "\">" \
+               "<div id=\"menuForm:mainMenu\" class=\"ui-menu ui-menubar ui-megamenu ui-widget\" role=\"menubar\">" \
+               "<ul class=\"ui-menu-list ui-helper-reset\">" + "".join(menu_html) + "</ul></div></form>"
+
+    @classmethod
+    def board_item(cls,
+                   index: int,
+                   title: str,
+                   is_attention: bool = False,
+                   is_flag: bool = False,
+                   is_unread: bool = True) -> str:
+        """
+        掲示板の掲示アイテム (div.alignRight)
+
+        Args:
+            index: 掲示の表示順
+            title: 掲示タイトル
+            is_attention: 注目フラグ
+            is_flag: フラグ (UNIPA の表示に合わせ、checked がない状態をフラグありとする)
+            is_unread: 未読か
+
+        Returns:
+            str: HTML
+        """
+        target_s = f"funcForm:tabArea:1:j_idt330:{index}:j_idt332"
+        target_p = "funcForm:tabArea:1:j_idt330:" + str(index) + ":j_idt332"
+        attention = "<i class=\"pi pi-exclamation-circle iconColorAttention\"></i>" if is_attention else ""
+        flag_checked = "" if is_flag else " checked=\"checked\""
+        unread_checked = " checked=\"checked\"" if is_unread else ""
+        return (
+            "<div class=\"alignRight\">"
+            f"{attention}"
+            f"<a id=\"funcForm:tabArea:1:j_idt330:{index}:keiji\" href=\"#\" class=\"ui-commandlink ui-widget\" "
+            f"onclick=\"PrimeFaces.ab({{s:&quot;{target_s}&quot;,p:&quot;{target_p}&quot;}});return false;\">"
+            f"{escape(title)}</a>"
+            "<span class=\"inlineBlock\">"
+            "<div class=\"ui-chkbox ui-widget\" type=\"button\">"
+            f"<input id=\"funcForm:tabArea:1:j_idt330:{index}:flag\" "
+            f"name=\"funcForm:tabArea:1:j_idt330:{index}:flag\" type=\"checkbox\"{flag_checked} /></div>"
+            "<div class=\"ui-chkbox ui-widget\" type=\"button\">"
+            f"<input id=\"funcForm:tabArea:1:j_idt330:{index}:unread\" "
+            f"name=\"funcForm:tabArea:1:j_idt330:{index}:unread\" type=\"checkbox\"{unread_checked} /></div>"
+            "</span></div>"
+        )
+
+    @classmethod
+    def board_items(cls,
+                    count: int) -> List[str]:
+        """
+        掲示アイテム群を生成する
+
+        注目・フラグ・未読の状態や、同一タイトルの掲示を適度に含みます。
+
+        Args:
+            count: 掲示数
+
+        Returns:
+            List[str]: 掲示アイテムの HTML
+        """
+        return [
+            cls.board_item(
+                index,
+                cls.board_title(index),
+                is_attention=index % 7 == 0,
+                is_flag=index % 5 == 0,
+                is_unread=index % 3 != 0,
+            )
+            for index in range(count)
+        ]
+
+    @staticmethod
+    def board_title(index: int) -> str:
+        """
+        board_items で生成する掲示のタイトル (10 件に 1 件は既存の掲示と同じタイトルになる)
+
+        Args:
+            index: 掲示の表示順
+
+        Returns:
+            str: 掲示タイトル
+        """
+        return f"【お知らせ】掲示{index // 2 if index % 10 == 9 else index}"
+
+    @classmethod
+    def board(cls,
+              tokens: UnipaPageTokens,
+              count: int = 100,
+              items: Optional[List[str]] = None) -> str:
+        """
+        掲示板ページ
+
+        タブパネルは「未読」「全表示」「フラグ」の順で、掲示アイテムは全表示タブ (2 番目) に含まれます。
+
+        Args:
+            tokens: トークン
+            count: 掲示数 (items を指定しない場合)
+            items: 掲示アイテムの HTML (board_item で生成したもの)
+
+        Returns:
+            str: HTML
+        """
+        if items is None:
+            items = cls.board_items(count)
+
+        unread_panel = "<div class=\"ui-scrollpanel\">" + "".join(items[:3]) + "</div>"
+        all_panel = "<div class=\"ui-scrollpanel\">" + "".join(items) + "</div>"
+        return cls._document(
+            "掲示板",
+            cls._header_form(tokens, cls.BULLETBOARD_ACTION) +
+            cls.menu(2, 1, 2) +
+            "<form id=\"funcForm\" name=\"funcForm\" method=\"post\" action=\"" + cls.BULLETBOARD_ACTION + "\">"
+            "<div id=\"funcForm:tabArea\" class=\"ui-tabs ui-widget\">"
+            "<ul class=\"ui-tabs-nav\"><li>未読</li><li>全表示</li><li>フラグ</li></ul>"
+            "<div class=\"ui-tabs-panels\">"
+            f"<div id=\"funcForm:tabArea:0\" class=\"ui-tabs-panel\" role=\"tabpanel\">{unread_panel}</div>"
+            f"<div id=\"funcForm:tabArea:1\" class=\"ui-tabs-panel\" role=\"tabpanel\">{all_panel}</div>"
+            "<div id=\"funcForm:tabArea:2\" class=\"ui-tabs-panel\" role=\"tabpanel\">"
+            "<div class=\"ui-scrollpanel\"></div></div>"
+            "</div></div></form>"
+        )
+
+    @classmethod
+    def details(cls,
+                tokens: UnipaPageTokens,
+                title: str = "【お知らせ】掲示0",
+                author: str = "教務課",
+                category: str = "授業",
+                content_html: str = "<p>本文です。<br />詳細は<a href=\"https://example.com/\">こちら</a></p>",
+                start_date: Optional[datetime.datetime] = None,
+                end_date: Optional[datetime.datetime] = None,
+                paragraphs: int = 1) -> str:
+        """
+        掲示詳細ページ
+
+        Args:
+            tokens: トークン
+            title: 掲示タイトル
+            author: 差出人
+            category: カテゴリ
+            content_html: 本文 HTML
+            start_date: 公開開始日
+            end_date: 公開終了日
+            paragraphs: 本文の繰り返し回数
+
+        Returns:
+            str: HTML
+        """
+        return cls._document(
+            "掲示詳細",
+            cls._header_form(tokens, cls.BULLETBOARD_ACTION) +
+            cls.details_form(title, author, category, content_html, start_date, end_date, paragraphs)
+        )
+
+    @classmethod
+    def details_form(cls,
+                     title: str = "【お知らせ】掲示0",
+                     author: str = "教務課",
+                     category: str = "授業",
+                     content_html: str = "<p>本文です。<br />詳細は<a href=\"https://example.com/\">こちら</a></p>",
+                     start_date: Optional[datetime.datetime] = None,
+                     end_date: Optional[datetime.datetime] = None,
+                     paragraphs: int = 1) -> str:
+        """
+        掲示詳細ページの form#funcForm (部分更新で返す要素)
+
+        Args:
+            title: 掲示タイトル
+            author: 差出人
+            category: カテゴリ
+            content_html: 本文 HTML
+            start_date: 公開開始日
+            end_date: 公開終了日
+            paragraphs: 本文の繰り返し回数
+
+        Returns:
+            str: HTML
+        """
+        if start_date is None:
+            start_date = datetime.datetime(2022, 4, 1, 9, 0)
+        if end_date is None:
+            end_date = datetime.datetime(2022, 4, 30, 23, 59)
+
+        return (
+            "<form id=\"funcForm\" name=\"funcForm\" method=\"post\" action=\"" + cls.BULLETBOARD_ACTION + "\">"
+            "<div id=\"funcForm:j_idt400\" class=\"ui-outputpanel ui-widget\">"
+            "<table class=\"singleTable\"><tbody>"
+            f"<tr><td class=\"label\">件名</td><td>{escape(title)}</td></tr>"
+            f"<tr><td class=\"label\">差出人</td><td>{escape(author)}</td></tr>"
+            f"<tr><td class=\"label\">カテゴリ</td><td>{escape(category)}</td></tr>"
+            f"<tr><td class=\"label\">本文</td><td>{content_html * paragraphs}</td></tr>"
+            "<tr><td class=\"label\">掲示期間</td><td>"
+            f"<span>{cls.format_datetime(start_date)}</span><span>～</span>"
+            f"<span>{cls.format_datetime(end_date)}</span></td></tr>"
+            "<tr><td colspan=\"2\">添付ファイルはありません</td></tr>"
+            "</tbody></table></div></form>"
+        )
+
+    @staticmethod
+    def partial_response(updates: Dict[str, str],
+                         view_state: Optional[str] = None) -> str:
+        """
+        JSF の部分更新レスポンス (partial-response)
+
+        Args:
+            updates: 更新する要素 (要素 ID: HTML)
+            view_state: 新しい View state (None の場合は含めない)
+
+        Returns:
+            str: XML
+        """
+        changes = [f"<update id=\"{escape(element_id)}\"><![CDATA[{markup}]]></update>"
+                   for element_id, markup in updates.items()]
+        if view_state is not None:
+            changes.append(f"<update id=\"j_id1:javax.faces.ViewState:0\"><![CDATA[{view_state}]]></update>")
+        return "<?xml version='1.0' encoding='UTF-8'?>\n" \
+               "<partial-response id=\"j_id1\"><changes>" + "".join(changes) + "</changes></partial-response>"
+
+    @classmethod
+    def class_profile(cls,
+                      tokens: UnipaPageTokens,
+                      days: int = 6,
+                      periods: int = 7,
+                      classes_per_period: int = 1) -> str:
+        """
+        クラスプロファイルページ
+
+        Args:
+            tokens: トークン
+            days: 曜日数
+            periods: 曜日ごとの時限数
+            classes_per_period: 時限ごとのクラス数
+
+        Returns:
+            str: HTML
+        """
+        yobi = []
+        for day in range(days):
+            jigens = []
+            for period in range(periods):
+                class_html = []
+                for index in range(classes_per_period):
+                    class_id = f"A{day}{period}{index:02d}"
+                    class_html.append(
+                        f"<div id=\"funcForm:j_idt{day}{period}{index}\" class=\"ui-outputpanel ui-widget\">"
+                        f"<a id=\"funcForm:yobi:{day}:jigen:{period}:class:{index}\" href=\"#\" "
+                        f"class=\"ui-commandlink ui-widget\">授業{day}-{period}-{index}</a>"
+                        f"<span>({class_id})</span></div>"
+                    )
+                jigens.append(
+                    f"<div class=\"classJigen\">{period + 1}限</div>"
+                    "<div class=\"classList\">" + "".join(class_html) + "</div>"
+                )
+            yobi.append(
+                "<div class=\"ui-panel ui-widget yobiContArea\">"
+                f"<div class=\"ui-panel-titlebar\"><span class=\"ui-panel-title\">{DAY_OF_WEEKS[day]}曜日</span></div>"
+                "<div class=\"ui-panel-content\">" + "".join(jigens) + "</div></div>"
+            )
+
+        return cls._document(
+            "クラスプロファイル",
+            cls._header_form(tokens, cls.TOP_ACTION) +
+            "<form id=\"funcForm\" name=\"funcForm\" method=\"post\" action=\"" + cls.TOP_ACTION + "\">" +
+            "".join(yobi) + "</form>"
+        )
+
+    @staticmethod
+    def format_datetime(dt: datetime.datetime) -> str:
+        """
+        UNIPA の日時テキスト (YYYY/MM/DD(曜) HH:MM) に変換する
+
+        Args:
+            dt: 日時
+
+        Returns:
+            str: UNIPA の日時テキスト
+        """
+        return dt.strftime("%Y/%m/%d(DAYOFWEEK) %H:%M").replace("DAYOFWEEK", DAY_OF_WEEKS[dt.weekday()])
+
+    @staticmethod
+    def _header_form(tokens: UnipaPageTokens,
+                     action: str) -> str:
+        return (
+            f"<form id=\"headerForm\" name=\"headerForm\" method=\"post\" action=\"{action}\">"
+            "<input type=\"hidden\" name=\"headerForm\" value=\"headerForm\" />"
+            "<a id=\"headerForm:logo\" href=\"#\" class=\"ui-commandlink ui-widget\">UNIVERSAL PASSPORT</a>"
+            f"<input type=\"hidden\" name=\"rx-token\" value=\"{escape(tokens.rx_token)}\" />"
+            f"<input type=\"hidden\" name=\"rx-loginKey\" value=\"{escape(tokens.rx_login_key)}\" />"
+            f"<input type=\"hidden\" name=\"rx-deviceKbn\" value=\"{escape(tokens.rx_device_kbn)}\" />"
+            f"<input type=\"hidden\" name=\"rx-loginType\" value=\"{escape(tokens.rx_login_type)}\" />"
+            "<input type=\"hidden\" name=\"javax.faces.ViewState\" id=\"j_id1:javax.faces.ViewState:0\" "
+            f"value=\"{escape(tokens.javax_view_state)}\" autocomplete=\"off\" />"
+            "</form>"
+        )
+
+    @staticmethod
+    def _document(title: str,
+                  body: str) -> str:
+        return (
+            "<!DOCTYPE html>\n<html xmlns=\"http://www.w3.org/1999/xhtml\"><head>"
+            "<meta http-equiv=\"Content-Type\" content=\"text/html; charset=UTF-8\" />"
+            f"<title>{escape(title)} | UNIVERSAL PASSPORT</title></head>"
+            f"<body><div id=\"wrapper\">{body}</div></body></html>"
+        )
@@ -0,0 +1,430 @@
+"""
+UNIPA スタンドインサーバー
+
+get-unipa が利用する範囲の UNIPA をローカルで再現します。オフラインテストやベンチマークのために利用します。
+
+- GET: ログインページ
+- POST (ログインフォーム): ログイン
+- POST (TOP): headerForm (TOP ページ), menuForm (メニュー), funcForm (インフォメーション)
+- POST (掲示板): funcForm (掲示詳細。javax.faces.partial.ajax=true の場合は部分更新レスポンス)
+
+レスポンスごとに rx-token と javax.faces.ViewState を更新し、古い rx-token でのリクエストはエラーにします。
+部分更新レスポンスでは form#headerForm を返さないため、javax.faces.ViewState のみ更新します。
+
+負荷試験のため、応答遅延 (latency, latency_jitter)、エラーの注入 (error_rate) とセッションの期限切れ (session_ttl) を
+設定できます。注入したエラーではトークンを更新しないため、クライアントは同じトークンで再送できます。
+期限切れのセッションは破棄され、次のリクエストにはログインページを返します。
+"""
+import random
+import re
+import secrets
+import threading
+import time
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, urlparse
+
+from unipa.testing.pages import UnipaPages, UnipaPageTokens
+
+SESSION_COOKIE = "JSESSIONID"
+BULLETBOARD_MENU_ID = "0_0_0"
+CLASS_PROFILE_INFO_INDEX = 1
+
+
+class UnipaStubResponse:
+    """
+    スタンドインサーバーのレスポンス
+    """
+
+    def __init__(self,
+                 status: int,
+                 body: str,
+                 session_id: Optional[str] = None,
+                 content_type: str = "text/html; charset=UTF-8"):
+        """
+        スタンドインサーバーのレスポンス コンストラクタ
+
+        Args:
+            status: ステータスコード
+            body: レスポンス本文
+            session_id: 新しく発行したセッション ID
+            content_type: Content-Type
+        """
+        self.status = status
+        self.body = body
+        self.session_id = session_id
+        self.content_type = content_type
+
+
+class UnipaStubSession:
+    """
+    スタンドインサーバーのセッション
+    """
+
+    def __init__(self,
+                 session_id: str):
+        self.session_id = session_id
+        self.username: Optional[str] = None
+        self.tenant: Optional[str] = None
+        self.rx_token = ""
+        self.view_states: List[str] = []
+        self.requests = 0
+        self.last_access = time.monotonic()
+        self.lock = threading.Lock()
+
+
+class UnipaStubApp:
+    """
+    スタンドインサーバーの処理 (HTTP サーバーから独立)
+    """
+
+    def __init__(self,
+                 accounts: Optional[Dict[str, str]] = None,
+                 board_size: int = 30,
+                 latency: float = 0.0,
+                 latency_jitter: float = 0.0,
+                 error_rate: float = 0.0,
+                 error_status: int = 503,
+                 session_ttl: Optional[float] = None,
+                 seed: Optional[int] = None,
+                 info_items: Optional[List[str]] = None,
+                 tenants: bool = False,
+                 menus: int = 8):
+        """
+        スタンドインサーバーの処理 コンストラクタ
+
+        Args:
+            accounts: ログイン可能なアカウント (ユーザー名: パスワード)
+            board_size: 掲示板の掲示数
+            latency: 応答遅延 (秒)
+            latency_jitter: 応答遅延に加えるランダムな揺らぎの最大値 (秒)
+            error_rate: エラーを返す割合 (0.0 - 1.0)
+            error_status: 注入するエラーのステータスコード
+            session_ttl: 最後のリクエストからセッションが期限切れになるまでの秒数 (None の場合は期限切れにしない)
+            seed: 遅延・エラー注入に利用する乱数のシード
+            info_items: TOP ページのインフォメーションアイテム名 (None の場合は既定値。途中で変更できる)
+            tenants: パスの /up/ より前の部分 (例: /tenant-1) をテナント (大学) として扱うか。
+                テナントごとにフォームの action 属性が異なり、ほかのテナントの URL へのリクエストはエラーになる
+            menus: TOP ページのメニュー数
+        """
+        self.accounts = accounts if accounts is not None else {"student": "password"}
+        self.board_size = board_size
+        self.board_items = UnipaPages.board_items(board_size)
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.session_ttl = session_ttl
+        self.random = random.Random(seed)
+        self.info_items = info_items
+        self.tenants = tenants
+        self.menus = menus
+        self.sessions: Dict[str, UnipaStubSession] = {}
+        self.lock = threading.Lock()
+        self.request_count = 0
+        self.error_count = 0
+        self.expired_count = 0
+
+    def handle(self,
+               method: str,
+               path: str,
+               form: Dict[str, str],
+               session_id: Optional[str]) -> UnipaStubResponse:
+        """
+        リクエストを処理する
+
+        Args:
+            method: HTTP メソッド
+            path: パス
+            form: フォームデータ
+            session_id: Cookie のセッション ID
+
+        Returns:
+            UnipaStubResponse: レスポンス
+        """
+        with self.lock:
+            self.request_count += 1
+            delay = self.latency
+            if self.latency_jitter > 0:
+                delay += self.random.uniform(0, self.latency_jitter)
+            inject_error = self.error_rate > 0 and self.random.random() < self.error_rate
+            if inject_error:
+                self.error_count += 1
+
+            now = time.monotonic()
+            session = self.sessions.get(session_id or "")
+            if session is not None and self.session_ttl is not None and now - session.last_access > self.session_ttl:
+                del self.sessions[session.session_id]
+                self.expired_count += 1
+                session = None
+            new_session_id = None
+            if session is None:
+                new_session_id = secrets.token_hex(16)
+                session = UnipaStubSession(new_session_id)
+                self.sessions[new_session_id] = session
+            session.last_access = now
+
+        if delay > 0:
+            # 遅延はロックの外で待ち、並列のリクエストを妨げない
+            time.sleep(delay)
+
+        if inject_error:
+            return UnipaStubResponse(self.error_status, "<html><body>Service Unavailable</body></html>",
+                                     new_session_id)
+
+        path = urlparse(path).path
+        tenant = ""
+        if self.tenants:
+            tenant, separator, rest = path.partition("/up/")
+            path = separator + rest if separator != "" else "/"
+            tenant = tenant.rstrip("/")
+
+        with session.lock:
+            session.requests += 1
+            if session.tenant is not None and session.tenant != tenant:
+                response = UnipaStubResponse(500, "<html><body>Wrong tenant</body></html>")
+            else:
+                session.tenant = tenant
+                response = self.route(session, method, path, form)
+                if tenant != "":
+                    response.body = response.body.replace("action=\"/up/", f"action=\"{tenant}/up/")
+        response.session_id = new_session_id
+        return response
+
+    def expire_sessions(self) -> int:
+        """
+        すべてのセッションを期限切れにする
+
+        Returns:
+            int: 期限切れにしたセッション数
+        """
+        with self.lock:
+            count = len(self.sessions)
+            self.sessions.clear()
+            self.expired_count += count
+        return count
+
+    def route(self,
+              session: UnipaStubSession,
+              method: str,
+              path: str,
+              form: Dict[str, str]) -> UnipaStubResponse:
+        """
+        リクエストをページごとの処理に振り分ける
+        """
+        if method == "GET":
+            return UnipaStubResponse(200, UnipaPages.login(self.next_view_state(session)))
+
+        if path == UnipaPages.LOGIN_ACTION:
+            return self.login(session, form)
+
+        if session.username is None:
+            # ログインしていない場合はログインページに戻される
+            return UnipaStubResponse(200, UnipaPages.login(self.next_view_state(session)))
+
+        if form.get("rx-token") != session.rx_token or form.get("javax.faces.ViewState") not in session.view_states:
+            return UnipaStubResponse(500, "<html><body>Invalid token</body></html>")
+
+        if path == UnipaPages.TOP_ACTION:
+            if "menuForm" in form:
+                if form.get("menuForm:mainMenu_menuid") == BULLETBOARD_MENU_ID:
+                    return UnipaStubResponse(200, UnipaPages.board(self.next_tokens(session), items=self.board_items))
+                return self.portal(session)
+            if "funcForm" in form:
+                source = form.get("rx.sync.source", "")
+                if source.startswith(f"funcForm:j_idt{CLASS_PROFILE_INFO_INDEX}:"):
+                    return UnipaStubResponse(200, UnipaPages.class_profile(self.next_tokens(session)))
+            return self.portal(session)
+
+        if path == UnipaPages.BULLETBOARD_ACTION:
+            match = re.search(r":(\d+):[^:]+$", form.get("javax.faces.source", ""))
+            if match is None or int(match.group(1)) >= self.board_size:
+                return UnipaStubResponse(500, "<html><body>Unknown item</body></html>")
+            title = UnipaPages.board_title(int(match.group(1)))
+            if form.get("javax.faces.partial.ajax") == "true":
+                updates = {}
+                if "funcForm" in form.get("javax.faces.partial.render", "").split():
+                    updates["funcForm"] = UnipaPages.details_form(title=title)
+                return UnipaStubResponse(200, UnipaPages.partial_response(updates, self.next_view_state(session)),
+                                         content_type="text/xml; charset=UTF-8")
+            return UnipaStubResponse(200, UnipaPages.details(self.next_tokens(session), title=title))
+
+        return UnipaStubResponse(404, "<html><body>Not Found</body></html>")
+
+    def login(self,
+              session: UnipaStubSession,
+              form: Dict[str, str]) -> UnipaStubResponse:
+        """
+        ログイン処理
+        """
+        username = form.get("loginForm:userId", "")
+        if form.get("javax.faces.ViewState") not in session.view_states or \
+                self.accounts.get(username) != form.get("loginForm:password"):
+            return UnipaStubResponse(200, UnipaPages.login(self.next_view_state(session),
+                                                           "ユーザIDまたはパスワードが正しくありません。"))
+
+        session.username = username
+        return self.portal(session)
+
+    def portal(self,
+               session: UnipaStubSession) -> UnipaStubResponse:
+        """
+        TOP ページ (ポータル) を返す
+        """
+        return UnipaStubResponse(200, UnipaPages.portal(self.next_tokens(session), menus=self.menus,
+                                                        info_items=self.info_items))
+
+    @staticmethod
+    def next_view_state(session: UnipaStubSession) -> str:
+        """
+        View state を発行する (JSF と同様に直近のものをいくつか有効とする)
+        """
+        view_state = f"{secrets.randbits(31)}:{len(session.view_states)}"
+        session.view_states = session.view_states[-19:] + [view_state]
+        return view_state
+
+    def next_tokens(self,
+                    session: UnipaStubSession) -> UnipaPageTokens:
+        """
+        トークンを発行する
+        """
+        session.rx_token = secrets.token_hex(8)
+        return UnipaPageTokens(rx_token=session.rx_token,
+                               rx_login_key=session.session_id,
+                               javax_view_state=self.next_view_state(session))
+
+
+class UnipaStubRequestHandler(BaseHTTPRequestHandler):
+    """
+    スタンドインサーバーの HTTP リクエストハンドラー
+    """
+
+    server: "UnipaStubServer"
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:  # noqa: N802
+        """
+        GET リクエスト
+        """
+        self.respond("GET", {})
+
+    def do_POST(self) -> None:  # noqa: N802
+        """
+        POST リクエスト
+        """
+        length = int(self.headers.get("Content-Length", "0"))
+        body = self.rfile.read(length).decode("utf-8")
+        self.respond("POST", dict(parse_qsl(body, keep_blank_values=True)))
+
+    def respond(self,
+                method: str,
+                form: Dict[str, str]) -> None:
+        """
+        レスポンスを返す
+        """
+        cookie = SimpleCookie(self.headers.get("Cookie", ""))
+        session_id = cookie[SESSION_COOKIE].value if SESSION_COOKIE in cookie else None
+        response = self.server.app.handle(method, self.path, form, session_id)
+
+        body = response.body.encode("utf-8")
+        self.send_response(response.status)
+        self.send_header("Content-Type", response.content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if response.session_id is not None:
+            self.send_header("Set-Cookie", f"{SESSION_COOKIE}={response.session_id}; Path=/; HttpOnly")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: object) -> None:
+        """
+        アクセスログは出力しない
+        """
+
+
+class UnipaStubServer(ThreadingHTTPServer):
+    """
+    UNIPA スタンドインサーバー
+
+        server = UnipaStubServer.start(UnipaStubApp())
+        unipa = Unipa(server.base_url)
+        ...
+        server.stop()
+    """
+
+    daemon_threads = True
+    # 数百セッションの同時接続を受け付けられるようにする (既定値は 5)
+    request_queue_size = 1024
+
+    def __init__(self,
+                 app: UnipaStubApp,
+                 host: str = "127.0.0.1",
+                 port: int = 0):
+        """
+        UNIPA スタンドインサーバー コンストラクタ
+
+        Args:
+            app: スタンドインサーバーの処理
+            host: 待ち受けるホスト
+            port: 待ち受けるポート (0 の場合は空いているポート)
+        """
+        super().__init__((host, port), UnipaStubRequestHandler)
+        self.app = app
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        """
+        Unipa に指定するベース URL
+
+        Returns:
+            str: ベース URL
+        """
+        host, port = self.server_address[:2]
+        return f"http://{host!s}:{port}/"
+
+    @classmethod
+    def start(cls,
+              app: Optional[UnipaStubApp] = None,
+              host: str = "127.0.0.1",
+              port: int = 0) -> "UnipaStubServer":
+        """
+        スタンドインサーバーをバックグラウンドで起動する
+
+        Args:
+            app: スタンドインサーバーの処理 (None の場合は既定値)
+            host: 待ち受けるホスト
+            port: 待ち受けるポート
+
+        Returns:
+            UnipaStubServer: 起動したサーバー
+        """
+        server = cls(app or UnipaStubApp(), host, port)
+        server.thread = threading.Thread(target=server.serve_forever, daemon=True)
+        server.thread.start()
+        return server
+
+    def stop(self) -> None:
+        """
+        スタンドインサーバーを停止する
+        """
+        self.shutdown()
+        self.server_close()
+
+
+def percentile(values: List[float],
+               rate: float) -> float:
+    """
+    パーセンタイルを求める (最近傍順位法)
+
+    Args:
+        values: 値
+        rate: 割合 (0.5 の場合は中央値)
+
+    Returns:
+        float: パーセンタイル (値がない場合は 0)
+    """
+    if len(values) == 0:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(max(int(len(ordered) * rate + 0.5) - 1, 0), len(ordered) - 1)]
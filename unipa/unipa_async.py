@@ -0,0 +1,390 @@
+"""
+asyncio 版 UNIVERSAL PASSPORT 基本ライブラリ
+
+HTTP クライアントに httpx を利用します。`pip install get-unipa[async]` でインストールしてください。
+"""
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
+
+from unipa import Unipa, UnipaToken
+from unipa.errors import UnipaInternalError, UnipaLoginError, UnipaNotLoggedIn
+from unipa.unipa_navigation import NAVIGATION_STORE, UnipaNavigation, UnipaNavigationStore
+from unipa.unipa_parser import PARSER_LXML, UnipaParser
+from unipa.unipa_stats import HOOK_AFTER_EXTRACT, HOOK_AFTER_PARSE, HOOK_AFTER_RESPONSE, HOOK_BEFORE_REQUEST, \
+    PHASE_DECODE, PHASE_DOWNLOAD, PHASE_EXTRACTION, PHASE_PARSE, PHASE_SERVER_WAIT, PHASE_TOKEN_UPDATE, UnipaHooks, \
+    UnipaRequestStats
+from unipa.unipa_utils import UnipaInfoItem, UnipaNavItem, UnipaRequestUrl, UnipaUtils
+
+try:
+    import httpx
+
+    HTTPX_AVAILABLE = True
+except ImportError:  # pragma: no cover
+    HTTPX_AVAILABLE = False
+
+R = TypeVar("R")
+
+
+class AsyncUnipa:
+    """
+    asyncio 版 UNIVERSAL PASSPORT 基本ライブラリ
+
+    Unipa と同じトークン・ViewState の扱いで動作します。1 インスタンス内のリクエストはトークンの更新順を守るため直列に
+    送信され、HTML の解析はスレッドで実行されるためイベントループをブロックしません。
+
+    Unipa と異なり、HTTP 通信のポリシー (UnipaTransportPolicy の再試行・サーキットブレーカー・レートリミッター) と
+    レスポンスキャッシュ (UnipaResponseCache) には対応していません。タイムアウトと接続数は client の設定に従い、
+    失敗したリクエストは再試行せずに例外を送出します。ナビゲーションの保存先 (UnipaNavigationStore) は Unipa と
+    共有できます。
+
+        async with AsyncUnipa(base_url) as unipa:
+            await unipa.login(username, password)
+            items = await AsyncUnipaBulletinBoard(unipa).get_all()
+    """
+
+    def __init__(self,
+                 base_url: str,
+                 parser: str = PARSER_LXML,
+                 client: Optional["httpx.AsyncClient"] = None,
+                 navigation_store: Optional[UnipaNavigationStore] = None):
+        """
+        AsyncUnipa クラスを初期化します
+
+        Args:
+            base_url: UNIVERSAL PASSPORT のベース URL
+            parser: HTML パーサー (lxml, html5lib, html.parser)
+            client: 利用する httpx.AsyncClient (None の場合は作成する。指定したクライアントは close で閉じない)
+            navigation_store: ナビゲーションの保存先 (None の場合はプロセス内で共有する保存先)。
+                メニューが前回と変わっていない場合、ログイン時にメニューを抽出せずに保存したナビゲーションを利用する
+        """
+        if not HTTPX_AVAILABLE:
+            raise UnipaInternalError("AsyncUnipa を利用するには httpx をインストールしてください。")
+
+        self.client: httpx.AsyncClient = client or httpx.AsyncClient(follow_redirects=True)
+        self.__owns_client: bool = client is None
+        self.client.headers["User-Agent"] = "get-unipa (https://github.com/book000/get-unipa)"
+        self.logger = logging.getLogger(__name__)
+        self.__base_url: str = base_url
+        self.__logged_in: bool = False
+        self.__latest_stats: Optional[UnipaRequestStats] = None
+        self.__lock = asyncio.Lock()
+
+        self.__token: Optional[UnipaToken] = None
+        self.__navigation: UnipaNavigation = UnipaNavigation([], [])
+
+        self.request_url: UnipaRequestUrl = UnipaRequestUrl(base_url)
+        self.parser: UnipaParser = UnipaParser(parser)
+        self.hooks: UnipaHooks = UnipaHooks()
+        self.navigation_store: UnipaNavigationStore = navigation_store if navigation_store is not None \
+            else NAVIGATION_STORE
+
+    async def login(self,
+                    username: str,
+                    password: str) -> bool:
+        """
+        UNIVERSAL PASSPORT にログインする
+
+        Args:
+            username: ユーザー名
+            password: パスワード
+
+        Returns:
+            bool: ログインできたか
+        """
+        async with self.__lock:
+            response, text, stats = await self.__send("GET", self.__base_url)
+            if response.status_code != 200:
+                raise UnipaInternalError("ログインページの取得に失敗しました。")
+
+            soup = await self.__parse(stats, text, lambda x: x.find("form", {"id": "loginForm"}) is not None)
+            login_form = soup.find("form", {"id": "loginForm"})
+            if login_form is None:
+                raise UnipaInternalError("ログインフォーム情報の取得に失敗しました。")
+
+            action = login_form.get("action")
+            if not isinstance(action, str):
+                raise UnipaInternalError("ログインフォーム情報の取得に失敗しました。")
+            login_url = urljoin(self.__base_url, action)
+            params = UnipaUtils.get_login_params(login_form)
+            params["loginForm:userId"] = username
+            params["loginForm:password"] = password
+
+            response, text, stats = await self.__send("POST", login_url, data=params)
+            if response.status_code != 200:
+                return False
+
+            soup = await self.__parse(stats, text, Unipa.has_header_form)
+            error_details = soup.find("span", {"class": "ui-messages-error-detail"})
+            if error_details is not None:
+                raise UnipaLoginError(error_details.text)
+
+            self.__token = UnipaToken.from_soup(soup)
+            self.__logged_in = True
+            self.request_url.set("TOP", soup)
+
+        soup, text = await self.__request("TOP", "headerForm", {
+            "rx.sync.source": "headerForm:logo",
+            "headerForm:logo": "",
+        })
+        self.__navigation = await self.__load_navigation(soup, UnipaNavigation.make_fingerprint(text))
+
+        self.request_url.set("TOP", soup)
+        return True
+
+    async def __load_navigation(self,
+                                soup: BeautifulSoup,
+                                fingerprint: Optional[str]) -> UnipaNavigation:
+        """
+        TOP ページからナビゲーションを取得する
+
+        メニュー部分のフィンガープリントが現在のナビゲーション・保存したナビゲーションと一致する場合は抽出しません。
+
+        Args:
+            soup: TOP ページ
+            fingerprint: TOP ページのメニュー部分のフィンガープリント
+
+        Returns:
+            UnipaNavigation: ナビゲーション
+        """
+        if fingerprint is not None:
+            for navigation in (self.__navigation, self.navigation_store.get(self.__base_url)):
+                if navigation is not None and navigation.fingerprint == fingerprint:
+                    return navigation
+
+        nav_items = await self.extract(UnipaUtils.get_nav_items, soup)
+        info_items = await self.extract(UnipaUtils.get_info_items, soup)
+        navigation = UnipaNavigation(nav_items, info_items, fingerprint)
+
+        if fingerprint is not None:
+            # ファイルに保存する場合があるため、スレッドで実行する
+            await asyncio.to_thread(self.navigation_store.put, self.__base_url, navigation)
+        return navigation
+
+    async def request_from_menu(self,
+                                menu_item: UnipaNavItem,
+                                extra_params: Optional[Dict[str, str]] = None) -> BeautifulSoup:
+        """
+        メニューからリクエストを送信する
+
+        Args:
+            menu_item: メニューアイテム
+            extra_params: リクエストに付加するパラメータ (トークンなど以外)
+
+        Returns:
+            BeautifulSoup: レスポンス
+        """
+        params = UnipaUtils.get_menu_params(menu_item)
+        params.update(extra_params or {})
+        return await self.request("TOP", "menuForm", params)
+
+    async def request_from_info(self,
+                                info_item: UnipaInfoItem) -> BeautifulSoup:
+        """
+        インフォメーションからリクエストを送信する
+
+        Args:
+            info_item: インフォメーションアイテム
+
+        Returns:
+            BeautifulSoup: レスポンス
+        """
+        return await self.request("TOP", "funcForm", UnipaUtils.get_info_params(info_item))
+
+    async def request(self,
+                      request_target: str,
+                      request_type: str,
+                      extra_params: Dict[str, str]) -> BeautifulSoup:
+        """
+        リクエストを送信する
+
+        Args:
+            request_target: リクエストターゲット
+            request_type: リクエストタイプ (menuForm, funcForm など)
+            extra_params: リクエストに付加するパラメータ (トークンなど以外)
+
+        Returns:
+            BeautifulSoup: レスポンス
+        """
+        soup, _ = await self.__request(request_target, request_type, extra_params)
+        return soup
+
+    async def __request(self,
+                        request_target: str,
+                        request_type: str,
+                        extra_params: Dict[str, str]) -> Tuple[BeautifulSoup, str]:
+        """
+        リクエストを送信する
+
+        Args:
+            request_target: リクエストターゲット
+            request_type: リクエストタイプ (menuForm, funcForm など)
+            extra_params: リクエストに付加するパラメータ (トークンなど以外)
+
+        Returns:
+            Tuple[BeautifulSoup, str]: レスポンス, レスポンスの HTML
+        """
+        async with self.__lock:
+            if not self.__logged_in or self.request_url.get("TOP") is None or self.__token is None:
+                raise UnipaNotLoggedIn()
+
+            params = self.__token.get_params()
+            params[request_type] = request_type
+            params.update(extra_params)
+
+            url = self.request_url.get(request_target)
+            if url is None:
+                raise UnipaInternalError("リクエストターゲットが見つかりません: " + request_target)
+
+            response, text, stats = await self.__send("POST", url, request_target, params)
+            if response.status_code != 200:
+                raise UnipaInternalError("リクエストに失敗しました。(" + str(response.status_code) + ")")
+
+            soup, self.__token = await asyncio.to_thread(self.__parse_with_token, stats, text)
+            self.hooks.fire(HOOK_AFTER_PARSE, stats, soup)
+            return soup, text
+
+    async def __send(self,
+                     method: str,
+                     url: str,
+                     request_target: Optional[str] = None,
+                     data: Optional[Dict[str, str]] = None) -> Tuple["httpx.Response", str, UnipaRequestStats]:
+        stats = UnipaRequestStats(method, url, request_target)
+        self.__latest_stats = stats
+
+        request = self.client.build_request(method, url, data=data)
+        stats.request_bytes = len(request.content)
+        self.hooks.fire(HOOK_BEFORE_REQUEST, stats, request)
+
+        start = time.perf_counter()
+        response = await self.client.send(request, stream=True)
+        stats.add_timing(PHASE_SERVER_WAIT, time.perf_counter() - start)
+        try:
+            start = time.perf_counter()
+            content = await response.aread()
+            stats.add_timing(PHASE_DOWNLOAD, time.perf_counter() - start)
+        finally:
+            await response.aclose()
+        stats.status_code = response.status_code
+        stats.response_bytes = len(content)
+
+        start = time.perf_counter()
+        text = response.text
+        stats.add_timing(PHASE_DECODE, time.perf_counter() - start)
+        self.hooks.fire(HOOK_AFTER_RESPONSE, stats, response)
+        return response, text, stats
+
+    async def __parse(self,
+                      stats: UnipaRequestStats,
+                      text: str,
+                      required: Callable[[BeautifulSoup], bool]) -> BeautifulSoup:
+        start = time.perf_counter()
+        soup = await asyncio.to_thread(self.parser.parse, text, required)
+        stats.add_timing(PHASE_PARSE, time.perf_counter() - start)
+        self.hooks.fire(HOOK_AFTER_PARSE, stats, soup)
+        return soup
+
+    def __parse_with_token(self,
+                           stats: UnipaRequestStats,
+                           text: str) -> Tuple[BeautifulSoup, UnipaToken]:
+        # スレッドで実行される: 解析とトークンの取得をまとめて行う
+        start = time.perf_counter()
+        soup = self.parser.parse(text, Unipa.has_header_form)
+        parsed = time.perf_counter()
+        token = UnipaToken.from_soup(soup)
+        stats.add_timing(PHASE_PARSE, parsed - start)
+        stats.add_timing(PHASE_TOKEN_UPDATE, time.perf_counter() - parsed)
+        return soup, token
+
+    async def extract(self,
+                      extractor: Callable[[BeautifulSoup], R],
+                      soup: BeautifulSoup) -> R:
+        """
+        抽出処理をスレッドで実行し、所要時間を最後のリクエストの計測結果に記録します。
+
+        Args:
+            extractor: 抽出処理 (UnipaBulletinBoard.parse_all など)
+            soup: レスポンス
+
+        Returns:
+            R: 抽出結果
+        """
+        stats = self.__latest_stats
+        start = time.perf_counter()
+        try:
+            return await asyncio.to_thread(extractor, soup)
+        finally:
+            if stats is not None:
+                stats.add_timing(PHASE_EXTRACTION, time.perf_counter() - start)
+                self.hooks.fire(HOOK_AFTER_EXTRACT, stats)
+
+    def is_logged_in(self) -> bool:
+        """
+        ログインしているかどうかを返します。
+
+        Returns:
+            bool: ログインしているかどうか
+        """
+        return self.__logged_in
+
+    def get_token(self) -> Optional[UnipaToken]:
+        """
+        トークンを返します。
+
+        Returns:
+            Optional[UnipaToken]: トークン
+        """
+        return self.__token
+
+    def get_navigation(self) -> UnipaNavigation:
+        """
+        ナビゲーション (名前・メニューのパス・menu_id で検索できるナビゲーション・インフォメーションアイテム) を返します。
+
+        Returns:
+            UnipaNavigation: ナビゲーション
+        """
+        return self.__navigation
+
+    def get_nav_items(self) -> List[UnipaNavItem]:
+        """
+        ナビゲーションアイテムを返します。
+
+        Returns:
+            List[UnipaNavItem]: ナビゲーションアイテム
+        """
+        return self.__navigation.nav_items
+
+    def get_info_items(self) -> List[UnipaInfoItem]:
+        """
+        インフォメーションアイテムを返します。
+
+        Returns:
+            List[UnipaInfoItem]: インフォメーションアイテム
+        """
+        return self.__navigation.info_items
+
+    def get_latest_stats(self) -> Optional[UnipaRequestStats]:
+        """
+        最後のリクエストの計測結果を返します。
+
+        Returns:
+            Optional[UnipaRequestStats]: 計測結果 (ない場合は None)
+        """
+        return self.__latest_stats
+
+    async def close(self) -> None:
+        """
+        HTTP クライアントを閉じる (コンストラクタで指定したクライアントは呼び出し元が閉じる)
+        """
+        if self.__owns_client:
+            await self.client.aclose()
+
+    async def __aenter__(self) -> "AsyncUnipa":
+        return self
+
+    async def __aexit__(self, *args: object) -> None:
+        await self.close()
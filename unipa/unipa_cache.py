@@ -0,0 +1,222 @@
+"""
+レスポンスキャッシュ
+
+掲示板メニューやクラスプロファイルなど、同じ内容を返す画面遷移のレスポンスをプロセス内にキャッシュします。
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+CacheKey = Tuple[Hashable, ...]
+
+
+class UnipaCacheEntry:
+    """
+    キャッシュしたレスポンス
+    """
+
+    def __init__(self,
+                 text: str,
+                 javax_view_state: str,
+                 expires_at: float):
+        """
+        キャッシュしたレスポンス コンストラクタ
+
+        Args:
+            text: レスポンス本文
+            javax_view_state: レスポンスの View state (キャッシュから返す際に復元する)
+            expires_at: 有効期限 (time.monotonic の値)
+        """
+        self._text = text
+        self._javax_view_state = javax_view_state
+        self._expires_at = expires_at
+
+    @property
+    def text(self) -> str:
+        """
+        レスポンス本文
+
+        Returns:
+            str: レスポンス本文
+        """
+        return self._text
+
+    @property
+    def javax_view_state(self) -> str:
+        """
+        レスポンスの View state
+
+        Returns:
+            str: View state
+        """
+        return self._javax_view_state
+
+    @property
+    def expires_at(self) -> float:
+        """
+        有効期限 (time.monotonic の値)
+
+        Returns:
+            float: 有効期限
+        """
+        return self._expires_at
+
+    @property
+    def size(self) -> int:
+        """
+        キャッシュサイズ (文字数)
+
+        Returns:
+            int: キャッシュサイズ
+        """
+        return len(self._text)
+
+
+class UnipaResponseCache:
+    """
+    レスポンスキャッシュ (TTL・LRU)
+
+    エントリ数とサイズの上限を超えた場合は、最も長く使われていないエントリから削除します。
+
+    Notes:
+        キャッシュから返したレスポンスを使って続けてリクエストできるよう、Unipa はキャッシュヒット時に
+        rx-token などは最新のまま、javax.faces.ViewState をキャッシュしたレスポンスのものに戻します。
+        JSF はセッションごとに直近のいくつかの View を保持しているため、TTL はあまり長くしないでください。
+    """
+
+    def __init__(self,
+                 ttl: float = 60.0,
+                 max_entries: int = 32,
+                 max_size: Optional[int] = 16 * 1024 * 1024,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        レスポンスキャッシュ コンストラクタ
+
+        Args:
+            ttl: 有効期間 (秒)
+            max_entries: 最大エントリ数
+            max_size: 最大サイズ (レスポンス本文の文字数の合計。None の場合は無制限)
+            clock: 時刻の取得関数 (テスト用)
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_size = max_size
+        self.__clock = clock
+        self.__entries: "OrderedDict[CacheKey, UnipaCacheEntry]" = OrderedDict()
+        self.__size = 0
+        self.__lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self,
+            key: CacheKey) -> Optional[UnipaCacheEntry]:
+        """
+        キャッシュを取得する
+
+        Args:
+            key: キャッシュキー
+
+        Returns:
+            Optional[UnipaCacheEntry]: キャッシュ (ない場合・有効期限切れの場合は None)
+        """
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None and entry.expires_at <= self.__clock():
+                self.__remove(key)
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.__entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self,
+            key: CacheKey,
+            text: str,
+            javax_view_state: str) -> None:
+        """
+        キャッシュを登録する
+
+        Args:
+            key: キャッシュキー
+            text: レスポンス本文
+            javax_view_state: レスポンスの View state
+        """
+        entry = UnipaCacheEntry(text, javax_view_state, self.__clock() + self.ttl)
+        if self.max_size is not None and entry.size > self.max_size:
+            return
+
+        with self.__lock:
+            if key in self.__entries:
+                self.__remove(key)
+            self.__entries[key] = entry
+            self.__size += entry.size
+
+            while len(self.__entries) > self.max_entries or \
+                    (self.max_size is not None and self.__size > self.max_size):
+                self.__remove(next(iter(self.__entries)))
+                self.evictions += 1
+
+    def __remove(self,
+                 key: CacheKey) -> None:
+        entry = self.__entries.pop(key)
+        self.__size -= entry.size
+
+    def clear(self) -> None:
+        """
+        キャッシュをすべて削除する
+        """
+        with self.__lock:
+            self.__entries.clear()
+            self.__size = 0
+
+    @property
+    def size(self) -> int:
+        """
+        キャッシュサイズ (レスポンス本文の文字数の合計)
+
+        Returns:
+            int: キャッシュサイズ
+        """
+        return self.__size
+
+    def get_counters(self) -> Dict[str, int]:
+        """
+        ヒット数などのカウンターを返す
+
+        Returns:
+            Dict[str, int]: hits, misses, evictions, entries
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self.__entries),
+        }
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    @staticmethod
+    def make_key(request_target: str,
+                 request_type: str,
+                 extra_params: Dict[str, str],
+                 response_markup: Optional[str]) -> CacheKey:
+        """
+        キャッシュキーを作成する (トークン類は含めない)
+
+        Args:
+            request_target: リクエストターゲット
+            request_type: リクエストタイプ
+            extra_params: リクエストに付加するパラメータ (トークンなど以外)
+            response_markup: レスポンスのマークアップ
+
+        Returns:
+            CacheKey: キャッシュキー
+        """
+        return request_target, request_type, tuple(sorted(extra_params.items())), response_markup
@@ -0,0 +1,296 @@
+"""
+リクエスト・レスポンスのキャプチャ (デバッグ用)
+
+直近のリクエストとレスポンスを、件数とサイズに上限のあるリングバッファに保存します。本文は zlib で圧縮し、
+パスワード・Cookie・rx-token・javax.faces.ViewState などの秘密情報は保存前に伏せ字にします。
+after_response フックで記録するため、キャプチャを有効にしない場合は何も保存されず、処理も増えません。
+
+    capture = UnipaCaptureBuffer(capacity=20)
+    unipa = Unipa(base_url, capture=capture)
+    ...
+    for entry in capture:
+        print(entry.status_code, entry.url, entry.response_body[:100])
+"""
+import re
+import threading
+import time
+import zlib
+from collections import deque
+from typing import Deque, Dict, Iterable, Iterator, List, Mapping, Optional, Pattern
+from urllib.parse import parse_qsl, urlencode
+
+from unipa.unipa_stats import HOOK_AFTER_RESPONSE, UnipaHooks, UnipaRequestStats
+
+REDACTED = "***"
+# 伏せ字にするフォームフィールド・hidden input
+REDACT_FIELDS = ("loginForm:password", "rx-token", "rx-loginKey", "javax.faces.ViewState")
+# 伏せ字にするヘッダー
+REDACT_HEADERS = ("Authorization", "Cookie", "Set-Cookie")
+
+_INPUT_PATTERN = re.compile(r"<input\b[^>]*>", re.IGNORECASE)
+_VALUE_PATTERN = re.compile(r"""(\bvalue\s*=\s*)("[^"]*"|'[^']*')""", re.IGNORECASE)
+_VIEW_STATE_UPDATE_PATTERN = re.compile(r"""(<update\s+id="[^"]*javax\.faces\.ViewState[^"]*"\s*><!\[CDATA\[)"""
+                                        r"""(.*?)(\]\]>)""", re.DOTALL)
+
+
+class UnipaCapture:
+    """
+    リクエスト・レスポンス 1 回分のキャプチャ
+    """
+
+    def __init__(self,
+                 method: str,
+                 url: str,
+                 request_target: Optional[str],
+                 status_code: Optional[int],
+                 request_headers: Dict[str, str],
+                 response_headers: Dict[str, str],
+                 request_body: bytes,
+                 response_body: bytes):
+        """
+        コンストラクタ
+
+        Args:
+            method: HTTP メソッド
+            url: リクエスト URL
+            request_target: リクエストターゲット
+            status_code: ステータスコード
+            request_headers: リクエストヘッダー (伏せ字済み)
+            response_headers: レスポンスヘッダー (伏せ字済み)
+            request_body: リクエスト本文 (伏せ字済み、圧縮済み)
+            response_body: レスポンス本文 (伏せ字済み、圧縮済み)
+        """
+        self.timestamp = time.time()
+        self.method = method
+        self.url = url
+        self.request_target = request_target
+        self.status_code = status_code
+        self.request_headers = request_headers
+        self.response_headers = response_headers
+        self._request_body = request_body
+        self._response_body = response_body
+
+    @property
+    def request_body(self) -> str:
+        """
+        リクエスト本文 (伏せ字済み)
+
+        Returns:
+            str: リクエスト本文
+        """
+        return zlib.decompress(self._request_body).decode("utf-8")
+
+    @property
+    def response_body(self) -> str:
+        """
+        レスポンス本文 (伏せ字済み)
+
+        Returns:
+            str: レスポンス本文
+        """
+        return zlib.decompress(self._response_body).decode("utf-8")
+
+    @property
+    def size(self) -> int:
+        """
+        圧縮後の本文のバイト数
+
+        Returns:
+            int: バイト数
+        """
+        return len(self._request_body) + len(self._response_body)
+
+    def __str__(self) -> str:
+        return f"UnipaCapture(method={self.method}, url={self.url}, status_code={self.status_code}, " \
+               f"size={self.size})"
+
+
+class UnipaCaptureBuffer:
+    """
+    リクエスト・レスポンスのキャプチャのリングバッファ
+
+    capacity 件、または圧縮後の合計 max_bytes バイトを超えると古いものから破棄します。
+    """
+
+    def __init__(self,
+                 capacity: int = 20,
+                 max_bytes: int = 1024 * 1024,
+                 compress_level: int = 6,
+                 redact_fields: Iterable[str] = REDACT_FIELDS,
+                 redact_headers: Iterable[str] = REDACT_HEADERS):
+        """
+        コンストラクタ
+
+        Args:
+            capacity: 保存する最大件数
+            max_bytes: 保存する圧縮後の本文の合計バイト数の上限
+            compress_level: zlib の圧縮レベル
+            redact_fields: 伏せ字にするフォームフィールド・hidden input の name
+            redact_headers: 伏せ字にするヘッダー名
+        """
+        self.capacity = capacity
+        self.max_bytes = max_bytes
+        self.compress_level = compress_level
+        self.redact_fields = frozenset(redact_fields)
+        self.redact_headers = frozenset(x.lower() for x in redact_headers)
+        self.__input_name_pattern: Pattern[str] = re.compile(
+            r"""\bname\s*=\s*["'](?:""" + "|".join(re.escape(x) for x in sorted(self.redact_fields)) + r""")["']""",
+            re.IGNORECASE)
+        self.__captures: Deque[UnipaCapture] = deque()
+        self.__bytes = 0
+        self.__lock = threading.Lock()
+
+    def attach(self,
+               hooks: UnipaHooks) -> None:
+        """
+        フックに登録し、レスポンスのキャプチャを開始する
+
+        Args:
+            hooks: Unipa のフック
+        """
+        hooks.register(HOOK_AFTER_RESPONSE, self.on_response)
+
+    def detach(self,
+               hooks: UnipaHooks) -> None:
+        """
+        フックの登録を解除し、レスポンスのキャプチャを終了する
+
+        Args:
+            hooks: Unipa のフック
+        """
+        hooks.unregister(HOOK_AFTER_RESPONSE, self.on_response)
+
+    def on_response(self,
+                    stats: UnipaRequestStats,
+                    response: object) -> None:
+        """
+        after_response フック: レスポンス (requests.Response, httpx.Response) をキャプチャする
+
+        Args:
+            stats: 計測結果
+            response: レスポンス
+        """
+        request = getattr(response, "request", None)
+        body = getattr(request, "body", None)
+        if body is None:
+            body = getattr(request, "content", b"")
+        if isinstance(body, bytes):
+            body = body.decode("utf-8", "replace")
+        content: bytes = getattr(response, "content", b"")
+
+        self.add(UnipaCapture(
+            stats.method,
+            stats.url,
+            stats.request_target,
+            stats.status_code,
+            self.redact_header_values(getattr(request, "headers", {})),
+            self.redact_header_values(getattr(response, "headers", {})),
+            zlib.compress(self.redact_form(body or "").encode("utf-8"), self.compress_level),
+            zlib.compress(self.redact_markup(content.decode("utf-8", "replace")).encode("utf-8"),
+                          self.compress_level)
+        ))
+
+    def add(self,
+            capture: UnipaCapture) -> None:
+        """
+        キャプチャを追加し、上限を超えた古いキャプチャを破棄する
+
+        Args:
+            capture: キャプチャ
+        """
+        with self.__lock:
+            self.__captures.append(capture)
+            self.__bytes += capture.size
+            while len(self.__captures) > 1 and (len(self.__captures) > self.capacity or self.__bytes > self.max_bytes):
+                self.__bytes -= self.__captures.popleft().size
+
+    def redact_form(self,
+                    body: str) -> str:
+        """
+        フォームデータ (application/x-www-form-urlencoded) の秘密情報を伏せ字にする
+
+        Args:
+            body: フォームデータ
+
+        Returns:
+            str: 伏せ字にしたフォームデータ
+        """
+        params = parse_qsl(body, keep_blank_values=True)
+        return urlencode([(key, REDACTED if key in self.redact_fields else value) for key, value in params], safe=":*")
+
+    def redact_markup(self,
+                      markup: str) -> str:
+        """
+        HTML・部分更新レスポンスの hidden input と View state を伏せ字にする
+
+        Args:
+            markup: HTML・XML
+
+        Returns:
+            str: 伏せ字にした HTML・XML
+        """
+        def redact_input(match: "re.Match[str]") -> str:
+            tag = match.group(0)
+            if self.__input_name_pattern.search(tag) is None:
+                return tag
+            return _VALUE_PATTERN.sub(lambda x: f'{x.group(1)}"{REDACTED}"', tag)
+
+        markup = _INPUT_PATTERN.sub(redact_input, markup)
+        return _VIEW_STATE_UPDATE_PATTERN.sub(lambda x: x.group(1) + REDACTED + x.group(3), markup)
+
+    def redact_header_values(self,
+                             headers: Mapping[str, str]) -> Dict[str, str]:
+        """
+        ヘッダーの秘密情報を伏せ字にする
+
+        Args:
+            headers: ヘッダー
+
+        Returns:
+            Dict[str, str]: 伏せ字にしたヘッダー
+        """
+        return {key: REDACTED if key.lower() in self.redact_headers else value for key, value in headers.items()}
+
+    @property
+    def size(self) -> int:
+        """
+        保存しているキャプチャの圧縮後の合計バイト数
+
+        Returns:
+            int: バイト数
+        """
+        return self.__bytes
+
+    def latest(self) -> Optional[UnipaCapture]:
+        """
+        最新のキャプチャを取得する
+
+        Returns:
+            Optional[UnipaCapture]: キャプチャ (ない場合は None)
+        """
+        with self.__lock:
+            return self.__captures[-1] if len(self.__captures) > 0 else None
+
+    def get_captures(self) -> List[UnipaCapture]:
+        """
+        保存しているキャプチャを古い順に取得する
+
+        Returns:
+            List[UnipaCapture]: キャプチャ
+        """
+        with self.__lock:
+            return list(self.__captures)
+
+    def clear(self) -> None:
+        """
+        保存しているキャプチャを破棄する
+        """
+        with self.__lock:
+            self.__captures.clear()
+            self.__bytes = 0
+
+    def __len__(self) -> int:
+        return len(self.__captures)
+
+    def __iter__(self) -> Iterator[UnipaCapture]:
+        return iter(self.get_captures())
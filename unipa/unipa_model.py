@@ -0,0 +1,66 @@
+"""
+モデルの基底クラス
+"""
+from typing import Tuple
+
+
+class UnipaModel:
+    """
+    モデルの基底クラス
+
+    サブクラスは属性 (_ で始まる内部属性) を __slots__ に列挙し、読み取り専用のプロパティで公開します。
+    インスタンスは __dict__ を持たないため省メモリで、属性の追加もできません。
+    等価性とハッシュは型と値の属性で判定するため、インスタンスは不変です (属性の代入・削除は AttributeError)。
+    サブクラスのコンストラクタは object.__setattr__ で属性を設定してください。
+
+    セッションへの参照や遅延取得した値のキャッシュなど、値ではない属性は _transient_slots にも列挙します。
+    これらの属性は等価性・ハッシュ・pickle (コピー) に含まれず、復元時は None になります。
+    これらの属性もモデル自身のメソッドから object.__setattr__ で設定します。
+    """
+
+    __slots__: Tuple[str, ...] = ()
+    # 等価性・ハッシュ・pickle に含めない属性
+    _transient_slots: Tuple[str, ...] = ()
+    # 値の属性 (__slots__ のうち _transient_slots 以外。サブクラスの定義時に設定される)
+    _fields: Tuple[str, ...] = ()
+
+    def __init_subclass__(cls) -> None:
+        super().__init_subclass__()
+        cls._fields = tuple(name for name in cls.__slots__ if name not in cls._transient_slots)
+
+    def _values(self) -> Tuple[object, ...]:
+        """
+        全属性の値 (_fields の順)
+
+        Returns:
+            Tuple[object, ...]: 全属性の値
+        """
+        return tuple(getattr(self, name) for name in self._fields)
+
+    def __eq__(self,
+               other: object) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return self._values() == other._values()
+
+    def __hash__(self) -> int:
+        return hash((type(self).__name__, self._values()))
+
+    def __setattr__(self,
+                    name: str,
+                    value: object) -> None:
+        raise AttributeError(f"{type(self).__name__} は不変のため、属性 {name} を変更できません")
+
+    def __delattr__(self,
+                    name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} は不変のため、属性 {name} を削除できません")
+
+    def __getstate__(self) -> Tuple[object, ...]:
+        return self._values()
+
+    def __setstate__(self,
+                     state: Tuple[object, ...]) -> None:
+        for name, value in zip(self._fields, state):
+            object.__setattr__(self, name, value)
+        for name in self._transient_slots:
+            object.__setattr__(self, name, None)
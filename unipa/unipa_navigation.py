@@ -0,0 +1,342 @@
+"""
+ナビゲーション (メガメニュー・インフォメーション) のレジストリ
+
+ログイン時に取得したナビゲーションアイテム・インフォメーションアイテムを、名前・メニューのパス・menu_id で
+引けるように索引付けします。索引はベース URL ごとに保存し (UnipaNavigationStore)、次回のログインではメニュー部分の
+HTML のハッシュ (フィンガープリント) が一致すればメニューを解析しません。
+
+    navigation = unipa.get_navigation()
+    nav_item = navigation.get_nav("掲示板")
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from unipa.errors import UnipaInternalError
+from unipa.unipa_utils import Menu, UnipaInfoItem, UnipaNavItem
+
+NAVIGATION_VERSION = 1
+
+# メニュー部分の開始位置 (div#menuForm:mainMenu, div.infoDetail) と終了位置 (フォームの終了タグ)。
+# ページ全体を正規表現で走査すると遅いため、文字列の検索で位置を求める
+_MENU_START = "menuForm:mainMenu"
+_INFO_START = "infoDetail"
+_FORM_END = "</form>"
+# リクエストごとに変わる hidden input (View state など) はフィンガープリントに含めない
+_INPUT_PATTERN = re.compile(r"<input\b[^>]*>", re.IGNORECASE)
+
+
+class UnipaNavigation:
+    """
+    ナビゲーションアイテム・インフォメーションアイテムの索引
+
+    同じ名前のアイテムが複数ある場合、名前での検索はページ上で最初のアイテムを返します。
+    """
+
+    def __init__(self,
+                 nav_items: List[UnipaNavItem],
+                 info_items: List[UnipaInfoItem],
+                 fingerprint: Optional[str] = None):
+        """
+        コンストラクタ
+
+        Args:
+            nav_items: ナビゲーションアイテム
+            info_items: インフォメーションアイテム
+            fingerprint: 取得元のメニュー部分のフィンガープリント (不明な場合は None)
+        """
+        self._nav_items = nav_items
+        self._info_items = info_items
+        self._fingerprint = fingerprint
+
+        self.__nav_by_name: Dict[str, UnipaNavItem] = {}
+        self.__nav_by_path: Dict[Tuple[str, Optional[str], str], UnipaNavItem] = {}
+        self.__nav_by_menu_id: Dict[str, UnipaNavItem] = {}
+        for item in nav_items:
+            self.__nav_by_name.setdefault(item.name, item)
+            self.__nav_by_path.setdefault((item.menu.name, item.menu.sub_name, item.name), item)
+            if item.menu_id is not None:
+                self.__nav_by_menu_id.setdefault(item.menu_id, item)
+
+        self.__info_by_name: Dict[str, UnipaInfoItem] = {}
+        for info_item in info_items:
+            self.__info_by_name.setdefault(info_item.name, info_item)
+
+    @property
+    def nav_items(self) -> List[UnipaNavItem]:
+        """
+        ナビゲーションアイテム (ページ上の順)
+
+        Returns:
+            List[UnipaNavItem]: ナビゲーションアイテム
+        """
+        return self._nav_items
+
+    @property
+    def info_items(self) -> List[UnipaInfoItem]:
+        """
+        インフォメーションアイテム (ページ上の順)
+
+        Returns:
+            List[UnipaInfoItem]: インフォメーションアイテム
+        """
+        return self._info_items
+
+    @property
+    def fingerprint(self) -> Optional[str]:
+        """
+        取得元のメニュー部分のフィンガープリント
+
+        Returns:
+            Optional[str]: フィンガープリント (不明な場合は None)
+        """
+        return self._fingerprint
+
+    def find_nav(self,
+                 name: str) -> Optional[UnipaNavItem]:
+        """
+        名前でナビゲーションアイテムを検索する
+
+        Args:
+            name: アイテム名 (例: 掲示板)
+
+        Returns:
+            Optional[UnipaNavItem]: ナビゲーションアイテム (見つからない場合は None)
+        """
+        return self.__nav_by_name.get(name)
+
+    def find_nav_by_path(self,
+                         menu_name: str,
+                         sub_name: Optional[str],
+                         name: str) -> Optional[UnipaNavItem]:
+        """
+        メニューのパス (メニュー名, サブメニュー名, アイテム名) でナビゲーションアイテムを検索する
+
+        Args:
+            menu_name: メニュー名
+            sub_name: サブメニュー名
+            name: アイテム名
+
+        Returns:
+            Optional[UnipaNavItem]: ナビゲーションアイテム (見つからない場合は None)
+        """
+        return self.__nav_by_path.get((menu_name, sub_name, name))
+
+    def find_nav_by_menu_id(self,
+                            menu_id: str) -> Optional[UnipaNavItem]:
+        """
+        menu_id でナビゲーションアイテムを検索する
+
+        Args:
+            menu_id: menu_id
+
+        Returns:
+            Optional[UnipaNavItem]: ナビゲーションアイテム (見つからない場合は None)
+        """
+        return self.__nav_by_menu_id.get(menu_id)
+
+    def find_info(self,
+                  name: str) -> Optional[UnipaInfoItem]:
+        """
+        名前でインフォメーションアイテムを検索する
+
+        Args:
+            name: アイテム名 (例: クラスプロファイル)
+
+        Returns:
+            Optional[UnipaInfoItem]: インフォメーションアイテム (見つからない場合は None)
+        """
+        return self.__info_by_name.get(name)
+
+    def get_nav(self,
+                name: str) -> UnipaNavItem:
+        """
+        名前でナビゲーションアイテムを取得する
+
+        Args:
+            name: アイテム名 (例: 掲示板)
+
+        Returns:
+            UnipaNavItem: ナビゲーションアイテム
+        """
+        item = self.find_nav(name)
+        if item is None:
+            raise UnipaInternalError(f"メニューに「{name}」が見つかりません。")
+        return item
+
+    def get_info(self,
+                 name: str) -> UnipaInfoItem:
+        """
+        名前でインフォメーションアイテムを取得する
+
+        Args:
+            name: アイテム名 (例: クラスプロファイル)
+
+        Returns:
+            UnipaInfoItem: インフォメーションアイテム
+        """
+        item = self.find_info(name)
+        if item is None:
+            raise UnipaInternalError(f"インフォメーションに「{name}」が見つかりません。")
+        return item
+
+    @staticmethod
+    def make_fingerprint(markup: str) -> Optional[str]:
+        """
+        ページのメニュー部分 (div#menuForm:mainMenu, div.infoDetail からフォームの終わりまで) のフィンガープリントを
+        作成する。ページ全体を解析せず、文字列の検索とハッシュの計算のみを行います。
+
+        Args:
+            markup: ページの HTML
+
+        Returns:
+            Optional[str]: フィンガープリント (メニュー部分が見つからない場合は None)
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        for marker in (_MENU_START, _INFO_START):
+            start = markup.find(marker)
+            if start < 0:
+                return None
+            end = markup.find(_FORM_END, start)
+            if end < 0:
+                return None
+            region = markup[start:end]
+            if "<input" in region:
+                region = _INPUT_PATTERN.sub("", region)
+            digest.update(region.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def to_dict(self) -> Dict[str, object]:
+        """
+        保存用の辞書に変換する
+
+        Returns:
+            Dict[str, object]: 保存用の辞書
+        """
+        return {
+            "fingerprint": self._fingerprint,
+            "nav_items": [[item.menu.name, item.menu.sub_name, item.name, item.menu_id] for item in self._nav_items],
+            "info_items": [[item.name, item.menu_id] for item in self._info_items],
+        }
+
+    @classmethod
+    def from_dict(cls,
+                  data: Dict[str, object]) -> "UnipaNavigation":
+        """
+        保存用の辞書から復元する
+
+        Args:
+            data: to_dict で変換した辞書
+
+        Returns:
+            UnipaNavigation: ナビゲーション
+        """
+        try:
+            nav_items = [UnipaNavItem(Menu(x[0], x[1]), x[2], x[3]) for x in data["nav_items"]]  # type: ignore
+            info_items = [UnipaInfoItem(x[0], x[1]) for x in data["info_items"]]  # type: ignore
+            fingerprint = data.get("fingerprint")
+        except (KeyError, IndexError, TypeError) as e:
+            raise UnipaInternalError("ナビゲーションの読み込みに失敗しました。") from e
+        return cls(nav_items, info_items, fingerprint if isinstance(fingerprint, str) else None)
+
+
+class UnipaNavigationStore:
+    """
+    ベース URL ごとのナビゲーションの保存先
+
+    プロセス内で共有し、path を指定した場合はファイルにも保存します (次回の起動時に読み込みます)。
+    メニューはアカウントによって異なる場合がありますが、フィンガープリントが一致する場合のみ再利用するため、
+    ほかのアカウントと共有しても誤ったメニューを返すことはありません。
+    """
+
+    def __init__(self,
+                 path: Optional[str] = None):
+        """
+        コンストラクタ
+
+        Args:
+            path: 保存先のファイルのパス (None の場合はプロセス内のみで保持する)
+        """
+        self.path = path
+        self.__navigations: Dict[str, UnipaNavigation] = {}
+        self.__lock = threading.Lock()
+        if path is not None and os.path.exists(path):
+            self.load()
+
+    def get(self,
+            base_url: str) -> Optional[UnipaNavigation]:
+        """
+        ナビゲーションを取得する
+
+        Args:
+            base_url: ベース URL
+
+        Returns:
+            Optional[UnipaNavigation]: ナビゲーション (保存していない場合は None)
+        """
+        with self.__lock:
+            return self.__navigations.get(base_url)
+
+    def put(self,
+            base_url: str,
+            navigation: UnipaNavigation) -> None:
+        """
+        ナビゲーションを保存する
+
+        Args:
+            base_url: ベース URL
+            navigation: ナビゲーション
+        """
+        with self.__lock:
+            self.__navigations[base_url] = navigation
+            if self.path is not None:
+                self.__save()
+
+    def load(self) -> None:
+        """
+        ファイルから読み込む。読み込めない場合は保存していないものとして扱う
+        """
+        if self.path is None:
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != NAVIGATION_VERSION:
+                return
+            navigations = {base_url: UnipaNavigation.from_dict(x) for base_url, x in data["navigations"].items()}
+        except (OSError, ValueError, KeyError, AttributeError, UnipaInternalError):
+            return
+        with self.__lock:
+            self.__navigations.update(navigations)
+
+    def __save(self) -> None:
+        assert self.path is not None
+        data = {
+            "version": NAVIGATION_VERSION,
+            "navigations": {base_url: x.to_dict() for base_url, x in self.__navigations.items()},
+        }
+        tmp_path = f"{self.path}.tmp"
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def clear(self) -> None:
+        """
+        保存したナビゲーションを破棄する
+        """
+        with self.__lock:
+            self.__navigations.clear()
+            if self.path is not None:
+                self.__save()
+
+    def __len__(self) -> int:
+        return len(self.__navigations)
+
+
+# Unipa が既定で利用するプロセス内の保存先
+NAVIGATION_STORE = UnipaNavigationStore()
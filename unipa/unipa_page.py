@@ -0,0 +1,117 @@
+"""
+レスポンスページ
+
+DOM (BeautifulSoup) は soup プロパティに初めてアクセスしたときに構築します。
+"""
+from typing import Optional
+
+from bs4 import BeautifulSoup
+
+from unipa.unipa_parser import UnipaParser
+from unipa.unipa_scanner import UnipaPageScan, UnipaPageScanner
+from unipa.unipa_stats import HOOK_AFTER_PARSE, PHASE_PARSE, UnipaHooks, UnipaRequestStats, UnipaStopwatch
+
+
+class UnipaPage:
+    """
+    レスポンスページ
+    """
+
+    def __init__(self,
+                 text: str,
+                 stats: UnipaRequestStats,
+                 parser: UnipaParser,
+                 hooks: UnipaHooks,
+                 response_markup: Optional[str] = None,
+                 scan_items: bool = False):
+        """
+        コンストラクタ
+
+        Args:
+            text: レスポンス本文
+            stats: 計測結果
+            parser: HTML パーサー
+            hooks: フック
+            response_markup: レスポンスのマークアップ (None の場合は parser を利用する)
+            scan_items: スキャン時にナビゲーション・インフォメーションアイテムも取得するか
+        """
+        self._text = text
+        self._stats = stats
+        self.__parser = parser
+        self.__hooks = hooks
+        self.__response_markup = response_markup
+        self.__scan_items = scan_items
+        self.__scan: Optional[UnipaPageScan] = None
+        self.__soup: Optional[BeautifulSoup] = None
+
+    @property
+    def text(self) -> str:
+        """
+        レスポンス本文
+
+        Returns:
+            str: レスポンス本文
+        """
+        return self._text
+
+    @property
+    def stats(self) -> UnipaRequestStats:
+        """
+        計測結果
+
+        Returns:
+            UnipaRequestStats: 計測結果
+        """
+        return self._stats
+
+    @property
+    def response_markup(self) -> Optional[str]:
+        """
+        レスポンスのマークアップ
+
+        Returns:
+            Optional[str]: レスポンスのマークアップ (None の場合はコンストラクタで指定した HTML パーサーを利用する)
+        """
+        return self.__response_markup
+
+    @property
+    def scan(self) -> UnipaPageScan:
+        """
+        スキャン結果 (トークン・フォームの action 属性など)
+
+        Returns:
+            UnipaPageScan: スキャン結果
+        """
+        if self.__scan is None:
+            with UnipaStopwatch(self._stats, PHASE_PARSE):
+                self.__scan = UnipaPageScanner.scan(self._text, self.__scan_items)
+        return self.__scan
+
+    @property
+    def is_parsed(self) -> bool:
+        """
+        DOM を構築済みか
+
+        Returns:
+            bool: DOM を構築済みか
+        """
+        return self.__soup is not None
+
+    @property
+    def soup(self) -> BeautifulSoup:
+        """
+        DOM (初めてアクセスしたときに構築する)
+
+        Returns:
+            BeautifulSoup: DOM
+        """
+        if self.__soup is None:
+            with UnipaStopwatch(self._stats, PHASE_PARSE):
+                if self.__response_markup is None:
+                    self.__soup = self.__parser.parse(
+                        self._text, lambda soup: soup.find("form", {"id": "headerForm"}) is not None
+                    )
+                else:
+                    self.__soup = BeautifulSoup(self._text, self.__response_markup)
+            self.__hooks.fire(HOOK_AFTER_PARSE, self._stats, self.__soup)
+        return self.__soup
@@ -0,0 +1,195 @@
+"""
+解析用プロセスプール
+
+HTML の解析 (BeautifulSoup の構築) と抽出処理は CPU 処理で、GIL を保持したまま実行されます。多数のセッションを
+スレッドで並列に処理すると、解析が 1 コアで直列化され、通信を待つスレッドも待たされます。
+解析用プロセスプールは、レスポンス本文を子プロセスに送り、解析と抽出をまとめて子プロセスで実行します。
+DOM は子プロセスから返さず、抽出結果 (掲示リスト・掲示詳細・クラスなどのモデル) のみを受け取ります。
+
+    with UnipaParsePool(4) as parse_pool:
+        unipa = Unipa(base_url, parse_pool=parse_pool)
+        unipa.login(username, password)
+        items = UnipaBulletinBoard(unipa).get_all()
+"""
+import multiprocessing
+import os
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import lru_cache
+from typing import Callable, List, Optional, Tuple, TypeVar
+
+from bs4 import BeautifulSoup
+
+from unipa.errors import UnipaInternalError
+from unipa.unipa_parser import UnipaParser
+
+R = TypeVar("R")
+
+# 子プロセスの開始方法 (スレッドを利用するプロセスから fork すると、ロックの状態を引き継いでデッドロックすることがある)
+DEFAULT_START_METHOD = "spawn"
+
+
+@lru_cache(maxsize=None)
+def _get_parser(backend: str,
+                fallback: Optional[str]) -> UnipaParser:
+    # 子プロセスで実行される: パーサーは (バックエンド, フォールバック先) ごとに 1 回だけ作成する
+    return UnipaParser(backend, fallback)
+
+
+def parse_and_extract(extractor: Callable[[BeautifulSoup], R],
+                      markup: str,
+                      backend: str,
+                      fallback: Optional[str],
+                      required: Optional[Callable[[BeautifulSoup], bool]] = None,
+                      response_markup: Optional[str] = None) -> Tuple[R, float, float]:
+    """
+    HTML を解析し、抽出処理を実行する (子プロセスで実行するための関数)
+
+    Args:
+        extractor: 抽出処理
+        markup: HTML
+        backend: 利用するパーサー
+        fallback: 解析結果に必要な要素がなかった場合に利用するパーサー
+        required: 解析結果が妥当かを判定する関数
+        response_markup: レスポンスのマークアップ (None 以外の場合は backend, fallback の代わりに利用する)
+
+    Returns:
+        Tuple[R, float, float]: 抽出結果, 解析の所要時間 (秒), 抽出の所要時間 (秒)
+    """
+    start = time.perf_counter()
+    if response_markup is None:
+        soup = _get_parser(backend, fallback).parse(markup, required)
+    else:
+        soup = BeautifulSoup(markup, response_markup)
+    parsed = time.perf_counter()
+    result = extractor(soup)
+    return result, parsed - start, time.perf_counter() - parsed
+
+
+def _warm_up(backend: str,
+             fallback: Optional[str]) -> int:
+    # 子プロセスで実行される: パーサーとモジュールの読み込みを済ませる
+    parse_and_extract(len, "<html><body></body></html>", backend, fallback)
+    return os.getpid()
+
+
+class UnipaParsePool:
+    """
+    解析用プロセスプール
+
+    extractor (抽出処理) と抽出結果は pickle で子プロセスとやり取りするため、モジュールの関数・クラスのメソッド
+    (UnipaBulletinBoard.parse_all など) とモデルのように pickle できるものを指定してください。
+    min_size より短いレスポンスは、プロセス間通信のほうが高くつくため呼び出したスレッドで解析します。
+    """
+
+    def __init__(self,
+                 max_workers: Optional[int] = None,
+                 min_size: int = 16 * 1024,
+                 start_method: str = DEFAULT_START_METHOD):
+        """
+        コンストラクタ
+
+        Args:
+            max_workers: 子プロセス数 (None の場合は CPU のコア数)
+            min_size: 子プロセスで解析するレスポンスの最小の長さ (文字数)
+            start_method: 子プロセスの開始方法 (spawn, forkserver, fork)
+        """
+        if max_workers is not None and max_workers < 1:
+            raise UnipaInternalError("子プロセス数は 1 以上を指定してください")
+
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.min_size = min_size
+        self.submitted = 0
+        self.__executor: Optional[ProcessPoolExecutor] = ProcessPoolExecutor(
+            self.max_workers, mp_context=multiprocessing.get_context(start_method)
+        )
+
+    def accepts(self,
+                markup: str) -> bool:
+        """
+        子プロセスで解析するか
+
+        Args:
+            markup: HTML
+
+        Returns:
+            bool: 子プロセスで解析するか
+        """
+        return self.__executor is not None and len(markup) >= self.min_size
+
+    def submit(self,
+               extractor: Callable[[BeautifulSoup], R],
+               markup: str,
+               parser: UnipaParser,
+               required: Optional[Callable[[BeautifulSoup], bool]] = None,
+               response_markup: Optional[str] = None) -> "Future[Tuple[R, float, float]]":
+        """
+        解析と抽出処理を子プロセスで実行する (完了を待たない)
+
+        Args:
+            extractor: 抽出処理
+            markup: HTML
+            parser: HTML パーサー (バックエンドとフォールバック先を子プロセスでも利用する)
+            required: 解析結果が妥当かを判定する関数
+            response_markup: レスポンスのマークアップ (None の場合は parser を利用する)
+
+        Returns:
+            Future[Tuple[R, float, float]]: 抽出結果, 解析の所要時間 (秒), 抽出の所要時間 (秒)
+        """
+        if self.__executor is None:
+            raise UnipaInternalError("解析用プロセスプールは終了しています。")
+        self.submitted += 1
+        return self.__executor.submit(parse_and_extract, extractor, markup, parser.backend, parser.fallback,
+                                      required, response_markup)
+
+    def extract(self,
+                extractor: Callable[[BeautifulSoup], R],
+                markup: str,
+                parser: UnipaParser,
+                required: Optional[Callable[[BeautifulSoup], bool]] = None,
+                response_markup: Optional[str] = None) -> Tuple[R, float, float]:
+        """
+        解析と抽出処理を子プロセスで実行し、完了を待つ (待っている間、呼び出したスレッドは GIL を解放する)
+
+        Args:
+            extractor: 抽出処理
+            markup: HTML
+            parser: HTML パーサー (バックエンドとフォールバック先を子プロセスでも利用する)
+            required: 解析結果が妥当かを判定する関数
+            response_markup: レスポンスのマークアップ (None の場合は parser を利用する)
+
+        Returns:
+            Tuple[R, float, float]: 抽出結果, 解析の所要時間 (秒), 抽出の所要時間 (秒)
+        """
+        return self.submit(extractor, markup, parser, required, response_markup).result()
+
+    def warm_up(self,
+                parser: Optional[UnipaParser] = None) -> List[int]:
+        """
+        子プロセスを起動し、パーサーとモジュールを読み込んでおく (初回の解析が遅くならないようにする)
+
+        Args:
+            parser: HTML パーサー (None の場合は既定のパーサー)
+
+        Returns:
+            List[int]: 処理した子プロセスのプロセス ID
+        """
+        if self.__executor is None:
+            raise UnipaInternalError("解析用プロセスプールは終了しています。")
+        parser = parser or UnipaParser()
+        futures = [self.__executor.submit(_warm_up, parser.backend, parser.fallback) for _ in range(self.max_workers)]
+        return [future.result() for future in futures]
+
+    def close(self) -> None:
+        """
+        子プロセスを終了する
+        """
+        if self.__executor is not None:
+            self.__executor.shutdown()
+            self.__executor = None
+
+    def __enter__(self) -> "UnipaParsePool":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
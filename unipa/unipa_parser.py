@@ -0,0 +1,106 @@
+"""
+HTML パーサーバックエンド
+"""
+import logging
+from typing import Callable, Optional, Union
+
+from bs4 import BeautifulSoup
+from bs4.builder import builder_registry
+
+from unipa.errors import UnipaInternalError
+
+PARSER_LXML = "lxml"
+PARSER_HTML5LIB = "html5lib"
+PARSER_HTML_PARSER = "html.parser"
+
+PARSER_BACKENDS = (PARSER_LXML, PARSER_HTML5LIB, PARSER_HTML_PARSER)
+
+
+class UnipaParser:
+    """
+    HTML パーサーバックエンド
+
+    既定では高速な lxml で解析し、壊れたページなどで必要な要素が見つからなかった場合のみ html5lib で解析しなおします。
+    """
+
+    def __init__(self,
+                 backend: str = PARSER_LXML,
+                 fallback: Optional[str] = PARSER_HTML5LIB):
+        """
+        HTML パーサーバックエンド コンストラクタ
+
+        Args:
+            backend: 利用するパーサー (lxml, html5lib, html.parser)
+            fallback: 解析結果に必要な要素がなかった場合に利用するパーサー (None の場合はフォールバックしない)
+        """
+        self.logger = logging.getLogger(__name__)
+
+        if backend not in PARSER_BACKENDS:
+            raise UnipaInternalError(f"未対応のパーサーです: {backend}")
+        if fallback is not None and fallback not in PARSER_BACKENDS:
+            raise UnipaInternalError(f"未対応のパーサーです: {fallback}")
+
+        if not self.is_available(backend):
+            # lxml などがインストールされていない場合はフォールバック先 (なければ html.parser) を利用する
+            self.logger.warning("パーサー %s が利用できないため、%s を利用します", backend, fallback or PARSER_HTML_PARSER)
+            backend = fallback or PARSER_HTML_PARSER
+            fallback = None
+
+        self._backend = backend
+        self._fallback = fallback if fallback != backend else None
+
+    @property
+    def backend(self) -> str:
+        """
+        利用するパーサー
+
+        Returns:
+            str: 利用するパーサー
+        """
+        return self._backend
+
+    @property
+    def fallback(self) -> Optional[str]:
+        """
+        フォールバック先のパーサー
+
+        Returns:
+            Optional[str]: フォールバック先のパーサー
+        """
+        return self._fallback
+
+    def parse(self,
+              markup: Union[str, bytes],
+              required: Optional[Callable[[BeautifulSoup], bool]] = None) -> BeautifulSoup:
+        """
+        HTML を解析する
+
+        Args:
+            markup: HTML
+            required: 解析結果が妥当かを判定する関数。False を返した場合、フォールバック先のパーサーで解析しなおす
+
+        Returns:
+            BeautifulSoup: 解析結果
+        """
+        soup = BeautifulSoup(markup, self._backend)
+        if required is None or self._fallback is None or required(soup):
+            return soup
+
+        self.logger.debug("%s での解析結果に必要な要素がないため、%s で解析しなおします", self._backend, self._fallback)
+        return BeautifulSoup(markup, self._fallback)
+
+    @staticmethod
+    def is_available(backend: str) -> bool:
+        """
+        パーサーが利用可能か
+
+        Args:
+            backend: パーサー
+
+        Returns:
+            bool: 利用可能か
+        """
+        return builder_registry.lookup(backend) is not None
+
+    def __str__(self) -> str:
+        return f"UnipaParser(backend={self._backend}, fallback={self._fallback})"
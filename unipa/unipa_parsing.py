@@ -0,0 +1,122 @@
+"""
+解析ユーティリティ
+
+属性値や日時テキストの解析に使う正規表現をモジュールの読み込み時に 1 回だけコンパイルし、
+UNIPA の日時テキストを固定書式として高速に変換します。同じ日時テキストの変換結果はキャッシュします (LRU)。
+
+    start_date, end_date = process_datetimes(["2022/04/01(金) 09:00", "2022/04/30(土) 17:00"])
+"""
+import datetime
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# 日本標準時 (UNIPA の日時はすべて日本時間)
+JST = datetime.timezone(datetime.timedelta(hours=+9), "JST")
+
+# data-pfconfirmcommand 属性からメニュー ID を取得する
+MENU_ID_PATTERN = re.compile(r"'menuForm:mainMenu_menuid':'(.+?)'")
+# 掲示アイテムの onclick 属性から s, p 値を取得する
+TARGET_SP_PATTERN = re.compile(r"PrimeFaces\.ab\({s:\"(.+?)\",p:\"(.+?)\"}\);")
+# UNIPA の日時テキスト (YYYY/MM/DD(曜日) HH:MM。曜日は省略可)
+DATETIME_PATTERN = re.compile(r"\s*(\d{4})/(\d{1,2})/(\d{1,2})\s*(?:\([^)]*\))?\s*(\d{1,2}):(\d{2})\s*")
+# 日時テキストの括弧 (曜日)
+_PARENTHESES_PATTERN = re.compile(r"\(.+?\)")
+
+# 日時テキストの変換結果をキャッシュする件数
+DATETIME_CACHE_SIZE = 4096
+
+
+def get_menuid(pfconfirmcommand: str) -> Optional[str]:
+    """
+    メニュー ID を取得する
+
+    Args:
+        pfconfirmcommand: data-pfconfirmcommand
+
+    Returns:
+        Optional[str]: メニュー ID
+    """
+    match = MENU_ID_PATTERN.search(pfconfirmcommand)
+    if match is None:
+        return None
+    return match.group(1)
+
+
+def get_target_sp(onclick: str) -> Tuple[Optional[str], Optional[str]]:
+    """
+    掲示アイテムの onclick 属性から s, p 値を取得する
+
+    Args:
+        onclick: onclick 属性の値
+
+    Returns:
+        Tuple[Optional[str], Optional[str]]: s, p 値 (取得できない場合は None)
+    """
+    match = TARGET_SP_PATTERN.search(onclick)
+    if match is None:
+        return None, None
+    return match.group(1), match.group(2)
+
+
+@lru_cache(maxsize=DATETIME_CACHE_SIZE)
+def parse_datetime(datetime_str: str) -> datetime.datetime:
+    """
+    UNIPA の日時テキスト (YYYY/MM/DD(曜日) HH:MM) を日本時間の datetime.datetime に変換する
+
+    固定書式として数値を取り出し、strptime を使わずに変換します。書式が異なる場合は strptime で変換します。
+    datetime.datetime は不変のため、同じテキストには同じインスタンスを返します。
+
+    Args:
+        datetime_str: UNIPA の日時テキスト (空文字列は不可)
+
+    Returns:
+        datetime.datetime: 変換後の datetime.datetime
+    """
+    match = DATETIME_PATTERN.fullmatch(datetime_str)
+    if match is not None:
+        year, month, day, hour, minute = match.groups()
+        return datetime.datetime(int(year), int(month), int(day), int(hour), int(minute), tzinfo=JST)
+
+    # 書式が異なる場合 (UnipaUtils.process_datetime の従来の処理)
+    datetime_str = _PARENTHESES_PATTERN.sub("", datetime_str)
+    return datetime.datetime.strptime(datetime_str + " +0900", "%Y/%m/%d %H:%M %z").astimezone(JST)
+
+
+def process_datetime(datetime_str: Optional[str]) -> Optional[datetime.datetime]:
+    """
+    UNIPA の日時テキスト (YYYY/MM/DD(曜日) HH:MM) を日本時間の datetime.datetime に変換する
+
+    Args:
+        datetime_str: UNIPA の日時テキスト
+
+    Returns:
+        Optional[datetime.datetime]: 変換後の datetime.datetime (None・空文字列の場合は None)
+    """
+    if not datetime_str:
+        return None
+    return parse_datetime(datetime_str)
+
+
+def process_datetimes(datetime_strs: Iterable[Optional[str]]) -> List[Optional[datetime.datetime]]:
+    """
+    複数の UNIPA の日時テキストをまとめて datetime.datetime に変換する
+
+    同じテキストは 1 回だけ変換します。
+
+    Args:
+        datetime_strs: UNIPA の日時テキスト
+
+    Returns:
+        List[Optional[datetime.datetime]]: 変換後の datetime.datetime (datetime_strs の順。None・空文字列の場合は None)
+    """
+    results: Dict[Optional[str], Optional[datetime.datetime]] = {None: None, "": None}
+    converted: List[Optional[datetime.datetime]] = []
+    for datetime_str in datetime_strs:
+        if datetime_str in results:
+            converted.append(results[datetime_str])
+            continue
+        result = parse_datetime(datetime_str)
+        results[datetime_str] = result
+        converted.append(result)
+    return converted
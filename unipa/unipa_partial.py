@@ -0,0 +1,160 @@
+"""
+JSF partial-response (部分更新) レスポンス
+
+Faces-Request: partial/ajax で送信したリクエストのレスポンス (XML) を解析します。
+
+    <partial-response id="j_id1"><changes>
+        <update id="funcForm"><![CDATA[<form id="funcForm">...</form>]]></update>
+        <update id="j_id1:javax.faces.ViewState:0"><![CDATA[-123:456]]></update>
+    </changes></partial-response>
+"""
+import xml.etree.ElementTree as ElementTree
+from typing import Dict, List, Optional
+
+from bs4 import BeautifulSoup
+
+from unipa.errors import UnipaInternalError
+from unipa.unipa_parser import UnipaParser
+
+PARTIAL_AJAX_HEADERS = {
+    "Accept": "application/xml, text/xml, */*; q=0.01",
+    "Faces-Request": "partial/ajax",
+    "X-Requested-With": "XMLHttpRequest",
+}
+VIEW_STATE_ID = "javax.faces.ViewState"
+
+
+class UnipaPartialResponse:
+    """
+    JSF partial-response (部分更新) レスポンス
+    """
+
+    def __init__(self,
+                 updates: Dict[str, str],
+                 view_state: Optional[str] = None,
+                 redirect: Optional[str] = None,
+                 error: Optional[str] = None):
+        """
+        コンストラクタ
+
+        Args:
+            updates: 更新された要素 (要素 ID: HTML 断片)。View state の更新は含まない
+            view_state: 新しい View state (更新されていない場合は None)
+            redirect: リダイレクト先 URL (リダイレクトでない場合は None)
+            error: エラーメッセージ (エラーでない場合は None)
+        """
+        self._updates = updates
+        self._view_state = view_state
+        self._redirect = redirect
+        self._error = error
+
+    @property
+    def updates(self) -> Dict[str, str]:
+        """
+        更新された要素 (要素 ID: HTML 断片)。View state の更新は含まない
+
+        Returns:
+            Dict[str, str]: 更新された要素
+        """
+        return self._updates
+
+    @property
+    def view_state(self) -> Optional[str]:
+        """
+        新しい View state
+
+        Returns:
+            Optional[str]: View state (更新されていない場合は None)
+        """
+        return self._view_state
+
+    @property
+    def redirect(self) -> Optional[str]:
+        """
+        リダイレクト先 URL
+
+        Returns:
+            Optional[str]: リダイレクト先 URL (リダイレクトでない場合は None)
+        """
+        return self._redirect
+
+    @property
+    def error(self) -> Optional[str]:
+        """
+        エラーメッセージ
+
+        Returns:
+            Optional[str]: エラーメッセージ (エラーでない場合は None)
+        """
+        return self._error
+
+    def get_update(self,
+                   element_id: str) -> Optional[str]:
+        """
+        更新された要素の HTML 断片を取得する
+
+        Args:
+            element_id: 要素 ID
+
+        Returns:
+            Optional[str]: HTML 断片 (更新されていない場合は None)
+        """
+        return self._updates.get(element_id)
+
+    def get_soup(self,
+                 parser: UnipaParser,
+                 element_ids: Optional[List[str]] = None) -> BeautifulSoup:
+        """
+        更新された要素の HTML 断片を解析する
+
+        Args:
+            parser: HTML パーサー
+            element_ids: 解析する要素 ID (None の場合は更新されたすべての要素)
+
+        Returns:
+            BeautifulSoup: 解析結果
+        """
+        if element_ids is None:
+            element_ids = list(self._updates)
+        return parser.parse("".join(self._updates[x] for x in element_ids if x in self._updates))
+
+    @classmethod
+    def parse(cls,
+              content: bytes) -> "UnipaPartialResponse":
+        """
+        partial-response を解析する
+
+        Args:
+            content: レスポンス本文 (XML)
+
+        Returns:
+            UnipaPartialResponse: 解析結果
+        """
+        try:
+            root = ElementTree.fromstring(content)
+        except ElementTree.ParseError as e:
+            raise UnipaInternalError("部分更新レスポンスの解析に失敗しました。") from e
+
+        if root.tag != "partial-response":
+            raise UnipaInternalError(f"部分更新レスポンスではありません: {root.tag}")
+
+        redirect = root.find("redirect")
+        if redirect is not None:
+            return cls({}, redirect=redirect.get("url"))
+
+        error = root.find("error")
+        if error is not None:
+            name = error.findtext("error-name") or ""
+            message = error.findtext("error-message") or ""
+            return cls({}, error=f"{name}: {message}".strip(": "))
+
+        updates: Dict[str, str] = {}
+        view_state = None
+        for update in root.iterfind("changes/update"):
+            element_id = update.get("id") or ""
+            if element_id == VIEW_STATE_ID or f":{VIEW_STATE_ID}:" in element_id:
+                view_state = update.text or ""
+                continue
+            updates[element_id] = update.text or ""
+
+        return cls(updates, view_state)
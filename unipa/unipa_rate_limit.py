@@ -0,0 +1,161 @@
+"""
+クライアント側のレートリミッター
+
+ホストごとのトークンバケットでリクエストの送信間隔を制限します。複数の Unipa (複数のアカウント・セッション) で
+1 つのレートリミッターを共有することで、同じ UNIPA へのリクエスト全体のレートを制限できます。
+ログインは通常のリクエストとは別の予算 (レート・バースト) で制限します。
+"""
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+RATE_LIMIT_LOGIN = "login"
+RATE_LIMIT_REQUEST = "request"
+
+
+class UnipaTokenBucket:
+    """
+    トークンバケット
+
+    1 秒あたり rate 個のトークンが最大 burst 個まで溜まり、リクエストごとに 1 個消費します。
+    トークンが足りない場合は、先に待っているリクエストの後ろに予約して待ちます。
+    """
+
+    def __init__(self,
+                 rate: float,
+                 burst: int):
+        """
+        トークンバケット コンストラクタ
+
+        Args:
+            rate: 1 秒あたりに補充するトークン数
+            burst: 溜められるトークンの最大数
+        """
+        self.rate = rate
+        self.burst = burst
+        self.acquired = 0
+        self.wait_time = 0.0
+        self.__tokens = float(burst)
+        self.__updated = time.monotonic()
+        self.__lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        トークンを 1 個予約し、利用できるまでの待ち時間を返す (待たない)
+
+        Returns:
+            float: 待ち時間 (秒)
+        """
+        with self.__lock:
+            now = time.monotonic()
+            self.__tokens = min(float(self.burst), self.__tokens + (now - self.__updated) * self.rate)
+            self.__updated = now
+            self.__tokens -= 1
+            wait = -self.__tokens / self.rate if self.__tokens < 0 else 0.0
+            self.acquired += 1
+            self.wait_time += wait
+        return wait
+
+    def acquire(self) -> float:
+        """
+        トークンを 1 個取得する (足りない場合は待つ)
+
+        Returns:
+            float: 待った時間 (秒)
+        """
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class UnipaRateLimiter:
+    """
+    ホストごとのレートリミッター
+
+        limiter = UnipaRateLimiter(request_rate=5, request_burst=10, login_rate=0.5, login_burst=2)
+        policy = UnipaTransportPolicy(rate_limiter=limiter)
+        sessions = [Unipa(base_url, transport=policy) for _ in range(10)]
+    """
+
+    def __init__(self,
+                 request_rate: Optional[float] = 5.0,
+                 request_burst: int = 10,
+                 login_rate: Optional[float] = 1.0,
+                 login_burst: int = 2):
+        """
+        ホストごとのレートリミッター コンストラクタ
+
+        Args:
+            request_rate: 通常のリクエストの 1 秒あたりの上限 (None の場合は制限しない)
+            request_burst: 通常のリクエストのバースト数
+            login_rate: ログイン (ログインページの取得・ログインフォームの送信) の 1 秒あたりの上限
+                (None の場合は制限しない)
+            login_burst: ログインのバースト数
+        """
+        self.budgets: Dict[str, Tuple[Optional[float], int]] = {
+            RATE_LIMIT_REQUEST: (request_rate, request_burst),
+            RATE_LIMIT_LOGIN: (login_rate, login_burst),
+        }
+        self.__buckets: Dict[Tuple[str, str], UnipaTokenBucket] = {}
+        self.__lock = threading.Lock()
+
+    def get_bucket(self,
+                   url: str,
+                   kind: str = RATE_LIMIT_REQUEST) -> Optional[UnipaTokenBucket]:
+        """
+        URL のホストと種類に対応するトークンバケットを取得する
+
+        Args:
+            url: リクエスト URL
+            kind: 種類 (RATE_LIMIT_REQUEST, RATE_LIMIT_LOGIN)
+
+        Returns:
+            Optional[UnipaTokenBucket]: トークンバケット (制限しない場合は None)
+        """
+        rate, burst = self.budgets[kind]
+        if rate is None:
+            return None
+
+        key = (urlparse(url).netloc, kind)
+        with self.__lock:
+            bucket = self.__buckets.get(key)
+            if bucket is None:
+                bucket = UnipaTokenBucket(rate, burst)
+                self.__buckets[key] = bucket
+            return bucket
+
+    def acquire(self,
+                url: str,
+                kind: str = RATE_LIMIT_REQUEST) -> float:
+        """
+        リクエストを送信できるまで待つ
+
+        Args:
+            url: リクエスト URL
+            kind: 種類 (RATE_LIMIT_REQUEST, RATE_LIMIT_LOGIN)
+
+        Returns:
+            float: 待った時間 (秒)
+        """
+        bucket = self.get_bucket(url, kind)
+        return bucket.acquire() if bucket is not None else 0.0
+
+    def get_wait_time(self,
+                      host: Optional[str] = None,
+                      kind: Optional[str] = None) -> float:
+        """
+        これまでに待った時間の合計を取得する
+
+        Args:
+            host: ホスト (None の場合はすべてのホスト)
+            kind: 種類 (None の場合はすべての種類)
+
+        Returns:
+            float: 待った時間の合計 (秒)
+        """
+        with self.__lock:
+            buckets = list(self.__buckets.items())
+        return sum(bucket.wait_time for (bucket_host, bucket_kind), bucket in buckets
+                   if (host is None or bucket_host == host) and (kind is None or bucket_kind == kind))
@@ -0,0 +1,369 @@
+"""
+ページスキャナー
+
+レスポンスの HTML を DOM を構築せずに 1 回だけ走査し、トークン・フォームの action 属性・
+ナビゲーションアイテム・インフォメーションアイテムを取得します。
+"""
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Tuple
+
+from unipa.unipa_utils import Menu, UnipaInfoItem, UnipaNavItem, UnipaUtils
+
+TOKEN_INPUT_NAMES = ("rx-token", "rx-loginKey", "rx-deviceKbn", "rx-loginType", "javax.faces.ViewState")
+
+
+class UnipaPageScan:
+    """
+    ページスキャナーの結果
+    """
+
+    def __init__(self,
+                 token_inputs: Dict[str, str],
+                 actions: Dict[str, str],
+                 nav_items: Optional[List[UnipaNavItem]],
+                 info_items: Optional[List[UnipaInfoItem]]):
+        """
+        コンストラクタ
+
+        Args:
+            token_inputs: form#headerForm のトークンの input (name: value)
+            actions: フォームの action 属性 (フォーム ID: action)
+            nav_items: ナビゲーションアイテム (取得していない・メニューがない・構造が想定と異なる場合は None)
+            info_items: インフォメーションアイテム (取得していない・インフォメーションがない・構造が想定と異なる場合は None)
+        """
+        self._token_inputs = token_inputs
+        self._actions = actions
+        self._nav_items = nav_items
+        self._info_items = info_items
+
+    @property
+    def token_inputs(self) -> Dict[str, str]:
+        """
+        form#headerForm のトークンの input (name: value)
+
+        Returns:
+            Dict[str, str]: トークンの input
+        """
+        return self._token_inputs
+
+    @property
+    def actions(self) -> Dict[str, str]:
+        """
+        フォームの action 属性 (フォーム ID: action)
+
+        Returns:
+            Dict[str, str]: フォームの action 属性
+        """
+        return self._actions
+
+    @property
+    def nav_items(self) -> Optional[List[UnipaNavItem]]:
+        """
+        ナビゲーションアイテム
+
+        Returns:
+            Optional[List[UnipaNavItem]]: ナビゲーションアイテム (取得していない・メニューがない・構造が想定と異なる場合は None)
+        """
+        return self._nav_items
+
+    @property
+    def info_items(self) -> Optional[List[UnipaInfoItem]]:
+        """
+        インフォメーションアイテム
+
+        Returns:
+            Optional[List[UnipaInfoItem]]: インフォメーションアイテム
+                (取得していない・インフォメーションがない・構造が想定と異なる場合は None)
+        """
+        return self._info_items
+
+    @property
+    def has_token(self) -> bool:
+        """
+        トークンがすべて揃っているか
+
+        Returns:
+            bool: トークンがすべて揃っているか
+        """
+        return all(name in self._token_inputs for name in TOKEN_INPUT_NAMES)
+
+    @property
+    def header_action(self) -> Optional[str]:
+        """
+        form#headerForm の action 属性
+
+        Returns:
+            Optional[str]: action 属性 (ない場合は None)
+        """
+        return self._actions.get("headerForm")
+
+
+class _ScanComplete(Exception):
+    """
+    必要な情報をすべて取得したため走査を打ち切る
+    """
+
+
+class UnipaPageScanner(HTMLParser):
+    """
+    ページスキャナー
+
+    UnipaUtils.get_nav_items, UnipaUtils.get_info_items, UnipaToken.from_soup と同じ要素を対象にします。
+    ナビゲーション・インフォメーションアイテムを取得しない場合は、form#headerForm の終了タグで走査を打ち切ります。
+    DOM から取得した場合と結果が異なりうる構造 (名前・ID のないアイテム、重複したメニュー・インフォメーション、
+    閉じられていない要素など) を見つけた場合は、アイテムを None とします (呼び出し元は DOM から取得しなおします)。
+
+        scan = UnipaPageScanner.scan(html, items=True)
+        print(scan.token_inputs, scan.header_action, scan.nav_items)
+    """
+
+    def __init__(self,
+                 items: bool = False):
+        """
+        コンストラクタ
+
+        Args:
+            items: ナビゲーション・インフォメーションアイテムを取得するか
+        """
+        super().__init__(convert_charrefs=True)
+        self.__items = items
+        self.__form: Optional[str] = None
+        self.token_inputs: Dict[str, str] = {}
+        self.actions: Dict[str, str] = {}
+
+        # 取得中のテキスト (種類, タグ名, テキスト) と、取得中に開いた同名のタグの数
+        self.__capture: Optional[Tuple[str, str, List[str]]] = None
+        self.__capture_depth = 0
+
+        # DOM から取得した場合と結果が異なりうる構造を見つけたか
+        self.__mismatch = False
+
+        # #portalCont (タグ名, 開いている同名のタグの数)
+        self.__portal_tag: Optional[str] = None
+        self.__portal_depth = 0
+
+        # ナビゲーションアイテム
+        self.nav_items: Optional[List[UnipaNavItem]] = None
+        self.__menu_depth = 0
+        self.__menu_name: Optional[str] = None
+        self.__sub_name: Optional[str] = None
+        self.__in_submenu = False
+        self.__in_header = False
+        self.__in_submenu_link = False
+        self.__menu_id: Optional[str] = None
+        self.__in_item_link = False
+
+        # インフォメーションアイテム
+        self.info_items: Optional[List[UnipaInfoItem]] = None
+        self.__info_depth = 0
+        self.__panel_depth: Optional[int] = None
+        self.__info: Optional[List[Optional[str]]] = None
+
+    @classmethod
+    def scan(cls,
+             markup: str,
+             items: bool = False) -> UnipaPageScan:
+        """
+        HTML を走査する
+
+        Args:
+            markup: HTML
+            items: ナビゲーション・インフォメーションアイテムを取得するか
+
+        Returns:
+            UnipaPageScan: 結果
+        """
+        scanner = cls(items)
+        try:
+            scanner.feed(markup)
+            scanner.close()
+        except _ScanComplete:
+            return UnipaPageScan(scanner.token_inputs, scanner.actions, None, None)
+
+        if scanner.__capture is not None or scanner.__menu_depth > 0 or scanner.__info_depth > 0:
+            scanner.__mismatch = True
+        if scanner.__mismatch:
+            return UnipaPageScan(scanner.token_inputs, scanner.actions, None, None)
+        return UnipaPageScan(scanner.token_inputs, scanner.actions, scanner.nav_items, scanner.info_items)
+
+    def handle_starttag(self,
+                        tag: str,
+                        attrs: List[Tuple[str, Optional[str]]]) -> None:
+        if tag == "form":
+            attributes = dict(attrs)
+            self.__form = attributes.get("id")
+            action = attributes.get("action")
+            if self.__form is not None and action is not None:
+                self.actions[self.__form] = action
+            return
+
+        if tag == "input":
+            if self.__form == "headerForm":
+                attributes = dict(attrs)
+                name = attributes.get("name")
+                if name in TOKEN_INPUT_NAMES and name not in self.token_inputs:
+                    self.token_inputs[name] = attributes.get("value") or ""
+            return
+
+        if not self.__items:
+            return
+
+        attributes = dict(attrs)
+        if self.__portal_tag is None:
+            if attributes.get("id") == "portalCont":
+                self.__portal_tag = tag
+                self.__portal_depth = 1
+        elif tag == self.__portal_tag:
+            self.__portal_depth += 1
+
+        if self.__capture is not None and tag == self.__capture[1]:
+            self.__capture_depth += 1
+
+        if tag == "div":
+            self.__start_div(attributes)
+        elif self.__menu_depth > 0:
+            self.__start_menu_tag(tag, attributes)
+        elif self.__info_depth > 0:
+            self.__start_info_tag(tag, attributes)
+
+    def __start_div(self,
+                    attributes: Dict[str, Optional[str]]) -> None:
+        classes = (attributes.get("class") or "").split()
+        if self.__menu_depth > 0:
+            self.__menu_depth += 1
+        elif attributes.get("id") == "menuForm:mainMenu":
+            if self.nav_items is not None:
+                self.__mismatch = True
+            self.__menu_depth = 1
+            self.nav_items = []
+
+        if self.__info_depth > 0:
+            self.__info_depth += 1
+            if "ui-panel-content" in classes:
+                if self.__panel_depth is not None:
+                    # 入れ子のパネル
+                    self.__mismatch = True
+                    self.__flush_info()
+                self.__panel_depth = self.__info_depth
+                self.__info = [None, None]
+        elif "infoDetail" in classes and self.__portal_tag is not None:
+            if self.info_items is not None:
+                self.__mismatch = True
+            self.__info_depth = 1
+            self.info_items = []
+
+    def __start_menu_tag(self,
+                         tag: str,
+                         attributes: Dict[str, Optional[str]]) -> None:
+        classes = (attributes.get("class") or "").split()
+        if tag == "td":
+            self.__in_submenu = True
+            self.__sub_name = None
+        elif tag == "li" and "ui-widget-header" in classes:
+            self.__in_header = True
+        elif tag == "h3" and self.__in_submenu and self.__in_header and self.__sub_name is None and \
+                self.__capture is None:
+            self.__capture = ("sub_name", tag, [])
+        elif tag == "a" and "ui-submenu-link" in classes:
+            self.__in_submenu_link = True
+            self.__menu_name = None
+        elif tag == "a" and "ui-menuitem-link" in classes and self.__in_submenu:
+            command = attributes.get("data-pfconfirmcommand")
+            self.__in_item_link = command is not None
+            self.__menu_id = UnipaUtils.get_menuid(command) if command is not None else None
+        elif tag == "span" and "ui-menuitem-text" in classes and self.__capture is None:
+            if self.__in_submenu_link and self.__menu_name is None:
+                self.__capture = ("menu_name", tag, [])
+            elif self.__in_item_link:
+                self.__capture = ("item_name", tag, [])
+
+    def __start_info_tag(self,
+                         tag: str,
+                         attributes: Dict[str, Optional[str]]) -> None:
+        if self.__info is None:
+            return
+        classes = (attributes.get("class") or "").split()
+        if tag == "a" and "ui-commandlink" in classes and self.__info[1] is None:
+            self.__info[1] = attributes.get("id")
+        elif tag == "span" and "span" in classes and self.__info[0] is None and self.__capture is None:
+            self.__capture = ("info_name", tag, [])
+
+    def handle_endtag(self,
+                      tag: str) -> None:
+        if tag == "form":
+            if self.__form == "headerForm" and not self.__items:
+                raise _ScanComplete()
+            self.__form = None
+            return
+
+        if not self.__items:
+            return
+
+        if self.__portal_tag == tag:
+            self.__portal_depth -= 1
+            if self.__portal_depth == 0:
+                self.__portal_tag = None
+
+        if self.__capture is not None and self.__capture[1] == tag:
+            if self.__capture_depth > 0:
+                self.__capture_depth -= 1
+            else:
+                self.__end_capture("".join(self.__capture[2]))
+            return
+
+        if tag == "div":
+            if self.__menu_depth > 0:
+                self.__menu_depth -= 1
+            if self.__info_depth > 0:
+                self.__info_depth -= 1
+                if self.__panel_depth is not None and self.__info_depth < self.__panel_depth:
+                    self.__panel_depth = None
+                    self.__flush_info()
+        elif tag == "td":
+            self.__in_submenu = False
+        elif tag == "li":
+            self.__in_header = False
+        elif tag == "a":
+            if self.__in_item_link:
+                # 確認ダイアログを伴うリンクに名前がない
+                self.__mismatch = True
+            self.__in_submenu_link = False
+            self.__in_item_link = False
+
+    def handle_data(self,
+                    data: str) -> None:
+        if self.__capture is not None:
+            self.__capture[2].append(data)
+
+    def __end_capture(self,
+                      text: str) -> None:
+        if self.__capture is None:
+            return
+        kind = self.__capture[0]
+        self.__capture = None
+
+        if kind == "menu_name":
+            self.__menu_name = text
+        elif kind == "sub_name":
+            self.__sub_name = text
+        elif kind == "item_name" and self.nav_items is not None:
+            if self.__menu_name is None or self.__sub_name is None:
+                self.__mismatch = True
+            self.nav_items.append(UnipaNavItem(
+                menu=Menu(name=self.__menu_name or "", sub_name=self.__sub_name),
+                name=text,
+                menu_id=self.__menu_id
+            ))
+            self.__in_item_link = False
+        elif kind == "info_name" and self.__info is not None:
+            self.__info[0] = text
+
+    def __flush_info(self) -> None:
+        if self.__info is None or self.info_items is None:
+            return
+        title, item_id = self.__info
+        self.__info = None
+        if title is None or item_id is None:
+            self.__mismatch = True
+            return
+        self.info_items.append(UnipaInfoItem(name=title, item_id=item_id))
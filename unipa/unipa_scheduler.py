@@ -0,0 +1,694 @@
+"""
+複数アカウントの定期取得スケジューラー
+
+多数のアカウントの掲示板・クラスを定期的に取得します。アカウントごとに状態 (セッション・次回の実行時刻・
+連続失敗回数) を持ち、ワーカープールで並列に取得します。
+
+- 公平なキューイング: 次回の実行時刻が早いアカウントから順に実行します (同じ時刻の場合は登録・再登録の順)。
+  取得が間隔より長くかかっても、ほかのアカウントが後回しにされ続けることはありません
+- 同時実行数の上限: 同時に取得するアカウント数を max_concurrency までに制限します。
+  リクエストのレートは transport の UnipaRateLimiter で制限してください (すべてのアカウントで共有されます)
+- アカウントごとのバックオフ: 失敗したアカウントは、連続失敗回数に応じて指数的に間隔を空けて再試行します
+- 1 つのアカウントを同時に 2 つのワーカーが取得することはありません (UNIPA のセッションは直列に扱う必要があるため)
+
+    scheduler = UnipaPollScheduler(base_url, poll_bulletin_board, interval=600, max_concurrency=8,
+                                   on_result=lambda account, items: print(account.key, len(items)))
+    for username, password in accounts:
+        scheduler.add_account(username, password)
+    scheduler.start()
+    ...
+    print(scheduler.get_metrics())
+    scheduler.stop()
+"""
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from unipa import Unipa
+from unipa.BulletinBoard import UnipaBulletinBoard
+from unipa.BulletinBoard.BulletinBoard import UnipaBulletinBoardItem
+from unipa.BulletinBoard.BulletinBoardDiff import UnipaBulletinBoardDiff, UnipaBulletinBoardEvent
+from unipa.BulletinBoard.BulletinBoardStateStore import UnipaBulletinBoardStateStore
+from unipa.Classes import UnipaClasses
+from unipa.Classes.UnipaClass import UnipaClass
+from unipa.errors import UnipaCircuitOpenError, UnipaInternalError, UnipaNotLoggedIn, UnipaSessionExpiredError
+from unipa.unipa_navigation import UnipaNavigationStore
+from unipa.unipa_parse_pool import UnipaParsePool
+from unipa.unipa_parser import PARSER_LXML
+from unipa.unipa_transport import UnipaTransportPolicy
+
+
+class UnipaAccount:
+    """
+    スケジューラーが管理するアカウントの状態
+
+    状態はスケジューラーが更新します。読み取りのみ行ってください。
+    """
+
+    def __init__(self,
+                 key: str,
+                 username: str,
+                 password: str,
+                 base_url: str,
+                 interval: float):
+        """
+        コンストラクタ
+
+        Args:
+            key: アカウントの識別子
+            username: ユーザー名
+            password: パスワード
+            base_url: UNIVERSAL PASSPORT のベース URL
+            interval: 取得間隔 (秒)
+        """
+        self.key = key
+        self.username = username
+        self.password = password
+        self.base_url = base_url
+        self.interval = interval
+        # ログイン済みのセッション (未ログイン・失敗後は None)
+        self.unipa: Optional[Unipa] = None
+        # 次回の実行時刻 (time.monotonic)
+        self.next_run = 0.0
+        self.runs = 0
+        self.successes = 0
+        self.errors = 0
+        self.logins = 0
+        # 連続失敗回数 (成功すると 0 に戻る)
+        self.failures = 0
+        self.last_error: Optional[BaseException] = None
+        self.last_result: Optional[object] = None
+        self.last_success: Optional[float] = None
+        self.last_duration: Optional[float] = None
+        self.running = False
+        # 有効なキューのエントリの番号 (再登録・削除で古いエントリを無効にする)
+        self._sequence = -1
+
+    def __str__(self) -> str:
+        return f"UnipaAccount{{key={self.key}, runs={self.runs}, errors={self.errors}, failures={self.failures}}}"
+
+
+# 取得処理 (ログイン済みのセッション, アカウント) -> 結果
+PollTask = Callable[[Unipa, UnipaAccount], object]
+
+
+def poll_bulletin_board(unipa: Unipa,
+                        account: UnipaAccount) -> List[UnipaBulletinBoardItem]:
+    """
+    取得処理: 掲示リストを取得する
+
+    Args:
+        unipa: ログイン済みのセッション
+        account: アカウント
+
+    Returns:
+        List[UnipaBulletinBoardItem]: 掲示リスト
+    """
+    return UnipaBulletinBoard(unipa).get_all()
+
+
+def poll_classes(unipa: Unipa,
+                 account: UnipaAccount) -> List[UnipaClass]:
+    """
+    取得処理: 履修中の全クラスを取得する
+
+    Args:
+        unipa: ログイン済みのセッション
+        account: アカウント
+
+    Returns:
+        List[UnipaClass]: 履修中の全クラス
+    """
+    return UnipaClasses(unipa).get_all()
+
+
+class UnipaBulletinBoardDiffTask:
+    """
+    取得処理: アカウントごとの状態ストアと比較し、掲示板の変化を取得する
+
+        task = UnipaBulletinBoardDiffTask(lambda account: UnipaBulletinBoardStateStore(f"state/{account.key}.sqlite3"))
+        scheduler = UnipaPollScheduler(base_url, task, on_result=notify)
+    """
+
+    def __init__(self,
+                 store_factory: Callable[[UnipaAccount], UnipaBulletinBoardStateStore],
+                 fetch_details: bool = True):
+        """
+        コンストラクタ
+
+        Args:
+            store_factory: アカウントの状態ストアを作成する関数 (アカウントごとに初回の取得時に 1 回だけ呼ばれる)
+            fetch_details: 追加された掲示の詳細を取得するか
+        """
+        self.store_factory = store_factory
+        self.fetch_details = fetch_details
+        self.__diffs: Dict[str, UnipaBulletinBoardDiff] = {}
+        self.__lock = threading.Lock()
+
+    def get_diff(self,
+                 account: UnipaAccount) -> UnipaBulletinBoardDiff:
+        """
+        アカウントの差分検出を取得する (なければ作成する)
+
+        Args:
+            account: アカウント
+
+        Returns:
+            UnipaBulletinBoardDiff: 差分検出
+        """
+        with self.__lock:
+            diff = self.__diffs.get(account.key)
+            if diff is None:
+                diff = UnipaBulletinBoardDiff(self.store_factory(account))
+                self.__diffs[account.key] = diff
+            return diff
+
+    def __call__(self,
+                 unipa: Unipa,
+                 account: UnipaAccount) -> List[UnipaBulletinBoardEvent]:
+        return self.get_diff(account).poll(UnipaBulletinBoard(unipa), self.fetch_details)
+
+    def close(self) -> None:
+        """
+        すべての状態ストアを閉じる
+        """
+        with self.__lock:
+            for diff in self.__diffs.values():
+                diff.store.close()
+            self.__diffs.clear()
+
+
+class UnipaSchedulerMetrics:
+    """
+    スケジューラーの統計 (取得時点のスナップショット)
+    """
+
+    def __init__(self,
+                 accounts: int,
+                 running: int,
+                 backlog: int,
+                 max_lag: float,
+                 completed: int,
+                 failed: int,
+                 logins: int,
+                 throughput: float,
+                 average_duration: float,
+                 backing_off: int):
+        """
+        コンストラクタ
+
+        Args:
+            accounts: アカウント数
+            running: 取得中のアカウント数
+            backlog: 実行時刻を過ぎて待っているアカウント数
+            max_lag: 待っているアカウントの、実行時刻からの最大の遅れ (秒)
+            completed: 成功した取得の回数
+            failed: 失敗した取得の回数
+            logins: ログインの回数
+            throughput: 直近の 1 秒あたりの取得の完了数 (成功・失敗を含む)
+            average_duration: 直近の取得にかかった時間の平均 (秒)
+            backing_off: 失敗によるバックオフ中のアカウント数
+        """
+        self.accounts = accounts
+        self.running = running
+        self.backlog = backlog
+        self.max_lag = max_lag
+        self.completed = completed
+        self.failed = failed
+        self.logins = logins
+        self.throughput = throughput
+        self.average_duration = average_duration
+        self.backing_off = backing_off
+
+    def __str__(self) -> str:
+        return (f"UnipaSchedulerMetrics{{accounts={self.accounts}, running={self.running}, "
+                f"backlog={self.backlog}, max_lag={self.max_lag:.3f}s, completed={self.completed}, "
+                f"failed={self.failed}, logins={self.logins}, throughput={self.throughput:.2f}/s, "
+                f"average_duration={self.average_duration:.3f}s, backing_off={self.backing_off}}}")
+
+
+class UnipaPollScheduler:
+    """
+    複数アカウントの定期取得スケジューラー
+    """
+
+    def __init__(self,
+                 base_url: str,
+                 task: PollTask = poll_bulletin_board,
+                 interval: float = 300.0,
+                 max_workers: int = 8,
+                 max_concurrency: Optional[int] = None,
+                 backoff_base: float = 30.0,
+                 backoff_max: float = 3600.0,
+                 on_result: Optional[Callable[[UnipaAccount, object], None]] = None,
+                 on_error: Optional[Callable[[UnipaAccount, BaseException], None]] = None,
+                 parser: str = PARSER_LXML,
+                 transport: Optional[UnipaTransportPolicy] = None,
+                 navigation_store: Optional[UnipaNavigationStore] = None,
+                 parse_pool: Optional[UnipaParsePool] = None,
+                 metrics_window: float = 60.0):
+        """
+        コンストラクタ
+
+        Args:
+            base_url: UNIVERSAL PASSPORT のベース URL (add_account で base_url を省略した場合に利用する)
+            task: 取得処理 (poll_bulletin_board, poll_classes, UnipaBulletinBoardDiffTask など)
+            interval: 取得間隔 (秒。add_account で interval を省略した場合に利用する)
+            max_workers: ワーカー数
+            max_concurrency: 同時に取得するアカウント数の上限 (None の場合は max_workers)
+            backoff_base: 失敗後の再試行までの待機時間の基準 (秒)。n 回連続で失敗したアカウントは
+                backoff_base * 2^(n-1) 秒 (backoff_max まで) の 1/2 - 1 倍の時間を待つ
+            backoff_max: 失敗後の再試行までの待機時間の上限 (秒)
+            on_result: 取得に成功したときに呼ばれる関数 (アカウント, 結果)。ワーカーのスレッドで呼ばれる
+            on_error: 取得に失敗したときに呼ばれる関数 (アカウント, 例外)。ワーカーのスレッドで呼ばれる
+            parser: HTML パーサー
+            transport: HTTP 通信のポリシー (すべてのアカウントで共有する。レートリミッター・サーキットブレーカーも共有される)
+            navigation_store: ナビゲーションの保存先 (None の場合はプロセス内で共有する保存先)
+            parse_pool: 解析用プロセスプール (すべてのアカウントで共有する。None の場合はワーカーのスレッドで解析する)
+            metrics_window: スループット・平均時間を求める直近の期間 (秒)
+        """
+        if max_workers < 1:
+            raise UnipaInternalError("ワーカー数は 1 以上を指定してください")
+        if max_concurrency is not None and max_concurrency < 1:
+            raise UnipaInternalError("同時実行数の上限は 1 以上を指定してください")
+
+        self.logger = logging.getLogger(__name__)
+        self.base_url = base_url
+        self.task = task
+        self.interval = interval
+        self.max_workers = max_workers
+        self.max_concurrency = max_concurrency if max_concurrency is not None else max_workers
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.on_result = on_result
+        self.on_error = on_error
+        self.parser = parser
+        self.transport: UnipaTransportPolicy = transport or UnipaTransportPolicy()
+        self.navigation_store = navigation_store
+        self.parse_pool = parse_pool
+        self.metrics_window = metrics_window
+
+        self.__accounts: Dict[str, UnipaAccount] = {}
+        # (次回の実行時刻, 番号, アカウントの識別子) のヒープ
+        self.__queue: List[Tuple[float, int, str]] = []
+        self.__sequence = itertools.count()
+        self.__running: Set[str] = set()
+        self.__condition = threading.Condition()
+        self.__executor: Optional[ThreadPoolExecutor] = None
+        self.__thread: Optional[threading.Thread] = None
+        self.__stopping = False
+
+        self.__completed = 0
+        self.__failed = 0
+        self.__logins = 0
+        # 直近の取得の (完了時刻, かかった時間)
+        self.__recent: Deque[Tuple[float, float]] = deque()
+        self.__started_at = time.monotonic()
+
+    @property
+    def accounts(self) -> List[UnipaAccount]:
+        """
+        管理しているアカウント
+
+        Returns:
+            List[UnipaAccount]: アカウント (登録順)
+        """
+        with self.__condition:
+            return list(self.__accounts.values())
+
+    def get_account(self,
+                    key: str) -> Optional[UnipaAccount]:
+        """
+        アカウントを取得する
+
+        Args:
+            key: アカウントの識別子
+
+        Returns:
+            Optional[UnipaAccount]: アカウント (登録されていない場合は None)
+        """
+        with self.__condition:
+            return self.__accounts.get(key)
+
+    def add_account(self,
+                    username: str,
+                    password: str,
+                    base_url: Optional[str] = None,
+                    key: Optional[str] = None,
+                    interval: Optional[float] = None,
+                    delay: float = 0.0) -> UnipaAccount:
+        """
+        アカウントを登録する
+
+        Args:
+            username: ユーザー名
+            password: パスワード
+            base_url: UNIVERSAL PASSPORT のベース URL (None の場合はスケジューラーのベース URL)
+            key: アカウントの識別子 (None の場合は「ベース URL と ユーザー名」)
+            interval: 取得間隔 (秒。None の場合はスケジューラーの取得間隔)
+            delay: 初回の取得までの時間 (秒。多数のアカウントを登録する場合、取得間隔の中で分散させると負荷が平準化される)
+
+        Returns:
+            UnipaAccount: アカウント
+        """
+        base_url = base_url if base_url is not None else self.base_url
+        key = key if key is not None else f"{base_url} {username}"
+        account = UnipaAccount(key, username, password, base_url, interval if interval is not None else self.interval)
+        with self.__condition:
+            if key in self.__accounts:
+                raise UnipaInternalError(f"アカウント {key} は登録済みです。")
+            self.__accounts[key] = account
+            self.__schedule(account, time.monotonic() + delay)
+            self.__condition.notify_all()
+        return account
+
+    def remove_account(self,
+                       key: str) -> Optional[UnipaAccount]:
+        """
+        アカウントの登録を解除する (取得中の場合は、取得の完了後に解除される)
+
+        Args:
+            key: アカウントの識別子
+
+        Returns:
+            Optional[UnipaAccount]: 解除したアカウント (登録されていない場合は None)
+        """
+        with self.__condition:
+            account = self.__accounts.pop(key, None)
+            if account is None:
+                return None
+            account._sequence = -1
+            running = account.running
+        if not running:
+            self.__close_session(account)
+        return account
+
+    def __schedule(self,
+                   account: UnipaAccount,
+                   next_run: float) -> None:
+        # ロックを取得した状態で呼ぶ
+        account.next_run = next_run
+        account._sequence = next(self.__sequence)
+        heapq.heappush(self.__queue, (next_run, account._sequence, account.key))
+
+    def get_backoff(self,
+                    failures: int) -> float:
+        """
+        連続失敗回数から再試行までの待機時間を求める
+
+        Args:
+            failures: 連続失敗回数 (1 以上)
+
+        Returns:
+            float: 待機時間 (秒)
+        """
+        backoff = min(self.backoff_max, self.backoff_base * 2 ** (failures - 1))
+        return random.uniform(backoff / 2, backoff)
+
+    def run_pending(self) -> int:
+        """
+        実行時刻を過ぎたアカウントの取得を、同時実行数の上限までワーカーに割り当てる (完了を待たない)
+
+        Returns:
+            int: 割り当てたアカウント数
+        """
+        with self.__condition:
+            return self.__dispatch(time.monotonic())
+
+    def __dispatch(self,
+                   now: float) -> int:
+        # ロックを取得した状態で呼ぶ
+        dispatched = 0
+        while len(self.__running) < self.max_concurrency and len(self.__queue) > 0 and self.__queue[0][0] <= now:
+            _, sequence, key = heapq.heappop(self.__queue)
+            account = self.__accounts.get(key)
+            if account is None or account._sequence != sequence:
+                # 削除・再登録されたアカウントの古いエントリ
+                continue
+            account.running = True
+            self.__running.add(key)
+            self.__get_executor().submit(self.__run, account)
+            dispatched += 1
+        return dispatched
+
+    def __get_executor(self) -> ThreadPoolExecutor:
+        if self.__executor is None:
+            self.__executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="unipa-scheduler")
+        return self.__executor
+
+    def __run(self,
+              account: UnipaAccount) -> None:
+        started = time.monotonic()
+        result: Optional[object] = None
+        error: Optional[BaseException] = None
+        try:
+            result = self.__poll(account)
+        except Exception as e:
+            error = e
+        finished = time.monotonic()
+
+        with self.__condition:
+            account.runs += 1
+            account.running = False
+            account.last_duration = finished - started
+            self.__running.discard(account.key)
+            self.__recent.append((finished, finished - started))
+            if error is None:
+                account.successes += 1
+                account.failures = 0
+                account.last_result = result
+                account.last_success = finished
+                self.__completed += 1
+                next_run = started + account.interval
+            else:
+                account.errors += 1
+                account.failures += 1
+                account.last_error = error
+                self.__failed += 1
+                next_run = finished + self.get_backoff(account.failures)
+            registered = self.__accounts.get(account.key) is account
+            if registered:
+                self.__schedule(account, next_run)
+            self.__condition.notify_all()
+
+        if error is not None:
+            self.logger.warning("アカウント %s の取得に失敗しました (%d 回連続): %r", account.key, account.failures, error)
+        if not registered or (error is not None and self.__is_session_broken(error)):
+            self.__close_session(account)
+
+        callback_error: Optional[BaseException] = None
+        try:
+            if error is None and self.on_result is not None:
+                self.on_result(account, result)
+            elif error is not None and self.on_error is not None:
+                self.on_error(account, error)
+        except Exception as e:
+            callback_error = e
+        if callback_error is not None:
+            self.logger.warning("アカウント %s のコールバックで例外が発生しました: %r", account.key, callback_error)
+
+    def __poll(self,
+               account: UnipaAccount) -> object:
+        """
+        アカウントの取得処理を実行する。
+
+        ログイン済みのセッションを再利用し、再利用したセッションが期限切れの場合はログインしなおして 1 回だけ
+        再試行します。それ以外の失敗 (サーキットブレーカー・状態ストア・コールバックの例外など) はログインしなおさずに
+        呼び出し元に伝えます。
+        """
+        unipa = account.unipa
+        if unipa is not None:
+            try:
+                return self.task(unipa, account)
+            except (UnipaSessionExpiredError, UnipaNotLoggedIn) as e:
+                self.logger.debug("アカウント %s のセッションを作りなおします: %r", account.key, e)
+                self.__close_session(account)
+
+        unipa = self.__login(account)
+        return self.task(unipa, account)
+
+    def __login(self,
+                account: UnipaAccount) -> Unipa:
+        unipa = Unipa(account.base_url, self.parser, transport=self.transport,
+                      navigation_store=self.navigation_store, parse_pool=self.parse_pool)
+        with self.__condition:
+            account.logins += 1
+            self.__logins += 1
+        try:
+            logged_in = unipa.login(account.username, account.password)
+        except BaseException:
+            unipa.session.close()
+            raise
+        if not logged_in:
+            unipa.session.close()
+            raise UnipaInternalError(f"アカウント {account.key} のログインに失敗しました。")
+        account.unipa = unipa
+        return unipa
+
+    @staticmethod
+    def __is_session_broken(error: BaseException) -> bool:
+        """
+        失敗したセッションを作りなおす必要があるか
+
+        通信・ページの処理に失敗した場合はトークンの状態がわからないため、セッションを作りなおします。
+        サーキットブレーカーがリクエストを停止した場合と、UNIPA 以外の例外 (状態ストア・コールバックなど) の場合は
+        セッションを再利用します。
+
+        Args:
+            error: 例外
+
+        Returns:
+            bool: セッションを作りなおす必要があるか
+        """
+        if isinstance(error, UnipaCircuitOpenError):
+            return False
+        return isinstance(error, (UnipaInternalError, UnipaNotLoggedIn))
+
+    @staticmethod
+    def __close_session(account: UnipaAccount) -> None:
+        unipa = account.unipa
+        account.unipa = None
+        if unipa is not None:
+            unipa.session.close()
+
+    def run_once(self,
+                 timeout: Optional[float] = None) -> List[UnipaAccount]:
+        """
+        すべてのアカウントを (次回の実行時刻にかかわらず) 1 回ずつ取得し、完了を待つ。
+
+        バックグラウンドで実行中 (start) の場合は利用できません。取得後の次回の実行時刻は通常どおり設定されます。
+
+        Args:
+            timeout: 待つ最大秒数 (None の場合は無制限)
+
+        Returns:
+            List[UnipaAccount]: 取得に失敗したアカウント
+        """
+        if self.__thread is not None:
+            raise UnipaInternalError("バックグラウンドで実行中は run_once を利用できません。")
+
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        with self.__condition:
+            now = time.monotonic()
+            pending = {key: account.runs for key, account in self.__accounts.items()}
+            for account in self.__accounts.values():
+                if not account.running:
+                    self.__schedule(account, now)
+
+            while True:
+                pending = {key: runs for key, runs in pending.items()
+                           if key in self.__accounts and self.__accounts[key].runs == runs}
+                if len(pending) == 0:
+                    break
+                # 待っている間に実行時刻を過ぎたほかのアカウントは割り当てない
+                self.__dispatch_keys(set(pending))
+                remaining = deadline - time.monotonic() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    raise UnipaInternalError("すべてのアカウントの取得が時間内に完了しませんでした。")
+                self.__condition.wait(remaining)
+
+            return [account for account in self.__accounts.values() if account.failures > 0]
+
+    def __dispatch_keys(self,
+                        keys: Set[str]) -> None:
+        # ロックを取得した状態で呼ぶ。keys のアカウントのみを、キューの順に割り当てる
+        skipped: List[Tuple[float, int, str]] = []
+        while len(self.__running) < self.max_concurrency and len(self.__queue) > 0:
+            entry = heapq.heappop(self.__queue)
+            account = self.__accounts.get(entry[2])
+            if account is None or account._sequence != entry[1]:
+                continue
+            if entry[2] not in keys:
+                skipped.append(entry)
+                continue
+            account.running = True
+            self.__running.add(account.key)
+            self.__get_executor().submit(self.__run, account)
+        for entry in skipped:
+            heapq.heappush(self.__queue, entry)
+
+    def start(self) -> None:
+        """
+        バックグラウンドのスレッドで定期取得を開始する
+        """
+        with self.__condition:
+            if self.__thread is not None:
+                return
+            self.__stopping = False
+            self.__thread = threading.Thread(target=self.__loop, name="unipa-scheduler-dispatcher", daemon=True)
+            self.__thread.start()
+
+    def __loop(self) -> None:
+        with self.__condition:
+            while not self.__stopping:
+                now = time.monotonic()
+                self.__dispatch(now)
+                # 次のアカウントの実行時刻まで待つ (ワーカーの完了・アカウントの登録で起こされる)
+                timeout: Optional[float] = None
+                if len(self.__running) < self.max_concurrency and len(self.__queue) > 0:
+                    timeout = max(self.__queue[0][0] - now, 0.0)
+                self.__condition.wait(timeout)
+
+    def stop(self,
+             wait: bool = True) -> None:
+        """
+        定期取得を停止する。取得中のアカウントの完了を待ち、すべてのセッションを閉じる
+
+        Args:
+            wait: 取得中のアカウントの完了を待つか
+        """
+        with self.__condition:
+            self.__stopping = True
+            self.__condition.notify_all()
+            thread = self.__thread
+            self.__thread = None
+        if thread is not None:
+            thread.join()
+
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=wait)
+            self.__executor = None
+        if wait:
+            for account in self.accounts:
+                self.__close_session(account)
+
+    def get_metrics(self) -> UnipaSchedulerMetrics:
+        """
+        スループット・バックログなどの統計を取得する
+
+        Returns:
+            UnipaSchedulerMetrics: 統計
+        """
+        with self.__condition:
+            now = time.monotonic()
+            while len(self.__recent) > 0 and self.__recent[0][0] < now - self.metrics_window:
+                self.__recent.popleft()
+
+            waiting = [account for account in self.__accounts.values() if not account.running]
+            lags = [now - account.next_run for account in waiting if account.next_run <= now]
+            window = min(self.metrics_window, now - self.__started_at)
+            durations = [duration for _, duration in self.__recent]
+            return UnipaSchedulerMetrics(
+                accounts=len(self.__accounts),
+                running=len(self.__running),
+                backlog=len(lags),
+                max_lag=max(lags, default=0.0),
+                completed=self.__completed,
+                failed=self.__failed,
+                logins=self.__logins,
+                throughput=len(self.__recent) / window if window > 0 else 0.0,
+                average_duration=sum(durations) / len(durations) if len(durations) > 0 else 0.0,
+                backing_off=sum(1 for account in waiting if account.failures > 0),
+            )
+
+    def __enter__(self) -> "UnipaPollScheduler":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.stop()
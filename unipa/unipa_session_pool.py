@@ -0,0 +1,189 @@
+"""
+セッションプール
+
+UNIPA は同一アカウントでの複数セッションの同時ログインが可能です。一方、1 つのセッションではレスポンスごとに
+rx-token と javax.faces.ViewState が更新されるため、リクエストを直列に送る必要があります。
+セッションプールは同じアカウントで複数回ログインしたセッションをワーカーに貸し出し、処理を並列化します。
+"""
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator, List, Optional, TypeVar
+
+from unipa import Unipa
+from unipa.errors import UnipaInternalError, UnipaNotLoggedIn
+from unipa.unipa_parse_pool import UnipaParsePool
+from unipa.unipa_parser import PARSER_LXML
+from unipa.unipa_transport import UnipaTransportPolicy
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class UnipaSessionPool:
+    """
+    セッションプール
+
+        pool = UnipaSessionPool(base_url, username, password, 4,
+                                prepare=lambda unipa: UnipaBulletinBoard(unipa).get_all())
+        pool.login()
+        with pool.lease() as unipa:
+            items = UnipaBulletinBoard(unipa).get_all()
+        for details in pool.map(lambda unipa, item: item.get_details(unipa), items):
+            ...
+        pool.close()
+    """
+
+    def __init__(self,
+                 base_url: str,
+                 username: str,
+                 password: str,
+                 size: int = 4,
+                 prepare: Optional[Callable[[Unipa], object]] = None,
+                 parser: str = PARSER_LXML,
+                 transport: Optional[UnipaTransportPolicy] = None,
+                 parse_pool: Optional[UnipaParsePool] = None):
+        """
+        セッションプール コンストラクタ
+
+        Args:
+            base_url: UNIVERSAL PASSPORT のベース URL
+            username: ユーザー名
+            password: パスワード
+            size: セッション数
+            prepare: ログイン後に各セッションで実行する準備処理 (掲示詳細を取得する場合は掲示板への移動など)
+            parser: HTML パーサー
+            transport: HTTP 通信のポリシー (すべてのセッションで共有する。サーキットブレーカーも共有される)
+            parse_pool: 解析用プロセスプール (すべてのセッションで共有する。None の場合はワーカーのスレッドで解析する)
+        """
+        if size < 1:
+            raise UnipaInternalError("セッション数は 1 以上を指定してください")
+
+        self.logger = logging.getLogger(__name__)
+        self.__username = username
+        self.__password = password
+        self.__prepare = prepare
+        self.__size = size
+        self.__sessions: List[Unipa] = [
+            Unipa(base_url, parser, transport=transport, parse_pool=parse_pool) for _ in range(size)
+        ]
+        self.__idle: "queue.Queue[Unipa]" = queue.Queue()
+        self.__logged_in = False
+        self.__login_lock = threading.Lock()
+        self.__executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def size(self) -> int:
+        """
+        セッション数
+
+        Returns:
+            int: セッション数
+        """
+        return self.__size
+
+    @property
+    def sessions(self) -> List[Unipa]:
+        """
+        プールしているセッション
+
+        Returns:
+            List[Unipa]: セッション
+        """
+        return list(self.__sessions)
+
+    def login(self) -> None:
+        """
+        すべてのセッションで並列にログインし、準備処理を実行する
+
+        ログイン済みの場合は何もしません。いずれかのセッションでログインに失敗した場合はどのセッションも貸し出さず、
+        もう一度呼び出すとすべてのセッションでログインしなおします。
+        """
+        with self.__login_lock:
+            if self.__logged_in:
+                return
+
+            with ThreadPoolExecutor(self.__size, thread_name_prefix="unipa-login") as executor:
+                sessions = list(executor.map(self.__login, self.__sessions))
+            for unipa in sessions:
+                self.__idle.put(unipa)
+            self.__logged_in = True
+
+        self.logger.debug("%d セッションでログインしました", self.__size)
+
+    def __login(self,
+                unipa: Unipa) -> Unipa:
+        if not unipa.login(self.__username, self.__password):
+            raise UnipaInternalError("セッションプールのログインに失敗しました。")
+        if self.__prepare is not None:
+            self.__prepare(unipa)
+        return unipa
+
+    @contextmanager
+    def lease(self,
+              timeout: Optional[float] = None) -> Iterator[Unipa]:
+        """
+        セッションを貸し出す。ブロック内では貸し出したセッションを他のワーカーが利用しない
+
+            with pool.lease() as unipa:
+                item.get_details(unipa)
+
+        ログイン前は UnipaNotLoggedIn、timeout 秒待っても空きセッションがない場合は UnipaInternalError を送出します。
+
+        Args:
+            timeout: 空きセッションを待つ最大秒数 (None の場合は無制限)
+        """
+        if not self.__logged_in:
+            raise UnipaNotLoggedIn()
+
+        try:
+            unipa = self.__idle.get(timeout=timeout)
+        except queue.Empty:
+            raise UnipaInternalError("空きセッションがありません。") from None
+
+        try:
+            yield unipa
+        finally:
+            self.__idle.put(unipa)
+
+    def map(self,
+            func: Callable[[Unipa, T], R],
+            items: Iterable[T]) -> Iterator[R]:
+        """
+        アイテムごとの処理を、セッションを貸し出しながら並列に実行する
+
+        Args:
+            func: 処理 (セッション, アイテム) -> 結果
+            items: アイテム
+
+        Returns:
+            Iterator[R]: 結果 (items の順)
+        """
+        def run(item: T) -> R:
+            with self.lease() as unipa:
+                return func(unipa, item)
+
+        return self.__get_executor().map(run, items)
+
+    def __get_executor(self) -> ThreadPoolExecutor:
+        if self.__executor is None:
+            self.__executor = ThreadPoolExecutor(self.__size, thread_name_prefix="unipa-pool")
+        return self.__executor
+
+    def close(self) -> None:
+        """
+        ワーカーを停止し、セッションを閉じる
+        """
+        if self.__executor is not None:
+            self.__executor.shutdown()
+            self.__executor = None
+        for unipa in self.__sessions:
+            unipa.session.close()
+
+    def __enter__(self) -> "UnipaSessionPool":
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.close()
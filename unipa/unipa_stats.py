@@ -0,0 +1,262 @@
+"""
+リクエスト計測とフック
+"""
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from unipa.errors import UnipaInternalError
+
+PHASE_CONNECT = "connect"
+PHASE_SERVER_WAIT = "server_wait"
+PHASE_DOWNLOAD = "download"
+PHASE_DECODE = "decode"
+PHASE_PARSE = "parse"
+PHASE_TOKEN_UPDATE = "token_update"
+PHASE_EXTRACTION = "extraction"
+
+PHASES = (PHASE_CONNECT, PHASE_SERVER_WAIT, PHASE_DOWNLOAD, PHASE_DECODE, PHASE_PARSE, PHASE_TOKEN_UPDATE,
+          PHASE_EXTRACTION)
+
+HOOK_BEFORE_REQUEST = "before_request"
+HOOK_AFTER_RESPONSE = "after_response"
+HOOK_AFTER_PARSE = "after_parse"
+HOOK_AFTER_EXTRACT = "after_extract"
+
+HOOK_EVENTS = (HOOK_BEFORE_REQUEST, HOOK_AFTER_RESPONSE, HOOK_AFTER_PARSE, HOOK_AFTER_EXTRACT)
+
+UnipaHookCallback = Callable[["UnipaRequestStats", object], None]
+
+# 接続にかかった時間はコネクションクラスで計測し、スレッドごとに積算する
+_connect_times = threading.local()
+
+
+class UnipaRequestStats:
+    """
+    リクエスト 1 回ぶんの計測結果
+    """
+
+    def __init__(self,
+                 method: str,
+                 url: str,
+                 request_target: Optional[str] = None):
+        """
+        リクエスト 1 回ぶんの計測結果 コンストラクタ
+
+        Args:
+            method: HTTP メソッド
+            url: リクエスト URL
+            request_target: リクエストターゲット (TOP, BULLETBOARD など。ログイン処理では None)
+        """
+        self.method = method
+        self.url = url
+        self.request_target = request_target
+        self.status_code: Optional[int] = None
+        self.request_bytes: int = 0
+        self.response_bytes: int = 0
+        self.from_cache: bool = False
+        self.retries: int = 0
+        self.retry_wait: float = 0.0
+        self.rate_limit_wait: float = 0.0
+        self.timings: Dict[str, float] = {}
+
+    def add_timing(self,
+                   phase: str,
+                   seconds: float) -> None:
+        """
+        フェーズの所要時間を加算する
+
+        Args:
+            phase: フェーズ (PHASES のいずれか)
+            seconds: 所要時間 (秒)
+        """
+        self.timings[phase] = self.timings.get(phase, 0.0) + seconds
+
+    @property
+    def total(self) -> float:
+        """
+        全フェーズの所要時間の合計
+
+        Returns:
+            float: 所要時間 (秒)
+        """
+        return sum(self.timings.values())
+
+    def __str__(self) -> str:
+        timings = ", ".join(f"{phase}={self.timings[phase] * 1000:.1f}ms" for phase in PHASES
+                            if phase in self.timings)
+        return f"UnipaRequestStats(method={self.method}, url={self.url}, status_code={self.status_code}, " \
+               f"from_cache={self.from_cache}, retries={self.retries}, " \
+               f"rate_limit_wait={self.rate_limit_wait * 1000:.1f}ms, request_bytes={self.request_bytes}, " \
+               f"response_bytes={self.response_bytes}, {timings})"
+
+
+class UnipaHooks:
+    """
+    リクエストのフック
+
+    コールバックは (UnipaRequestStats, 対象) の 2 引数で呼び出されます。対象はイベントごとに以下の通りです。
+
+    - before_request: requests.PreparedRequest
+    - after_response: requests.Response
+    - after_parse: BeautifulSoup
+    - after_extract: None
+
+    コールバック内で発生した例外はログに出力され、リクエスト処理には影響しません。
+    """
+
+    def __init__(self) -> None:
+        """
+        リクエストのフック コンストラクタ
+        """
+        self.logger = logging.getLogger(__name__)
+        self.__callbacks: Dict[str, List[UnipaHookCallback]] = {event: [] for event in HOOK_EVENTS}
+
+    def register(self,
+                 event: str,
+                 callback: UnipaHookCallback) -> None:
+        """
+        コールバックを登録する
+
+        Args:
+            event: イベント (before_request, after_response, after_parse, after_extract)
+            callback: コールバック
+        """
+        if event not in self.__callbacks:
+            raise UnipaInternalError(f"{event} is undefined")
+        self.__callbacks[event].append(callback)
+
+    def unregister(self,
+                   event: str,
+                   callback: UnipaHookCallback) -> None:
+        """
+        コールバックの登録を解除する
+
+        Args:
+            event: イベント
+            callback: コールバック
+        """
+        if event not in self.__callbacks:
+            raise UnipaInternalError(f"{event} is undefined")
+        if callback in self.__callbacks[event]:
+            self.__callbacks[event].remove(callback)
+
+    def has_callbacks(self,
+                      event: str) -> bool:
+        """
+        イベントにコールバックが登録されているか
+
+        Args:
+            event: イベント
+
+        Returns:
+            bool: コールバックが登録されているか
+        """
+        return len(self.__callbacks.get(event, [])) > 0
+
+    def fire(self,
+             event: str,
+             stats: "UnipaRequestStats",
+             target: object = None) -> None:
+        """
+        イベントのコールバックを呼び出す
+
+        Args:
+            event: イベント
+            stats: 計測結果
+            target: 対象 (PreparedRequest, Response, BeautifulSoup など)
+        """
+        for callback in list(self.__callbacks[event]):
+            try:
+                callback(stats, target)
+            except Exception:  # noqa
+                self.logger.exception("フック %s の実行に失敗しました", event)
+
+
+class UnipaStopwatch:
+    """
+    フェーズの所要時間を計測し、UnipaRequestStats に加算する
+
+        with UnipaStopwatch(stats, PHASE_PARSE):
+            ...
+    """
+
+    def __init__(self,
+                 stats: UnipaRequestStats,
+                 phase: str):
+        self.stats = stats
+        self.phase = phase
+        self.start = 0.0
+
+    def __enter__(self) -> "UnipaStopwatch":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args: object) -> None:
+        self.stats.add_timing(self.phase, time.perf_counter() - self.start)
+
+
+def reset_connect_time() -> None:
+    """
+    現在のスレッドで積算している接続時間をリセットする
+    """
+    _connect_times.seconds = 0.0
+
+
+def get_connect_time() -> float:
+    """
+    現在のスレッドで積算している接続時間を返す
+
+    Returns:
+        float: 接続時間 (秒)
+    """
+    seconds: float = getattr(_connect_times, "seconds", 0.0)
+    return seconds
+
+
+def _add_connect_time(seconds: float) -> None:
+    _connect_times.seconds = get_connect_time() + seconds
+
+
+class _TimedHTTPConnection(HTTPConnection):
+    def connect(self) -> None:
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _add_connect_time(time.perf_counter() - start)
+
+
+class _TimedHTTPSConnection(HTTPSConnection):
+    def connect(self) -> None:
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _add_connect_time(time.perf_counter() - start)
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class UnipaTimingAdapter(HTTPAdapter):
+    """
+    接続 (TCP/TLS) にかかった時間を計測する HTTPAdapter
+    """
+
+    def init_poolmanager(self, *args: object, **kwargs: object) -> None:
+        super().init_poolmanager(*args, **kwargs)  # type: ignore
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
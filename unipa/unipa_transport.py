@@ -0,0 +1,229 @@
+"""
+HTTP 通信のポリシー (タイムアウト・再試行・コネクションプール・サーキットブレーカー)
+
+UNIPA はレスポンスごとに rx-token と javax.faces.ViewState を更新するため、POST の再試行は
+サーバーがリクエストを処理していないことが確実な場合 (接続できなかった場合と、post_retry_statuses のステータスが
+返された場合) に限ります。読み込みタイムアウトなどレスポンスが届かなかった場合や、ゲートウェイのタイムアウト (504)・
+不正なレスポンス (502) は、アプリケーションがリクエストを処理してトークンを更新した後に返されることがあるため、
+POST では再試行しません。
+"""
+import random
+import threading
+import time
+from typing import Optional, Tuple
+
+import requests
+from urllib3.exceptions import ConnectTimeoutError, MaxRetryError, NewConnectionError
+
+from unipa.errors import UnipaCircuitOpenError
+from unipa.unipa_rate_limit import UnipaRateLimiter
+
+# GET で再試行するステータス (ゲートウェイ・ロードバランサーが返すもの)
+RETRY_STATUSES = (502, 503, 504)
+# POST で再試行するステータス (アプリケーションがリクエストを処理していないことが確実なもの)
+POST_RETRY_STATUSES = (503,)
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+
+class UnipaCircuitBreaker:
+    """
+    サーキットブレーカー
+
+    連続して failure_threshold 回失敗すると open になり、reset_timeout 秒のあいだはリクエストを送信せずに
+    UnipaCircuitOpenError を送出します。reset_timeout 秒後は half_open となり、1 リクエストだけ試行して
+    成功すれば closed に、失敗すれば再び open に戻ります。複数の Unipa で共有できます。
+    """
+
+    def __init__(self,
+                 failure_threshold: int = 5,
+                 reset_timeout: float = 30.0):
+        """
+        サーキットブレーカー コンストラクタ
+
+        Args:
+            failure_threshold: open にする連続失敗回数
+            reset_timeout: open から half_open にするまでの秒数
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.__state = CIRCUIT_CLOSED
+        self.__failures = 0
+        self.__opened_at = 0.0
+        self.__trial = False
+        self.__lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """
+        状態 (closed, open, half_open)
+
+        Returns:
+            str: 状態
+        """
+        with self.__lock:
+            if self.__state == CIRCUIT_OPEN and time.monotonic() - self.__opened_at >= self.reset_timeout:
+                return CIRCUIT_HALF_OPEN
+            return self.__state
+
+    def before_request(self) -> None:
+        """
+        リクエストを送信してよいか確認する (送信できない場合は UnipaCircuitOpenError を送出する)
+        """
+        with self.__lock:
+            if self.__state == CIRCUIT_CLOSED:
+                return
+            if self.__state == CIRCUIT_OPEN:
+                remaining = self.reset_timeout - (time.monotonic() - self.__opened_at)
+                if remaining > 0:
+                    raise UnipaCircuitOpenError(f"サーバーの応答が不安定なため、リクエストを停止しています。"
+                                                f"(残り {remaining:.1f} 秒)")
+                self.__state = CIRCUIT_HALF_OPEN
+                self.__trial = False
+            if self.__trial:
+                raise UnipaCircuitOpenError("サーバーの回復を確認中のため、リクエストを停止しています。")
+            self.__trial = True
+
+    def record_success(self) -> None:
+        """
+        リクエストの成功を記録する
+        """
+        with self.__lock:
+            self.__state = CIRCUIT_CLOSED
+            self.__failures = 0
+            self.__trial = False
+
+    def record_failure(self) -> None:
+        """
+        リクエストの失敗を記録する
+        """
+        with self.__lock:
+            self.__failures += 1
+            if self.__state == CIRCUIT_HALF_OPEN or self.__failures >= self.failure_threshold:
+                self.__state = CIRCUIT_OPEN
+                self.__opened_at = time.monotonic()
+                self.__trial = False
+
+
+class UnipaTransportPolicy:
+    """
+    HTTP 通信のポリシー
+
+        policy = UnipaTransportPolicy(read_timeout=60, max_retries=3, circuit_breaker=UnipaCircuitBreaker())
+        unipa = Unipa(base_url, transport=policy)
+    """
+
+    def __init__(self,
+                 connect_timeout: float = 10.0,
+                 read_timeout: float = 30.0,
+                 max_retries: int = 2,
+                 backoff_base: float = 0.5,
+                 backoff_max: float = 8.0,
+                 retry_statuses: Tuple[int, ...] = RETRY_STATUSES,
+                 post_retry_statuses: Tuple[int, ...] = POST_RETRY_STATUSES,
+                 pool_connections: int = 4,
+                 pool_maxsize: int = 10,
+                 pool_block: bool = False,
+                 keep_alive: bool = True,
+                 circuit_breaker: Optional[UnipaCircuitBreaker] = None,
+                 rate_limiter: Optional[UnipaRateLimiter] = None):
+        """
+        HTTP 通信のポリシー コンストラクタ
+
+        Args:
+            connect_timeout: 接続タイムアウト (秒)
+            read_timeout: 読み込みタイムアウト (秒)
+            max_retries: 最大再試行回数 (0 の場合は再試行しない)
+            backoff_base: 再試行までの待機時間の基準 (秒)。n 回目の再試行は 0 - backoff_base * 2^(n-1) 秒待つ
+            backoff_max: 再試行までの待機時間の上限 (秒)
+            retry_statuses: GET で再試行するステータスコード
+            post_retry_statuses: POST で再試行するステータスコード (アプリケーションがリクエストを処理していないことが
+                確実なもののみ指定すること。処理済みのリクエストを同じトークンで再送すると JSF のビューが同期しなくなる)
+            pool_connections: コネクションプールを保持するホスト数
+            pool_maxsize: ホストごとのコネクションプールの最大接続数
+            pool_block: コネクションプールが埋まっている場合に空きを待つか
+            keep_alive: 接続を再利用するか (False の場合は Connection: close を送信する)
+            circuit_breaker: サーキットブレーカー (None の場合は利用しない)
+            rate_limiter: レートリミッター (None の場合は制限しない)
+        """
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_statuses = retry_statuses
+        self.post_retry_statuses = post_retry_statuses
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.keep_alive = keep_alive
+        self.circuit_breaker = circuit_breaker
+        self.rate_limiter = rate_limiter
+
+    @property
+    def timeout(self) -> Tuple[float, float]:
+        """
+        requests に指定するタイムアウト
+
+        Returns:
+            Tuple[float, float]: (接続タイムアウト, 読み込みタイムアウト)
+        """
+        return self.connect_timeout, self.read_timeout
+
+    def is_retryable_status(self,
+                            method: Optional[str],
+                            status: int) -> bool:
+        """
+        ステータスコードから、リクエストを再試行してよいか判定する
+
+        Args:
+            method: HTTP メソッド
+            status: ステータスコード
+
+        Returns:
+            bool: 再試行してよいか
+        """
+        if method == "GET":
+            return status in self.retry_statuses
+        return status in self.post_retry_statuses
+
+    def is_retryable(self,
+                     method: Optional[str],
+                     error: requests.RequestException) -> bool:
+        """
+        例外が発生したリクエストを再試行してよいか判定する
+
+        GET はタイムアウトを含むすべての通信エラーで再試行します。POST は接続できなかった場合のみ再試行します。
+
+        Args:
+            method: HTTP メソッド
+            error: 発生した例外
+
+        Returns:
+            bool: 再試行してよいか
+        """
+        if method == "GET":
+            return isinstance(error, (requests.ConnectionError, requests.Timeout))
+        if isinstance(error, requests.ConnectTimeout):
+            return True
+        if not isinstance(error, requests.ConnectionError) or isinstance(error, requests.ReadTimeout):
+            return False
+        reason = error.args[0] if len(error.args) > 0 else None
+        if isinstance(reason, MaxRetryError):
+            reason = reason.reason
+        return isinstance(reason, (NewConnectionError, ConnectTimeoutError))
+
+    def get_backoff(self,
+                    attempt: int) -> float:
+        """
+        再試行までの待機時間を求める (full jitter)
+
+        Args:
+            attempt: 再試行の回数 (1 から)
+
+        Returns:
+            float: 待機時間 (秒)
+        """
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
@@ -2,20 +2,26 @@
 ユーティリティ
 """
 import datetime
-import re
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional
 from urllib.parse import urljoin
 
 from bs4 import BeautifulSoup
+from bs4.element import Tag
 
 from unipa import UnipaInternalError
+from unipa import unipa_parsing
+from unipa.unipa_model import UnipaModel
 
 
-class Menu:
+class Menu(UnipaModel):
     """
     ナビゲーションメニュー
     """
 
+    __slots__ = ("_name", "_sub_name")
+    _name: str
+    _sub_name: Optional[str]
+
     def __init__(self,
                  name: str,
                  sub_name: Optional[str]):
@@ -26,8 +32,8 @@ class Menu:
             name: メニュー名
             sub_name: サブメニュー名
         """
-        self._name = name
-        self._sub_name = sub_name
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_sub_name", sub_name)
 
     @property
     def name(self) -> str:
@@ -53,11 +59,16 @@ class Menu:
         return f"Menu(_name={self.name}, sub__name={self.sub_name})"
 
 
-class UnipaNavItem:
+class UnipaNavItem(UnipaModel):
     """
     ナビゲーションアイテム
     """
 
+    __slots__ = ("_menu", "_name", "_menu_id")
+    _menu: Menu
+    _name: str
+    _menu_id: Optional[str]
+
     def __init__(self,
                  menu: Menu,
                  name: str,
@@ -70,9 +81,9 @@ class UnipaNavItem:
             name: アイテム名
             menu_id: メニュー ID
         """
-        self._menu = menu
-        self._name = name
-        self._menu_id = menu_id
+        object.__setattr__(self, "_menu", menu)
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_menu_id", menu_id)
 
     @property
     def menu(self) -> Menu:
@@ -108,11 +119,15 @@ class UnipaNavItem:
         return f"UnipaNavItem(_menu={self._menu}, _name={self._name}, __menu_id={self._menu_id})"
 
 
-class UnipaInfoItem:
+class UnipaInfoItem(UnipaModel):
     """
     トップインフォメーションアイテム
     """
 
+    __slots__ = ("_name", "_item_id")
+    _name: str
+    _item_id: str
+
     def __init__(self,
                  name: str,
                  item_id: str):
@@ -123,8 +138,8 @@ class UnipaInfoItem:
             name: アイテム名
             item_id: アイテム ID
         """
-        self._name = name
-        self._item_id = item_id
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_item_id", item_id)
 
     @property
     def name(self) -> str:
@@ -155,12 +170,10 @@ class UnipaRequestUrl:
     リクエスト URL の列挙
 
     フォームのaction属性を取得し更新する。システムによって違うかもしれないので
+
+    値はインスタンスごとに保持するため、1 プロセスで複数のアカウント・大学の Unipa を利用できます。
     """
-    __urls: Dict[str, Optional[str]] = {
-        "TOP": None,
-        "BULLETBOARD": None,
-        "SITEMAP": None,
-    }
+    NAMES = ("TOP", "BULLETBOARD", "SITEMAP")
 
     def __init__(self,
                  base_url: str):
@@ -171,6 +184,7 @@ class UnipaRequestUrl:
             base_url: ベース URL
         """
         self.__base_url = base_url
+        self.__urls: Dict[str, Optional[str]] = dict.fromkeys(self.NAMES)
 
     def get(self,
             name: str) -> Optional[str]:
@@ -207,6 +221,28 @@ class UnipaRequestUrl:
         header_form = soup.find("form", {"id": "headerForm"})
         self.__urls[name] = header_form.get("action")
 
+    def get_actions(self) -> Dict[str, Optional[str]]:
+        """
+        設定されている action 属性の値 (base_url と結合する前の値) を取得する
+
+        Returns:
+            Dict[str, Optional[str]]: UnipaRequestUrl の名前と action 属性の値
+        """
+        return dict(self.__urls)
+
+    def set_actions(self,
+                    actions: Dict[str, Optional[str]]) -> None:
+        """
+        action 属性の値 (base_url と結合する前の値) を設定する
+
+        Args:
+            actions: UnipaRequestUrl の名前と action 属性の値
+        """
+        for name, action in actions.items():
+            if name not in self.__urls:
+                raise UnipaInternalError(f"{name} is undefined")
+            self.__urls[name] = action
+
 
 class UnipaUtils:
     """
@@ -275,16 +311,11 @@ class UnipaUtils:
 
         info_items = info_detail.select("div.ui-panel-content")
 
-        with open("hoge.html", "w") as f:
-            f.write(str(info_items))
-
         items = []
         for info_item in info_items:
             title = info_item.find("span", {"class": "span"}).text
             item_id = info_item.select_one("a.ui-commandlink").get("id")
 
-            print(title, item_id)
-
             items.append(UnipaInfoItem(
                 name=title,
                 item_id=item_id
@@ -292,6 +323,78 @@ class UnipaUtils:
 
         return items
 
+    @staticmethod
+    def get_login_params(login_form: Tag) -> Dict[str, str]:
+        """
+        ログインフォームのデフォルトパラメータを取得する
+
+        input と button の値をログイン処理でそのまま流用します。
+
+        Args:
+            login_form: ログインフォーム (form#loginForm)
+
+        Returns:
+            Dict[str, str]: パラメータ
+        """
+        params = {}
+
+        for input_tag in login_form.find_all("input"):
+            input_tag_name = input_tag.get("name")
+            input_tag_value = input_tag.get("value")
+            if input_tag_name is None or input_tag_value is None:
+                continue
+            if input_tag_value == "":
+                continue
+
+            params[input_tag_name] = input_tag_value
+
+        for button_tag in login_form.find_all("button"):
+            button_tag_name = button_tag.get("name")
+            button_tag_value = button_tag.get("value")
+            if button_tag_name is None:
+                continue
+
+            if button_tag_value is None:
+                button_tag_value = ""
+
+            params[button_tag_name] = button_tag_value
+
+        return params
+
+    @staticmethod
+    def get_menu_params(menu_item: UnipaNavItem) -> Dict[str, str]:
+        """
+        メニューからリクエストする際のパラメータを取得する
+
+        Args:
+            menu_item: メニューアイテム
+
+        Returns:
+            Dict[str, str]: パラメータ
+        """
+        return {
+            "menuForm:mainMenu": "menuForm:mainMenu",
+            "rx.sync.source": "menuForm:mainMenu",
+            "menuForm:mainMenu_menuid": str(menu_item.menu_id),
+        }
+
+    @staticmethod
+    def get_info_params(info_item: UnipaInfoItem) -> Dict[str, str]:
+        """
+        インフォメーションからリクエストする際のパラメータを取得する
+
+        Args:
+            info_item: インフォメーションアイテム
+
+        Returns:
+            Dict[str, str]: パラメータ
+        """
+        return {
+            "menuForm:mainMenu": "menuForm:mainMenu",
+            "rx.sync.source": info_item.menu_id,
+            info_item.menu_id: info_item.menu_id,
+        }
+
     @staticmethod
     def get_menuid(pfconfirmcommand: str) -> Optional[str]:
         """
@@ -303,12 +406,7 @@ class UnipaUtils:
         Returns:
             Optional[str]: メニュー ID
         """
-        pattern = re.compile(r"'menuForm:mainMenu_menuid':'(.+?)'")
-        match = pattern.search(pfconfirmcommand)
-        if match is None:
-            return None
-
-        return match.group(1)
+        return unipa_parsing.get_menuid(pfconfirmcommand)
 
     @staticmethod
     def process_datetime(datetime_str: Optional[str]) -> Optional[datetime.datetime]:
@@ -321,9 +419,17 @@ class UnipaUtils:
         Returns:
             Optional[datetime.datetime]: 変換後の datetime.datetime
         """
-        if datetime_str is None or datetime_str == "":
-            return None
-        datetime_str = re.sub(r"\(.+?\)", "", datetime_str)
-        datetime_format = "%Y/%m/%d %H:%M %z"
-        jst = datetime.timezone(datetime.timedelta(hours=+9), 'JST')
-        return datetime.datetime.strptime(datetime_str + " +0900", datetime_format).astimezone(jst)
+        return unipa_parsing.process_datetime(datetime_str)
+
+    @staticmethod
+    def process_datetimes(datetime_strs: Iterable[Optional[str]]) -> List[Optional[datetime.datetime]]:
+        """
+        複数の UNIPA の日時テキスト(YYYY/MM/DD HH:MM)をまとめて datetime.datetime に変換する
+
+        Args:
+            datetime_strs: UNIPA の日時テキスト
+
+        Returns:
+            List[Optional[datetime.datetime]]: 変換後の datetime.datetime (datetime_strs の順)
+        """
+        return unipa_parsing.process_datetimes(datetime_strs)